@@ -1,20 +1,56 @@
+import asyncio
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
-from src.api.middleware import error_handler_middleware, logging_middleware
+from src.api.middleware import (
+    error_handler_middleware,
+    logging_middleware,
+    metrics_middleware,
+    profiling_middleware,
+    query_counter_middleware,
+    tracing_middleware,
+)
 from src.api.routes import api_router
 from src.config.settings import settings
+from src.observability.logging import configure_logging
+from src.observability.metrics import render_metrics
+from src.observability.readiness import warm_up
+from src.observability.tracing import configure_tracing
+
+# Configure logging (records are written by a background thread)
+configure_logging("workmetrics-api")
+
+configure_tracing("workmetrics-api")
+
+logger = logging.getLogger(__name__)
+
+
+async def _warm_up(app: FastAPI) -> None:
+    """Build the OpenAPI schema and warm the process up, off the event loop."""
+    try:
+        await run_in_threadpool(app.openapi)
+        await run_in_threadpool(warm_up)
+    except Exception as e:
+        # /api/v1/ready tries again
+        logger.warning(f"Warm-up failed: {str(e)}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Start serving at once and warm up in the background; /api/v1/ready reports when done."""
+    warm_up_task = asyncio.create_task(_warm_up(app))
+    yield
+    warm_up_task.cancel()
 
-# Configure logging
-logging.basicConfig(
-    level=settings.log_level,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
 
 # Create FastAPI application
 app = FastAPI(
+    lifespan=lifespan,
     title="WorkMetrics API",
     description="""
 ## GitLab Metrics Dashboard API
@@ -92,6 +128,18 @@ Manual refresh can be triggered via the `/projects/{id}/refresh` endpoint.
             "name": "projects",
             "description": "Project management operations (CRUD, refresh)",
         },
+        {
+            "name": "snapshots",
+            "description": "Columnar export and import of a project's history",
+        },
+        {
+            "name": "backfill",
+            "description": "Resumable background backfill of a project's GitLab history",
+        },
+        {
+            "name": "webhooks",
+            "description": "GitLab webhook receiver for push-based incremental updates",
+        },
         {
             "name": "metrics",
             "description": "Four Keys DevOps performance metrics",
@@ -104,6 +152,14 @@ Manual refresh can be triggered via the `/projects/{id}/refresh` endpoint.
             "name": "cycle-time",
             "description": "Cycle time analysis with stage breakdowns",
         },
+        {
+            "name": "exports",
+            "description": "Streaming exports of raw merge requests, reviews and deployments",
+        },
+        {
+            "name": "profiling",
+            "description": "On-demand request and task profiles (admin only)",
+        },
     ],
 )
 
@@ -119,6 +175,13 @@ app.add_middleware(
 # Add custom middlewares
 app.middleware("http")(logging_middleware)
 app.middleware("http")(error_handler_middleware)
+# Outside the error handler, so failed requests are profiled too
+app.middleware("http")(profiling_middleware)
+app.middleware("http")(query_counter_middleware)
+if settings.metrics_enabled:
+    app.middleware("http")(metrics_middleware)
+# Outermost, so the request span covers the other middlewares
+app.middleware("http")(tracing_middleware)
 
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
@@ -134,6 +197,15 @@ async def root() -> dict[str, str]:
     }
 
 
+if settings.metrics_enabled:
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics() -> Response:
+        """Prometheus metrics endpoint."""
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -1,4 +1,16 @@
 from src.api.middleware.error_handler import error_handler_middleware
 from src.api.middleware.logging import logging_middleware
+from src.api.middleware.metrics import metrics_middleware
+from src.api.middleware.profiling import ProfiledRoute, profiling_middleware
+from src.api.middleware.queries import query_counter_middleware
+from src.api.middleware.tracing import tracing_middleware
 
-__all__ = ["error_handler_middleware", "logging_middleware"]
+__all__ = [
+    "ProfiledRoute",
+    "error_handler_middleware",
+    "logging_middleware",
+    "metrics_middleware",
+    "profiling_middleware",
+    "query_counter_middleware",
+    "tracing_middleware",
+]
@@ -1,49 +1,66 @@
 import logging
+import random
 import time
 from typing import Callable
 
 from fastapi import Request, Response
 
+from src.config.settings import settings
+
 logger = logging.getLogger(__name__)
 
 
+def should_log_request(status_code: int, process_time: float) -> bool:
+    """
+    Decide whether a request is logged.
+
+    Failed requests and requests slower than settings.request_log_slow_ms are
+    always logged; the others are sampled at settings.request_log_sample_rate.
+    """
+    if status_code >= 400 or process_time * 1000 >= settings.request_log_slow_ms:
+        return True
+    return random.random() < settings.request_log_sample_rate
+
+
 async def logging_middleware(request: Request, call_next: Callable) -> Response:
     """
     Structured logging middleware for request/response tracking.
-    
-    Logs request details, response status, and processing time in a structured format.
+
+    Logs one record per request, with method, path, status, processing time
+    and client as ``extra`` fields (JSON output includes them), subject to
+    sampling (see should_log_request).
     """
-    start_time = time.time()
-    
-    # Log request
-    logger.info(
-        "Request started",
-        extra={
-            "method": request.method,
-            "url": str(request.url),
-            "client_host": request.client.host if request.client else None,
-            "user_agent": request.headers.get("user-agent"),
-        },
-    )
-    
+    start_time = time.perf_counter()
+
     # Process request
     response = await call_next(request)
-    
+
     # Calculate processing time
-    process_time = time.time() - start_time
-    
+    process_time = time.perf_counter() - start_time
+
     # Log response
-    logger.info(
-        "Request completed",
-        extra={
-            "method": request.method,
-            "url": str(request.url),
-            "status_code": response.status_code,
-            "process_time": f"{process_time:.3f}s",
-        },
-    )
-    
+    if logger.isEnabledFor(logging.INFO) and should_log_request(
+        response.status_code, process_time
+    ):
+        # The path from the scope; building request.url costs more than the log record
+        path = request.scope["path"]
+        logger.info(
+            "%s %s %s %.1fms",
+            request.method,
+            path,
+            response.status_code,
+            process_time * 1000,
+            extra={
+                "method": request.method,
+                "path": path,
+                "status_code": response.status_code,
+                "duration_ms": round(process_time * 1000, 3),
+                "client_host": request.client.host if request.client else None,
+                "user_agent": request.headers.get("user-agent"),
+            },
+        )
+
     # Add custom header with processing time
     response.headers["X-Process-Time"] = f"{process_time:.3f}"
-    
+
     return response
@@ -0,0 +1,29 @@
+import time
+from typing import Callable
+
+from fastapi import Request, Response
+
+from src.observability.metrics import HTTP_REQUEST_DURATION
+
+# Route label for requests that match no route (keeps 404 scans out of the labels)
+UNMATCHED_ROUTE = "unmatched"
+
+
+async def metrics_middleware(request: Request, call_next: Callable) -> Response:
+    """
+    Prometheus instrumentation middleware.
+    
+    Records request latency by route template (e.g.
+    /projects/{project_id}/four-keys).
+    """
+    start_time = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        route = getattr(request.scope.get("route"), "path", None) or UNMATCHED_ROUTE
+        HTTP_REQUEST_DURATION.labels(
+            method=request.method, route=route, status=str(status_code)
+        ).observe(time.perf_counter() - start_time)
@@ -0,0 +1,89 @@
+import hmac
+import inspect
+from collections.abc import Callable
+from functools import wraps
+from typing import Any
+
+from fastapi import Request, Response, status
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+from src.config.settings import settings
+from src.observability.profiling import (
+    end_session,
+    is_thread_profiled,
+    run_profiled,
+    save_session,
+    start_session,
+)
+
+# Header (or query parameter) carrying the admin profiling token
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+PROFILE_QUERY_PARAM = "profile"
+
+# Fetching stored profiles is never profiled, so it cannot evict the profile being fetched
+_PROFILES_PATH = "/api/v1/profiles/"
+
+
+def is_profiling_authorized(token: str | None) -> bool:
+    """Whether token is the configured admin profiling token (profiling is off without one)."""
+    if not settings.profiling_token or not token:
+        return False
+    return hmac.compare_digest(token, settings.profiling_token)
+
+
+async def profiling_middleware(request: Request, call_next: Callable) -> Response:
+    """
+    On-demand profiling middleware.
+    
+    Requests carrying the admin profiling token in the X-Profile-Token header
+    or the profile query parameter are run under cProfile; the stored
+    profile's artifact ID is returned in the X-Profile-Id header. Other
+    requests pass straight through.
+    
+    Only one request at a time can profile the event loop; a profiled
+    request arriving while another one runs gets 409 Conflict.
+    """
+    if not settings.profiling_token or request.url.path.startswith(_PROFILES_PATH):
+        return await call_next(request)
+    token = request.headers.get(PROFILE_TOKEN_HEADER) or request.query_params.get(
+        PROFILE_QUERY_PARAM
+    )
+    if not is_profiling_authorized(token):
+        return await call_next(request)
+    if is_thread_profiled():
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={
+                "error": "Profiling in progress",
+                "message": "Another request is being profiled; try again when it completes.",
+            },
+        )
+
+    session, session_token = start_session("request", f"{request.method} {request.url.path}")
+    try:
+        # Profiles the event loop thread (which may include other requests'
+        # coroutines); sync endpoints get their own profiler in ProfiledRoute
+        with session.profile_thread():
+            response = await call_next(request)
+    finally:
+        end_session(session_token)
+
+    artifact_id = save_session(session)
+    if artifact_id is not None:
+        response.headers["X-Profile-Id"] = artifact_id
+    return response
+
+
+class ProfiledRoute(APIRoute):
+    """API route whose sync endpoint runs under the profiler of a profiled request."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        if not inspect.iscoroutinefunction(endpoint):
+            original = endpoint
+
+            @wraps(original)
+            def endpoint(*args: Any, **kwargs: Any) -> Any:
+                return run_profiled(original, *args, **kwargs)
+
+        super().__init__(path, endpoint, **kwargs)
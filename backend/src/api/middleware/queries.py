@@ -0,0 +1,37 @@
+from typing import Callable
+
+from fastapi import Request, Response
+
+from src.config.settings import settings
+from src.observability.queries import (
+    current_query_source,
+    report_repeated_statements,
+    reset_query_source,
+    set_query_source,
+)
+
+# Source label for requests that match no route (keeps 404 scans out of the labels)
+UNMATCHED_ROUTE = "unmatched"
+
+
+async def query_counter_middleware(request: Request, call_next: Callable) -> Response:
+    """
+    SQL query counting middleware.
+    
+    Attributes the database queries made while handling the request to its
+    route, logs statements repeated often enough to suggest an N+1 pattern,
+    and outside production reports the totals in the X-DB-Query-Count and
+    X-DB-Query-Time headers.
+    """
+    token = set_query_source(UNMATCHED_ROUTE, scope=request.scope)
+    source = current_query_source()
+    try:
+        response = await call_next(request)
+    finally:
+        reset_query_source(token)
+
+    report_repeated_statements(source)
+    if not settings.is_production:
+        response.headers["X-DB-Query-Count"] = str(source.queries)
+        response.headers["X-DB-Query-Time"] = f"{source.seconds:.3f}"
+    return response
@@ -0,0 +1,32 @@
+from typing import Callable
+
+from fastapi import Request, Response
+from opentelemetry.trace import SpanKind, Status, StatusCode
+
+from src.observability.tracing import extract_context, tracer
+
+
+async def tracing_middleware(request: Request, call_next: Callable) -> Response:
+    """
+    Tracing middleware.
+    
+    Starts the server span of the request, continuing the trace of the
+    caller when a traceparent header is present. Spans of the refresh
+    pipeline and GitLab calls made by the request become its children.
+    """
+    with tracer.start_as_current_span(
+        request.method,
+        context=extract_context(request.headers),
+        kind=SpanKind.SERVER,
+        attributes={"http.request.method": request.method, "url.path": request.url.path},
+    ) as span:
+        response = await call_next(request)
+
+        route = getattr(request.scope.get("route"), "path", None)
+        if route is not None and span.is_recording():
+            span.update_name(f"{request.method} {route}")
+            span.set_attribute("http.route", route)
+        span.set_attribute("http.response.status_code", response.status_code)
+        if response.status_code >= 500:
+            span.set_status(Status(StatusCode.ERROR))
+        return response
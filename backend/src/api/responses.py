@@ -0,0 +1,52 @@
+"""
+Fast JSON responses for large payloads built from trusted service output.
+
+FastAPI validates an endpoint's return value against its response_model
+before serializing it. For payloads the route assembles itself from
+analyzer output (one entry per team member or merge request) that
+validation only repeats what the analyzers already guarantee, and it
+dominates serialization time at thousands of entries. Such routes keep
+their response_model for the OpenAPI schema but return trusted_response,
+which encodes the payload once with orjson.
+"""
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from src.config.settings import settings
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response encoded with orjson (numpy scalars and arrays included)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def trusted_response(content: dict[str, Any], model: type[BaseModel]) -> ORJSONResponse:
+    """
+    Return content without revalidating it against its response model.
+
+    With settings.validate_trusted_responses on (development and tests),
+    the encoded content must also be byte-for-byte what response_model
+    would send, so drift between an analyzer and the documented schema
+    (missing or extra keys, ints for floats) fails loudly instead of shipping.
+
+    Args:
+        content: Response payload built by the route from trusted service output
+        model: The route's response_model
+
+    Returns:
+        The orjson-encoded response
+
+    Raises:
+        ValueError: If validation is on and content differs from its validated form
+    """
+    response = ORJSONResponse(content)
+    if settings.validate_trusted_responses:
+        validated = ORJSONResponse(model.model_validate(content).model_dump(mode="json"))
+        if response.body != validated.body:
+            raise ValueError(f"Trusted payload differs from its {model.__name__} form")
+    return response
@@ -0,0 +1,110 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from src.api.middleware.profiling import ProfiledRoute
+from src.database.session import get_db
+from src.models.backfill import BackfillRun
+from src.models.project import Project
+from src.services.backfill import BackfillService
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+class BackfillRequest(BaseModel):
+    """Request model for starting a backfill."""
+
+    days: int = Field(ge=1, description="Days of history to fetch, counting back from now")
+    chunk_days: int | None = Field(
+        default=None, ge=1, description="Days of history per window (defaults to settings)"
+    )
+    restart: bool = Field(default=False, description="Start over instead of resuming")
+
+
+class BackfillResponse(BaseModel):
+    """Response model for a backfill's progress."""
+
+    project_id: int
+    status: str
+    oldest: datetime
+    newest: datetime
+    cursor: datetime
+    chunks_done: int
+    chunks_total: int
+    rows_written: int
+    eta_seconds: float | None
+    last_error: str | None
+    finished_at: datetime | None
+
+    class Config:
+        from_attributes = True
+
+
+def _get_project(db: Session, project_id: int) -> Project:
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Project {project_id} not found"
+        )
+    return project
+
+
+@router.post(
+    "/projects/{project_id}/backfill",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=BackfillResponse,
+)
+def start_backfill(
+    project_id: int, request: BackfillRequest, db: Session = Depends(get_db)
+) -> BackfillRun:
+    """
+    Start (or resume) a backfill of a project's history in the background.
+
+    History is fetched from GitLab in windows of chunk_days, newest first,
+    with its own rate budget; progress is checkpointed after each window, so
+    an interrupted backfill continues where it stopped. Starting a backfill
+    that is still in progress resumes it unless restart is set; a task queued
+    while another one is processing the backfill exits without fetching, as
+    each backfill is processed under its project's ``backfill`` lease.
+
+    Args:
+        project_id: Project ID
+        request: Backfill range and options
+        db: Database session
+
+    Returns:
+        The backfill's progress
+    """
+    # The Celery app is loaded on first use, not at API startup
+    from src.tasks.backfill import backfill_project
+
+    project = _get_project(db, project_id)
+    run = BackfillService(db).start(
+        project, request.days, chunk_days=request.chunk_days, restart=request.restart
+    )
+    backfill_project.delay(project_id)
+    return run
+
+
+@router.get("/projects/{project_id}/backfill", response_model=BackfillResponse)
+def get_backfill(project_id: int, db: Session = Depends(get_db)) -> BackfillRun:
+    """
+    Get the progress of a project's backfill.
+
+    Args:
+        project_id: Project ID
+        db: Database session
+
+    Returns:
+        The backfill's progress, with an estimate of the processing time left
+    """
+    _get_project(db, project_id)
+    run = BackfillService(db).get_run(project_id)
+    if run is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No backfill started for project {project_id}",
+        )
+    return run
@@ -1,14 +1,16 @@
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from src.database.session import get_db
+from src.api.middleware.profiling import ProfiledRoute
+from src.api.responses import trusted_response
+from src.database.session import get_read_db
 from src.models.project import Project
 from src.services.cycle_time_analyzer import CycleTimeAnalyzer
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 class StageStats(BaseModel):
@@ -66,8 +68,8 @@ def get_cycle_time(
     project_id: int,
     start_date: str = Query(..., description="Start date in YYYY-MM-DD format"),
     end_date: str = Query(..., description="End date in YYYY-MM-DD format"),
-    db: Session = Depends(get_db),
-) -> dict:
+    db: Session = Depends(get_read_db),
+) -> Response:
     """
     Get cycle time analysis for a project.
     
@@ -121,9 +123,13 @@ def get_cycle_time(
     distribution = analyzer.get_cycle_time_distribution(project_id, start_dt, end_dt)
     distribution = distribution[:50]  # Limit for performance
 
-    return {
-        "period_start": start_dt.isoformat(),
-        "period_end": end_dt.isoformat(),
-        "metrics": metrics,
-        "distribution": distribution,
-    }
+    # Analyzer output already matches the response model; skip revalidating it
+    return trusted_response(
+        {
+            "period_start": start_dt.isoformat(),
+            "period_end": end_dt.isoformat(),
+            "metrics": metrics,
+            "distribution": distribution,
+        },
+        CycleTimeResponse,
+    )
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from src.api.middleware.profiling import ProfiledRoute
+from src.database.session import get_read_db
+from src.models.project import Project
+from src.services.event_exporter import EXPORT_DATASETS, EventExporter
+
+router = APIRouter(route_class=ProfiledRoute)
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _parse_date(value: str | None, next_day: bool = False) -> datetime | None:
+    """Parse an optional YYYY-MM-DD date, optionally moved to the start of the next day."""
+    if value is None:
+        return None
+    try:
+        parsed = datetime.strptime(value, "%Y-%m-%d")
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid date format: {str(e)}. Use YYYY-MM-DD",
+        )
+    if next_day:
+        parsed += timedelta(days=1)
+    return parsed
+
+
+@router.get(
+    "/projects/{project_id}/exports/{dataset}",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {media_type: {} for media_type in MEDIA_TYPES.values()},
+            "description": "Rows as newline-delimited JSON or CSV",
+        }
+    },
+)
+def export_events(
+    project_id: int,
+    dataset: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    start_date: str | None = Query(None, description="Start date in YYYY-MM-DD format"),
+    end_date: str | None = Query(None, description="End date in YYYY-MM-DD format"),
+    columns: str | None = Query(
+        None, description="Comma-separated columns to export (all columns when omitted)"
+    ),
+    db: Session = Depends(get_read_db),
+) -> StreamingResponse:
+    """
+    Export a project's raw merge requests, reviews or deployments.
+
+    Rows are streamed from a server-side cursor as they are read, ordered by
+    time (created_at_gitlab, reviewed_at or deployed_at), so exports of any
+    size use constant memory. The date range applies to that time column.
+
+    Args:
+        project_id: Project ID
+        dataset: merge_requests, reviews or deployments
+        format: Output format
+        start_date: Earliest day to export
+        end_date: Last day to export (inclusive)
+        columns: Columns to export
+        db: Database session
+
+    Returns:
+        The streamed rows
+    """
+    if dataset not in EXPORT_DATASETS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown export dataset: {dataset}"
+        )
+
+    # Validate project exists
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Project {project_id} not found"
+        )
+
+    start_dt = _parse_date(start_date)
+    # Exclusive bound, so the whole of the last day is exported
+    end_dt = _parse_date(end_date, next_day=True)
+    if start_dt is not None and end_dt is not None and start_dt >= end_dt:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="start_date must be before end_date"
+        )
+
+    requested = [name.strip() for name in columns.split(",") if name.strip()] if columns else None
+    exporter = EventExporter(db)
+    try:
+        selected = exporter.resolve_columns(dataset, requested)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    # The query runs now, so database errors surface before the response starts.
+    # The session stays open while the body streams: dependencies with yield
+    # are torn down after the response is sent (FastAPI 0.118 and later).
+    result = exporter.open_rows(dataset, project_id, selected, start_dt, end_dt)
+    encode = exporter.iter_csv if format == "csv" else exporter.iter_ndjson
+    return StreamingResponse(
+        encode(result, selected),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="project-{project_id}-{dataset}.{format}"'
+            )
+        },
+    )
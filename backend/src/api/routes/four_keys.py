@@ -1,15 +1,19 @@
 from datetime import datetime, timedelta
 from typing import Any
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from src.database.session import get_db
+from src.api.middleware.profiling import ProfiledRoute
+from src.database.session import get_read_db
 from src.models.project import Project
+from src.observability.metrics import record_cache_lookup
 from src.services.metrics_calculator import MetricsCalculator
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 class FourKeysMetricsResponse(BaseModel):
@@ -27,6 +31,71 @@ class FourKeysMetricsResponse(BaseModel):
     time_to_restore_median_hours: float | None
 
 
+class ProjectFourKeysMetrics(FourKeysMetricsResponse):
+    """Four Keys metrics for one project in a batch response."""
+
+    project_id: int
+
+
+class FourKeysBatchResponse(BaseModel):
+    """Response model for multi-project Four Keys metrics."""
+
+    period_start: str
+    period_end: str
+    total: int
+    limit: int
+    offset: int
+    projects: list[ProjectFourKeysMetrics]
+    aggregate: FourKeysMetricsResponse | None = None
+
+
+class FourKeysSeriesResponse(BaseModel):
+    """Response model for bucketed Four Keys metrics."""
+
+    period_start: str
+    period_end: str
+    bucket: str
+    timezone: str
+    buckets: list[FourKeysMetricsResponse]
+
+
+def _parse_date_range(start_date: str, end_date: str) -> tuple[datetime, datetime]:
+    """Parse and validate a YYYY-MM-DD date range, extending the end to end of day."""
+    try:
+        start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+        end_dt = datetime.strptime(end_date, "%Y-%m-%d")
+        # Set end time to end of day
+        end_dt = end_dt.replace(hour=23, minute=59, second=59)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid date format: {str(e)}. Use YYYY-MM-DD",
+        )
+
+    if start_dt > end_dt:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="start_date must be before end_date"
+        )
+
+    return start_dt, end_dt
+
+
+def _format_metrics(metrics: dict[str, Any]) -> dict[str, Any]:
+    """Format calculated metrics for a response."""
+    return {
+        "period_start": metrics["period_start"].isoformat(),
+        "period_end": metrics["period_end"].isoformat(),
+        "deployment_frequency": metrics["deployment_frequency"],
+        "deployment_count": metrics["deployment_count"],
+        "lead_time_hours": metrics["lead_time_hours"],
+        "lead_time_median_hours": metrics["lead_time_median_hours"],
+        "change_failure_rate": metrics["change_failure_rate"],
+        "failed_deployment_count": metrics["failed_deployment_count"],
+        "time_to_restore_hours": metrics["time_to_restore_hours"],
+        "time_to_restore_median_hours": metrics["time_to_restore_median_hours"],
+    }
+
+
 @router.get(
     "/projects/{project_id}/four-keys", response_model=FourKeysMetricsResponse
 )
@@ -34,11 +103,14 @@ def get_four_keys_metrics(
     project_id: int,
     start_date: str = Query(..., description="Start date in YYYY-MM-DD format"),
     end_date: str = Query(..., description="End date in YYYY-MM-DD format"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> dict[str, Any]:
     """
     Get Four Keys DevOps metrics for a project.
     
+    Metrics come from the snapshot saved by the daily refresh when one covers
+    the same days, and are calculated from deployments otherwise.
+    
     Args:
         project_id: Project ID
         start_date: Start date for metrics calculation
@@ -55,38 +127,158 @@ def get_four_keys_metrics(
             status_code=status.HTTP_404_NOT_FOUND, detail=f"Project {project_id} not found"
         )
 
-    # Parse dates
+    start_dt, end_dt = _parse_date_range(start_date, end_date)
+
+    # Serve a stored snapshot for the same period, otherwise calculate live
+    calculator = MetricsCalculator(db)
+    metrics = calculator.get_snapshot(project_id, start_dt, end_dt)
+    record_cache_lookup("four_keys_snapshot", hit=metrics is not None)
+    if metrics is None:
+        metrics = calculator.calculate_four_keys(project_id, start_dt, end_dt)
+    else:
+        metrics.update(period_start=start_dt, period_end=end_dt)
+
+    # Format response
+    return _format_metrics(metrics)
+
+
+@router.get(
+    "/projects/{project_id}/four-keys/series", response_model=FourKeysSeriesResponse
+)
+def get_four_keys_series(
+    project_id: int,
+    start_date: str = Query(..., description="Start date in YYYY-MM-DD format"),
+    end_date: str = Query(..., description="End date in YYYY-MM-DD format"),
+    bucket: str = Query(
+        "week", pattern="^(day|week|month)$", description="Bucket size: day, week or month"
+    ),
+    timezone: str = Query("UTC", description="IANA timezone used for bucket boundaries"),
+    db: Session = Depends(get_read_db),
+) -> dict[str, Any]:
+    """
+    Get Four Keys DevOps metrics per day, week or month for a project.
+    
+    Every bucket in the range is returned, including buckets without
+    deployments. Buckets follow local calendar boundaries in the requested
+    timezone (weeks start on Monday), and each period_end is exclusive.
+    
+    Args:
+        project_id: Project ID
+        start_date: First day of the series
+        end_date: Last day of the series (inclusive)
+        bucket: Bucket size
+        timezone: Timezone for bucket boundaries
+        db: Database session
+        
+    Returns:
+        Four Keys metrics for each bucket in the period
+    """
+    # Validate project exists
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Project {project_id} not found"
+        )
+
     try:
-        start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-        end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-        # Set end time to end of day
-        end_dt = end_dt.replace(hour=23, minute=59, second=59)
-    except ValueError as e:
+        zone = ZoneInfo(timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown timezone: {timezone}"
+        )
+
+    start_dt, end_dt = _parse_date_range(start_date, end_date)
+    start_dt = start_dt.replace(tzinfo=zone)
+    end_dt = datetime.combine(end_dt.date() + timedelta(days=1), datetime.min.time(), tzinfo=zone)
+
+    calculator = MetricsCalculator(db)
+    series = calculator.calculate_four_keys_series(project_id, start_dt, end_dt, bucket, timezone)
+
+    return {
+        "period_start": start_dt.isoformat(),
+        "period_end": end_dt.isoformat(),
+        "bucket": bucket,
+        "timezone": timezone,
+        "buckets": [_format_metrics(metrics) for metrics in series],
+    }
+
+
+@router.get("/four-keys", response_model=FourKeysBatchResponse)
+def get_four_keys_metrics_batch(
+    project_ids: str = Query(..., description="Comma-separated project IDs"),
+    start_date: str = Query(..., description="Start date in YYYY-MM-DD format"),
+    end_date: str = Query(..., description="End date in YYYY-MM-DD format"),
+    include_aggregate: bool = Query(
+        False, description="Include metrics aggregated across all requested projects"
+    ),
+    limit: int = Query(100, ge=1, le=500, description="Maximum projects per page"),
+    offset: int = Query(0, ge=0, description="Number of projects to skip"),
+    db: Session = Depends(get_read_db),
+) -> dict[str, Any]:
+    """
+    Get Four Keys DevOps metrics for many projects at once.
+    
+    All projects on the requested page are computed by a single grouped query.
+    When include_aggregate is set, the org-level aggregate covers every
+    requested project (not just the current page) and comes from the same query.
+    
+    Args:
+        project_ids: Comma-separated project IDs
+        start_date: Start date for metrics calculation
+        end_date: End date for metrics calculation
+        include_aggregate: Whether to include the org-level aggregate
+        limit: Maximum number of projects to return
+        offset: Number of projects to skip
+        db: Database session
+        
+    Returns:
+        Four Keys metrics per project, plus the optional aggregate
+    """
+    try:
+        requested_ids = sorted({int(pid) for pid in project_ids.split(",") if pid.strip()})
+    except ValueError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid date format: {str(e)}. Use YYYY-MM-DD",
+            detail="project_ids must be a comma-separated list of integers",
+        )
+    if not requested_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="project_ids must not be empty"
         )
 
-    # Validate date range
-    if start_dt > end_dt:
+    start_dt, end_dt = _parse_date_range(start_date, end_date)
+
+    # Validate all projects exist with one lookup
+    found_ids = set(
+        db.execute(select(Project.id).where(Project.id.in_(requested_ids))).scalars()
+    )
+    missing_ids = [pid for pid in requested_ids if pid not in found_ids]
+    if missing_ids:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="start_date must be before end_date"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Projects not found: {', '.join(str(pid) for pid in missing_ids)}",
         )
 
-    # Calculate metrics
+    page_ids = requested_ids[offset : offset + limit]
+
+    # The aggregate must span every requested project, so compute over all of
+    # them in that case; otherwise only the current page is queried.
     calculator = MetricsCalculator(db)
-    metrics = calculator.calculate_four_keys(project_id, start_dt, end_dt)
+    per_project, aggregate = calculator.calculate_four_keys_batch(
+        requested_ids if include_aggregate else page_ids,
+        start_dt,
+        end_dt,
+        include_aggregate=include_aggregate,
+    )
 
-    # Format response
     return {
-        "period_start": metrics["period_start"].isoformat(),
-        "period_end": metrics["period_end"].isoformat(),
-        "deployment_frequency": metrics["deployment_frequency"],
-        "deployment_count": metrics["deployment_count"],
-        "lead_time_hours": metrics["lead_time_hours"],
-        "lead_time_median_hours": metrics["lead_time_median_hours"],
-        "change_failure_rate": metrics["change_failure_rate"],
-        "failed_deployment_count": metrics["failed_deployment_count"],
-        "time_to_restore_hours": metrics["time_to_restore_hours"],
-        "time_to_restore_median_hours": metrics["time_to_restore_median_hours"],
+        "period_start": start_dt.isoformat(),
+        "period_end": end_dt.isoformat(),
+        "total": len(requested_ids),
+        "limit": limit,
+        "offset": offset,
+        "projects": [
+            {"project_id": pid, **_format_metrics(per_project[pid])} for pid in page_ids
+        ],
+        "aggregate": _format_metrics(aggregate) if aggregate is not None else None,
     }
@@ -1,12 +1,15 @@
 from typing import Any
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from src.api.middleware.profiling import ProfiledRoute
 from src.database.session import get_db
+from src.observability.readiness import is_ready, warm_up
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.get("/health", status_code=status.HTTP_200_OK)
@@ -31,3 +34,25 @@ async def health_check(db: Session = Depends(get_db)) -> dict[str, Any]:
         "database": db_status,
         "service": "workmetrics-api",
     }
+
+
+@router.get("/ready", status_code=status.HTTP_200_OK)
+async def readiness_check(response: Response) -> dict[str, Any]:
+    """
+    Readiness check endpoint.
+
+    Reports ready once warm-up has finished (see src.observability.readiness).
+    Warm-up runs in the background at startup; if it has not finished, it is
+    run here, so the check returns once the process is ready or warm-up failed.
+
+    Returns:
+        Readiness status, with status code 503 while not ready
+    """
+    if not is_ready():
+        try:
+            await run_in_threadpool(warm_up)
+        except Exception as e:
+            response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+            return {"status": "not ready", "reason": str(e)}
+
+    return {"status": "ready"}
@@ -0,0 +1,83 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+
+from src.api.middleware.profiling import ProfiledRoute, is_profiling_authorized
+from src.observability.profiling import collapsed_stacks, load_metadata, load_pstats
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+def require_profiling_token(
+    x_profile_token: str | None = Header(None, description="Admin profiling token"),
+) -> None:
+    """Reject requests without the admin profiling token."""
+    if not is_profiling_authorized(x_profile_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="A valid profiling token is required"
+        )
+
+
+def _not_found(profile_id: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND, detail=f"Profile {profile_id} not found"
+    )
+
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_profiling_token)])
+def get_profile(profile_id: str) -> dict[str, Any]:
+    """
+    Get the metadata of a stored profile.
+
+    Args:
+        profile_id: Artifact ID from the X-Profile-Id response header or the task log
+
+    Returns:
+        What was profiled (request or task), when, and for how long
+    """
+    try:
+        return load_metadata(profile_id)
+    except FileNotFoundError:
+        raise _not_found(profile_id)
+
+
+@router.get("/profiles/{profile_id}/pstats", dependencies=[Depends(require_profiling_token)])
+def get_profile_pstats(profile_id: str) -> Response:
+    """
+    Download a stored profile in the pstats format.
+
+    The file can be opened with ``python -m pstats`` or snakeviz.
+
+    Args:
+        profile_id: Artifact ID of the profile
+
+    Returns:
+        The pstats file
+    """
+    try:
+        content = load_pstats(profile_id)
+    except FileNotFoundError:
+        raise _not_found(profile_id)
+    return Response(
+        content=content,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.pstats"'},
+    )
+
+
+@router.get("/profiles/{profile_id}/collapsed", dependencies=[Depends(require_profiling_token)])
+def get_profile_collapsed(profile_id: str) -> Response:
+    """
+    Get a stored profile as collapsed stacks for flamegraph tools.
+
+    Args:
+        profile_id: Artifact ID of the profile
+
+    Returns:
+        One "frame;frame;frame microseconds" line per stack
+    """
+    try:
+        content = collapsed_stacks(profile_id)
+    except FileNotFoundError:
+        raise _not_found(profile_id)
+    return Response(content=content, media_type="text/plain")
@@ -4,11 +4,13 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from src.api.middleware.profiling import ProfiledRoute
 from src.database.session import get_db
 from src.models.project import Project
 from src.services.data_refresh import DataRefreshService
+from src.services.project_leases import ProjectLeases
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 class CreateProjectRequest(BaseModel):
@@ -134,6 +136,12 @@ def delete_project(project_id: int, db: Session = Depends(get_db)) -> None:
 async def refresh_project(project_id: int, db: Session = Depends(get_db)) -> dict[str, Any]:
     """
     Manually trigger data refresh for a project.
+
+    The refresh runs under the project's ``refresh`` lease (see ProjectLeases):
+    while the project is being refreshed by another request or the daily
+    batch, this request waits for that refresh and returns its result.
+    Metrics of the buckets the refresh changed are recomputed under the
+    same lease.
     
     Args:
         project_id: Project ID
@@ -149,16 +157,31 @@ async def refresh_project(project_id: int, db: Session = Depends(get_db)) -> dic
             status_code=status.HTTP_404_NOT_FOUND, detail=f"Project {project_id} not found"
         )
 
-    # Refresh data
+    # Refresh data, then the metrics of the buckets it changed
     refresh_service = DataRefreshService(db)
-    try:
+
+    async def refresh_and_recompute() -> dict[str, Any]:
         result = await refresh_service.refresh_project_data(project, days_back=90)
-        return {
-            "message": f"Data refresh completed for project {project.name}",
-            "deployments_count": result["deployments"],
-        }
+        counters = await refresh_service.recompute_metrics(project, metrics_days=30)
+        return {**result, **counters}
+
+    leases = ProjectLeases()
+    try:
+        result = await leases.run("refresh", project.id, refresh_and_recompute, scope=90)
+    except TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"A refresh of project {project.name} is still in progress",
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to refresh data: {str(e)}",
         )
+    finally:
+        await leases.close()
+
+    return {
+        "message": f"Data refresh completed for project {project.name}",
+        "deployments_count": result["deployments"],
+    }
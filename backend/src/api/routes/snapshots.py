@@ -0,0 +1,108 @@
+import tempfile
+from collections.abc import Iterator
+from typing import IO, Any
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from src.api.middleware.profiling import ProfiledRoute
+from src.database.session import get_db, get_read_db
+from src.models.project import Project
+from src.services.project_snapshot import SPOOL_MAX_BYTES, ProjectSnapshotService, SnapshotError
+
+router = APIRouter(route_class=ProfiledRoute)
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def _iter_file(file: IO[bytes]) -> Iterator[bytes]:
+    """Yield a file's content in chunks, closing it at the end."""
+    try:
+        while chunk := file.read(CHUNK_SIZE):
+            yield chunk
+    finally:
+        file.close()
+
+
+@router.get(
+    "/projects/{project_id}/snapshot",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/zip": {}}, "description": "Snapshot archive"}},
+)
+def export_project_snapshot(
+    project_id: int, db: Session = Depends(get_read_db)
+) -> StreamingResponse:
+    """
+    Export a project's history as a columnar snapshot.
+
+    The snapshot is a zip archive with one Parquet file per table (project,
+    team members, merge requests, reviews, deployments) and a manifest. It
+    can be imported into another environment with POST /projects/snapshots
+    or read directly with pandas or pyarrow.
+
+    Args:
+        project_id: Project ID
+        db: Database session
+
+    Returns:
+        The snapshot archive
+    """
+    project = db.query(Project).filter(Project.id == project_id).first()
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Project {project_id} not found"
+        )
+
+    snapshot = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    try:
+        ProjectSnapshotService(db).export_project(project_id, snapshot)
+    except Exception:
+        snapshot.close()
+        raise
+    snapshot.seek(0)
+    return StreamingResponse(
+        _iter_file(snapshot),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="project-{project_id}-snapshot.zip"'
+        },
+    )
+
+
+@router.post(
+    "/projects/snapshots",
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/zip": {"schema": {"type": "string", "format": "binary"}}},
+        }
+    },
+)
+async def import_project_snapshot(
+    request: Request, db: Session = Depends(get_db)
+) -> dict[str, Any]:
+    """
+    Import a project snapshot sent as the request body.
+
+    The project is matched by its GitLab ID and created if needed; existing
+    rows are updated, so the same snapshot can be imported repeatedly. No
+    GitLab access is needed.
+
+    Args:
+        request: Request whose body is the snapshot archive
+        db: Database session
+
+    Returns:
+        The imported project's ID and the rows loaded per table
+    """
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as snapshot:
+        async for chunk in request.stream():
+            snapshot.write(chunk)
+        snapshot.seek(0)
+        try:
+            return await run_in_threadpool(ProjectSnapshotService(db).import_snapshot, snapshot)
+        except SnapshotError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
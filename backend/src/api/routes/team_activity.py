@@ -1,14 +1,16 @@
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from src.database.session import get_db
+from src.api.middleware.profiling import ProfiledRoute
+from src.api.responses import trusted_response
+from src.database.session import get_read_db
 from src.models.project import Project
 from src.services.activity_analyzer import ActivityAnalyzer
 
-router = APIRouter()
+router = APIRouter(route_class=ProfiledRoute)
 
 
 class TeamMemberActivity(BaseModel):
@@ -55,8 +57,8 @@ def get_team_activity(
     project_id: int,
     start_date: str = Query(..., description="Start date in YYYY-MM-DD format"),
     end_date: str = Query(..., description="End date in YYYY-MM-DD format"),
-    db: Session = Depends(get_db),
-) -> dict:
+    db: Session = Depends(get_read_db),
+) -> Response:
     """
     Get team activity metrics for a project.
     
@@ -102,9 +104,13 @@ def get_team_activity(
     # Get review load distribution
     review_load = analyzer.get_review_load_distribution(project_id, start_dt, end_dt)
 
-    return {
-        "period_start": start_dt.isoformat(),
-        "period_end": end_dt.isoformat(),
-        "team_members": activity_metrics,
-        "review_load": review_load,
-    }
+    # Analyzer output already matches the response model; skip revalidating it
+    return trusted_response(
+        {
+            "period_start": start_dt.isoformat(),
+            "period_end": end_dt.isoformat(),
+            "team_members": activity_metrics,
+            "review_load": review_load,
+        },
+        TeamActivityResponse,
+    )
@@ -0,0 +1,63 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from sqlalchemy.orm import Session
+
+from src.api.middleware.profiling import ProfiledRoute
+from src.database.session import get_db
+from src.models.project import Project
+from src.services.webhooks import is_webhook_authorized, parse_gitlab_event
+
+router = APIRouter(route_class=ProfiledRoute)
+
+
+@router.post("/webhooks/gitlab", status_code=status.HTTP_202_ACCEPTED)
+async def receive_gitlab_webhook(
+    request: Request,
+    x_gitlab_event: str = Header(..., description="GitLab event kind"),
+    x_gitlab_token: str | None = Header(None, description="Webhook secret token"),
+    db: Session = Depends(get_db),
+) -> dict[str, Any]:
+    """
+    Receive a GitLab webhook event and queue an update of the rows it affects.
+
+    Deployment, Merge Request, Note and Pipeline events are handled; the
+    affected deployment or merge request is fetched from GitLab and upserted
+    in the background, and its metrics are recomputed. Other events, and
+    events of projects that are not tracked, are acknowledged and ignored.
+    Configure the webhook in GitLab with the secret token GITLAB_WEBHOOK_SECRET.
+
+    Args:
+        request: Request whose body is the event payload
+        x_gitlab_event: Event kind
+        x_gitlab_token: Secret token configured on the webhook
+        db: Database session
+
+    Returns:
+        Whether the event was queued or ignored
+    """
+    if not is_webhook_authorized(x_gitlab_token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid webhook token"
+        )
+
+    try:
+        payload = await request.json()
+        change = parse_gitlab_event(x_gitlab_event, payload)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if change is None:
+        return {"status": "ignored", "reason": f"Unsupported event {x_gitlab_event}"}
+    if change.is_empty():
+        return {"status": "ignored", "reason": "No tracked rows affected"}
+
+    project = db.query(Project).filter(Project.gitlab_id == change.gitlab_project_id).first()
+    if not project:
+        return {"status": "ignored", "reason": "Project is not tracked"}
+
+    # The Celery app is loaded on first use, not at API startup
+    from src.tasks.webhooks import apply_webhook_change
+
+    apply_webhook_change.delay(project.id, change.deployment_ids, change.merge_request_iids)
+    return {"status": "queued", "project_id": project.id}
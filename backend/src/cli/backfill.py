@@ -0,0 +1,80 @@
+"""
+Run and inspect historical backfills from the command line.
+
+    python -m src.cli.backfill start 42 --days 1095
+    python -m src.cli.backfill run 42
+    python -m src.cli.backfill status 42
+
+start only records the backfill; run processes it in the foreground until it
+completes (it can be interrupted and run again to resume). Backfills started
+through the API are processed by Celery workers instead.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+import src.models.team_member  # noqa: F401  (register team activity tables)
+from src.database.session import SessionLocal
+from src.models.backfill import BackfillRun
+from src.models.project import Project
+from src.services.backfill import BackfillService
+
+
+def _progress(run: BackfillRun) -> dict:
+    return {
+        "project_id": run.project_id,
+        "status": run.status,
+        "oldest": run.oldest.isoformat(),
+        "cursor": run.cursor.isoformat(),
+        "chunks_done": run.chunks_done,
+        "chunks_total": run.chunks_total,
+        "rows_written": run.rows_written,
+        "eta_seconds": run.eta_seconds,
+        "last_error": run.last_error,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run or inspect historical backfills")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    start_parser = commands.add_parser("start", help="Start or resume a project's backfill")
+    start_parser.add_argument("project_id", type=int)
+    start_parser.add_argument("--days", type=int, required=True, help="Days of history")
+    start_parser.add_argument("--chunk-days", type=int, help="Days of history per window")
+    start_parser.add_argument("--restart", action="store_true", help="Start over")
+
+    run_parser = commands.add_parser("run", help="Process a project's backfill until done")
+    run_parser.add_argument("project_id", type=int)
+
+    status_parser = commands.add_parser("status", help="Show a project's backfill progress")
+    status_parser.add_argument("project_id", type=int)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    db = SessionLocal()
+    try:
+        service = BackfillService(db)
+        if args.command == "start":
+            project = db.get(Project, args.project_id)
+            if project is None:
+                sys.exit(f"Project {args.project_id} not found")
+            run = service.start(
+                project, args.days, chunk_days=args.chunk_days, restart=args.restart
+            )
+        else:
+            run = service.get_run(args.project_id)
+            if run is None:
+                sys.exit(f"No backfill started for project {args.project_id}")
+            if args.command == "run":
+                run = asyncio.run(service.run(run))
+        print(json.dumps(_progress(run), indent=2))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
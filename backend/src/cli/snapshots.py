@@ -0,0 +1,49 @@
+"""
+Export and import project snapshots from the command line.
+
+    python -m src.cli.snapshots export 42 --output project-42.zip
+    python -m src.cli.snapshots import project-42.zip
+
+See src.services.project_snapshot for the snapshot format.
+"""
+import argparse
+import json
+import logging
+
+import src.models.team_member  # noqa: F401  (register team activity tables)
+from src.database.session import SessionLocal
+from src.services.project_snapshot import ProjectSnapshotService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export or import project snapshots")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Write a project's snapshot to a file")
+    export_parser.add_argument("project_id", type=int)
+    export_parser.add_argument("--output", "-o", help="Snapshot file (default: project-ID.zip)")
+
+    import_parser = commands.add_parser("import", help="Load a snapshot file")
+    import_parser.add_argument("path")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    db = SessionLocal()
+    try:
+        service = ProjectSnapshotService(db)
+        if args.command == "export":
+            output = args.output or f"project-{args.project_id}.zip"
+            with open(output, "wb") as target:
+                result = service.export_project(args.project_id, target)
+            print(f"Wrote {output}")
+        else:
+            with open(args.path, "rb") as source:
+                result = service.import_snapshot(source)
+        print(json.dumps(result, indent=2))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,21 @@ class Settings(BaseSettings):
     # Database Configuration
     database_url: str
 
+    # Primary Database Pool (ingestion and writes)
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_recycle: int = 1800  # seconds before a pooled connection is replaced
+    database_statement_timeout_ms: int = 0  # 0 disables
+
+    # Read Replica (analytic and read-only routes; empty URL reads from the primary)
+    database_replica_url: str = ""
+    database_replica_pool_size: int = 5
+    database_replica_max_overflow: int = 10
+    database_replica_pool_recycle: int = 1800
+    database_replica_statement_timeout_ms: int = 60000
+    database_replica_max_lag_seconds: float = 30.0  # reads fall back to the primary above this
+    database_replica_lag_check_seconds: float = 5.0  # how long a lag measurement is reused
+
     # Redis Configuration
     redis_url: str
 
@@ -24,8 +39,13 @@ class Settings(BaseSettings):
     # Application Settings
     environment: str = "development"
     log_level: str = "INFO"
+    log_format: str = "text"  # text or json
     cors_origins: str = "http://localhost:3000,http://localhost:5173"
 
+    # Request Logging (failed and slow requests are always logged)
+    request_log_sample_rate: float = 1.0  # share of other requests logged
+    request_log_slow_ms: int = 1000
+
     # Celery Configuration
     celery_broker_url: str
     celery_result_backend: str
@@ -39,7 +59,72 @@ class Settings(BaseSettings):
     cache_recent_data_ttl: int = 3600  # 1 hour
 
     # API Rate Limiting
-    gitlab_api_rate_limit_per_minute: int = 60
+    gitlab_api_rate_limit_per_minute: int = 60  # GitLab budget shared by all jobs
+    gitlab_interactive_rate_reserve_per_minute: int = 10  # batch and backfills cannot use it
+    gitlab_rate_budget_shared: bool = True  # share the budget across processes through Redis
+    gitlab_max_retries: int = 3  # retries of a request answered with 429
+
+    # GitLab Merge Request Backend (rest or graphql)
+    gitlab_merge_request_backend: str = "rest"
+    gitlab_graphql_page_size: int = 50  # first page; later pages are sized by complexity
+    gitlab_graphql_max_complexity: int = 250  # GitLab's query complexity limit
+
+    # Multi-project Refresh
+    refresh_max_concurrency: int = 8
+    refresh_project_timeout_seconds: int = 600
+    gitlab_http_max_connections: int = 20
+
+    # Refresh Locks (per-project leases in Redis)
+    refresh_lock_enabled: bool = True
+    refresh_lock_lease_seconds: int = 60  # renewed while a refresh runs; recovered after this
+    refresh_lock_wait_seconds: int = 600  # how long a duplicate request waits for the refresh
+    refresh_lock_poll_seconds: float = 1.0
+    refresh_lock_result_ttl_seconds: int = 300  # how long a result is kept for attached requests
+
+    # Table Partitioning (deployments, merge_requests)
+    partition_premake_months: int = 3
+    partition_retention_months: int = 0  # 0 keeps all history
+    partition_retention_action: str = "detach"  # detach or drop
+    partition_maintenance_hour: int = 1
+
+    # Startup and Readiness
+    warmup_db_connections: int = 2  # pooled connections opened before a process is ready
+    worker_ready_file: str = ""  # touched once a Celery worker is ready; empty disables
+
+    # Query Diagnostics
+    query_repeat_threshold: int = 5  # repeats per request/task logged as N+1; 0 disables
+
+    # Tracing (exporter: none, otlp or json)
+    tracing_exporter: str = "none"
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    tracing_json_path: str = "traces.jsonl"
+
+    # Prometheus Metrics
+    metrics_enabled: bool = True
+    celery_metrics_port: int = 9808  # 0 disables the worker metrics server
+
+    # Exports
+    export_batch_size: int = 1000  # rows fetched per server-side cursor round trip
+
+    # GitLab Webhooks
+    gitlab_webhook_secret: str = ""  # secret token of the GitLab webhooks; empty disables them
+    webhook_reconcile_days: int = 3  # daily refresh window while webhooks are enabled
+
+    # Bulk Loading
+    bulk_load_min_rows: int = 500  # batches at least this large are loaded with COPY; 0 disables
+
+    # Historical Backfill
+    backfill_chunk_days: int = 30  # days of history fetched and committed per window
+    backfill_rate_limit_per_minute: int = 20  # share of the GitLab budget for backfills
+    backfill_task_budget_seconds: int = 2400  # a task re-enqueues itself after this long
+
+    # Response Serialization
+    validate_trusted_responses: bool = False  # validate fast-path payloads (development/tests)
+
+    # Profiling
+    profiling_token: str = ""  # admin token for on-demand profiles; empty disables
+    profiling_dir: str = "profiles"
+    profiling_max_artifacts: int = 100
 
     @property
     def cors_origins_list(self) -> list[str]:
@@ -1,7 +1,7 @@
 """add team activity tables
 
 Revision ID: 002_add_team_activity
-Revises: 001_create_initial_tables
+Revises: 001
 Create Date: 2024-11-27 10:00:00.000000
 
 """
@@ -11,7 +11,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision = '002_add_team_activity'
-down_revision = '001_create_initial_tables'
+down_revision = '001'
 branch_labels = None
 depends_on = None
 
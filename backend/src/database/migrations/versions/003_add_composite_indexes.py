@@ -0,0 +1,100 @@
+"""add composite indexes for hot query filters
+
+Revision ID: 003_add_composite_indexes
+Revises: 002_add_team_activity
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '003_add_composite_indexes'
+down_revision = '002_add_team_activity'
+branch_labels = None
+depends_on = None
+
+
+# (index name, table, columns, unique)
+INDEXES = [
+    ('ix_deployments_project_deployed_at', 'deployments', ['project_id', 'deployed_at'], False),
+    (
+        'ix_merge_requests_project_state_merged_at',
+        'merge_requests',
+        ['project_id', 'state', 'merged_at'],
+        False,
+    ),
+    (
+        'ix_merge_requests_author_created_at',
+        'merge_requests',
+        ['author_id', 'created_at_gitlab'],
+        False,
+    ),
+    ('ix_reviews_reviewer_reviewed_at', 'reviews', ['reviewer_id', 'reviewed_at'], False),
+    (
+        'uq_team_members_project_gitlab_user',
+        'team_members',
+        ['project_id', 'gitlab_user_id'],
+        True,
+    ),
+]
+
+
+def upgrade() -> None:
+    # Merge duplicate team members so the unique index can be built: keep the
+    # lowest id per (project_id, gitlab_user_id) and repoint references to it.
+    op.execute(
+        """
+        CREATE TEMPORARY TABLE team_member_duplicates ON COMMIT DROP AS
+        SELECT id AS duplicate_id, keeper_id
+        FROM (
+            SELECT id, min(id) OVER (PARTITION BY project_id, gitlab_user_id) AS keeper_id
+            FROM team_members
+        ) ranked
+        WHERE id <> keeper_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE merge_requests SET author_id = d.keeper_id
+        FROM team_member_duplicates d WHERE merge_requests.author_id = d.duplicate_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE reviews SET reviewer_id = d.keeper_id
+        FROM team_member_duplicates d WHERE reviews.reviewer_id = d.duplicate_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE activity_metrics SET team_member_id = d.keeper_id
+        FROM team_member_duplicates d WHERE activity_metrics.team_member_id = d.duplicate_id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM team_members
+        USING team_member_duplicates d WHERE team_members.id = d.duplicate_id
+        """
+    )
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=unique,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _columns, _unique in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table, postgresql_concurrently=True, if_exists=True
+            )
@@ -0,0 +1,148 @@
+"""partition deployments and merge_requests by month
+
+Revision ID: 004_partition_history_tables
+Revises: 003_add_composite_indexes
+Create Date: 2026-10-19 10:00:00.000000
+
+Rewrites both tables as PostgreSQL range-partitioned tables (monthly
+partitions plus a DEFAULT partition). The partition key joins the primary
+key and the merge request unique constraint, and reviews.merge_request_id
+loses its foreign key because PostgreSQL cannot reference a partitioned
+table by id alone. The data is copied, so run this in a maintenance window.
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004_partition_history_tables'
+down_revision = '003_add_composite_indexes'
+branch_labels = None
+depends_on = None
+
+
+# Months of empty partitions created ahead of the current month
+PREMAKE_MONTHS = 3
+
+TABLES = {
+    'deployments': {
+        'key': 'deployed_at',
+        'sequence': 'deployments_id_seq',
+        'constraints': [
+            'ALTER TABLE deployments ADD CONSTRAINT deployments_project_id_fkey '
+            'FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE',
+        ],
+        'indexes': [
+            ('ix_deployments_project_id', ['project_id']),
+            ('ix_deployments_gitlab_deployment_id', ['gitlab_deployment_id']),
+            ('ix_deployments_deployed_at', ['deployed_at']),
+            ('ix_deployments_project_deployed_at', ['project_id', 'deployed_at']),
+        ],
+    },
+    'merge_requests': {
+        'key': 'created_at_gitlab',
+        'sequence': 'merge_requests_id_seq',
+        'constraints': [
+            'ALTER TABLE merge_requests ADD CONSTRAINT merge_requests_project_id_fkey '
+            'FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE',
+            'ALTER TABLE merge_requests ADD CONSTRAINT merge_requests_author_id_fkey '
+            'FOREIGN KEY (author_id) REFERENCES team_members (id) ON DELETE CASCADE',
+        ],
+        'indexes': [
+            ('ix_merge_requests_project_id', ['project_id']),
+            ('ix_merge_requests_author_id', ['author_id']),
+            ('ix_merge_requests_state', ['state']),
+            ('ix_merge_requests_project_state_merged_at', ['project_id', 'state', 'merged_at']),
+            ('ix_merge_requests_author_created_at', ['author_id', 'created_at_gitlab']),
+        ],
+    },
+}
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _rebuild(table: str, partitioned: bool) -> None:
+    """Copy table into a new (un)partitioned table and swap it in place."""
+    spec = TABLES[table]
+    key = spec['key']
+    new_table = f'{table}_rebuild'
+    bind = op.get_bind()
+
+    if partitioned:
+        op.execute(
+            f'CREATE TABLE {new_table} (LIKE {table} INCLUDING DEFAULTS) '
+            f'PARTITION BY RANGE ({key})'
+        )
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {new_table} DEFAULT')
+
+        # Monthly partitions for existing history plus a few months ahead
+        oldest = bind.execute(
+            sa.text(f"SELECT min(date_trunc('month', {key} AT TIME ZONE 'UTC'))::date FROM {table}")
+        ).scalar()
+        current = date.today().replace(day=1)
+        month = min(oldest, current) if oldest else current
+        while month <= _add_months(current, PREMAKE_MONTHS):
+            upper = _add_months(month, 1)
+            op.execute(
+                f'CREATE TABLE {table}_p{month.year:04d}_{month.month:02d} '
+                f'PARTITION OF {new_table} '
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+                f"TO ('{upper.isoformat()} 00:00:00+00')"
+            )
+            month = upper
+    else:
+        op.execute(f'CREATE TABLE {new_table} (LIKE {table} INCLUDING DEFAULTS)')
+
+    op.execute(f'INSERT INTO {new_table} SELECT * FROM {table}')
+    op.execute(f"ALTER SEQUENCE {spec['sequence']} OWNED BY NONE")
+    op.execute(f'DROP TABLE {table} CASCADE')
+    op.execute(f'ALTER TABLE {new_table} RENAME TO {table}')
+    op.execute(f"ALTER SEQUENCE {spec['sequence']} OWNED BY {table}.id")
+
+    primary_key = f'id, {key}' if partitioned else 'id'
+    op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY ({primary_key})')
+    for constraint in spec['constraints']:
+        op.execute(constraint)
+    for name, columns in spec['indexes']:
+        op.create_index(name, table, columns)
+
+
+def upgrade() -> None:
+    op.execute('ALTER TABLE reviews DROP CONSTRAINT IF EXISTS reviews_merge_request_id_fkey')
+
+    _rebuild('deployments', partitioned=True)
+    _rebuild('merge_requests', partitioned=True)
+    op.create_unique_constraint(
+        'uq_merge_requests_project_gitlab_mr',
+        'merge_requests',
+        ['project_id', 'gitlab_mr_id', 'created_at_gitlab'],
+    )
+
+
+def downgrade() -> None:
+    _rebuild('deployments', partitioned=False)
+    _rebuild('merge_requests', partitioned=False)
+    op.execute('DROP TABLE IF EXISTS deployments_default, merge_requests_default')
+    op.create_unique_constraint(
+        'uq_merge_requests_project_gitlab_mr', 'merge_requests', ['project_id', 'gitlab_mr_id']
+    )
+
+    # Reviews of merge requests removed by retention cannot keep a foreign key
+    op.execute(
+        'DELETE FROM reviews WHERE NOT EXISTS '
+        '(SELECT 1 FROM merge_requests mr WHERE mr.id = reviews.merge_request_id)'
+    )
+    op.create_foreign_key(
+        'reviews_merge_request_id_fkey',
+        'reviews',
+        'merge_requests',
+        ['merge_request_id'],
+        ['id'],
+        ondelete='CASCADE',
+    )
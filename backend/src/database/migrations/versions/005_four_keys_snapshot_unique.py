@@ -0,0 +1,50 @@
+"""make Four Keys snapshots unique per project and period
+
+Revision ID: 005_four_keys_snapshot_unique
+Revises: 004_partition_history_tables
+Create Date: 2026-10-19 11:00:00.000000
+
+Older releases inserted a new snapshot on every refresh. Duplicates are
+collapsed to the most recently updated row before the constraint is added;
+the collapse_metric_snapshots task can be run beforehand to do most of this
+work outside the migration.
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '005_four_keys_snapshot_unique'
+down_revision = '004_partition_history_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        DELETE FROM four_keys_metrics
+        WHERE id IN (
+            SELECT id
+            FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY project_id, period_start, period_end
+                    ORDER BY updated_at DESC, id DESC
+                ) AS position
+                FROM four_keys_metrics
+            ) ranked
+            WHERE position > 1
+        )
+        """
+    )
+    op.create_unique_constraint(
+        'uq_four_keys_metrics_project_period',
+        'four_keys_metrics',
+        ['project_id', 'period_start', 'period_end'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        'uq_four_keys_metrics_project_period', 'four_keys_metrics', type_='unique'
+    )
@@ -0,0 +1,75 @@
+"""add daily deployment rollups and dirty metric buckets
+
+Revision ID: 006_add_metric_rollups
+Revises: 005_four_keys_snapshot_unique
+Create Date: 2026-10-19 12:00:00.000000
+
+Rollups are backfilled from the existing deployments, so later refreshes
+only need to rebuild the buckets they change.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '006_add_metric_rollups'
+down_revision = '005_four_keys_snapshot_unique'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'deployment_daily_rollups',
+        sa.Column('project_id', sa.BigInteger(), nullable=False),
+        sa.Column('environment', sa.String(length=255), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('deployment_count', sa.BigInteger(), nullable=False),
+        sa.Column('failed_deployment_count', sa.BigInteger(), nullable=False),
+        sa.Column('lead_times_hours', postgresql.ARRAY(sa.Float()), nullable=False),
+        sa.Column('time_to_restore_hours', postgresql.ARRAY(sa.Float()), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('project_id', 'environment', 'day'),
+    )
+
+    op.create_table(
+        'metrics_dirty_buckets',
+        sa.Column('project_id', sa.BigInteger(), nullable=False),
+        sa.Column('environment', sa.String(length=255), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('project_id', 'environment', 'day'),
+    )
+
+    op.execute(
+        """
+        INSERT INTO deployment_daily_rollups (
+            project_id, environment, day, deployment_count, failed_deployment_count,
+            lead_times_hours, time_to_restore_hours
+        )
+        SELECT
+            project_id,
+            environment,
+            (deployed_at AT TIME ZONE 'UTC')::date,
+            count(*),
+            count(*) FILTER (WHERE is_failure),
+            coalesce(array_agg(lead_time_hours) FILTER (WHERE lead_time_hours IS NOT NULL), '{}'),
+            coalesce(
+                array_agg(time_to_restore_hours) FILTER (WHERE time_to_restore_hours IS NOT NULL),
+                '{}'
+            )
+        FROM deployments
+        GROUP BY project_id, environment, (deployed_at AT TIME ZONE 'UTC')::date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('metrics_dirty_buckets')
+    op.drop_table('deployment_daily_rollups')
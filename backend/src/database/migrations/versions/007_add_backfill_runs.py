@@ -0,0 +1,46 @@
+"""add backfill runs
+
+Revision ID: 007_add_backfill_runs
+Revises: 006_add_metric_rollups
+Create Date: 2026-10-19 12:00:00.000000
+
+Checkpoints of resumable historical backfills, one per project.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007_add_backfill_runs'
+down_revision = '006_add_metric_rollups'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'backfill_runs',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('project_id', sa.BigInteger(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('oldest', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('newest', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('cursor', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('chunk_days', sa.Integer(), nullable=False),
+        sa.Column('chunks_total', sa.Integer(), nullable=False),
+        sa.Column('chunks_done', sa.Integer(), nullable=False),
+        sa.Column('rows_written', sa.BigInteger(), nullable=False),
+        sa.Column('active_seconds', sa.Float(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('project_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('backfill_runs')
@@ -0,0 +1,225 @@
+import logging
+import re
+from datetime import date, datetime, timezone
+from typing import Any
+
+from sqlalchemy import Connection, text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Tables partitioned by month, mapped to their partition key column
+PARTITIONED_TABLES: dict[str, str] = {
+    "deployments": "deployed_at",
+    "merge_requests": "created_at_gitlab",
+}
+
+# Serializes maintenance runs so two workers never create the same partition
+MAINTENANCE_LOCK_ID = 730_001
+
+
+def month_start(value: date | datetime) -> date:
+    """Return the first day of the month containing value."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    """Return the first day of the month count months after month (may be negative)."""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """Name of the monthly partition of table that starts at month."""
+    return f"{table}_p{month.year:04d}_{month.month:02d}"
+
+
+def default_partition_name(table: str) -> str:
+    """Name of the catch-all partition of table."""
+    return f"{table}_default"
+
+
+class PartitionManager:
+    """
+    Manage monthly range partitions of the high-volume history tables.
+
+    Every partitioned table has a DEFAULT partition, so inserts never fail when
+    a month's partition does not exist yet. Creating a partition moves any rows
+    for that month out of the DEFAULT partition before attaching it, which keeps
+    backfills of old history and premade future months equally safe.
+    """
+
+    def __init__(self, db: Session | Connection):
+        self.db = db
+
+    def list_partitions(self, table: str) -> list[date]:
+        """Return the start months of the existing monthly partitions of table."""
+        rows = self.db.execute(
+            text(
+                """
+                SELECT child.relname
+                FROM pg_inherits
+                JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+                JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+                WHERE parent.relname = :table
+                  AND parent.relnamespace = to_regnamespace(current_schema())
+                """
+            ),
+            {"table": table},
+        ).scalars()
+
+        pattern = re.compile(rf"^{re.escape(table)}_p(\d{{4}})_(\d{{2}})$")
+        months = []
+        for name in rows:
+            match = pattern.match(name)
+            if match:
+                months.append(date(int(match.group(1)), int(match.group(2)), 1))
+        return sorted(months)
+
+    def create_partition(self, table: str, month: date) -> bool:
+        """
+        Create the partition of table for month if it does not exist.
+
+        Returns:
+            True if a partition was created
+        """
+        if month in self.list_partitions(table):
+            return False
+
+        key = PARTITIONED_TABLES[table]
+        name = partition_name(table, month)
+        bounds = {
+            "lower": datetime.combine(month, datetime.min.time(), tzinfo=timezone.utc),
+            "upper": datetime.combine(
+                add_months(month, 1), datetime.min.time(), tzinfo=timezone.utc
+            ),
+        }
+
+        self.db.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)"))
+        moved = self.db.execute(
+            text(
+                f"""
+                WITH moved AS (
+                    DELETE FROM {default_partition_name(table)}
+                    WHERE {key} >= :lower AND {key} < :upper
+                    RETURNING *
+                )
+                INSERT INTO {name} SELECT * FROM moved
+                """
+            ),
+            bounds,
+        ).rowcount
+        lower = bounds["lower"].isoformat()
+        upper = bounds["upper"].isoformat()
+        self.db.execute(
+            text(
+                f"ALTER TABLE {table} ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+            )
+        )
+
+        logger.info(f"Created partition {name} ({moved} rows moved from default partition)")
+        return True
+
+    def ensure_partitions(self, start: date, end: date) -> int:
+        """
+        Create monthly partitions covering [start, end] for every partitioned table.
+
+        Returns:
+            Number of partitions created
+        """
+        created = 0
+        for table in PARTITIONED_TABLES:
+            month = month_start(start)
+            while month <= end:
+                created += self.create_partition(table, month)
+                month = add_months(month, 1)
+        return created
+
+    def split_default_partitions(self) -> int:
+        """
+        Give every month that has rows in a DEFAULT partition its own partition.
+
+        Returns:
+            Number of partitions created
+        """
+        created = 0
+        for table, key in PARTITIONED_TABLES.items():
+            months = self.db.execute(
+                text(
+                    f"""
+                    SELECT DISTINCT date_trunc('month', {key} AT TIME ZONE 'UTC')::date
+                    FROM {default_partition_name(table)}
+                    """
+                )
+            ).scalars()
+            for month in sorted(months):
+                created += self.create_partition(table, month)
+        return created
+
+    def apply_retention(self, retention_months: int, action: str = "detach") -> list[str]:
+        """
+        Detach or drop partitions that lie entirely outside the retention horizon.
+
+        Detached partitions are kept as standalone tables for archival. When
+        merge request partitions are dropped, their reviews are deleted first
+        because reviews reference merge requests without a foreign key.
+
+        Args:
+            retention_months: Number of whole months to keep before the current one
+            action: "detach" or "drop"
+
+        Returns:
+            Names of the partitions that were removed from their tables
+        """
+        if action not in ("detach", "drop"):
+            raise ValueError(f"Unsupported retention action: {action}")
+
+        horizon = add_months(month_start(datetime.now(timezone.utc)), -retention_months)
+        removed = []
+        for table in PARTITIONED_TABLES:
+            for month in self.list_partitions(table):
+                if add_months(month, 1) > horizon:
+                    continue
+                name = partition_name(table, month)
+                if action == "drop" and table == "merge_requests":
+                    self.db.execute(
+                        text(
+                            f"DELETE FROM reviews USING {name} mr "
+                            f"WHERE reviews.merge_request_id = mr.id"
+                        )
+                    )
+                self.db.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                if action == "drop":
+                    self.db.execute(text(f"DROP TABLE {name}"))
+                verb = "dropped" if action == "drop" else "detached"
+                logger.info(f"Retention: {verb} partition {name}")
+                removed.append(name)
+        return removed
+
+    def run_maintenance(
+        self, premake_months: int, retention_months: int = 0, retention_action: str = "detach"
+    ) -> dict[str, Any]:
+        """
+        Run all partition maintenance in one transaction.
+
+        Args:
+            premake_months: Number of future months to create partitions for
+            retention_months: Months of history to keep (0 keeps everything)
+            retention_action: "detach" or "drop" for partitions past the horizon
+
+        Returns:
+            Summary of the partitions created and removed
+        """
+        self.db.execute(
+            text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": MAINTENANCE_LOCK_ID}
+        )
+
+        current = month_start(datetime.now(timezone.utc))
+        created = self.split_default_partitions()
+        created += self.ensure_partitions(current, add_months(current, premake_months))
+        removed = (
+            self.apply_retention(retention_months, retention_action) if retention_months else []
+        )
+
+        return {"partitions_created": created, "partitions_removed": removed}
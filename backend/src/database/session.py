@@ -1,21 +1,175 @@
-from collections.abc import Generator
-from typing import Annotated
+import functools
+import logging
+import threading
+import time
+from collections.abc import Callable, Generator
+from typing import Annotated, Any
 
 from fastapi import Depends
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, make_url, text
 from sqlalchemy.orm import Session, sessionmaker
 
 from src.config.settings import settings
+from src.observability.metrics import DB_READ_SESSIONS
+from src.observability.queries import instrument_engine
 
-# Create database engine
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-    echo=settings.is_development,
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind the primary. A replica that has replayed all
+# the WAL it received is current; a server that is not in recovery is the
+# primary itself.
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
 )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def _create_engine(
+    url: str, pool_size: int, max_overflow: int, pool_recycle: int, statement_timeout_ms: int
+) -> Engine:
+    """Create an engine with its own pool and, on PostgreSQL, a statement timeout."""
+    connect_args = {}
+    if statement_timeout_ms > 0 and make_url(url).get_backend_name() == "postgresql":
+        connect_args["options"] = f"-c statement_timeout={statement_timeout_ms}"
+    new_engine = create_engine(
+        url,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=pool_recycle,
+        connect_args=connect_args,
+        echo=settings.is_development,
+    )
+    # Count queries per request and task (src.observability.queries)
+    instrument_engine(new_engine)
+    return new_engine
+
+
+class ReplicaLagGuard:
+    """
+    Decide whether reads may go to the replica.
+
+    The replica's replication lag is measured at most once per check interval
+    and shared by every session of the process. While the lag exceeds the
+    threshold, or cannot be measured, reads go to the primary.
+    """
+
+    def __init__(self, engine: Engine, max_lag_seconds: float, check_interval_seconds: float):
+        """
+        Initialize the guard.
+
+        Args:
+            engine: Replica engine
+            max_lag_seconds: Largest lag at which the replica is still used
+            check_interval_seconds: How long a lag measurement is reused
+        """
+        self.engine = engine
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.lag_seconds: float | None = None
+        self._healthy = True
+        self._checked_at: float | None = None
+        self._lock = threading.Lock()
+
+    def measure_lag(self) -> float:
+        """Return the replica's current replication lag in seconds."""
+        with self.engine.connect() as conn:
+            return float(conn.execute(REPLICA_LAG_QUERY).scalar_one())
+
+    def is_usable(self) -> bool:
+        """Return whether the replica is within the lag threshold, measuring when due."""
+        with self._lock:
+            now = time.monotonic()
+            if self._checked_at is not None and (
+                now - self._checked_at < self.check_interval_seconds
+            ):
+                return self._healthy
+            self._checked_at = now
+
+            try:
+                self.lag_seconds = self.measure_lag()
+                healthy = self.lag_seconds <= self.max_lag_seconds
+            except Exception as e:
+                self.lag_seconds = None
+                healthy = False
+                logger.warning(f"Could not measure replica lag: {str(e)}")
+
+            if healthy and not self._healthy:
+                logger.info(f"Replica caught up ({self.lag_seconds:.1f}s), reading from it")
+            elif self._healthy and self.lag_seconds is not None and not healthy:
+                logger.warning(
+                    f"Replica lag {self.lag_seconds:.1f}s exceeds "
+                    f"{self.max_lag_seconds}s, reading from the primary"
+                )
+            self._healthy = healthy
+            return healthy
+
+
+class LazySessionmaker(sessionmaker):
+    """
+    sessionmaker whose engine is created when the first session is.
+
+    Importing the module then costs no engine, dialect or pool setup, which
+    keeps process startup fast; the pool is primed by warm-up instead (see
+    src.observability.readiness).
+    """
+
+    def __init__(self, engine_factory: Callable[[], Engine], **kw: Any):
+        super().__init__(**kw)
+        self.engine_factory = engine_factory
+
+    def __call__(self, **local_kw: Any) -> Session:
+        if self.kw.get("bind") is None:
+            self.configure(bind=self.engine_factory())
+        return super().__call__(**local_kw)
+
+
+@functools.cache
+def get_engine() -> Engine:
+    """Return the primary engine (ingestion and writes), creating it on first use."""
+    return _create_engine(
+        settings.database_url,
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_max_overflow,
+        pool_recycle=settings.database_pool_recycle,
+        statement_timeout_ms=settings.database_statement_timeout_ms,
+    )
+
+
+@functools.cache
+def get_replica_guard() -> ReplicaLagGuard | None:
+    """
+    Return the lag guard of the read replica, creating the replica engine on first use.
+
+    Returns:
+        The guard, whose engine is the replica's, or None when no replica is configured
+    """
+    if not settings.database_replica_url:
+        return None
+    replica_engine = _create_engine(
+        settings.database_replica_url,
+        pool_size=settings.database_replica_pool_size,
+        max_overflow=settings.database_replica_max_overflow,
+        pool_recycle=settings.database_replica_pool_recycle,
+        statement_timeout_ms=settings.database_replica_statement_timeout_ms,
+    )
+    return ReplicaLagGuard(
+        replica_engine,
+        max_lag_seconds=settings.database_replica_max_lag_seconds,
+        check_interval_seconds=settings.database_replica_lag_check_seconds,
+    )
+
+
+# Create session factories (engines are created on first use)
+SessionLocal = LazySessionmaker(get_engine, autocommit=False, autoflush=False)
+ReplicaSessionLocal = LazySessionmaker(
+    lambda: get_replica_guard().engine, autocommit=False, autoflush=False
+)
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -32,5 +186,29 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-# Type alias for FastAPI dependency injection
+def get_read_db() -> Generator[Session, None, None]:
+    """
+    Dependency function to get a session for read-only queries.
+
+    Analytic and other read-only routes use it so that large metric queries
+    run on the read replica instead of competing with ingestion writes. The
+    session is on the primary when no replica is configured or the replica
+    lags by more than DATABASE_REPLICA_MAX_LAG_SECONDS. Nothing may be
+    written through it.
+
+    Yields:
+        Database session that will be automatically closed after use.
+    """
+    replica_guard = get_replica_guard()
+    use_replica = replica_guard is not None and replica_guard.is_usable()
+    DB_READ_SESSIONS.labels(database="replica" if use_replica else "primary").inc()
+    db = ReplicaSessionLocal() if use_replica else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Type aliases for FastAPI dependency injection
 DBSession = Annotated[Session, Depends(get_db)]
+ReadDBSession = Annotated[Session, Depends(get_read_db)]
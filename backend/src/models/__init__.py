@@ -39,7 +39,23 @@ class BaseModel(Base, TimestampMixin):
 
 
 # Import models to register them with SQLAlchemy
-from src.models.metrics import Deployment, FourKeysMetrics  # noqa: E402
+from src.models.backfill import BackfillRun  # noqa: E402
+from src.models.metrics import (  # noqa: E402
+    Deployment,
+    DeploymentDailyRollup,
+    FourKeysMetrics,
+    MetricsDirtyBucket,
+)
 from src.models.project import Project  # noqa: E402
 
-__all__ = ["Base", "BaseModel", "TimestampMixin", "Project", "FourKeysMetrics", "Deployment"]
+__all__ = [
+    "Base",
+    "BaseModel",
+    "TimestampMixin",
+    "Project",
+    "FourKeysMetrics",
+    "Deployment",
+    "DeploymentDailyRollup",
+    "MetricsDirtyBucket",
+    "BackfillRun",
+]
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models import BaseModel
+
+# Backfill run states
+BACKFILL_PENDING = "pending"
+BACKFILL_RUNNING = "running"
+BACKFILL_COMPLETED = "completed"
+BACKFILL_FAILED = "failed"
+
+
+class BackfillRun(BaseModel):
+    """
+    Progress of a project's historical backfill.
+
+    History between oldest and newest is fetched in windows of chunk_days,
+    from newest to oldest. Everything from cursor up to newest has been
+    committed, so a run that stops (crash, time limit) resumes at cursor.
+    """
+
+    __tablename__ = "backfill_runs"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    project_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, unique=True
+    )
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default=BACKFILL_PENDING)
+
+    # Range of history, and the checkpoint within it
+    oldest: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    newest: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    cursor: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    chunk_days: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # Progress
+    chunks_total: Mapped[int] = mapped_column(Integer, nullable=False)
+    chunks_done: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rows_written: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    # Time spent processing chunks, excluding pauses between task runs
+    active_seconds: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    @property
+    def eta_seconds(self) -> float | None:
+        """Estimated processing time left, from the average time per chunk so far."""
+        if self.status == BACKFILL_COMPLETED:
+            return 0.0
+        if not self.chunks_done:
+            return None
+        return self.active_seconds / self.chunks_done * (self.chunks_total - self.chunks_done)
+
+    def __repr__(self) -> str:
+        return (
+            f"<BackfillRun(project_id={self.project_id}, status='{self.status}', "
+            f"chunks={self.chunks_done}/{self.chunks_total})>"
+        )
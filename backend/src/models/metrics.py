@@ -1,7 +1,20 @@
-from datetime import datetime
+from datetime import date, datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import BigInteger, Boolean, DateTime, Float, ForeignKey, String
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    String,
+    UniqueConstraint,
+    event,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.models import BaseModel
@@ -11,9 +24,19 @@ if TYPE_CHECKING:
 
 
 class FourKeysMetrics(BaseModel):
-    """Four Keys metrics for a specific time period."""
+    """
+    Four Keys metrics for a specific time period.
+    
+    There is one snapshot per project and period; recalculating a period
+    updates its snapshot in place.
+    """
 
     __tablename__ = "four_keys_metrics"
+    __table_args__ = (
+        UniqueConstraint(
+            "project_id", "period_start", "period_end", name="uq_four_keys_metrics_project_period"
+        ),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     project_id: Mapped[int] = mapped_column(
@@ -52,9 +75,18 @@ class FourKeysMetrics(BaseModel):
 
 
 class Deployment(BaseModel):
-    """GitLab deployment record."""
+    """
+    GitLab deployment record.
+    
+    The table is range-partitioned by month on deployed_at, so deployed_at is
+    part of the primary key (see src.database.partitioning).
+    """
 
     __tablename__ = "deployments"
+    __table_args__ = (
+        Index("ix_deployments_project_deployed_at", "project_id", "deployed_at"),
+        {"postgresql_partition_by": "RANGE (deployed_at)"},
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     project_id: Mapped[int] = mapped_column(
@@ -67,7 +99,9 @@ class Deployment(BaseModel):
     status: Mapped[str] = mapped_column(String(50), nullable=False)  # success, failed, canceled, etc.
     
     # Timestamps
-    deployed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    deployed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True, nullable=False, index=True
+    )
     finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     
     # Related commit/MR info
@@ -87,3 +121,60 @@ class Deployment(BaseModel):
             f"<Deployment(id={self.id}, project_id={self.project_id}, "
             f"gitlab_deployment_id={self.gitlab_deployment_id}, status='{self.status}')>"
         )
+
+
+class DeploymentDailyRollup(BaseModel):
+    """
+    Per-day deployment aggregates for one project and environment.
+    
+    Days are UTC calendar days. Lead and restore times are kept as arrays so
+    that means and medians over any range of whole days can be computed from
+    the rollups without reading deployments.
+    """
+
+    __tablename__ = "deployment_daily_rollups"
+
+    project_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True
+    )
+    environment: Mapped[str] = mapped_column(String(255), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    deployment_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    failed_deployment_count: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    lead_times_hours: Mapped[list[float]] = mapped_column(ARRAY(Float), nullable=False)
+    time_to_restore_hours: Mapped[list[float]] = mapped_column(ARRAY(Float), nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"<DeploymentDailyRollup(project_id={self.project_id}, "
+            f"environment='{self.environment}', day={self.day}, count={self.deployment_count})>"
+        )
+
+
+class MetricsDirtyBucket(BaseModel):
+    """A (project, environment, day) bucket whose deployments changed since its last rollup."""
+
+    __tablename__ = "metrics_dirty_buckets"
+
+    project_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True
+    )
+    environment: Mapped[str] = mapped_column(String(255), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"<MetricsDirtyBucket(project_id={self.project_id}, "
+            f"environment='{self.environment}', day={self.day})>"
+        )
+
+
+# Partitioned tables need a partition before rows can be inserted; the DEFAULT
+# partition catches rows until monthly partitions are created by maintenance.
+event.listen(
+    Deployment.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS deployments_default PARTITION OF deployments DEFAULT")
+    .execute_if(dialect="postgresql"),
+)
@@ -1,6 +1,17 @@
 from datetime import datetime
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    DDL,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    event,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.models import BaseModel
@@ -10,6 +21,11 @@ class TeamMember(BaseModel):
     """Team member model to track individual contributors."""
 
     __tablename__ = "team_members"
+    __table_args__ = (
+        Index(
+            "uq_team_members_project_gitlab_user", "project_id", "gitlab_user_id", unique=True
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     project_id: Mapped[int] = mapped_column(Integer, ForeignKey("projects.id", ondelete="CASCADE"))
@@ -67,9 +83,27 @@ class ActivityMetrics(BaseModel):
 
 
 class MergeRequest(BaseModel):
-    """Merge request model to track MR activity."""
+    """
+    Merge request model to track MR activity.
+    
+    The table is range-partitioned by month on created_at_gitlab, so that column
+    is part of the primary key and of every unique constraint.
+    """
 
     __tablename__ = "merge_requests"
+    __table_args__ = (
+        UniqueConstraint(
+            "project_id",
+            "gitlab_mr_id",
+            "created_at_gitlab",
+            name="uq_merge_requests_project_gitlab_mr",
+        ),
+        Index(
+            "ix_merge_requests_project_state_merged_at", "project_id", "state", "merged_at"
+        ),
+        Index("ix_merge_requests_author_created_at", "author_id", "created_at_gitlab"),
+        {"postgresql_partition_by": "RANGE (created_at_gitlab)"},
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     project_id: Mapped[int] = mapped_column(Integer, ForeignKey("projects.id", ondelete="CASCADE"))
@@ -80,7 +114,9 @@ class MergeRequest(BaseModel):
     gitlab_mr_iid: Mapped[int] = mapped_column(Integer, nullable=False)
     title: Mapped[str] = mapped_column(Text, nullable=False)
     state: Mapped[str] = mapped_column(String(50), nullable=False)  # opened, merged, closed
-    created_at_gitlab: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    created_at_gitlab: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True, nullable=False
+    )
     merged_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     closed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     source_branch: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -94,7 +130,10 @@ class MergeRequest(BaseModel):
         "TeamMember", foreign_keys=[author_id], back_populates="merge_requests"
     )
     reviews: Mapped[list["Review"]] = relationship(
-        "Review", back_populates="merge_request", cascade="all, delete-orphan"
+        "Review",
+        primaryjoin="MergeRequest.id == foreign(Review.merge_request_id)",
+        back_populates="merge_request",
+        cascade="all, delete-orphan",
     )
 
 
@@ -102,11 +141,12 @@ class Review(BaseModel):
     """Review model to track code review activity."""
 
     __tablename__ = "reviews"
+    __table_args__ = (Index("ix_reviews_reviewer_reviewed_at", "reviewer_id", "reviewed_at"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    merge_request_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("merge_requests.id", ondelete="CASCADE")
-    )
+    # No database foreign key: PostgreSQL cannot reference a partitioned table
+    # by a key that excludes the partition column.
+    merge_request_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
     reviewer_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("team_members.id", ondelete="CASCADE")
     )
@@ -117,5 +157,18 @@ class Review(BaseModel):
     )  # approved, commented, changes_requested
 
     # Relationships
-    merge_request: Mapped["MergeRequest"] = relationship("MergeRequest", back_populates="reviews")
+    merge_request: Mapped["MergeRequest"] = relationship(
+        "MergeRequest",
+        primaryjoin="foreign(Review.merge_request_id) == MergeRequest.id",
+        back_populates="reviews",
+    )
     reviewer: Mapped["TeamMember"] = relationship("TeamMember", back_populates="reviews")
+
+
+# See src.models.metrics: a DEFAULT partition makes the table writable at once.
+event.listen(
+    MergeRequest.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS merge_requests_default PARTITION OF merge_requests DEFAULT")
+    .execute_if(dialect="postgresql"),
+)
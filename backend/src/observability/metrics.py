@@ -0,0 +1,145 @@
+"""
+Prometheus metrics for the API, the GitLab client, the database and Celery.
+
+Labels are kept to bounded sets (route templates, GitLab endpoint templates,
+status codes, task names) so the metrics are cheap enough to leave on in
+production. Project IDs and raw URLs are never used as labels.
+
+The API exposes the metrics at ``/metrics``; Celery workers serve them over
+HTTP on ``settings.celery_metrics_port``. Processes forked by uvicorn or the
+Celery prefork pool share their metrics when PROMETHEUS_MULTIPROC_DIR is set
+(see the prometheus_client multiprocess documentation).
+"""
+import os
+import re
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+# Buckets in seconds, from fast queries to slow project refreshes
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+REFRESH_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "workmetrics_http_request_duration_seconds",
+    "API request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+GITLAB_REQUESTS = Counter(
+    "workmetrics_gitlab_requests_total",
+    "GitLab API requests by endpoint template and status code",
+    ["method", "endpoint", "status"],
+)
+GITLAB_REQUEST_DURATION = Histogram(
+    "workmetrics_gitlab_request_duration_seconds",
+    "GitLab API request latency by endpoint template",
+    ["method", "endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+GITLAB_RATE_LIMIT_WAIT = Histogram(
+    "workmetrics_gitlab_rate_limit_wait_seconds",
+    "Time spent waiting for the GitLab rate limiter",
+    buckets=(0.0, 0.01, 0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0),
+)
+
+DB_QUERIES = Counter(
+    "workmetrics_db_queries_total",
+    "Database queries by API route or Celery task",
+    ["source"],
+)
+DB_QUERY_DURATION = Histogram(
+    "workmetrics_db_query_duration_seconds",
+    "Database query latency by API route or Celery task",
+    ["source"],
+    buckets=LATENCY_BUCKETS,
+)
+
+DB_READ_SESSIONS = Counter(
+    "workmetrics_db_read_sessions_total",
+    "Read-only sessions by the database that served them (replica or primary)",
+    ["database"],
+)
+
+CACHE_REQUESTS = Counter(
+    "workmetrics_cache_requests_total",
+    "Cache lookups by cache and result (hit or miss)",
+    ["cache", "result"],
+)
+
+REFRESH_DURATION = Histogram(
+    "workmetrics_refresh_duration_seconds",
+    "Duration of one project's refresh by outcome",
+    ["status"],
+    buckets=REFRESH_BUCKETS,
+)
+PROJECT_LEASES = Counter(
+    "workmetrics_project_leases_total",
+    "Project lease outcomes by resource (acquired, recovered, attached, lost or unlocked)",
+    ["resource", "outcome"],
+)
+REFRESH_ROWS = Counter(
+    "workmetrics_refresh_rows_written_total",
+    "Rows written by project refreshes by table",
+    ["table"],
+)
+REFRESH_ROWS_PER_PROJECT = Histogram(
+    "workmetrics_refresh_rows_per_project",
+    "Rows written by one project's refresh by table",
+    ["table"],
+    buckets=(0, 10, 100, 1_000, 10_000, 100_000),
+)
+
+CELERY_TASK_DURATION = Histogram(
+    "workmetrics_celery_task_duration_seconds",
+    "Celery task run time by task name and final state",
+    ["task", "state"],
+    buckets=REFRESH_BUCKETS,
+)
+
+# Path segments that are IDs, collapsed in GitLab endpoint labels
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def gitlab_endpoint_label(endpoint: str) -> str:
+    """Return the endpoint template for a GitLab API path (IDs replaced by :id)."""
+    return _ID_SEGMENT.sub("/:id", "/" + endpoint.lstrip("/"))
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Count one cache lookup."""
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def record_refresh_rows(table: str, rows: int) -> None:
+    """Count rows written to table by one project's refresh."""
+    REFRESH_ROWS.labels(table=table).inc(rows)
+    REFRESH_ROWS_PER_PROJECT.labels(table=table).observe(rows)
+
+
+def metrics_registry() -> CollectorRegistry:
+    """Return the registry to expose, merging worker processes in multiprocess mode."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Render the current metrics in the Prometheus text format."""
+    return generate_latest(metrics_registry()), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: int) -> None:
+    """Serve the metrics over HTTP on port from a background thread."""
+    start_http_server(port, registry=metrics_registry())
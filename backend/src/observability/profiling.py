@@ -0,0 +1,264 @@
+"""
+On-demand cProfile profiling of single API requests and Celery tasks.
+
+A profiling session is opened for one request (authorized with the admin
+profiling token) or one task (enqueued with the ``workmetrics_profile``
+header). cProfile only sees the thread it was enabled in, so every thread
+that does work for the request or task while the session is current (the
+event loop, the endpoint's threadpool worker, database work offloaded with
+``asyncio.to_thread``) runs under its own profiler through
+``ProfileSession.profile_thread`` or ``run_profiled``, and the profilers
+are merged when the session is saved.
+
+Each saved profile gets an artifact ID and is stored under
+settings.profiling_dir as a pstats file, retrievable as is or as
+flamegraph-ready collapsed stacks. When no session is current,
+``run_profiled`` costs a single context variable lookup.
+"""
+import cProfile
+import json
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+import uuid
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, TypeVar
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Artifact IDs are uuid4 hex strings; anything else is rejected before
+# touching the filesystem
+_ARTIFACT_ID = re.compile(r"^[0-9a-f]{32}$")
+
+# Threads with an active profiler, whichever session it belongs to: enabling
+# a second cProfile profiler on a thread would silently replace the first
+_profiled_threads: set[int] = set()
+_profiled_threads_lock = threading.Lock()
+
+
+def is_thread_profiled() -> bool:
+    """Whether the current thread is being profiled by any session."""
+    with _profiled_threads_lock:
+        return threading.get_ident() in _profiled_threads
+
+
+class ProfileSession:
+    """The profilers collected for one request or task."""
+
+    def __init__(self, kind: str, name: str):
+        self.kind = kind
+        self.name = name
+        self.started_at = time.perf_counter()
+        self._profilers: list[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def profile_thread(self) -> Generator[None, None, None]:
+        """
+        Profile the current thread for the duration of the block.
+
+        A thread has only one active profiler in the process, so a block
+        inside one that already profiles this thread, for this session or
+        another one, is not profiled again; it is covered by the outer
+        profiler.
+        """
+        thread_id = threading.get_ident()
+        with _profiled_threads_lock:
+            if thread_id in _profiled_threads:
+                nested = True
+            else:
+                nested = False
+                _profiled_threads.add(thread_id)
+        if nested:
+            yield
+            return
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            with _profiled_threads_lock:
+                _profiled_threads.discard(thread_id)
+            with self._lock:
+                self._profilers.append(profiler)
+
+    def stats(self) -> pstats.Stats | None:
+        """Merge the session's profilers, or return None if nothing was profiled."""
+        with self._lock:
+            profilers = list(self._profilers)
+        if not profilers:
+            return None
+        stats = pstats.Stats(profilers[0])
+        for profiler in profilers[1:]:
+            stats.add(profiler)
+        return stats
+
+
+_session: ContextVar[ProfileSession | None] = ContextVar("profile_session", default=None)
+
+
+def start_session(kind: str, name: str) -> tuple[ProfileSession, Any]:
+    """
+    Make a new profiling session current.
+
+    Returns:
+        The session and the token for end_session
+    """
+    session = ProfileSession(kind, name)
+    return session, _session.set(session)
+
+
+def current_session() -> ProfileSession | None:
+    """Return the profiling session of the current context, if any."""
+    return _session.get()
+
+
+def end_session(token: Any) -> None:
+    """Restore the session that was current before start_session."""
+    _session.reset(token)
+
+
+def run_profiled(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Call func, under a profiler for this thread when a profiling session is current."""
+    session = _session.get()
+    if session is None:
+        return func(*args, **kwargs)
+
+    with session.profile_thread():
+        return func(*args, **kwargs)
+
+
+def _artifact_dir() -> Path:
+    return Path(settings.profiling_dir)
+
+
+def _artifact_path(artifact_id: str, suffix: str) -> Path:
+    if not _ARTIFACT_ID.match(artifact_id):
+        raise FileNotFoundError(artifact_id)
+    return _artifact_dir() / f"{artifact_id}{suffix}"
+
+
+def save_session(session: ProfileSession) -> str | None:
+    """
+    Store a finished session as a profile artifact.
+
+    Returns:
+        The artifact ID, or None if the session profiled nothing
+    """
+    stats = session.stats()
+    if stats is None:
+        return None
+
+    directory = _artifact_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    artifact_id = uuid.uuid4().hex
+    stats.dump_stats(str(_artifact_path(artifact_id, ".pstats")))
+    metadata = {
+        "id": artifact_id,
+        "kind": session.kind,
+        "name": session.name,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "duration_seconds": time.perf_counter() - session.started_at,
+        "total_calls": stats.total_calls,
+    }
+    _artifact_path(artifact_id, ".json").write_text(json.dumps(metadata))
+    _prune(directory)
+
+    logger.info(f"Saved profile {artifact_id} of {session.kind} {session.name}")
+    return artifact_id
+
+
+def _prune(directory: Path) -> None:
+    """Delete the oldest artifacts beyond settings.profiling_max_artifacts."""
+    artifacts = sorted(directory.glob("*.json"), key=os.path.getmtime, reverse=True)
+    for stale in artifacts[settings.profiling_max_artifacts :]:
+        stale.with_suffix(".pstats").unlink(missing_ok=True)
+        stale.unlink(missing_ok=True)
+
+
+def load_metadata(artifact_id: str) -> dict[str, Any]:
+    """
+    Return the metadata of a stored profile.
+
+    Raises:
+        FileNotFoundError: If there is no profile with that ID
+    """
+    return json.loads(_artifact_path(artifact_id, ".json").read_text())
+
+
+def load_pstats(artifact_id: str) -> bytes:
+    """
+    Return a stored profile in the pstats (marshal) format.
+
+    Raises:
+        FileNotFoundError: If there is no profile with that ID
+    """
+    return _artifact_path(artifact_id, ".pstats").read_bytes()
+
+
+def _frame_label(func: tuple[str, int, str]) -> str:
+    filename, lineno, name = func
+    if filename == "~":
+        # Built-ins, e.g. <built-in method time.sleep>
+        return name
+    return f"{name} ({Path(filename).name}:{lineno})"
+
+
+def collapsed_stacks(artifact_id: str) -> str:
+    """
+    Return a stored profile as collapsed stacks ("a;b;c <microseconds>" lines).
+
+    cProfile records caller/callee pairs rather than whole stacks, so stacks
+    are rebuilt from the call graph, splitting each function's time across
+    its callers in proportion to the time spent under each. The output can
+    be fed to flamegraph.pl, speedscope or inferno.
+
+    Raises:
+        FileNotFoundError: If there is no profile with that ID
+    """
+    path = _artifact_path(artifact_id, ".pstats")
+    stats = pstats.Stats(str(path)).stats  # type: ignore[attr-defined]
+
+    callees: dict[Any, list[tuple[Any, float]]] = {}
+    for func, (_cc, _nc, _tt, _ct, callers) in stats.items():
+        for caller, (_ecc, _enc, _ett, edge_ct) in callers.items():
+            callees.setdefault(caller, []).append((func, edge_ct))
+
+    lines: dict[str, float] = {}
+
+    def walk(func: Any, stack: list[str], share: float, seen: frozenset) -> None:
+        _cc, _nc, own_time, total_time, _callers = stats[func]
+        stack = stack + [_frame_label(func)]
+        if own_time * share > 0:
+            key = ";".join(stack)
+            lines[key] = lines.get(key, 0.0) + own_time * share
+        for callee, edge_time in callees.get(func, []):
+            callee_total = stats[callee][3]
+            # Branches under a microsecond are dropped, which also keeps the
+            # number of paths through large call graphs bounded
+            if callee in seen or callee_total <= 0 or share * edge_time < 1e-6:
+                continue
+            walk(callee, stack, share * edge_time / callee_total, seen | {callee})
+
+    for func, (_cc, _nc, _tt, _ct, callers) in stats.items():
+        if not callers:
+            walk(func, [], 1.0, frozenset({func}))
+
+    return "".join(
+        f"{stack} {round(seconds * 1_000_000)}\n"
+        for stack, seconds in sorted(lines.items())
+        if round(seconds * 1_000_000) > 0
+    )
@@ -0,0 +1,156 @@
+"""
+SQL query counting and N+1 detection.
+
+SQLAlchemy engine events count every statement and its database time
+against the current query source: the API request or Celery task being
+handled. Statements executed many times with the same SQL within one source
+(the signature of an N+1 loop) are remembered together with the application
+call site that issued them, and reported when the source finishes.
+"""
+import logging
+import time
+import traceback
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.config.settings import settings
+from src.observability.metrics import DB_QUERIES, DB_QUERY_DURATION
+
+logger = logging.getLogger(__name__)
+
+# Label used for queries made outside of a request or task
+UNATTRIBUTED = "none"
+
+# Application source root; call sites are the innermost frames below it
+_SRC_ROOT = str(Path(__file__).resolve().parents[1])
+_OBSERVABILITY_ROOT = str(Path(__file__).resolve().parent)
+
+
+@dataclass
+class QuerySource:
+    """Where the queries of the current request or task are attributed, with their totals."""
+
+    name: str = UNATTRIBUTED
+    queries: int = 0
+    seconds: float = 0.0
+
+    # ASGI scope of the request being handled; routing stores the matched
+    # route in it, which then names the source
+    scope: dict[str, Any] | None = None
+
+    # Executions per distinct SQL statement, and call sites of the repeated ones
+    statements: Counter = field(default_factory=Counter)
+    call_sites: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def label(self) -> str:
+        """Route template of the request, or the name given to the source."""
+        if self.scope is not None:
+            route = self.scope.get("route")
+            return getattr(route, "path", None) or self.name
+        return self.name
+
+    def repeated_statements(self, threshold: int) -> list[tuple[str, int, str | None]]:
+        """
+        Return the statements executed at least threshold times.
+
+        Returns:
+            (statement, executions, call site) tuples, most executed first
+        """
+        if threshold <= 0:
+            return []
+        return [
+            (statement, count, self.call_sites.get(statement))
+            for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+_query_source: ContextVar[QuerySource | None] = ContextVar("query_source", default=None)
+
+
+def set_query_source(name: str, scope: dict[str, Any] | None = None) -> Any:
+    """
+    Attribute the database queries of the current context to name.
+
+    Args:
+        name: Source label (a Celery task name, or the label of an API
+            request that matches no route)
+        scope: ASGI scope of the API request, labelled by its matched route
+
+    Returns:
+        Token for reset_query_source
+    """
+    return _query_source.set(QuerySource(name, scope=scope))
+
+
+def current_query_source() -> QuerySource | None:
+    """Return the query source of the current context, if any."""
+    return _query_source.get()
+
+
+def reset_query_source(token: Any) -> None:
+    """Restore the query source that was current before set_query_source."""
+    _query_source.reset(token)
+
+
+def report_repeated_statements(source: QuerySource) -> None:
+    """Log the statements source executed repeatedly (likely N+1 queries)."""
+    for statement, count, call_site in source.repeated_statements(
+        settings.query_repeat_threshold
+    ):
+        logger.warning(
+            f"Possible N+1 query in {source.label}: statement executed {count} times "
+            f"from {call_site or 'unknown call site'}: {' '.join(statement.split())[:300]}"
+        )
+
+
+def _call_site() -> str | None:
+    """Return the innermost application frame outside this package, as file:line in function."""
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.startswith(_SRC_ROOT) and not frame.filename.startswith(
+            _OBSERVABILITY_ROOT
+        ):
+            return f"{frame.filename[len(_SRC_ROOT) + 1:]}:{frame.lineno} in {frame.name}"
+    return None
+
+
+def _before_cursor_execute(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    source = _query_source.get()
+    name = UNATTRIBUTED
+    if source is not None:
+        name = source.label
+        source.queries += 1
+        source.seconds += elapsed
+        source.statements[statement] += 1
+        # The stack is only inspected once per repeated statement
+        if source.statements[statement] == settings.query_repeat_threshold:
+            source.call_sites[statement] = _call_site()
+    DB_QUERIES.labels(source=name).inc()
+    DB_QUERY_DURATION.labels(source=name).observe(elapsed)
+
+
+def _handle_error(context: Any) -> None:
+    # A failed statement never reaches after_cursor_execute
+    started = context.connection.info.get("query_started") if context.connection else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count and time every query run through engine."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,152 @@
+"""
+Process warm-up and readiness.
+
+Startup imports as little as possible and creates no database engine (see
+src.database.session), so a new API or worker process starts quickly. The
+work that was left out is done by warm_up before the process reports that
+it is ready: the modules that are imported lazily are loaded, and the
+database pools are primed with settings.warmup_db_connections connections,
+so the first request or task pays no startup cost.
+
+The API serves readiness at ``/api/v1/ready``; a Celery worker touches
+settings.worker_ready_file, for an exec readiness probe, once it is ready
+and the database can be reached.
+"""
+import importlib
+import logging
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy import Engine, create_engine, text
+from sqlalchemy.pool import NullPool
+
+from src.config.settings import settings
+from src.database.session import get_engine, get_replica_guard
+
+logger = logging.getLogger(__name__)
+
+# Imported lazily by the code that uses them; loaded by warm-up instead of
+# by the first request or task that needs them
+WARM_UP_MODULES = ("numpy",)
+
+# Seconds between database checks while a worker is not ready yet
+READY_RETRY_SECONDS = 5.0
+
+_ready = threading.Event()
+_warm_up_lock = threading.Lock()
+_ready_retry: threading.Timer | None = None
+
+
+def prime_pool(engine: Engine, connections: int) -> int:
+    """
+    Open pooled connections and return them to the pool.
+
+    Args:
+        engine: Engine whose pool is primed
+        connections: Connections to open (at most the pool size)
+
+    Returns:
+        Number of connections opened
+    """
+    connections = min(connections, engine.pool.size())
+    opened = []
+    try:
+        for _ in range(connections):
+            conn = engine.connect()
+            opened.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in opened:
+            conn.close()
+    return len(opened)
+
+
+def warm_up(connect: bool = True) -> None:
+    """
+    Load lazily imported modules and prime the database pools, then mark the process ready.
+
+    Concurrent calls wait for the first one; calls after it succeeded return at once.
+
+    Args:
+        connect: Whether to prime the pools and mark the process ready; a
+            Celery worker's main process only imports, as its connections
+            must not be shared with the pool processes it forks
+
+    Raises:
+        Exception: If the database cannot be reached; the process stays not ready
+    """
+    with _warm_up_lock:
+        if _ready.is_set():
+            return
+        started = time.perf_counter()
+        for module in WARM_UP_MODULES:
+            importlib.import_module(module)
+
+        if not connect:
+            return
+
+        connections = prime_pool(get_engine(), settings.warmup_db_connections)
+        replica_guard = get_replica_guard()
+        if replica_guard is not None:
+            connections += prime_pool(replica_guard.engine, settings.warmup_db_connections)
+            replica_guard.is_usable()
+
+        _ready.set()
+        logger.info(
+            f"Warm-up finished in {time.perf_counter() - started:.2f}s "
+            f"({connections} database connections opened)"
+        )
+
+
+def is_ready() -> bool:
+    """Return whether warm-up has finished in this process."""
+    return _ready.is_set()
+
+
+def check_database() -> None:
+    """
+    Run a query on the database over a connection of its own.
+
+    No pool is kept, so a Celery worker's main process can check the
+    database without leaving connections for the pool processes it forks.
+
+    Raises:
+        Exception: If the database cannot be reached
+    """
+    engine = create_engine(settings.database_url, poolclass=NullPool)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    finally:
+        engine.dispose()
+
+
+def write_ready_file(retry_seconds: float = READY_RETRY_SECONDS) -> None:
+    """
+    Touch settings.worker_ready_file, if one is configured, once the database can be reached.
+
+    While it cannot, the file is not written and the check is retried in
+    the background every retry_seconds.
+    """
+    global _ready_retry
+    if not settings.worker_ready_file:
+        return
+    try:
+        check_database()
+    except Exception as e:
+        logger.warning(f"Worker not ready, retrying in {retry_seconds:.0f}s: {str(e)}")
+        _ready_retry = threading.Timer(retry_seconds, write_ready_file, (retry_seconds,))
+        _ready_retry.daemon = True
+        _ready_retry.start()
+        return
+    Path(settings.worker_ready_file).touch()
+    logger.info(f"Worker ready ({settings.worker_ready_file})")
+
+
+def remove_ready_file() -> None:
+    """Remove settings.worker_ready_file, if one is configured, and stop retrying to write it."""
+    if _ready_retry is not None:
+        _ready_retry.cancel()
+    if settings.worker_ready_file:
+        Path(settings.worker_ready_file).unlink(missing_ok=True)
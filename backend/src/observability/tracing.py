@@ -0,0 +1,145 @@
+"""
+OpenTelemetry tracing of the refresh pipeline and API requests.
+
+Spans cover each stage of a refresh (GitLab fetches, rate-limit waits and
+retries, JSON parsing, upserts, metric computation) and every GitLab call.
+API requests and Celery tasks start the root spans; the W3C trace context
+is taken from incoming request headers and carried in Celery message
+headers, so a task enqueued by a request continues the request's trace.
+
+The exporter is chosen with settings.tracing_exporter:
+
+* ``none`` (default): no provider is installed and the OpenTelemetry API
+  stays a no-op
+* ``otlp``: OTLP over HTTP to settings.tracing_otlp_endpoint (Jaeger,
+  Tempo, an OpenTelemetry Collector, ...)
+* ``json``: one JSON object per span appended to settings.tracing_json_path,
+  for offline analysis
+"""
+import functools
+import json
+import logging
+import threading
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from typing import Any, TypeVar
+
+from opentelemetry import context, propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+TRACING_EXPORTERS = ("none", "otlp", "json")
+
+tracer = trace.get_tracer("workmetrics")
+
+_provider: TracerProvider | None = None
+
+
+class JsonFileSpanExporter(SpanExporter):
+    """Append finished spans to a file as JSON lines."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = "".join(json.dumps(json.loads(span.to_json(indent=None))) + "\n" for span in spans)
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError as e:
+            logger.error(f"Could not write spans to {self.path}: {str(e)}")
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _create_exporter(name: str) -> SpanExporter:
+    """Create the span exporter called name."""
+    if name == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        return OTLPSpanExporter(endpoint=settings.tracing_otlp_endpoint)
+    if name == "json":
+        return JsonFileSpanExporter(settings.tracing_json_path)
+    raise ValueError(f"Unknown tracing exporter: {name}")
+
+
+def configure_tracing(service_name: str) -> bool:
+    """
+    Install the tracer provider and exporter chosen in settings.
+
+    Call once per process; the batch span processor restarts its export
+    thread in processes forked afterwards (the Celery prefork pool).
+
+    Args:
+        service_name: service.name resource attribute of the spans
+
+    Returns:
+        True if tracing was enabled
+    """
+    global _provider
+
+    exporter_name = settings.tracing_exporter.lower()
+    if exporter_name == "none" or _provider is not None:
+        return _provider is not None
+    if exporter_name not in TRACING_EXPORTERS:
+        raise ValueError(
+            f"Unknown tracing exporter {exporter_name!r}; use one of {', '.join(TRACING_EXPORTERS)}"
+        )
+
+    _provider = TracerProvider(
+        resource=Resource.create(
+            {"service.name": service_name, "deployment.environment": settings.environment}
+        )
+    )
+    _provider.add_span_processor(BatchSpanProcessor(_create_exporter(exporter_name)))
+    trace.set_tracer_provider(_provider)
+    logger.info(f"Tracing enabled for {service_name} with the {exporter_name} exporter")
+    return True
+
+
+def shutdown_tracing() -> None:
+    """Flush pending spans and stop the exporter."""
+    if _provider is not None:
+        _provider.shutdown()
+
+
+def extract_context(carrier: Mapping[str, Any] | None) -> context.Context:
+    """Return the trace context propagated in carrier (HTTP or message headers)."""
+    return propagate.extract(carrier or {})
+
+
+def inject_context(carrier: dict[str, Any]) -> None:
+    """Add the current trace context to carrier (HTTP or message headers)."""
+    propagate.inject(carrier)
+
+
+def traced_stage(
+    name: str,
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """
+    Run an async per-project method (``self, project, ...``) in a span called name.
+
+    The span records the project ID, and the error if the method raises.
+    """
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(func)
+        async def wrapper(self: Any, project: Any, *args: Any, **kwargs: Any) -> T:
+            with tracer.start_as_current_span(
+                name, attributes={"workmetrics.project_id": project.id}
+            ):
+                return await func(self, project, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
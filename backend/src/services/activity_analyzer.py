@@ -159,7 +159,7 @@ class ActivityAnalyzer:
         result = []
         for row in review_counts:
             percentage = (
-                (row.review_count / total_reviews * 100) if total_reviews > 0 else 0
+                (row.review_count / total_reviews * 100) if total_reviews > 0 else 0.0
             )
             result.append(
                 {
@@ -0,0 +1,248 @@
+import logging
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from src.config.settings import settings
+from src.models.backfill import (
+    BACKFILL_COMPLETED,
+    BACKFILL_FAILED,
+    BACKFILL_PENDING,
+    BACKFILL_RUNNING,
+    BackfillRun,
+)
+from src.models.project import Project
+from src.services.data_refresh import DataRefreshService
+from src.services.gitlab_client import GitLabClient, create_gitlab_client, get_rate_limiter
+from src.services.project_leases import ProjectLeases
+
+logger = logging.getLogger(__name__)
+
+
+def _format_duration(seconds: float | None) -> str:
+    if seconds is None:
+        return "unknown"
+    return str(timedelta(seconds=round(seconds)))
+
+
+class BackfillService:
+    """
+    Resumable backfill of a project's full history from GitLab.
+
+    History is fetched in windows of GitLab updated_at, newest first, and each
+    window is committed together with the run's checkpoint, so a run that is
+    interrupted repeats at most the window it was working on. The metrics of
+    each window's changed buckets are recomputed before its checkpoint. Windows are
+    refreshed with DataRefreshService, whose upserts make a repeated window
+    harmless.
+
+    Backfills draw on the backfill share of the GitLab budget, capped at
+    settings.backfill_rate_limit_per_minute and never taking the interactive
+    reserve (see BudgetRateLimiter). Given leases, each window is written
+    under the project's ``refresh`` lease, so it never races a refresh or a
+    webhook change on the same rows.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        gitlab_client: GitLabClient | None = None,
+        leases: ProjectLeases | None = None,
+    ):
+        self.db = db
+        self.gitlab_client = gitlab_client or create_gitlab_client(
+            rate_limiter=get_rate_limiter("backfill")
+        )
+        self.leases = leases
+
+    def get_run(self, project_id: int) -> BackfillRun | None:
+        """Return the backfill run of a project, if one was started."""
+        return self.db.query(BackfillRun).filter(BackfillRun.project_id == project_id).first()
+
+    def start(
+        self,
+        project: Project,
+        days: int,
+        chunk_days: int | None = None,
+        restart: bool = False,
+    ) -> BackfillRun:
+        """
+        Create the backfill run of a project, or return the one in progress.
+
+        Args:
+            project: Project to backfill
+            days: Days of history to fetch, counting back from now
+            chunk_days: Days of history per window (defaults to settings)
+            restart: Start over even if a run exists (a finished run is
+                always started over)
+
+        Returns:
+            The committed run
+        """
+        run = self.get_run(project.id)
+        if run is not None and run.status != BACKFILL_COMPLETED and not restart:
+            logger.info(f"Resuming backfill of project {project.id} at {run.cursor.isoformat()}")
+            return run
+
+        chunk_days = chunk_days or settings.backfill_chunk_days
+        newest = datetime.now(timezone.utc)
+        oldest = newest - timedelta(days=days)
+        if run is None:
+            run = BackfillRun(project_id=project.id)
+            self.db.add(run)
+        run.status = BACKFILL_PENDING
+        run.oldest = oldest
+        run.newest = newest
+        run.cursor = newest
+        run.chunk_days = chunk_days
+        run.chunks_total = math.ceil(days / chunk_days)
+        run.chunks_done = 0
+        run.rows_written = 0
+        run.active_seconds = 0.0
+        run.last_error = None
+        run.finished_at = None
+        self.db.commit()
+
+        logger.info(
+            f"Started backfill of project {project.id}: {days} days in "
+            f"{run.chunks_total} windows of {chunk_days} days"
+        )
+        return run
+
+    async def run(self, run: BackfillRun, time_budget_seconds: float | None = None) -> BackfillRun:
+        """
+        Process windows of a backfill until it completes or the time budget is spent.
+
+        Args:
+            run: Run to continue (see start)
+            time_budget_seconds: Stop after the window during which this much
+                time has passed (at least one window is processed); None runs
+                to completion
+
+        Returns:
+            The run, completed or with its checkpoint at the next window
+        """
+        project = self.db.get(Project, run.project_id)
+        refresh_service = DataRefreshService(self.db, gitlab_client=self.gitlab_client)
+        started = time.monotonic()
+        # Identifies this run; a restart gives the run a new newest
+        newest = run.newest
+
+        run.status = BACKFILL_RUNNING
+        self.db.commit()
+
+        while run.cursor > run.oldest:
+            window_start = max(run.cursor - timedelta(days=run.chunk_days), run.oldest)
+            window = (window_start, run.cursor)
+            chunk_started = time.monotonic()
+
+            async def refresh_window(window: tuple[datetime, datetime] = window) -> dict:
+                deployments = await refresh_service.refresh_project_data(project, window=window)
+                activity = await refresh_service.refresh_team_activity_data(
+                    project, window=window
+                )
+                # History only: rebuild its rollups and snapshots, not the rolling one
+                await refresh_service.recompute_metrics(project, metrics_days=None)
+                return {"rows": deployments["deployments"] + activity["merge_requests"]}
+
+            try:
+                if self.leases is None:
+                    written = await refresh_window()
+                else:
+                    # History outside any refresh's scope: never attach to one
+                    written = await self.leases.run(
+                        "refresh", project.id, refresh_window, attach=False
+                    )
+            except Exception as e:
+                self.db.rollback()
+                self._update_if_current(
+                    run, newest, window[1], status=BACKFILL_FAILED, last_error=str(e)
+                )
+                raise
+
+            # Checkpoint: the window's rows were committed by the refresh
+            checkpointed = self._update_if_current(
+                run,
+                newest,
+                window[1],
+                cursor=window_start,
+                chunks_done=BackfillRun.chunks_done + 1,
+                rows_written=BackfillRun.rows_written + written["rows"],
+                active_seconds=BackfillRun.active_seconds + (time.monotonic() - chunk_started),
+                last_error=None,
+            )
+            if not checkpointed:
+                logger.warning(
+                    f"Backfill of project {run.project_id} was restarted during window "
+                    f"{window_start.date()} to {window[1].date()}; leaving the restarted run"
+                )
+                return run
+
+            logger.info(
+                f"Backfill of project {run.project_id}: window {window_start.date()} to "
+                f"{window[1].date()} done ({run.chunks_done}/{run.chunks_total}, "
+                f"{run.rows_written} rows), ETA {_format_duration(run.eta_seconds)}"
+            )
+
+            out_of_time = (
+                time_budget_seconds is not None
+                and time.monotonic() - started >= time_budget_seconds
+            )
+            if out_of_time and run.cursor > run.oldest:
+                logger.info(
+                    f"Backfill of project {run.project_id} paused after its time budget"
+                )
+                return run
+
+        completed = self._update_if_current(
+            run,
+            newest,
+            run.cursor,
+            status=BACKFILL_COMPLETED,
+            finished_at=datetime.now(timezone.utc),
+        )
+        if not completed:
+            return run
+        logger.info(
+            f"Backfill of project {run.project_id} completed: {run.rows_written} rows in "
+            f"{_format_duration(run.active_seconds)}"
+        )
+        return run
+
+    def _update_if_current(
+        self,
+        run: BackfillRun,
+        expected_newest: datetime,
+        expected_cursor: datetime,
+        **values: Any,
+    ) -> bool:
+        """
+        Update and commit run, unless it was restarted or moved past cursor meanwhile.
+
+        A restart resets the run while a task may still be processing a window
+        of the old one; that task must not write its progress over the reset.
+
+        Args:
+            run: Run being processed
+            expected_newest: newest of the run when processing started
+            expected_cursor: Cursor the run is expected to be at
+            values: Column values to set
+
+        Returns:
+            True if the run was updated
+        """
+        updated = self.db.execute(
+            update(BackfillRun)
+            .where(BackfillRun.id == run.id)
+            .where(BackfillRun.newest == expected_newest)
+            .where(BackfillRun.cursor == expected_cursor)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        # Also expires run, so it is reloaded with the stored progress
+        self.db.commit()
+        return updated == 1
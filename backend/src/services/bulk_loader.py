@@ -0,0 +1,288 @@
+import logging
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.database.bulk import copy_rows_into
+from src.models.project import Project
+from src.services.gitlab_client import parse_gitlab_datetime
+
+logger = logging.getLogger(__name__)
+
+# Staging tables hold parsed GitLab rows; they have no constraints, so a batch
+# is checked and deduplicated by the merge statements instead
+STAGING_TABLES = {
+    "staging_deployments": """
+        gitlab_deployment_id bigint,
+        environment varchar(255),
+        status varchar(50),
+        deployed_at timestamptz,
+        finished_at timestamptz,
+        commit_sha varchar(40),
+        is_failure boolean
+    """,
+    "staging_team_members": """
+        gitlab_user_id integer,
+        username varchar(255),
+        name varchar(255),
+        email varchar(255),
+        avatar_url text
+    """,
+    "staging_merge_requests": """
+        gitlab_mr_id integer,
+        gitlab_mr_iid integer,
+        author_gitlab_user_id integer,
+        title text,
+        state varchar(50),
+        created_at_gitlab timestamptz,
+        merged_at timestamptz,
+        closed_at timestamptz,
+        source_branch varchar(255),
+        target_branch varchar(255),
+        additions integer,
+        deletions integer
+    """,
+}
+
+
+class BulkLoader:
+    """
+    COPY-based ingestion of large GitLab batches.
+
+    Parsed rows are streamed into temporary staging tables with COPY FROM STDIN
+    and merged into the real tables with one set-based statement per table.
+    The results match DataRefreshService's row-by-row processing, which
+    remains cheaper for small batches (see settings.bulk_load_min_rows).
+    Nothing is committed; the caller commits the batch.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _stage(self, staging_table: str, columns: list[str], rows: list[tuple]) -> int:
+        """Create a staging table for this transaction and COPY rows into it."""
+        self.db.execute(text(f"DROP TABLE IF EXISTS pg_temp.{staging_table}"))
+        self.db.execute(
+            text(
+                f"CREATE TEMPORARY TABLE {staging_table} ({STAGING_TABLES[staging_table]}) "
+                "ON COMMIT DROP"
+            )
+        )
+        return copy_rows_into(self.db, staging_table, columns, rows)
+
+    def load_deployments(self, project: Project, deployments_data: list[dict]) -> int:
+        """
+        Save deployments fetched from GitLab.
+
+        Every (environment, day) bucket with an inserted or changed deployment
+        is marked dirty, as by DataRefreshService._process_deployments.
+
+        Args:
+            project: Project the deployments belong to
+            deployments_data: Deployments as returned by the GitLab API
+
+        Returns:
+            Number of deployments processed
+        """
+        started = time.perf_counter()
+        rows = []
+        for data in deployments_data:
+            deployed_at = parse_gitlab_datetime(data.get("created_at"))
+            if deployed_at is None:
+                logger.error(f"Skipping deployment {data.get('id')} without created_at")
+                continue
+            rows.append(
+                (
+                    data["id"],
+                    (data.get("environment") or {}).get("name", "unknown"),
+                    data.get("status", "unknown"),
+                    deployed_at,
+                    parse_gitlab_datetime(data.get("updated_at")),
+                    (data.get("sha") or "")[:40],
+                    data.get("status") in ["failed", "canceled"],
+                )
+            )
+        staged = self._stage(
+            "staging_deployments",
+            [
+                "gitlab_deployment_id",
+                "environment",
+                "status",
+                "deployed_at",
+                "finished_at",
+                "commit_sha",
+                "is_failure",
+            ],
+            rows,
+        )
+
+        # Deployments have no unique constraint to upsert on: update the ones
+        # that exist and insert the rest in one statement, marking the buckets
+        # of changed rows dirty (see IncrementalMetricsService.mark_dirty)
+        dirty = self.db.execute(
+            text(
+                """
+                WITH batch AS (
+                    SELECT DISTINCT ON (gitlab_deployment_id) *
+                    FROM staging_deployments
+                    ORDER BY gitlab_deployment_id, finished_at DESC NULLS LAST
+                ),
+                updated AS (
+                    UPDATE deployments d SET
+                        status = s.status,
+                        finished_at = s.finished_at,
+                        is_failure = s.is_failure,
+                        updated_at = now()
+                    FROM batch s
+                    WHERE d.project_id = :project_id
+                      AND d.gitlab_deployment_id = s.gitlab_deployment_id
+                      AND (d.status, d.finished_at, d.is_failure)
+                          IS DISTINCT FROM (s.status, s.finished_at, s.is_failure)
+                    RETURNING d.environment, d.deployed_at
+                ),
+                inserted AS (
+                    INSERT INTO deployments (
+                        project_id, gitlab_deployment_id, environment, status, deployed_at,
+                        finished_at, commit_sha, is_failure
+                    )
+                    SELECT
+                        :project_id, s.gitlab_deployment_id, s.environment, s.status,
+                        s.deployed_at, s.finished_at, s.commit_sha, s.is_failure
+                    FROM batch s
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM deployments d
+                        WHERE d.project_id = :project_id
+                          AND d.gitlab_deployment_id = s.gitlab_deployment_id
+                    )
+                    RETURNING environment, deployed_at
+                )
+                INSERT INTO metrics_dirty_buckets (project_id, environment, day)
+                SELECT DISTINCT :project_id, environment, (deployed_at AT TIME ZONE 'UTC')::date
+                FROM (SELECT * FROM updated UNION ALL SELECT * FROM inserted) changed
+                ON CONFLICT DO NOTHING
+                """
+            ),
+            {"project_id": project.id},
+        ).rowcount
+
+        logger.info(
+            f"Bulk loaded {staged} deployments for project {project.id} "
+            f"({dirty} new dirty buckets) in {time.perf_counter() - started:.2f}s"
+        )
+        return staged
+
+    def load_merge_requests(self, project: Project, mrs_data: list[dict]) -> dict[str, int]:
+        """
+        Save merge requests fetched from GitLab, creating their authors as team members.
+
+        Existing team members are left unchanged and existing merge requests get
+        their state, timestamps and size updated, as by DataRefreshService.
+
+        Args:
+            project: Project the merge requests belong to
+            mrs_data: Merge requests as returned by the GitLab API
+
+        Returns:
+            Numbers of merge requests and distinct authors processed
+        """
+        started = time.perf_counter()
+        authors = {mr["author"]["id"]: mr["author"] for mr in mrs_data}
+        self._stage(
+            "staging_team_members",
+            ["gitlab_user_id", "username", "name", "email", "avatar_url"],
+            [
+                (
+                    user_id,
+                    user.get("username", ""),
+                    user.get("name", ""),
+                    user.get("email"),
+                    user.get("avatar_url"),
+                )
+                for user_id, user in authors.items()
+            ],
+        )
+        staged = self._stage(
+            "staging_merge_requests",
+            [
+                "gitlab_mr_id",
+                "gitlab_mr_iid",
+                "author_gitlab_user_id",
+                "title",
+                "state",
+                "created_at_gitlab",
+                "merged_at",
+                "closed_at",
+                "source_branch",
+                "target_branch",
+                "additions",
+                "deletions",
+            ],
+            [
+                (
+                    mr["id"],
+                    mr["iid"],
+                    mr["author"]["id"],
+                    mr["title"],
+                    mr.get("state", "opened"),
+                    parse_gitlab_datetime(mr["created_at"]),
+                    parse_gitlab_datetime(mr.get("merged_at")),
+                    parse_gitlab_datetime(mr.get("closed_at")),
+                    mr.get("source_branch", ""),
+                    mr.get("target_branch", ""),
+                    mr.get("changes", {}).get("additions", 0),
+                    mr.get("changes", {}).get("deletions", 0),
+                )
+                for mr in mrs_data
+            ],
+        )
+        params = {"project_id": project.id}
+
+        self.db.execute(
+            text(
+                """
+                INSERT INTO team_members (
+                    project_id, gitlab_user_id, username, name, email, avatar_url
+                )
+                SELECT :project_id, gitlab_user_id, username, name, email, avatar_url
+                FROM staging_team_members
+                ON CONFLICT (project_id, gitlab_user_id) DO NOTHING
+                """
+            ),
+            params,
+        )
+        # The unique key includes the partition column created_at_gitlab, which
+        # never changes for a merge request
+        self.db.execute(
+            text(
+                """
+                INSERT INTO merge_requests (
+                    project_id, author_id, gitlab_mr_id, gitlab_mr_iid, title, state,
+                    created_at_gitlab, merged_at, closed_at, source_branch, target_branch,
+                    additions, deletions
+                )
+                SELECT DISTINCT ON (s.gitlab_mr_id)
+                    :project_id, tm.id, s.gitlab_mr_id, s.gitlab_mr_iid, s.title, s.state,
+                    s.created_at_gitlab, s.merged_at, s.closed_at, s.source_branch,
+                    s.target_branch, s.additions, s.deletions
+                FROM staging_merge_requests s
+                JOIN team_members tm
+                  ON tm.project_id = :project_id AND tm.gitlab_user_id = s.author_gitlab_user_id
+                ORDER BY s.gitlab_mr_id
+                ON CONFLICT (project_id, gitlab_mr_id, created_at_gitlab) DO UPDATE SET
+                    state = excluded.state,
+                    merged_at = excluded.merged_at,
+                    closed_at = excluded.closed_at,
+                    additions = excluded.additions,
+                    deletions = excluded.deletions,
+                    updated_at = now()
+                """
+            ),
+            params,
+        )
+
+        logger.info(
+            f"Bulk loaded {staged} merge requests and {len(authors)} authors for project "
+            f"{project.id} in {time.perf_counter() - started:.2f}s"
+        )
+        return {"merge_requests": staged, "team_members": len(authors)}
@@ -2,7 +2,6 @@ import logging
 from datetime import datetime, timedelta
 from typing import Any
 
-import numpy as np
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
@@ -50,6 +49,9 @@ class CycleTimeAnalyzer:
                 MergeRequest.state == "merged",
                 MergeRequest.merged_at >= start_date,
                 MergeRequest.merged_at <= end_date,
+                # Merged MRs were created before they merged; lets PostgreSQL
+                # prune merge_requests partitions after the period
+                MergeRequest.created_at_gitlab <= end_date,
             )
             .all()
         )
@@ -130,6 +132,9 @@ class CycleTimeAnalyzer:
         Returns:
             Aggregated metrics with percentiles
         """
+        # Imported on first use rather than at process startup
+        import numpy as np
+
         # Extract arrays for each stage
         coding_times = [st["coding_time"] for st in stage_times]
         review_times = [st["review_time"] for st in stage_times]
@@ -146,19 +151,19 @@ class CycleTimeAnalyzer:
             "total": self._calculate_stage_stats(total_times, "Total"),
             "stage_breakdown_avg": {
                 "coding_percentage": (
-                    np.mean(coding_times) / np.mean(total_times) * 100
+                    float(np.mean(coding_times) / np.mean(total_times) * 100)
                     if total_times
-                    else 0
+                    else 0.0
                 ),
                 "review_percentage": (
-                    np.mean(review_times) / np.mean(total_times) * 100
+                    float(np.mean(review_times) / np.mean(total_times) * 100)
                     if total_times
-                    else 0
+                    else 0.0
                 ),
                 "deployment_percentage": (
-                    np.mean(deployment_times) / np.mean(total_times) * 100
+                    float(np.mean(deployment_times) / np.mean(total_times) * 100)
                     if total_times
-                    else 0
+                    else 0.0
                 ),
             },
         }
@@ -179,14 +184,16 @@ class CycleTimeAnalyzer:
         if not times:
             return {
                 "name": stage_name,
-                "mean": 0,
-                "median": 0,
-                "p75": 0,
-                "p90": 0,
-                "min": 0,
-                "max": 0,
+                "mean": 0.0,
+                "median": 0.0,
+                "p75": 0.0,
+                "p90": 0.0,
+                "min": 0.0,
+                "max": 0.0,
             }
 
+        import numpy as np
+
         times_array = np.array(times)
         
         return {
@@ -210,9 +217,9 @@ class CycleTimeAnalyzer:
             },
             "total": self._calculate_stage_stats([], "Total"),
             "stage_breakdown_avg": {
-                "coding_percentage": 0,
-                "review_percentage": 0,
-                "deployment_percentage": 0,
+                "coding_percentage": 0.0,
+                "review_percentage": 0.0,
+                "deployment_percentage": 0.0,
             },
         }
 
@@ -237,6 +244,9 @@ class CycleTimeAnalyzer:
                 MergeRequest.state == "merged",
                 MergeRequest.merged_at >= start_date,
                 MergeRequest.merged_at <= end_date,
+                # Merged MRs were created before they merged; lets PostgreSQL
+                # prune merge_requests partitions after the period
+                MergeRequest.created_at_gitlab <= end_date,
             )
             .all()
         )
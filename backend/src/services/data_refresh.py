@@ -1,26 +1,89 @@
+import asyncio
 import logging
-from datetime import datetime, timedelta
+from collections.abc import Callable, Iterable
+from datetime import date, datetime, timedelta
+from typing import Any, TypeVar
 
+import httpx
 from sqlalchemy.orm import Session
 
+from src.config.settings import settings
 from src.models.metrics import Deployment
 from src.models.project import Project
-from src.services.gitlab_client import GitLabClient
+from src.observability.metrics import record_refresh_rows
+from src.observability.profiling import run_profiled
+from src.observability.tracing import traced_stage, tracer
+from src.services.bulk_loader import BulkLoader
+from src.services.gitlab_client import GitLabClient, create_gitlab_client, parse_gitlab_datetime
+from src.services.incremental_metrics import IncrementalMetricsService, deployment_day
 from src.services.metrics_calculator import MetricsCalculator
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class DataRefreshService:
     """Service for orchestrating data refresh from GitLab and metrics calculation."""
 
-    def __init__(self, db: Session, gitlab_client: GitLabClient | None = None):
+    def __init__(
+        self,
+        db: Session,
+        gitlab_client: GitLabClient | None = None,
+        offload_db: bool = False,
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            db: Database session used for all reads and writes
+            gitlab_client: GitLab client (a private one is created when omitted)
+            offload_db: Run blocking database work in a worker thread so that the
+                event loop stays free for other projects' GitLab I/O
+        """
         self.db = db
-        self.gitlab_client = gitlab_client or GitLabClient()
+        self.gitlab_client = gitlab_client or create_gitlab_client()
         self.metrics_calculator = MetricsCalculator(db)
+        self.bulk_loader = BulkLoader(db)
+        self.offload_db = offload_db
 
+    async def _run_db(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run blocking database work, in a worker thread when offloading is enabled.
+
+        If the awaiting task is cancelled while the thread is running, the thread
+        is allowed to finish before the cancellation propagates, so the session
+        is never used from two places at once.
+        """
+        if not self.offload_db:
+            return func(*args)
+
+        future = asyncio.ensure_future(asyncio.to_thread(run_profiled, func, *args))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            await asyncio.wait([future])
+            raise
+
+    def _use_bulk_load(self, batch: list[dict]) -> bool:
+        """Whether a batch is large enough to load with COPY (see settings.bulk_load_min_rows)."""
+        return 0 < settings.bulk_load_min_rows <= len(batch)
+
+    def _updated_range(
+        self, days_back: int, window: tuple[datetime, datetime] | None
+    ) -> tuple[datetime, datetime]:
+        """The updated_at range to fetch: an explicit window, or the last days_back days."""
+        if window is not None:
+            return window
+        end_date = datetime.utcnow()
+        return end_date - timedelta(days=days_back), end_date
+
+    @traced_stage("refresh.project_data")
     async def refresh_project_data(
-        self, project: Project, days_back: int = 90
+        self,
+        project: Project,
+        days_back: int = 90,
+        window: tuple[datetime, datetime] | None = None,
     ) -> dict[str, int]:
         """
         Refresh data for a project from GitLab.
@@ -28,6 +91,9 @@ class DataRefreshService:
         Args:
             project: Project to refresh
             days_back: Number of days to fetch historical data
+            window: Explicit (start, end) range of GitLab updated_at to fetch
+                instead of days_back (used by backfills); last_synced_at is
+                left unchanged
             
         Returns:
             Dictionary with counts of updated records
@@ -36,14 +102,29 @@ class DataRefreshService:
 
         try:
             # Fetch deployments from GitLab
-            deployments_data = await self._fetch_deployments(project, days_back)
+            with tracer.start_as_current_span("refresh.fetch_deployments") as span:
+                deployments_data = await self._fetch_deployments(
+                    project, *self._updated_range(days_back, window)
+                )
+                span.set_attribute("refresh.rows_fetched", len(deployments_data))
             
             # Process and save deployments
-            saved_count = self._process_deployments(project, deployments_data)
+            with tracer.start_as_current_span("refresh.upsert_deployments"):
+                if self._use_bulk_load(deployments_data):
+                    saved_count = await self._run_db(
+                        self.bulk_loader.load_deployments, project, deployments_data
+                    )
+                else:
+                    saved_count = await self._run_db(
+                        self._process_deployments, project, deployments_data
+                    )
             
             # Update last_synced_at
-            project.last_synced_at = datetime.utcnow()
-            self.db.commit()
+            if window is None:
+                project.last_synced_at = datetime.utcnow()
+            with tracer.start_as_current_span("refresh.commit"):
+                await self._run_db(self.db.commit)
+            record_refresh_rows("deployments", saved_count)
             
             logger.info(
                 f"Data refresh completed for project {project.id}: "
@@ -54,17 +135,71 @@ class DataRefreshService:
             
         except Exception as e:
             logger.error(f"Error refreshing project {project.id}: {str(e)}", exc_info=True)
-            self.db.rollback()
+            await self._run_db(self.db.rollback)
             raise
 
-    async def _fetch_deployments(self, project: Project, days_back: int) -> list[dict]:
-        """Fetch deployments from GitLab API."""
+    @traced_stage("refresh.items")
+    async def refresh_items(
+        self,
+        project: Project,
+        deployment_ids: Iterable[int] = (),
+        merge_request_iids: Iterable[int] = (),
+    ) -> dict[str, int]:
+        """
+        Refresh individual deployments and merge requests of a project from GitLab.
+
+        Used for webhook events: only the named rows are fetched and upserted,
+        and the metric buckets of changed deployments are marked dirty.
+        Rows GitLab no longer returns are skipped. last_synced_at is left
+        unchanged, since the rest of the project was not checked.
+
+        Args:
+            project: Project the rows belong to
+            deployment_ids: GitLab deployment IDs
+            merge_request_iids: GitLab merge request IIDs
+
+        Returns:
+            Dictionary with counts of updated records
+        """
+        deployments_data = []
+        for deployment_id in deployment_ids:
+            try:
+                deployments_data.append(
+                    await self.gitlab_client.get_project_deployment(
+                        project.gitlab_id, deployment_id
+                    )
+                )
+            except httpx.HTTPStatusError as e:
+                logger.warning(f"Skipping deployment {deployment_id}: {str(e)}")
+        mrs_data = []
+        for iid in merge_request_iids:
+            try:
+                mrs_data.append(
+                    await self.gitlab_client.get_project_merge_request(project.gitlab_id, iid)
+                )
+            except httpx.HTTPStatusError as e:
+                logger.warning(f"Skipping merge request !{iid}: {str(e)}")
+
+        try:
+            saved_deployments = await self._run_db(
+                self._process_deployments, project, deployments_data
+            )
+            counts = await self._process_merge_requests(project, mrs_data)
+            await self._run_db(self.db.commit)
+        except Exception:
+            await self._run_db(self.db.rollback)
+            raise
+        record_refresh_rows("deployments", saved_deployments)
+        record_refresh_rows("merge_requests", counts["merge_requests"])
+
+        return {"deployments": saved_deployments, **counts}
+
+    async def _fetch_deployments(
+        self, project: Project, start_date: datetime, end_date: datetime
+    ) -> list[dict]:
+        """Fetch deployments updated between start_date and end_date from GitLab API."""
         logger.debug(f"Fetching deployments for GitLab project {project.gitlab_id}")
         
-        # Calculate date range
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days_back)
-        
         # Fetch from GitLab
         params = {
             "updated_after": start_date.isoformat(),
@@ -80,8 +215,14 @@ class DataRefreshService:
         return deployments
 
     def _process_deployments(self, project: Project, deployments_data: list[dict]) -> int:
-        """Process and save deployment records."""
+        """
+        Process and save deployment records.
+        
+        Every (environment, day) bucket with an inserted or changed deployment
+        is marked dirty in the same transaction, for incremental recomputation.
+        """
         saved_count = 0
+        dirty_buckets: set[tuple[str, date]] = set()
         
         for deployment_data in deployments_data:
             try:
@@ -97,10 +238,17 @@ class DataRefreshService:
                 
                 if existing:
                     # Update existing deployment
-                    self._update_deployment(existing, deployment_data)
+                    if self._update_deployment(existing, deployment_data):
+                        dirty_buckets.add(
+                            (existing.environment, deployment_day(existing.deployed_at))
+                        )
                 else:
                     # Create new deployment
-                    self._create_deployment(project, deployment_data)
+                    created = self._create_deployment(project, deployment_data)
+                    if created.deployed_at is not None:
+                        dirty_buckets.add(
+                            (created.environment, deployment_day(created.deployed_at))
+                        )
                 
                 saved_count += 1
                 
@@ -110,6 +258,7 @@ class DataRefreshService:
                 )
                 continue
         
+        IncrementalMetricsService(self.db).mark_dirty(project.id, dirty_buckets)
         self.db.commit()
         return saved_count
 
@@ -128,26 +277,29 @@ class DataRefreshService:
         )
         
         self.db.add(deployment)
-        logger.debug(f"Created deployment {deployment.gitlab_deployment_id}")
+        logger.debug("Created deployment %s", deployment.gitlab_deployment_id)
         return deployment
 
-    def _update_deployment(self, deployment: Deployment, data: dict) -> None:
-        """Update an existing deployment record."""
+    def _update_deployment(self, deployment: Deployment, data: dict) -> bool:
+        """
+        Update an existing deployment record.
+        
+        Returns:
+            True if any field used by the metrics changed
+        """
+        previous = (deployment.status, deployment.finished_at, deployment.is_failure)
         deployment.status = data.get("status", deployment.status)
         deployment.finished_at = self._parse_datetime(data.get("updated_at"))
         deployment.is_failure = data.get("status") in ["failed", "canceled"]
         
-        logger.debug(f"Updated deployment {deployment.gitlab_deployment_id}")
+        logger.debug("Updated deployment %s", deployment.gitlab_deployment_id)
+        return previous != (deployment.status, deployment.finished_at, deployment.is_failure)
 
     def _parse_datetime(self, date_str: str | None) -> datetime | None:
         """Parse ISO datetime string."""
-        if not date_str:
-            return None
-        try:
-            return datetime.fromisoformat(date_str.replace("Z", "+00:00"))
-        except (ValueError, AttributeError):
-            return None
+        return parse_gitlab_datetime(date_str)
 
+    @traced_stage("metrics.calculate_and_save")
     async def calculate_and_save_metrics(
         self, project: Project, start_date: datetime, end_date: datetime
     ) -> None:
@@ -158,17 +310,45 @@ class DataRefreshService:
         )
         
         # Calculate metrics
-        metrics_data = self.metrics_calculator.calculate_four_keys(
-            project.id, start_date, end_date
-        )
+        with tracer.start_as_current_span("metrics.calculate"):
+            metrics_data = await self._run_db(
+                self.metrics_calculator.calculate_four_keys, project.id, start_date, end_date
+            )
         
         # Save to database
-        self.metrics_calculator.save_metrics(project.id, metrics_data)
+        with tracer.start_as_current_span("metrics.save"):
+            await self._run_db(self.metrics_calculator.save_metrics, project.id, metrics_data)
         
         logger.info(f"Metrics calculated and saved for project {project.id}")
 
+    @traced_stage("metrics.recompute")
+    async def recompute_metrics(
+        self, project: Project, metrics_days: int | None = 30
+    ) -> dict[str, Any]:
+        """
+        Recompute rollups and snapshots for the buckets changed by ingestion.
+        
+        Args:
+            project: Project to recompute
+            metrics_days: Number of whole days (ending yesterday) of the rolling
+                Four Keys snapshot to keep current, or None to skip it
+            
+        Returns:
+            Counters of dirty and clean buckets and of recomputed snapshots
+        """
+        service = IncrementalMetricsService(self.db)
+        try:
+            return await self._run_db(service.recompute, project.id, metrics_days)
+        except Exception:
+            await self._run_db(self.db.rollback)
+            raise
+
+    @traced_stage("refresh.team_activity")
     async def refresh_team_activity_data(
-        self, project: Project, days_back: int = 90
+        self,
+        project: Project,
+        days_back: int = 90,
+        window: tuple[datetime, datetime] | None = None,
     ) -> dict[str, int]:
         """
         Refresh team activity data (MRs, reviews, team members) from GitLab.
@@ -176,6 +356,8 @@ class DataRefreshService:
         Args:
             project: Project to refresh
             days_back: Number of days to fetch historical data
+            window: Explicit (start, end) range of GitLab updated_at to fetch
+                instead of days_back (used by backfills)
             
         Returns:
             Dictionary with counts of updated records
@@ -188,59 +370,80 @@ class DataRefreshService:
 
         try:
             # Fetch merge requests from GitLab
-            mrs_data = await self._fetch_merge_requests(project, days_back)
+            with tracer.start_as_current_span("refresh.fetch_merge_requests") as span:
+                mrs_data = await self._fetch_merge_requests(
+                    project, *self._updated_range(days_back, window)
+                )
+                span.set_attribute("refresh.rows_fetched", len(mrs_data))
             
             # Process merge requests and team members
-            team_members_map = {}
-            saved_mrs = 0
-            
-            for mr_data in mrs_data:
-                # Get or create author
-                author = self._get_or_create_team_member(
-                    project, mr_data["author"], team_members_map
-                )
-                
-                # Process merge request
-                mr = self._process_merge_request(project, author, mr_data)
-                if mr:
-                    saved_mrs += 1
-                    
-                    # Fetch and process reviews for this MR
-                    await self._fetch_and_process_reviews(project, mr, team_members_map)
+            with tracer.start_as_current_span("refresh.upsert_merge_requests"):
+                if self._use_bulk_load(mrs_data):
+                    counts = await self._run_db(
+                        self.bulk_loader.load_merge_requests, project, mrs_data
+                    )
+                else:
+                    counts = await self._process_merge_requests(project, mrs_data)
             
-            self.db.commit()
+            with tracer.start_as_current_span("refresh.commit"):
+                await self._run_db(self.db.commit)
+            record_refresh_rows("merge_requests", counts["merge_requests"])
             
             logger.info(
                 f"Team activity data refresh completed for project {project.id}: "
-                f"{saved_mrs} MRs, {len(team_members_map)} team members"
+                f"{counts['merge_requests']} MRs, {counts['team_members']} team members"
             )
             
-            return {
-                "merge_requests": saved_mrs,
-                "team_members": len(team_members_map),
-            }
+            return counts
             
         except Exception as e:
             logger.error(
                 f"Error refreshing team activity for project {project.id}: {str(e)}",
                 exc_info=True,
             )
-            self.db.rollback()
+            await self._run_db(self.db.rollback)
             raise
 
+    async def _process_merge_requests(
+        self, project: Project, mrs_data: list[dict]
+    ) -> dict[str, int]:
+        """Process and save merge requests and their authors one at a time."""
+        team_members_map: dict = {}
+        saved_mrs = await self._run_db(
+            self._save_merge_requests, project, mrs_data, team_members_map
+        )
+        
+        for mr in saved_mrs:
+            # Fetch and process reviews for this MR
+            await self._fetch_and_process_reviews(project, mr, team_members_map)
+        
+        return {"merge_requests": len(saved_mrs), "team_members": len(team_members_map)}
+
+    def _save_merge_requests(
+        self, project: Project, mrs_data: list[dict], members_map: dict
+    ) -> list["MergeRequest"]:
+        """Save merge requests and their authors; return the merge requests saved."""
+        saved_mrs = []
+        for mr_data in mrs_data:
+            # Get or create author
+            author = self._get_or_create_team_member(project, mr_data["author"], members_map)
+            
+            # Process merge request
+            mr = self._process_merge_request(project, author, mr_data)
+            if mr:
+                saved_mrs.append(mr)
+        return saved_mrs
+
     async def _fetch_merge_requests(
-        self, project: Project, days_back: int
+        self, project: Project, start_date: datetime, end_date: datetime
     ) -> list[dict]:
-        """Fetch merge requests from GitLab API."""
+        """Fetch merge requests updated between start_date and end_date from GitLab API."""
         logger.debug(f"Fetching merge requests for GitLab project {project.gitlab_id}")
         
-        # Calculate date range
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days_back)
-        
         # Fetch from GitLab
         params = {
             "updated_after": start_date.isoformat(),
+            "updated_before": end_date.isoformat(),
             "per_page": 100,
             "order_by": "updated_at",
             "sort": "desc",
@@ -287,7 +490,7 @@ class DataRefreshService:
             )
             self.db.add(member)
             self.db.flush()  # Get ID without committing
-            logger.debug(f"Created team member {member.username}")
+            logger.debug("Created team member %s", member.username)
         
         members_map[gitlab_user_id] = member
         return member
@@ -336,7 +539,7 @@ class DataRefreshService:
                 )
                 self.db.add(mr)
                 self.db.flush()  # Get ID
-                logger.debug(f"Created merge request {mr.gitlab_mr_iid}")
+                logger.debug("Created merge request %s", mr.gitlab_mr_iid)
                 return mr
                 
         except Exception as e:
@@ -0,0 +1,164 @@
+import csv
+import io
+import logging
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+import orjson
+from sqlalchemy import Column, Result, select
+from sqlalchemy.orm import Session
+
+from src.config.settings import settings
+from src.models.metrics import Deployment
+from src.models.team_member import MergeRequest, Review
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+
+@dataclass(frozen=True)
+class ExportDataset:
+    """A table that can be exported as raw rows."""
+
+    model: Any
+    # Column the date range applies to
+    time_column: str
+
+    @property
+    def columns(self) -> list[str]:
+        return [column.name for column in self.model.__table__.columns]
+
+    def column(self, name: str) -> Column:
+        return self.model.__table__.columns[name]
+
+
+EXPORT_DATASETS = {
+    "merge_requests": ExportDataset(MergeRequest, "created_at_gitlab"),
+    "reviews": ExportDataset(Review, "reviewed_at"),
+    "deployments": ExportDataset(Deployment, "deployed_at"),
+}
+
+
+def _csv_value(value: Any) -> Any:
+    """Format a value for CSV (timestamps as ISO 8601, like the NDJSON export)."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class EventExporter:
+    """
+    Stream a project's raw merge requests, reviews or deployments.
+
+    Rows are read through a server-side cursor in batches of
+    settings.export_batch_size and encoded batch by batch, so memory use does
+    not grow with the size of the export.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def resolve_columns(self, dataset: str, columns: Sequence[str] | None) -> list[str]:
+        """
+        Validate a column selection.
+
+        Args:
+            dataset: Dataset name (see EXPORT_DATASETS)
+            columns: Requested columns, or None for all columns
+
+        Returns:
+            The columns to export, in the requested order
+
+        Raises:
+            ValueError: If the dataset or a column is unknown
+        """
+        if dataset not in EXPORT_DATASETS:
+            raise ValueError(
+                f"Unknown dataset {dataset!r}; use one of {', '.join(EXPORT_DATASETS)}"
+            )
+        available = EXPORT_DATASETS[dataset].columns
+        if not columns:
+            return available
+        unknown = [name for name in columns if name not in available]
+        if unknown:
+            raise ValueError(
+                f"Unknown columns for {dataset}: {', '.join(unknown)}; "
+                f"available: {', '.join(available)}"
+            )
+        return list(dict.fromkeys(columns))
+
+    def open_rows(
+        self,
+        dataset: str,
+        project_id: int,
+        columns: Sequence[str],
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+    ) -> Result:
+        """
+        Start streaming a project's rows from a server-side cursor.
+
+        Rows are ordered by the dataset's time column. The caller must consume
+        or close the result before the session is closed.
+
+        Args:
+            dataset: Dataset name (see EXPORT_DATASETS)
+            project_id: Project ID
+            columns: Columns to read (see resolve_columns)
+            start_date: Earliest time column value to include
+            end_date: First time column value to exclude
+
+        Returns:
+            The streaming result
+        """
+        spec = EXPORT_DATASETS[dataset]
+        time_column = spec.column(spec.time_column)
+        query = select(*(spec.column(name) for name in columns))
+        if spec.model is Review:
+            # Reviews belong to a project through their merge request
+            query = query.join(MergeRequest, MergeRequest.id == Review.merge_request_id).where(
+                MergeRequest.project_id == project_id
+            )
+        else:
+            query = query.where(spec.column("project_id") == project_id)
+        if start_date is not None:
+            query = query.where(time_column >= start_date)
+        if end_date is not None:
+            query = query.where(time_column < end_date)
+        query = query.order_by(time_column)
+
+        logger.info(f"Exporting {dataset} of project {project_id}")
+        return self.db.execute(
+            query,
+            execution_options={"stream_results": True, "yield_per": settings.export_batch_size},
+        )
+
+    def iter_ndjson(self, result: Result, columns: Sequence[str]) -> Iterator[bytes]:
+        """Encode streamed rows as newline-delimited JSON, one chunk per batch."""
+        try:
+            for batch in result.partitions():
+                yield b"".join(
+                    orjson.dumps(dict(zip(columns, row, strict=True))) + b"\n" for row in batch
+                )
+        finally:
+            result.close()
+
+    def iter_csv(self, result: Result, columns: Sequence[str]) -> Iterator[bytes]:
+        """Encode streamed rows as CSV with a header line, one chunk per batch."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        try:
+            for batch in result.partitions():
+                writer.writerows([_csv_value(value) for value in row] for row in batch)
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                # Header of an empty export
+                yield buffer.getvalue().encode()
+        finally:
+            result.close()
@@ -1,14 +1,46 @@
 import asyncio
+import functools
 import logging
+import time
+import weakref
+from datetime import datetime
 from typing import Any
 
 import httpx
+from opentelemetry.trace import SpanKind
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
 
 from src.config.settings import settings
+from src.observability.metrics import (
+    GITLAB_RATE_LIMIT_WAIT,
+    GITLAB_REQUEST_DURATION,
+    GITLAB_REQUESTS,
+    gitlab_endpoint_label,
+)
+from src.observability.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
 
+def parse_gitlab_datetime(value: str | None) -> datetime | None:
+    """Parse a GitLab ISO 8601 timestamp, returning None when missing or invalid."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (ValueError, AttributeError):
+        return None
+
+
+class GitLabGraphQLError(Exception):
+    """A GitLab GraphQL query was answered with errors."""
+
+    def __init__(self, errors: list[dict[str, Any]]):
+        self.errors = errors
+        super().__init__("; ".join(str(error.get("message", error)) for error in errors))
+
+
 class RateLimiter:
     """Simple rate limiter for API calls."""
 
@@ -16,11 +48,21 @@ class RateLimiter:
         self.max_calls_per_minute = max_calls_per_minute
         self.calls: list[float] = []
         self.lock = asyncio.Lock()
+        self._lock_loop: asyncio.AbstractEventLoop | None = None
+
+    def _loop_lock(self) -> asyncio.Lock:
+        """The lock, recreated when the limiter is used from a new event loop (Celery tasks)."""
+        loop = asyncio.get_running_loop()
+        if self._lock_loop is not loop:
+            self.lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self.lock
 
     async def acquire(self) -> None:
         """Acquire permission to make an API call, respecting rate limits."""
-        async with self.lock:
-            now = asyncio.get_event_loop().time()
+        started = time.perf_counter()
+        async with self._loop_lock():
+            now = time.monotonic()
             # Remove calls older than 1 minute
             self.calls = [call_time for call_time in self.calls if now - call_time < 60]
 
@@ -31,8 +73,193 @@ class RateLimiter:
                     logger.warning(f"Rate limit reached, sleeping for {sleep_time:.2f}s")
                     await asyncio.sleep(sleep_time)
                     self.calls = self.calls[1:]
+                    now = time.monotonic()
 
             self.calls.append(now)
+        GITLAB_RATE_LIMIT_WAIT.observe(time.perf_counter() - started)
+
+
+# Shares of the GitLab rate budget, one per Celery queue (see src.tasks)
+RATE_BUDGETS = ("interactive", "batch", "backfill")
+
+RATE_BUDGET_KEY_PREFIX = "workmetrics:gitlab-budget"
+
+# Takes one token from every bucket, or none. Per bucket: capacity, refill
+# per second and the level it may not take below. Returns the seconds to
+# wait before a token can be taken, "0" once it was taken.
+TAKE_TOKEN_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local levels = {}
+local wait = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[3 * i - 2])
+    local rate = tonumber(ARGV[3 * i - 1])
+    local floor = tonumber(ARGV[3 * i])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local level = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    level = math.min(capacity, level + math.max(0, now - ts) * rate)
+    levels[i] = level
+    if level - 1 < floor then
+        wait = math.max(wait, (floor + 1 - level) / rate)
+    end
+end
+if wait > 0 then
+    return tostring(wait)
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[3 * i - 2])
+    local rate = tonumber(ARGV[3 * i - 1])
+    redis.call('HSET', key, 'tokens', tostring(levels[i] - 1), 'ts', tostring(now))
+    redis.call('EXPIRE', key, math.ceil(capacity / rate) + 60)
+end
+return "0"
+"""
+
+
+def rate_limit_per_minute(budget: str) -> int:
+    """
+    Calls per minute of one share of the GitLab rate budget, when it is split statically.
+
+    This is the per-process fallback of BudgetRateLimiter while Redis cannot be
+    reached: settings.gitlab_api_rate_limit_per_minute is split so that the
+    shares never add up to more than it. Interactive work (on-demand refreshes
+    and webhook changes) gets settings.gitlab_interactive_rate_reserve_per_minute,
+    backfills get settings.backfill_rate_limit_per_minute and batch refreshes
+    the rest.
+
+    Args:
+        budget: One of RATE_BUDGETS
+
+    Returns:
+        Calls per minute (at least 1)
+
+    Raises:
+        ValueError: If the budget is unknown
+    """
+    if budget == "interactive":
+        limit = settings.gitlab_interactive_rate_reserve_per_minute
+    elif budget == "backfill":
+        limit = settings.backfill_rate_limit_per_minute
+    elif budget == "batch":
+        limit = (
+            settings.gitlab_api_rate_limit_per_minute
+            - settings.gitlab_interactive_rate_reserve_per_minute
+            - settings.backfill_rate_limit_per_minute
+        )
+    else:
+        raise ValueError(f"Unknown GitLab rate budget {budget!r} (expected one of {RATE_BUDGETS})")
+    return max(limit, 1)
+
+
+class BudgetRateLimiter(RateLimiter):
+    """
+    Rate limiter on one share of the GitLab rate budget, shared by all processes.
+
+    The budget is a token bucket in Redis holding
+    settings.gitlab_api_rate_limit_per_minute tokens and refilled at that rate.
+    Batch and backfill calls may not take the last
+    settings.gitlab_interactive_rate_reserve_per_minute tokens, so interactive
+    calls get through however busy the batch is; interactive calls may use the
+    whole budget while nothing else runs. Backfills also draw from a bucket of
+    their own, capped at settings.backfill_rate_limit_per_minute.
+
+    While Redis cannot be reached, calls are limited in this process to the
+    budget's static share (see rate_limit_per_minute).
+    """
+
+    # Seconds Redis is not tried again after it could not be reached
+    RETRY_SECONDS = 30.0
+
+    def __init__(
+        self,
+        budget: str,
+        redis: Redis | None = None,
+        key_prefix: str = RATE_BUDGET_KEY_PREFIX,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            budget: One of RATE_BUDGETS
+            redis: Redis client (one per event loop is created from
+                settings.redis_url when omitted)
+            key_prefix: Prefix of the bucket keys
+        """
+        super().__init__(rate_limit_per_minute(budget))
+        self.budget = budget
+        self.key_prefix = key_prefix
+        self._redis = redis
+        self._clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Redis] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._redis_retry_at = 0.0
+
+    def _client(self) -> Redis:
+        if self._redis is not None:
+            return self._redis
+        # A client's connections belong to the event loop that opened them
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = Redis.from_url(settings.redis_url, socket_connect_timeout=2)
+            self._clients[loop] = client
+        return client
+
+    def _buckets(self) -> tuple[list[str], list[float]]:
+        """Bucket keys and their (capacity, refill per second, floor) for this budget."""
+        total = settings.gitlab_api_rate_limit_per_minute
+        reserve = settings.gitlab_interactive_rate_reserve_per_minute
+        floor = 0 if self.budget == "interactive" else min(reserve, total - 1)
+        keys = [f"{self.key_prefix}:total"]
+        args = [total, total / 60, floor]
+        if self.budget == "backfill":
+            backfill = settings.backfill_rate_limit_per_minute
+            keys.append(f"{self.key_prefix}:backfill")
+            args += [backfill, backfill / 60, 0]
+        return keys, args
+
+    async def _take(self) -> float:
+        """Take a token; return 0, or the seconds to wait before trying again."""
+        keys, args = self._buckets()
+        # Shielded: redis-py can hang a task cancelled while a command is in flight
+        wait = await asyncio.shield(
+            self._client().eval(TAKE_TOKEN_SCRIPT, len(keys), *keys, *args)
+        )
+        return float(wait)
+
+    async def acquire(self) -> None:
+        """Acquire permission to make an API call from the shared budget."""
+        if not settings.gitlab_rate_budget_shared or time.monotonic() < self._redis_retry_at:
+            return await super().acquire()
+
+        started = time.perf_counter()
+        try:
+            while (wait := await self._take()) > 0:
+                await asyncio.sleep(wait)
+        except RedisError as e:
+            logger.warning(
+                f"GitLab {self.budget} budget limited in this process for "
+                f"{self.RETRY_SECONDS:.0f}s: {str(e)}"
+            )
+            self._redis_retry_at = time.monotonic() + self.RETRY_SECONDS
+            return await super().acquire()
+        GITLAB_RATE_LIMIT_WAIT.observe(time.perf_counter() - started)
+
+
+@functools.cache
+def get_rate_limiter(budget: str) -> BudgetRateLimiter:
+    """
+    Return this process's rate limiter on a share of the GitLab budget.
+
+    Args:
+        budget: One of RATE_BUDGETS
+
+    Raises:
+        ValueError: If the budget is unknown
+    """
+    return BudgetRateLimiter(budget)
 
 
 class GitLabClient:
@@ -40,10 +267,31 @@ class GitLabClient:
     Wrapper client for GitLab API with rate limiting and error handling.
     """
 
-    def __init__(self, api_url: str | None = None, access_token: str | None = None):
+    def __init__(
+        self,
+        api_url: str | None = None,
+        access_token: str | None = None,
+        rate_limiter: RateLimiter | None = None,
+        http_client: httpx.AsyncClient | None = None,
+    ):
+        """
+        Initialize the client.
+
+        Args:
+            api_url: GitLab API base URL (defaults to settings)
+            access_token: GitLab access token (defaults to settings)
+            rate_limiter: Rate limiter to share with other clients (defaults to
+                the process's limiter on the interactive budget)
+            http_client: Long-lived HTTP client whose connection pool is reused
+                for every request; a short-lived client per request is used
+                when omitted
+        """
         self.api_url = api_url or settings.gitlab_api_url
         self.access_token = access_token or settings.gitlab_access_token
-        self.rate_limiter = RateLimiter(settings.gitlab_api_rate_limit_per_minute)
+        self.rate_limiter = rate_limiter or get_rate_limiter("interactive")
+        self.http_client = http_client
+        # The GraphQL endpoint is a sibling of the versioned REST API
+        self.graphql_url = self.api_url.rstrip("/").removesuffix("/v4") + "/graphql"
 
         if not self.access_token:
             logger.warning("GitLab access token not configured")
@@ -55,6 +303,100 @@ class GitLabClient:
             headers["PRIVATE-TOKEN"] = self.access_token
         return headers
 
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        base_url: str | None = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """
+        Make a rate-limited request to GitLab API and return the raw response.
+        
+        Requests answered with 429 Too Many Requests are retried after the
+        delay GitLab asks for (Retry-After, or RateLimit-Reset), up to
+        settings.gitlab_max_retries times.
+        
+        Raises:
+            httpx.HTTPError: If request fails
+        """
+        url = f"{base_url or self.api_url}/{endpoint.lstrip('/')}"
+        headers = self._get_headers()
+        endpoint_label = gitlab_endpoint_label(endpoint)
+
+        with tracer.start_as_current_span(
+            f"GitLab {method} {endpoint_label}",
+            kind=SpanKind.CLIENT,
+            attributes={"http.request.method": method, "gitlab.endpoint": endpoint_label},
+        ) as span:
+            for attempt in range(settings.gitlab_max_retries + 1):
+                with tracer.start_as_current_span("gitlab.rate_limit_wait"):
+                    await self.rate_limiter.acquire()
+
+                logger.debug("%s %s", method, url)
+                started = time.perf_counter()
+                try:
+                    if self.http_client is not None:
+                        response = await self.http_client.request(
+                            method, url, headers=headers, params=params, timeout=30.0, **kwargs
+                        )
+                    else:
+                        async with httpx.AsyncClient() as client:
+                            response = await client.request(
+                                method, url, headers=headers, params=params, timeout=30.0, **kwargs
+                            )
+                except httpx.HTTPError:
+                    GITLAB_REQUESTS.labels(
+                        method=method, endpoint=endpoint_label, status="error"
+                    ).inc()
+                    raise
+                finally:
+                    GITLAB_REQUEST_DURATION.labels(method=method, endpoint=endpoint_label).observe(
+                        time.perf_counter() - started
+                    )
+                GITLAB_REQUESTS.labels(
+                    method=method, endpoint=endpoint_label, status=str(response.status_code)
+                ).inc()
+
+                if response.status_code != 429 or attempt == settings.gitlab_max_retries:
+                    break
+
+                delay = self._retry_delay(response)
+                logger.warning(f"GitLab rate limit hit for {url}, retrying in {delay:.2f}s")
+                with tracer.start_as_current_span(
+                    "gitlab.retry_wait", attributes={"gitlab.retry_delay_seconds": delay}
+                ):
+                    await asyncio.sleep(delay)
+
+            span.set_attribute("http.response.status_code", response.status_code)
+            span.set_attribute("gitlab.attempts", attempt + 1)
+            response.raise_for_status()
+            return response
+
+    def _parse_json(self, response: httpx.Response) -> Any:
+        """Decode a GitLab response body."""
+        with tracer.start_as_current_span(
+            "gitlab.parse_json", attributes={"http.response.body.size": len(response.content)}
+        ):
+            return response.json()
+
+    def _retry_delay(self, response: httpx.Response) -> float:
+        """Seconds to wait before retrying a request answered with 429."""
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            try:
+                return max(float(retry_after), 0.0)
+            except ValueError:
+                pass
+        reset = response.headers.get("RateLimit-Reset")
+        if reset is not None:
+            try:
+                return max(float(reset) - time.time(), 0.0)
+            except ValueError:
+                pass
+        return 1.0
+
     async def _request(
         self, method: str, endpoint: str, params: dict[str, Any] | None = None, **kwargs: Any
     ) -> dict[str, Any] | list[dict[str, Any]]:
@@ -73,18 +415,55 @@ class GitLabClient:
         Raises:
             httpx.HTTPError: If request fails
         """
-        await self.rate_limiter.acquire()
+        response = await self._send(method, endpoint, params=params, **kwargs)
+        return self._parse_json(response)
 
-        url = f"{self.api_url}/{endpoint.lstrip('/')}"
-        headers = self._get_headers()
+    async def graphql(self, query: str, variables: dict[str, Any] | None = None) -> dict[str, Any]:
+        """
+        Run a query against GitLab's GraphQL API.
 
-        async with httpx.AsyncClient() as client:
-            logger.debug(f"{method} {url}")
-            response = await client.request(
-                method, url, headers=headers, params=params, timeout=30.0, **kwargs
-            )
-            response.raise_for_status()
-            return response.json()
+        The query shares the client's rate limiter, 429 retries and connection
+        pool with REST requests.
+
+        Returns:
+            The query's data
+
+        Raises:
+            httpx.HTTPError: If request fails
+            GitLabGraphQLError: If GitLab answers with errors
+        """
+        base_url, endpoint = self.graphql_url.rsplit("/", 1)
+        response = await self._send(
+            "POST",
+            endpoint,
+            base_url=base_url,
+            json={"query": query, "variables": variables or {}},
+        )
+        result = self._parse_json(response)
+        if result.get("errors"):
+            raise GitLabGraphQLError(result["errors"])
+        return result["data"]
+
+    async def get_all(
+        self, endpoint: str, params: dict[str, Any] | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        GET every page of a paginated GitLab list endpoint.
+        
+        Pages are followed through the X-Next-Page header until GitLab
+        reports no further page.
+        """
+        params = dict(params or {})
+        items: list[dict[str, Any]] = []
+        page = params.pop("page", 1)
+        while page:
+            response = await self._send("GET", endpoint, params={**params, "page": page})
+            result = self._parse_json(response)
+            if not isinstance(result, list):
+                break
+            items.extend(result)
+            page = response.headers.get("X-Next-Page") or None
+        return items
 
     async def get(
         self, endpoint: str, params: dict[str, Any] | None = None
@@ -99,32 +478,55 @@ class GitLabClient:
     async def get_project_deployments(
         self, project_id: int, params: dict[str, Any] | None = None
     ) -> list[dict[str, Any]]:
-        """Get project deployments."""
-        result = await self.get(f"/projects/{project_id}/deployments", params=params)
-        return result if isinstance(result, list) else []
+        """Get project deployments (all pages)."""
+        return await self.get_all(f"/projects/{project_id}/deployments", params=params)
+
+    async def get_project_deployment(self, project_id: int, deployment_id: int) -> dict[str, Any]:
+        """Get a single deployment."""
+        return await self.get(f"/projects/{project_id}/deployments/{deployment_id}")
 
     async def get_project_merge_requests(
         self, project_id: int, params: dict[str, Any] | None = None
     ) -> list[dict[str, Any]]:
-        """Get project merge requests."""
-        result = await self.get(f"/projects/{project_id}/merge_requests", params=params)
-        return result if isinstance(result, list) else []
+        """Get project merge requests (all pages)."""
+        return await self.get_all(f"/projects/{project_id}/merge_requests", params=params)
+
+    async def get_project_merge_request(
+        self, project_id: int, merge_request_iid: int
+    ) -> dict[str, Any]:
+        """Get a single merge request."""
+        return await self.get(f"/projects/{project_id}/merge_requests/{merge_request_iid}")
 
     async def get_merge_request_commits(
         self, project_id: int, merge_request_iid: int
     ) -> list[dict[str, Any]]:
-        """Get commits for a merge request."""
-        result = await self.get(
+        """Get commits for a merge request (all pages)."""
+        return await self.get_all(
             f"/projects/{project_id}/merge_requests/{merge_request_iid}/commits"
         )
-        return result if isinstance(result, list) else []
 
     async def get_project_issues(
         self, project_id: int, params: dict[str, Any] | None = None
     ) -> list[dict[str, Any]]:
-        """Get project issues."""
-        result = await self.get(f"/projects/{project_id}/issues", params=params)
-        return result if isinstance(result, list) else []
+        """Get project issues (all pages)."""
+        return await self.get_all(f"/projects/{project_id}/issues", params=params)
+
+
+def create_gitlab_client(**kwargs: Any) -> GitLabClient:
+    """
+    Create the GitLab client for settings.gitlab_merge_request_backend.
+
+    "graphql" fetches merge requests through the GraphQL API (see
+    src.services.gitlab_graphql); "rest" uses the REST API for everything.
+
+    Args:
+        **kwargs: See GitLabClient
+    """
+    if settings.gitlab_merge_request_backend == "graphql":
+        from src.services.gitlab_graphql import GitLabGraphQLClient
+
+        return GitLabGraphQLClient(**kwargs)
+    return GitLabClient(**kwargs)
 
 
 # Global client instance
@@ -0,0 +1,189 @@
+import logging
+import re
+from typing import Any
+
+from src.config.settings import settings
+from src.services.gitlab_client import GitLabClient, GitLabGraphQLError
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds GitLab enforces on a connection's page size
+MAX_PAGE_SIZE = 100
+MAX_APPROVERS = 20
+
+# Share of the complexity limit a page is sized to use, leaving room for
+# estimation error
+COMPLEXITY_HEADROOM = 0.9
+
+MERGE_REQUESTS_QUERY = """
+query MergeRequests(
+  $ids: [ID!], $first: Int!, $after: String, $updatedAfter: Time, $updatedBefore: Time,
+  $approvers: Int!
+) {
+  queryComplexity { score limit }
+  projects(ids: $ids) {
+    nodes {
+      mergeRequests(
+        first: $first, after: $after, updatedAfter: $updatedAfter,
+        updatedBefore: $updatedBefore, sort: UPDATED_DESC
+      ) {
+        pageInfo { hasNextPage endCursor }
+        nodes {
+          id iid title state createdAt updatedAt mergedAt closedAt sourceBranch targetBranch
+          author { id username name avatarUrl publicEmail }
+          diffStatsSummary { additions deletions }
+          userNotesCount
+          commitCount
+          approvedBy(first: $approvers) { nodes { id username name avatarUrl } }
+          commits(last: 1) { nodes { authoredDate } }
+        }
+      }
+    }
+  }
+}
+"""
+
+_EXCEEDED_LIMIT = re.compile(r"exceeds max complexity of (\d+)")
+
+
+def _gid_number(gid: str) -> int:
+    """Numeric ID of a GraphQL global ID such as gid://gitlab/User/42."""
+    return int(gid.rsplit("/", 1)[-1])
+
+
+def _user(node: dict[str, Any]) -> dict[str, Any]:
+    """A GraphQL user in the shape of the REST API."""
+    return {
+        "id": _gid_number(node["id"]),
+        "username": node.get("username", ""),
+        "name": node.get("name", ""),
+        "avatar_url": node.get("avatarUrl"),
+        "email": node.get("publicEmail"),
+    }
+
+
+def merge_request_from_graphql(node: dict[str, Any]) -> dict[str, Any]:
+    """
+    Convert a GraphQL merge request node to the REST API's shape.
+
+    Besides the REST listing fields, the result has the fields the REST API
+    only returns from per-MR calls: changes (diff stats), approved_by,
+    user_notes_count, commit_count and first_commit_at.
+    """
+    diff_stats = node.get("diffStatsSummary") or {}
+    commits = (node.get("commits") or {}).get("nodes") or []
+    return {
+        "id": _gid_number(node["id"]),
+        "iid": int(node["iid"]),
+        "title": node["title"],
+        "state": node["state"],
+        "author": _user(node["author"]),
+        "created_at": node["createdAt"],
+        "updated_at": node.get("updatedAt"),
+        "merged_at": node.get("mergedAt"),
+        "closed_at": node.get("closedAt"),
+        "source_branch": node.get("sourceBranch", ""),
+        "target_branch": node.get("targetBranch", ""),
+        "changes": {
+            "additions": diff_stats.get("additions", 0),
+            "deletions": diff_stats.get("deletions", 0),
+        },
+        "approved_by": [
+            {"user": _user(user)} for user in (node.get("approvedBy") or {}).get("nodes") or []
+        ],
+        "user_notes_count": node.get("userNotesCount", 0),
+        "commit_count": node.get("commitCount", 0),
+        "first_commit_at": commits[0]["authoredDate"] if commits else None,
+    }
+
+
+class GitLabGraphQLClient(GitLabClient):
+    """
+    GitLab client that fetches merge requests through the GraphQL API.
+
+    One paged query returns merge requests together with their approvers,
+    note and commit counts, first commit time and diff stats, which the REST
+    API spreads over a listing plus several calls per merge request. Results
+    have the REST shape (see merge_request_from_graphql), so ingestion is the
+    same for both clients; every other call goes to the REST API.
+
+    GitLab rejects queries above a complexity limit. The page size is sized
+    from the complexity GitLab reports for each page, and halved and retried
+    when a query is rejected anyway.
+    """
+
+    def __init__(self, *args: Any, page_size: int | None = None, **kwargs: Any):
+        """
+        Initialize the client.
+
+        Args:
+            *args: See GitLabClient
+            page_size: Merge requests per query to start with (defaults to settings)
+            **kwargs: See GitLabClient
+        """
+        super().__init__(*args, **kwargs)
+        self.page_size = min(page_size or settings.gitlab_graphql_page_size, MAX_PAGE_SIZE)
+        self.max_complexity = settings.gitlab_graphql_max_complexity
+
+    def _resize_page(self, score: int, limit: int, page_size: int) -> None:
+        """Size the next page from the complexity of the last one."""
+        self.max_complexity = limit
+        per_node = max(score / page_size, 1.0)
+        self.page_size = max(
+            1, min(int(limit * COMPLEXITY_HEADROOM / per_node), MAX_PAGE_SIZE)
+        )
+
+    async def get_project_merge_requests(
+        self, project_id: int, params: dict[str, Any] | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Get project merge requests (all pages), with approvals, counts and diff stats.
+
+        Args:
+            project_id: GitLab project ID
+            params: REST-style filters; updated_after and updated_before are applied
+
+        Returns:
+            Merge requests in the shape of the REST API
+        """
+        params = params or {}
+        variables = {
+            "ids": [f"gid://gitlab/Project/{project_id}"],
+            "updatedAfter": params.get("updated_after"),
+            "updatedBefore": params.get("updated_before"),
+            "approvers": MAX_APPROVERS,
+            "after": None,
+        }
+        merge_requests: list[dict[str, Any]] = []
+        while True:
+            page_size = self.page_size
+            try:
+                data = await self.graphql(MERGE_REQUESTS_QUERY, {**variables, "first": page_size})
+            except GitLabGraphQLError as e:
+                exceeded = _EXCEEDED_LIMIT.search(str(e))
+                if not exceeded or page_size == 1:
+                    raise
+                self.max_complexity = int(exceeded.group(1))
+                self.page_size = max(page_size // 2, 1)
+                logger.warning(
+                    f"GraphQL page of {page_size} merge requests too complex, "
+                    f"retrying with {self.page_size}"
+                )
+                continue
+
+            complexity = data.get("queryComplexity") or {}
+            if complexity.get("score"):
+                self._resize_page(
+                    complexity["score"], complexity.get("limit") or self.max_complexity, page_size
+                )
+
+            projects = data["projects"]["nodes"]
+            if not projects:
+                return merge_requests
+            connection = projects[0]["mergeRequests"]
+            merge_requests.extend(
+                merge_request_from_graphql(node) for node in connection["nodes"]
+            )
+            if not connection["pageInfo"]["hasNextPage"]:
+                return merge_requests
+            variables["after"] = connection["pageInfo"]["endCursor"]
@@ -0,0 +1,260 @@
+import logging
+from collections.abc import Iterable
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import Date, bindparam, cast, delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.orm import Session
+
+from src.models.metrics import (
+    Deployment,
+    DeploymentDailyRollup,
+    FourKeysMetrics,
+    MetricsDirtyBucket,
+)
+from src.services.metrics_calculator import MetricsCalculator
+
+logger = logging.getLogger(__name__)
+
+
+def deployment_day(deployed_at: datetime) -> date:
+    """Return the UTC calendar day a deployment is rolled up into."""
+    if deployed_at.tzinfo is None:
+        return deployed_at.date()
+    return deployed_at.astimezone(timezone.utc).date()
+
+
+def _is_day_aligned(start_date: datetime, end_date: datetime) -> bool:
+    """Whether a period covers whole UTC days, so it can be built from rollups."""
+    start = start_date.astimezone(timezone.utc).time()
+    end = end_date.astimezone(timezone.utc).time()
+    return start == time.min and (end == time.min or end >= time(23, 59, 59))
+
+
+class IncrementalMetricsService:
+    """
+    Recompute Four Keys aggregates only where deployments changed.
+
+    Ingestion marks each (project, environment, day) bucket touched by an
+    insert or update as dirty. Recomputing rebuilds the daily rollups of the
+    dirty buckets, then the stored snapshots that overlap them, so the nightly
+    cost follows the number of changed buckets rather than the length of the
+    history.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.metrics_calculator = MetricsCalculator(db)
+
+    def mark_dirty(self, project_id: int, buckets: Iterable[tuple[str, date]]) -> int:
+        """
+        Record buckets whose deployments were inserted or updated.
+
+        Runs in the caller's transaction, so buckets are only marked when the
+        deployment changes are committed with them.
+
+        Args:
+            project_id: Project ID
+            buckets: (environment, day) pairs touched by ingestion
+
+        Returns:
+            Number of distinct buckets passed in
+        """
+        rows = [
+            {"project_id": project_id, "environment": environment, "day": day}
+            for environment, day in set(buckets)
+        ]
+        if rows:
+            self.db.execute(insert(MetricsDirtyBucket).values(rows).on_conflict_do_nothing())
+        return len(rows)
+
+    def recompute(
+        self, project_id: int, metrics_days: int | None = 30, today: date | None = None
+    ) -> dict[str, Any]:
+        """
+        Rebuild dirty rollups and the snapshots derived from them.
+
+        Args:
+            project_id: Project ID
+            metrics_days: Number of whole days (ending yesterday) of the rolling
+                Four Keys snapshot to keep current, or None to skip it
+            today: Current UTC day (defaults to today)
+
+        Returns:
+            Counters of dirty and clean buckets and of recomputed snapshots
+        """
+        today = today or datetime.now(timezone.utc).date()
+
+        # Claim the dirty buckets; ones marked by a concurrent sync after this
+        # point stay in the table for the next run
+        dirty = [
+            (row.environment, row.day)
+            for row in self.db.execute(
+                delete(MetricsDirtyBucket)
+                .where(MetricsDirtyBucket.project_id == project_id)
+                .returning(MetricsDirtyBucket.environment, MetricsDirtyBucket.day)
+            )
+        ]
+        dirty_days = {day for _environment, day in dirty}
+
+        if dirty:
+            self._rebuild_rollups(project_id, dirty)
+
+        recomputed = set()
+        for snapshot in self._snapshots_overlapping(project_id, dirty_days):
+            self._save_snapshot(project_id, snapshot.period_start, snapshot.period_end)
+            recomputed.add((snapshot.period_start, snapshot.period_end))
+
+        if metrics_days is not None:
+            window_start = datetime.combine(
+                today - timedelta(days=metrics_days), time.min, tzinfo=timezone.utc
+            )
+            window_end = datetime.combine(
+                today - timedelta(days=1), time(23, 59, 59), tzinfo=timezone.utc
+            )
+            window_days = {
+                window_start.date() + timedelta(days=offset) for offset in range(metrics_days)
+            }
+            # A snapshot for the window that already exists was rebuilt above if
+            # any of its days were dirty
+            exists = self.db.execute(
+                select(FourKeysMetrics.id).where(
+                    FourKeysMetrics.project_id == project_id,
+                    FourKeysMetrics.period_start == window_start,
+                    FourKeysMetrics.period_end == window_end,
+                )
+            ).first()
+            if exists is None:
+                self._save_snapshot(project_id, window_start, window_end)
+                recomputed.add((window_start, window_end))
+        else:
+            window_days = set()
+
+        # Buckets of the rolling window that had no changes and were not touched
+        clean = (
+            select(func.count())
+            .select_from(DeploymentDailyRollup)
+            .where(DeploymentDailyRollup.project_id == project_id)
+            .where(DeploymentDailyRollup.day.in_(window_days))
+        )
+        if dirty:
+            clean = clean.where(
+                tuple_(DeploymentDailyRollup.environment, DeploymentDailyRollup.day).not_in(dirty)
+            )
+        clean_buckets = self.db.execute(clean).scalar_one()
+
+        # One transaction: if anything fails, the claimed buckets stay dirty
+        self.db.commit()
+
+        logger.info(
+            f"Incremental metrics for project {project_id}: {len(dirty)} dirty buckets, "
+            f"{clean_buckets} clean buckets, {len(recomputed)} snapshots recomputed"
+        )
+        return {
+            "dirty_buckets": len(dirty),
+            "clean_buckets": clean_buckets,
+            "snapshots_recomputed": len(recomputed),
+        }
+
+    def _rebuild_rollups(self, project_id: int, buckets: list[tuple[str, date]]) -> None:
+        """Replace the rollup rows of the given buckets with fresh aggregates."""
+        days = [day for _environment, day in buckets]
+        day_expr = cast(func.timezone("UTC", Deployment.deployed_at), Date)
+
+        self.db.execute(
+            delete(DeploymentDailyRollup).where(
+                DeploymentDailyRollup.project_id == project_id,
+                tuple_(DeploymentDailyRollup.environment, DeploymentDailyRollup.day).in_(buckets),
+            )
+        )
+
+        aggregates = (
+            select(
+                Deployment.project_id,
+                Deployment.environment,
+                day_expr.label("day"),
+                func.count(Deployment.id),
+                func.count(Deployment.id).filter(Deployment.is_failure.is_(True)),
+                func.coalesce(
+                    func.array_agg(Deployment.lead_time_hours).filter(
+                        Deployment.lead_time_hours.is_not(None)
+                    ),
+                    "{}",
+                ),
+                func.coalesce(
+                    func.array_agg(Deployment.time_to_restore_hours).filter(
+                        Deployment.time_to_restore_hours.is_not(None)
+                    ),
+                    "{}",
+                ),
+            )
+            .where(Deployment.project_id == project_id)
+            # Bounds on the partition key let the planner prune partitions
+            .where(
+                Deployment.deployed_at
+                >= datetime.combine(min(days), time.min, tzinfo=timezone.utc)
+            )
+            .where(
+                Deployment.deployed_at
+                < datetime.combine(max(days) + timedelta(days=1), time.min, tzinfo=timezone.utc)
+            )
+            .where(tuple_(Deployment.environment, day_expr).in_(buckets))
+            .group_by(Deployment.project_id, Deployment.environment, day_expr)
+        )
+        self.db.execute(
+            insert(DeploymentDailyRollup).from_select(
+                [
+                    "project_id",
+                    "environment",
+                    "day",
+                    "deployment_count",
+                    "failed_deployment_count",
+                    "lead_times_hours",
+                    "time_to_restore_hours",
+                ],
+                aggregates,
+            )
+        )
+
+    def _snapshots_overlapping(
+        self, project_id: int, days: set[date]
+    ) -> list[FourKeysMetrics]:
+        """Return the stored snapshots whose period includes any of the given days."""
+        if not days:
+            return []
+
+        # One array parameter, so the statement does not grow with the dirty days
+        dirty_days = (
+            func.unnest(bindparam("dirty_days", sorted(days), type_=ARRAY(Date)))
+            .table_valued("day")
+            .render_derived(name="dirty_days")
+        )
+        first_day = cast(func.timezone("UTC", FourKeysMetrics.period_start), Date)
+        last_day = cast(func.timezone("UTC", FourKeysMetrics.period_end), Date)
+        overlaps = (
+            select(dirty_days.c.day)
+            .where(dirty_days.c.day >= first_day)
+            .where(dirty_days.c.day <= last_day)
+            .exists()
+        )
+        return list(
+            self.db.execute(
+                select(FourKeysMetrics)
+                .where(FourKeysMetrics.project_id == project_id)
+                .where(overlaps)
+            ).scalars()
+        )
+
+    def _save_snapshot(self, project_id: int, start_date: datetime, end_date: datetime) -> None:
+        """Recalculate one snapshot, from rollups when its period covers whole days."""
+        if _is_day_aligned(start_date, end_date):
+            metrics = self.metrics_calculator.calculate_four_keys_from_rollups(
+                project_id, start_date, end_date
+            )
+        else:
+            metrics = self.metrics_calculator.calculate_four_keys(
+                project_id, start_date, end_date
+            )
+        # Committed by recompute together with the claimed dirty buckets
+        self.metrics_calculator.save_metrics(project_id, metrics, commit=False)
@@ -1,15 +1,85 @@
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime, time, timedelta, timezone
+from types import SimpleNamespace
 from typing import Any
+from zoneinfo import ZoneInfo
 
-from sqlalchemy import func, select
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Select,
+    and_,
+    cast,
+    delete,
+    func,
+    literal,
+    or_,
+    select,
+    true,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
-from src.models.metrics import Deployment, FourKeysMetrics
+from src.models.metrics import (
+    Deployment,
+    DeploymentDailyRollup,
+    FourKeysMetrics,
+    MetricsDirtyBucket,
+)
 from src.models.project import Project
 
 logger = logging.getLogger(__name__)
 
+# Supported bucket sizes for time-series metrics (PostgreSQL date_trunc fields)
+BUCKET_SIZES = ("day", "week", "month")
+
+# Metric columns stored in a FourKeysMetrics snapshot
+SNAPSHOT_METRIC_COLUMNS = (
+    "deployment_frequency",
+    "deployment_count",
+    "lead_time_hours",
+    "lead_time_median_hours",
+    "change_failure_rate",
+    "failed_deployment_count",
+    "time_to_restore_hours",
+    "time_to_restore_median_hours",
+)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Return value as an aware UTC datetime, treating naive values as UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _truncate_day(day: date, bucket: str) -> date:
+    """Truncate a date to the start of its bucket (weeks start on Monday)."""
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket_day(day: date, bucket: str) -> date:
+    """Return the first day of the bucket following the one starting at day."""
+    if bucket == "week":
+        return day + timedelta(days=7)
+    if bucket == "month":
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
+
+def _bucket_days(first_day: date, last_day: date, bucket: str) -> list[date]:
+    """List the start days of all buckets overlapping [first_day, last_day]."""
+    days = []
+    day = _truncate_day(first_day, bucket)
+    while day <= last_day:
+        days.append(day)
+        day = _next_bucket_day(day, bucket)
+    return days
+
 
 class MetricsCalculator:
     """Service for calculating Four Keys DevOps metrics."""
@@ -74,6 +144,380 @@ class MetricsCalculator:
             "time_to_restore_median_hours": time_to_restore["median"],
         }
 
+    def calculate_four_keys_from_rollups(
+        self, project_id: int, start_date: datetime, end_date: datetime
+    ) -> dict[str, Any]:
+        """
+        Calculate Four Keys metrics for whole UTC days from the daily rollups.
+        
+        Gives the same result as calculate_four_keys for a day-aligned period
+        while reading one rollup row per environment and day instead of the
+        deployments themselves.
+        
+        Args:
+            project_id: Project ID
+            start_date: Start of period (midnight UTC of the first day)
+            end_date: End of period (last moment of, or midnight after, the last day)
+            
+        Returns:
+            Dictionary containing all Four Keys metrics
+        """
+        first_day = _as_utc(start_date).date()
+        last_day = (_as_utc(end_date) - timedelta(microseconds=1)).date()
+        in_period = (
+            DeploymentDailyRollup.project_id == project_id,
+            DeploymentDailyRollup.day >= first_day,
+            DeploymentDailyRollup.day <= last_day,
+        )
+
+        # Function calls in FROM are implicitly LATERAL, so each rollup row's
+        # arrays are expanded in place
+        lead_times = (
+            func.unnest(DeploymentDailyRollup.lead_times_hours)
+            .table_valued("hours")
+            .render_derived(name="lead_times")
+        )
+        restore_times = (
+            func.unnest(DeploymentDailyRollup.time_to_restore_hours)
+            .table_valued("hours")
+            .render_derived(name="restore_times")
+        )
+
+        counts = select(
+            func.coalesce(func.sum(DeploymentDailyRollup.deployment_count), 0)
+            .cast(BigInteger)
+            .label("deployment_count"),
+            func.coalesce(func.sum(DeploymentDailyRollup.failed_deployment_count), 0)
+            .cast(BigInteger)
+            .label("failed_deployment_count"),
+        ).where(*in_period)
+        lead_time_stats = (
+            select(
+                func.avg(lead_times.c.hours).label("lead_time_mean"),
+                func.percentile_cont(0.5)
+                .within_group(lead_times.c.hours)
+                .label("lead_time_median"),
+            )
+            .select_from(DeploymentDailyRollup)
+            .join(lead_times, true())
+            .where(*in_period)
+        )
+        restore_time_stats = (
+            select(
+                func.avg(restore_times.c.hours).label("time_to_restore_mean"),
+                func.percentile_cont(0.5)
+                .within_group(restore_times.c.hours)
+                .label("time_to_restore_median"),
+            )
+            .select_from(DeploymentDailyRollup)
+            .join(restore_times, true())
+            .where(*in_period)
+        )
+
+        counts_row = self.db.execute(counts).one()
+        lead_row = self.db.execute(lead_time_stats).one()
+        restore_row = self.db.execute(restore_time_stats).one()
+        row = SimpleNamespace(**counts_row._mapping, **lead_row._mapping, **restore_row._mapping)
+        return self._metrics_from_aggregate_row(row, start_date, end_date)
+
+    def calculate_four_keys_batch(
+        self,
+        project_ids: list[int],
+        start_date: datetime,
+        end_date: datetime,
+        include_aggregate: bool = False,
+    ) -> tuple[dict[int, dict[str, Any]], dict[str, Any] | None]:
+        """
+        Calculate Four Keys metrics for many projects in a single grouped query.
+        
+        Means and medians are computed by the database, so no deployment rows
+        are loaded into memory. When an aggregate is requested, the grouping
+        uses ROLLUP so the org-level row comes out of the same pass.
+        
+        Args:
+            project_ids: Project IDs to calculate metrics for
+            start_date: Start of period
+            end_date: End of period
+            include_aggregate: Also return metrics across all requested projects
+            
+        Returns:
+            Tuple of (metrics per project ID, aggregate metrics or None)
+        """
+        logger.info(
+            f"Calculating Four Keys metrics for {len(project_ids)} projects "
+            f"from {start_date} to {end_date}"
+        )
+
+        group_key = (
+            func.rollup(Deployment.project_id) if include_aggregate else Deployment.project_id
+        )
+        stmt = (
+            select(
+                Deployment.project_id,
+                func.grouping(Deployment.project_id).label("is_aggregate")
+                if include_aggregate
+                else literal(0).label("is_aggregate"),
+                *self._aggregate_columns(),
+            )
+            .where(Deployment.project_id.in_(project_ids))
+            .where(Deployment.deployed_at >= start_date)
+            .where(Deployment.deployed_at <= end_date)
+            .group_by(group_key)
+        )
+
+        per_project = {
+            project_id: self._empty_metrics(start_date, end_date) for project_id in project_ids
+        }
+        aggregate = self._empty_metrics(start_date, end_date) if include_aggregate else None
+
+        for row in self.db.execute(stmt):
+            metrics = self._metrics_from_aggregate_row(row, start_date, end_date)
+            if row.is_aggregate:
+                aggregate = metrics
+            else:
+                per_project[row.project_id] = metrics
+
+        return per_project, aggregate
+
+    def calculate_four_keys_series(
+        self,
+        project_id: int,
+        start_date: datetime,
+        end_date: datetime,
+        bucket: str,
+        timezone: str = "UTC",
+    ) -> list[dict[str, Any]]:
+        """
+        Calculate Four Keys metrics per time bucket in a single grouped query.
+        
+        Buckets are truncated in the given timezone, so a "day" is a local
+        calendar day. Buckets without deployments are filled with empty metrics.
+        UTC series over whole days are read from the daily rollups, unless
+        some of their days are still waiting to be recomputed.
+        
+        Args:
+            project_id: Project ID
+            start_date: Start of period (timezone-aware, inclusive)
+            end_date: End of period (timezone-aware, exclusive)
+            bucket: Bucket size, one of "day", "week" or "month"
+            timezone: IANA timezone name used for bucket boundaries
+            
+        Returns:
+            Metrics for every bucket in the period, in chronological order
+        """
+        if bucket not in BUCKET_SIZES:
+            raise ValueError(f"Unsupported bucket: {bucket}")
+
+        zone = ZoneInfo(timezone)
+        logger.info(
+            f"Calculating {bucket} Four Keys series for project {project_id} "
+            f"from {start_date} to {end_date} ({timezone})"
+        )
+
+        first_day = start_date.astimezone(zone).date()
+        last_day = (end_date.astimezone(zone) - timedelta(microseconds=1)).date()
+
+        if self._rollups_cover(project_id, start_date, end_date, timezone, first_day, last_day):
+            rows_by_bucket = self._series_rows_from_rollups(
+                project_id, first_day, last_day, bucket
+            )
+        else:
+            bucket_start = func.date_trunc(bucket, Deployment.deployed_at, timezone).label(
+                "bucket_start"
+            )
+            stmt = (
+                select(bucket_start, *self._aggregate_columns())
+                .where(Deployment.project_id == project_id)
+                .where(Deployment.deployed_at >= start_date)
+                .where(Deployment.deployed_at < end_date)
+                .group_by("bucket_start")
+            )
+            rows_by_bucket = {
+                row.bucket_start.astimezone(zone).date(): row for row in self.db.execute(stmt)
+            }
+
+        series = []
+        for bucket_day in _bucket_days(first_day, last_day, bucket):
+            next_day = _next_bucket_day(bucket_day, bucket)
+            period_start = max(
+                datetime.combine(bucket_day, datetime.min.time(), tzinfo=zone), start_date
+            )
+            period_end = min(
+                datetime.combine(next_day, datetime.min.time(), tzinfo=zone), end_date
+            )
+            period_days = (
+                period_end.astimezone(zone).date() - period_start.astimezone(zone).date()
+            ).days
+
+            row = rows_by_bucket.get(bucket_day)
+            if row is None:
+                series.append(self._empty_metrics(period_start, period_end))
+            else:
+                series.append(
+                    self._metrics_from_aggregate_row(row, period_start, period_end, period_days)
+                )
+
+        return series
+
+    def _rollups_cover(
+        self,
+        project_id: int,
+        start_date: datetime,
+        end_date: datetime,
+        timezone: str,
+        first_day: date,
+        last_day: date,
+    ) -> bool:
+        """Whether a series period can be read from up-to-date daily rollups."""
+        # Rollup days are UTC calendar days, so buckets must be too
+        if timezone != "UTC":
+            return False
+        if any(_as_utc(value).time() != time.min for value in (start_date, end_date)):
+            return False
+
+        pending = self.db.execute(
+            self._pending_days(project_id, first_day, last_day).limit(1)
+        ).first()
+        return pending is None
+
+    def _pending_days(self, project_id: int, first_day: date, last_day: date) -> Select:
+        """Query for the days of [first_day, last_day] still waiting to be recomputed."""
+        return (
+            select(MetricsDirtyBucket.day)
+            .where(MetricsDirtyBucket.project_id == project_id)
+            .where(MetricsDirtyBucket.day >= first_day)
+            .where(MetricsDirtyBucket.day <= last_day)
+        )
+
+    def _series_rows_from_rollups(
+        self, project_id: int, first_day: date, last_day: date, bucket: str
+    ) -> dict[date, Any]:
+        """Aggregate the daily rollups of a period per bucket, keyed by bucket start day."""
+        bucket_start = func.date_trunc(
+            bucket, cast(DeploymentDailyRollup.day, DateTime)
+        ).label("bucket_start")
+        in_period = (
+            DeploymentDailyRollup.project_id == project_id,
+            DeploymentDailyRollup.day >= first_day,
+            DeploymentDailyRollup.day <= last_day,
+        )
+        lead_times = (
+            func.unnest(DeploymentDailyRollup.lead_times_hours)
+            .table_valued("hours")
+            .render_derived(name="lead_times")
+        )
+        restore_times = (
+            func.unnest(DeploymentDailyRollup.time_to_restore_hours)
+            .table_valued("hours")
+            .render_derived(name="restore_times")
+        )
+
+        counts = (
+            select(
+                bucket_start,
+                func.sum(DeploymentDailyRollup.deployment_count)
+                .cast(BigInteger)
+                .label("deployment_count"),
+                func.sum(DeploymentDailyRollup.failed_deployment_count)
+                .cast(BigInteger)
+                .label("failed_deployment_count"),
+            )
+            .where(*in_period)
+            .group_by("bucket_start")
+            .subquery("counts")
+        )
+        lead_time_stats = (
+            select(
+                bucket_start,
+                func.avg(lead_times.c.hours).label("lead_time_mean"),
+                func.percentile_cont(0.5)
+                .within_group(lead_times.c.hours)
+                .label("lead_time_median"),
+            )
+            .select_from(DeploymentDailyRollup)
+            .join(lead_times, true())
+            .where(*in_period)
+            .group_by("bucket_start")
+            .subquery("lead_time_stats")
+        )
+        restore_time_stats = (
+            select(
+                bucket_start,
+                func.avg(restore_times.c.hours).label("time_to_restore_mean"),
+                func.percentile_cont(0.5)
+                .within_group(restore_times.c.hours)
+                .label("time_to_restore_median"),
+            )
+            .select_from(DeploymentDailyRollup)
+            .join(restore_times, true())
+            .where(*in_period)
+            .group_by("bucket_start")
+            .subquery("restore_time_stats")
+        )
+
+        stmt = (
+            select(
+                counts,
+                lead_time_stats.c.lead_time_mean,
+                lead_time_stats.c.lead_time_median,
+                restore_time_stats.c.time_to_restore_mean,
+                restore_time_stats.c.time_to_restore_median,
+            )
+            .outerjoin(
+                lead_time_stats, lead_time_stats.c.bucket_start == counts.c.bucket_start
+            )
+            .outerjoin(
+                restore_time_stats, restore_time_stats.c.bucket_start == counts.c.bucket_start
+            )
+        )
+        return {row.bucket_start.date(): row for row in self.db.execute(stmt)}
+
+    def _aggregate_columns(self) -> list[Any]:
+        """Aggregate expressions shared by the grouped Four Keys queries."""
+        return [
+            func.count(Deployment.id).label("deployment_count"),
+            func.count(Deployment.id)
+            .filter(Deployment.is_failure.is_(True))
+            .label("failed_deployment_count"),
+            func.avg(Deployment.lead_time_hours).label("lead_time_mean"),
+            func.percentile_cont(0.5)
+            .within_group(Deployment.lead_time_hours)
+            .label("lead_time_median"),
+            func.avg(Deployment.time_to_restore_hours).label("time_to_restore_mean"),
+            func.percentile_cont(0.5)
+            .within_group(Deployment.time_to_restore_hours)
+            .label("time_to_restore_median"),
+        ]
+
+    def _metrics_from_aggregate_row(
+        self,
+        row: Any,
+        start_date: datetime,
+        end_date: datetime,
+        period_days: int | None = None,
+    ) -> dict[str, Any]:
+        """Build a metrics dictionary from one row of a grouped deployment query."""
+        deployment_count = row.deployment_count
+        if not deployment_count:
+            return self._empty_metrics(start_date, end_date)
+
+        if period_days is None:
+            period_days = (end_date - start_date).days
+        period_days = max(period_days, 1)
+
+        return {
+            "period_start": start_date,
+            "period_end": end_date,
+            "deployment_frequency": deployment_count / period_days,
+            "deployment_count": deployment_count,
+            "lead_time_hours": row.lead_time_mean,
+            "lead_time_median_hours": row.lead_time_median,
+            "change_failure_rate": (row.failed_deployment_count / deployment_count) * 100,
+            "failed_deployment_count": row.failed_deployment_count,
+            "time_to_restore_hours": row.time_to_restore_mean,
+            "time_to_restore_median_hours": row.time_to_restore_median,
+        }
+
     def _empty_metrics(self, start_date: datetime, end_date: datetime) -> dict[str, Any]:
         """Return empty metrics when no deployments exist."""
         return {
@@ -173,11 +617,146 @@ class MetricsCalculator:
 
         return {"mean": mean, "median": median}
 
-    def save_metrics(self, project_id: int, metrics_data: dict[str, Any]) -> FourKeysMetrics:
-        """Save calculated metrics to database."""
-        metrics = FourKeysMetrics(project_id=project_id, **metrics_data)
-        self.db.add(metrics)
-        self.db.commit()
-        self.db.refresh(metrics)
+    def save_metrics(
+        self, project_id: int, metrics_data: dict[str, Any], commit: bool = True
+    ) -> FourKeysMetrics:
+        """
+        Save calculated metrics to database.
+        
+        The snapshot is upserted on (project_id, period_start, period_end), so
+        recalculating a period replaces its previous values instead of adding
+        another row.
+        
+        Args:
+            project_id: Project ID
+            metrics_data: Metrics in the format of calculate_four_keys
+            commit: Commit the snapshot; pass False to leave it in the
+                caller's transaction
+            
+        Returns:
+            The stored snapshot
+        """
+        values = {column: metrics_data[column] for column in SNAPSHOT_METRIC_COLUMNS}
+        stmt = insert(FourKeysMetrics).values(
+            project_id=project_id,
+            period_start=metrics_data["period_start"],
+            period_end=metrics_data["period_end"],
+            **values,
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_four_keys_metrics_project_period",
+            set_={**values, "updated_at": func.now()},
+        ).returning(FourKeysMetrics)
+
+        metrics = self.db.scalars(
+            stmt, execution_options={"populate_existing": True}
+        ).one()
+        if commit:
+            self.db.commit()
         logger.info(f"Saved Four Keys metrics for project {project_id}")
         return metrics
+
+    def get_snapshot(
+        self, project_id: int, start_date: datetime, end_date: datetime
+    ) -> dict[str, Any] | None:
+        """
+        Find a stored snapshot covering exactly the requested period.
+        
+        A snapshot matches when its bounds equal the requested ones, or when
+        it starts at midnight of the first requested day and ends at the last
+        moment (or the exclusive midnight) of the last requested day. Only
+        snapshots calculated after their period ended are returned, since
+        earlier ones may be missing deployments, and only while none of the
+        requested days are waiting to be recomputed.
+        
+        Args:
+            project_id: Project ID
+            start_date: Start of period (naive values are treated as UTC)
+            end_date: End of period (naive values are treated as UTC)
+            
+        Returns:
+            Metrics in the format of calculate_four_keys, or None if no
+            snapshot matches
+        """
+        start_date = _as_utc(start_date)
+        end_date = _as_utc(end_date)
+        first_day = datetime.combine(start_date.date(), datetime.min.time(), tzinfo=timezone.utc)
+        last_day = datetime.combine(end_date.date(), datetime.min.time(), tzinfo=timezone.utc)
+        day_aligned = and_(
+            FourKeysMetrics.period_start == first_day,
+            FourKeysMetrics.period_end >= last_day + timedelta(days=1, seconds=-1),
+            FourKeysMetrics.period_end <= last_day + timedelta(days=1),
+        )
+
+        snapshot = self.db.execute(
+            select(FourKeysMetrics)
+            .where(FourKeysMetrics.project_id == project_id)
+            .where(
+                or_(
+                    and_(
+                        FourKeysMetrics.period_start == start_date,
+                        FourKeysMetrics.period_end == end_date,
+                    ),
+                    day_aligned,
+                )
+            )
+            .where(FourKeysMetrics.updated_at >= FourKeysMetrics.period_end)
+            .where(
+                ~self._pending_days(
+                    project_id, start_date.date(), (end_date - timedelta(microseconds=1)).date()
+                ).exists()
+            )
+            .order_by(FourKeysMetrics.updated_at.desc())
+            .limit(1)
+        ).scalar_one_or_none()
+
+        if snapshot is None:
+            return None
+
+        logger.debug(f"Serving Four Keys snapshot {snapshot.id} for project {project_id}")
+        return {
+            "period_start": snapshot.period_start,
+            "period_end": snapshot.period_end,
+            **{column: getattr(snapshot, column) for column in SNAPSHOT_METRIC_COLUMNS},
+        }
+
+    def collapse_duplicate_snapshots(self, project_id: int | None = None) -> int:
+        """
+        Delete duplicate snapshots, keeping the most recent one per period.
+        
+        Snapshots used to be inserted on every refresh, so older databases
+        hold several rows for the same project and period.
+        
+        Args:
+            project_id: Only collapse this project's snapshots (all if None)
+            
+        Returns:
+            Number of rows deleted
+        """
+        ranked = select(
+            FourKeysMetrics.id,
+            func.row_number()
+            .over(
+                partition_by=(
+                    FourKeysMetrics.project_id,
+                    FourKeysMetrics.period_start,
+                    FourKeysMetrics.period_end,
+                ),
+                order_by=(FourKeysMetrics.updated_at.desc(), FourKeysMetrics.id.desc()),
+            )
+            .label("position"),
+        )
+        if project_id is not None:
+            ranked = ranked.where(FourKeysMetrics.project_id == project_id)
+        ranked = ranked.subquery()
+
+        result = self.db.execute(
+            delete(FourKeysMetrics).where(
+                FourKeysMetrics.id.in_(select(ranked.c.id).where(ranked.c.position > 1))
+            )
+        )
+        self.db.commit()
+
+        deleted = result.rowcount
+        logger.info(f"Collapsed {deleted} duplicate Four Keys snapshots")
+        return deleted
@@ -0,0 +1,300 @@
+"""
+Per-project leases that keep jobs on the same project from running at once.
+
+A manual refresh, a second click and the daily batch would otherwise refresh
+the same project concurrently, multiplying GitLab calls and racing on the
+same rows. Before such a job runs, its caller takes a lease on the project
+and resource (e.g. ``refresh``) in Redis:
+
+- The lease is a Redis lock whose token is the job ID. It expires after
+  settings.refresh_lock_lease_seconds and is renewed while the job runs, so
+  the lease of a process that died is recovered once it expires.
+- A job that loses its lease (it expired while Redis was unreachable, or was
+  deleted) is cancelled, so two holders never write at once.
+- A request for a job that is already in flight attaches to it: it waits
+  for the job and returns its result instead of running it again. It only
+  attaches if the in-flight job's scope (e.g. days of history) covers its
+  own; otherwise it waits for the lease and then runs. Jobs that write
+  something the job in flight does not (e.g. a webhook's items) never
+  attach.
+
+The job's state and, once it finished, its result are kept under a second
+key for settings.refresh_lock_result_ttl_seconds, for the requests attached
+to it. If Redis cannot be reached when the lease is taken, the job runs
+without one.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from redis.asyncio import Redis
+from redis.asyncio.lock import Lock
+from redis.exceptions import LockError, RedisError
+
+from src.config.settings import settings
+from src.observability.metrics import PROJECT_LEASES
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "workmetrics:lease"
+
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class LeaseLostError(Exception):
+    """The lease expired or was taken over while its job was running."""
+
+
+class JobFailedError(Exception):
+    """The in-flight job a request attached to failed."""
+
+
+class ProjectLeases:
+    """Run jobs under a per-project lease, attaching duplicates to the job in flight."""
+
+    def __init__(
+        self,
+        redis: Redis | None = None,
+        lease_seconds: float | None = None,
+        wait_seconds: float | None = None,
+        poll_seconds: float | None = None,
+    ):
+        """
+        Initialize the leases.
+
+        Args:
+            redis: Redis client (one is created from settings.redis_url when omitted)
+            lease_seconds: Lease duration, renewed while the job runs
+            wait_seconds: How long a request waits for a job in flight before
+                giving up with TimeoutError
+            poll_seconds: Interval at which a waiting request checks the job
+        """
+        self._owns_redis = redis is None
+        self.redis = redis or Redis.from_url(settings.redis_url, decode_responses=True)
+        self.lease_seconds = lease_seconds or settings.refresh_lock_lease_seconds
+        self.wait_seconds = wait_seconds or settings.refresh_lock_wait_seconds
+        self.poll_seconds = poll_seconds or settings.refresh_lock_poll_seconds
+
+    async def close(self) -> None:
+        """Close the Redis client, if it was created by these leases."""
+        if self._owns_redis:
+            await self.redis.aclose()
+
+    def _lease_key(self, resource: str, project_id: int) -> str:
+        return f"{KEY_PREFIX}:{resource}:{project_id}"
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{KEY_PREFIX}:job:{job_id}"
+
+    async def run(
+        self,
+        resource: str,
+        project_id: int,
+        job: Callable[[], Awaitable[dict[str, Any]]],
+        scope: int = 0,
+        attach: bool = True,
+    ) -> dict[str, Any]:
+        """
+        Run a job under the project's lease, or attach to the same job in flight.
+
+        Args:
+            resource: What the job works on (e.g. ``refresh``); jobs on
+                different resources of a project do not exclude each other
+            project_id: Project ID
+            job: Coroutine function running the job; its result must be JSON
+                serializable, as attached requests receive it from Redis
+            scope: Size of the job (e.g. days of history); a request attaches
+                only to an in-flight job of at least its scope
+            attach: Whether the request may attach to a job in flight; if
+                not, it always waits for the lease and runs its own job
+
+        Returns:
+            The result of the job, run here or by the job this request attached to
+
+        Raises:
+            JobFailedError: If the job this request attached to failed
+            LeaseLostError: If the lease was lost while the job ran
+            TimeoutError: If the job in flight did not finish within wait_seconds
+        """
+        if not settings.refresh_lock_enabled:
+            return await job()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_seconds
+        lease_key = self._lease_key(resource, project_id)
+        recovered = False
+        while True:
+            job_id = uuid.uuid4().hex
+            state = {
+                "resource": resource,
+                "project_id": project_id,
+                "scope": scope,
+                "status": JOB_RUNNING,
+            }
+            lock = self.redis.lock(lease_key, timeout=self.lease_seconds, thread_local=False)
+            try:
+                # Recorded first, so a request finding the lease taken can read the scope
+                await self._set_job_state(job_id, state, self.lease_seconds)
+                acquired = await lock.acquire(blocking=False, token=job_id)
+                if not acquired:
+                    await self.redis.delete(self._job_key(job_id))
+                holder = None if acquired else await self.redis.get(lease_key)
+            except RedisError as e:
+                logger.warning(
+                    f"Running {resource} of project {project_id} without a lease: {str(e)}"
+                )
+                PROJECT_LEASES.labels(resource=resource, outcome="unlocked").inc()
+                return await job()
+
+            if acquired:
+                PROJECT_LEASES.labels(
+                    resource=resource, outcome="recovered" if recovered else "acquired"
+                ).inc()
+                return await self._run_holding(lock, job_id, state, job)
+            if holder is None:
+                # Released in between
+                continue
+
+            holder_state = await self._job_state(holder)
+            attaching = (
+                attach and holder_state is not None and holder_state["scope"] >= scope
+            )
+            if attaching:
+                logger.info(
+                    f"Attaching {resource} of project {project_id} to job {holder} in flight"
+                )
+            outcome = await self._wait_for_job(lease_key, holder, deadline)
+            if outcome is None:
+                # The holder stopped renewing its lease: recover it
+                logger.warning(
+                    f"Lease on {resource} of project {project_id} held by job {holder} "
+                    f"was abandoned"
+                )
+                recovered = True
+                continue
+            if not attaching:
+                continue
+
+            PROJECT_LEASES.labels(resource=resource, outcome="attached").inc()
+            if outcome["status"] == JOB_FAILED:
+                raise JobFailedError(outcome["error"])
+            return outcome["result"]
+
+    async def _job_state(self, job_id: str) -> dict[str, Any] | None:
+        """Return the recorded state of a job, or None if it expired or never existed."""
+        value = await self.redis.get(self._job_key(job_id))
+        return json.loads(value) if value is not None else None
+
+    async def _set_job_state(self, job_id: str, state: dict[str, Any], ttl: float) -> None:
+        value = json.dumps(state, default=str)
+        await self.redis.set(self._job_key(job_id), value, px=int(ttl * 1000))
+
+    async def _wait_for_job(
+        self, lease_key: str, job_id: str, deadline: float
+    ) -> dict[str, Any] | None:
+        """
+        Wait until a job in flight has finished.
+
+        Returns:
+            The finished job's state, or None if its lease expired or was
+            released without a recorded outcome (its holder died)
+
+        Raises:
+            TimeoutError: If the job is still running at the deadline
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            state = await self._job_state(job_id)
+            if state is not None and state["status"] != JOB_RUNNING:
+                return state
+            # The outcome is recorded before the lease is released
+            if await self.redis.get(lease_key) != job_id:
+                state = await self._job_state(job_id)
+                if state is not None and state["status"] != JOB_RUNNING:
+                    return state
+                return None
+            if loop.time() >= deadline:
+                raise TimeoutError(f"job {job_id} did not finish in {self.wait_seconds}s")
+            await asyncio.sleep(self.poll_seconds)
+
+    async def _run_holding(
+        self,
+        lock: Lock,
+        job_id: str,
+        state: dict[str, Any],
+        job: Callable[[], Awaitable[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        """Run a job while renewing its lease, record its outcome and release the lease."""
+        resource, project_id = state["resource"], state["project_id"]
+        work = asyncio.ensure_future(job())
+        lost = asyncio.Event()
+        stopped = asyncio.Event()
+        renewal = asyncio.create_task(self._renew(lock, job_id, work, lost, stopped))
+        try:
+            result = await work
+        except asyncio.CancelledError:
+            if lost.is_set():
+                PROJECT_LEASES.labels(resource=resource, outcome="lost").inc()
+                raise LeaseLostError(
+                    f"lease on {resource} of project {project_id} was lost"
+                ) from None
+            await self._finish(job_id, {**state, "status": JOB_FAILED, "error": "cancelled"})
+            raise
+        except Exception as e:
+            await self._finish(job_id, {**state, "status": JOB_FAILED, "error": str(e)})
+            raise
+        else:
+            await self._finish(job_id, {**state, "status": JOB_SUCCEEDED, "result": result})
+            return result
+        finally:
+            stopped.set()
+            # Let a cancelled job wind down before another holder can start
+            work.cancel()
+            await asyncio.wait([work, renewal])
+            try:
+                await lock.release()
+            except (LockError, RedisError):
+                # Expired or taken over; nothing to release
+                pass
+
+    async def _finish(self, job_id: str, state: dict[str, Any]) -> None:
+        """Record a job's outcome for the requests attached to it."""
+        try:
+            await self._set_job_state(job_id, state, settings.refresh_lock_result_ttl_seconds)
+        except RedisError as e:
+            logger.warning(f"Could not record the outcome of job {job_id}: {str(e)}")
+
+    async def _renew(
+        self,
+        lock: Lock,
+        job_id: str,
+        work: asyncio.Future,
+        lost: asyncio.Event,
+        stopped: asyncio.Event,
+    ) -> None:
+        """Renew the lease a few times per lease duration; cancel the job if it is lost."""
+        while True:
+            # Stopped by an event rather than cancelled: redis-py can hang a
+            # task cancelled while a command is in flight
+            try:
+                await asyncio.wait_for(stopped.wait(), self.lease_seconds / 3)
+                return
+            except TimeoutError:
+                pass
+            try:
+                await lock.reacquire()
+                await self.redis.pexpire(self._job_key(job_id), int(self.lease_seconds * 1000))
+            except LockError:
+                logger.error(f"Lease of job {job_id} was lost; cancelling it")
+                lost.set()
+                work.cancel()
+                return
+            except RedisError as e:
+                # The lease survives a failed renewal until it expires
+                logger.warning(f"Could not renew the lease of job {job_id}: {str(e)}")
+
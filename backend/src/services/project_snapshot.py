@@ -0,0 +1,392 @@
+import json
+import logging
+import tempfile
+import time
+import zipfile
+from datetime import datetime, timezone
+from typing import IO, TYPE_CHECKING, Any
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, Table, text
+from sqlalchemy.orm import Session
+
+from src.database.bulk import copy_csv_into, copy_query_to_csv, create_staging_table
+from src.models.metrics import Deployment
+from src.models.project import Project
+from src.models.team_member import MergeRequest, Review, TeamMember
+
+# pyarrow is imported where snapshots are read or written, so that processes
+# which never handle one do not load it at startup
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Tables in a snapshot, in import order, with the query selecting a project's rows
+SNAPSHOT_TABLES: dict[str, tuple[Table, str]] = {
+    "projects": (Project.__table__, "id = {project_id}"),
+    "team_members": (TeamMember.__table__, "project_id = {project_id}"),
+    "merge_requests": (MergeRequest.__table__, "project_id = {project_id}"),
+    "reviews": (
+        Review.__table__,
+        "merge_request_id IN (SELECT id FROM merge_requests WHERE project_id = {project_id})",
+    ),
+    "deployments": (Deployment.__table__, "project_id = {project_id}"),
+}
+
+# Files are spooled in memory up to this size, then on disk
+SPOOL_MAX_BYTES = 64 * 1024 * 1024
+
+
+class SnapshotError(ValueError):
+    """The snapshot file is not a valid project snapshot."""
+
+
+def _arrow_type(column: Any) -> "pa.DataType":
+    """Arrow type for a table column."""
+    import pyarrow as pa
+
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(column.type, Date):
+        return pa.date32()
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, Integer):
+        # BigInteger is a subclass of Integer
+        return pa.int64()
+    return pa.string()
+
+
+def arrow_schema(table: Table) -> "pa.Schema":
+    """Arrow schema of a table's rows in a snapshot."""
+    import pyarrow as pa
+
+    return pa.schema([pa.field(column.name, _arrow_type(column)) for column in table.columns])
+
+
+class ProjectSnapshotService:
+    """
+    Export a project's history to a columnar snapshot file and import it back.
+
+    A snapshot is a zip archive holding one zstd-compressed Parquet file per
+    table (the project, its team members, merge requests, reviews and
+    deployments) and a manifest.json. Both directions move rows with COPY
+    (see src.database.bulk) and never call GitLab, so a project's history
+    can be copied between environments or opened in a notebook with pandas
+    or pyarrow.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def export_project(self, project_id: int, target: IO[bytes]) -> dict[str, Any]:
+        """
+        Write a snapshot of a project to target.
+
+        Args:
+            project_id: Project ID
+            target: Binary file object the zip archive is written to
+
+        Returns:
+            The snapshot manifest
+
+        Raises:
+            ValueError: If the project does not exist
+        """
+        project = self.db.get(Project, project_id)
+        if project is None:
+            raise ValueError(f"Project {project_id} not found")
+
+        started = time.perf_counter()
+        # Timestamps are exported in UTC whatever the server's time zone
+        self.db.execute(text("SET LOCAL TIME ZONE 'UTC'"))
+
+        rows: dict[str, int] = {}
+        with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_STORED) as archive:
+            for name, (table, condition) in SNAPSHOT_TABLES.items():
+                with archive.open(f"{name}.parquet", "w", force_zip64=True) as parquet_file:
+                    rows[name] = self._export_table(
+                        table, condition.format(project_id=int(project_id)), parquet_file
+                    )
+
+            manifest = {
+                "format_version": SNAPSHOT_FORMAT_VERSION,
+                "project_gitlab_id": project.gitlab_id,
+                "project_name": project.name,
+                "exported_at": datetime.now(timezone.utc).isoformat(),
+                "rows": rows,
+            }
+            archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+
+        logger.info(
+            f"Exported snapshot of project {project_id} "
+            f"({sum(rows.values())} rows) in {time.perf_counter() - started:.2f}s"
+        )
+        return manifest
+
+    def _export_table(self, table: Table, condition: str, target: IO[bytes]) -> int:
+        """COPY a table's selected rows out as CSV and convert them to Parquet."""
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
+
+        schema = arrow_schema(table)
+        columns = ", ".join(schema.names)
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as spool:
+            copy_query_to_csv(
+                self.db, f"SELECT {columns} FROM {table.name} WHERE {condition}", spool
+            )
+            spool.seek(0)
+            reader = pa_csv.open_csv(
+                spool,
+                convert_options=pa_csv.ConvertOptions(
+                    column_types=schema,
+                    true_values=["t"],
+                    false_values=["f"],
+                    # COPY writes NULL unquoted and empty strings quoted
+                    strings_can_be_null=True,
+                    quoted_strings_can_be_null=False,
+                ),
+            )
+            rows = 0
+            with pq.ParquetWriter(target, schema, compression="zstd") as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+                    rows += batch.num_rows
+        return rows
+
+    def import_snapshot(self, source: IO[bytes]) -> dict[str, Any]:
+        """
+        Load a snapshot into the database and commit it.
+
+        The project is matched by its GitLab ID and created if it does not
+        exist; team members, merge requests, reviews and deployments are
+        matched by their GitLab keys and get IDs of this database. Existing
+        rows are updated in place, so importing the same snapshot twice
+        changes nothing. Deployment days are marked dirty for the next
+        incremental metrics run.
+
+        Args:
+            source: Seekable binary file object holding the zip archive
+
+        Returns:
+            The imported project's ID and the rows loaded per table
+
+        Raises:
+            SnapshotError: If source is not a snapshot of a supported format
+        """
+        import pyarrow as pa
+
+        started = time.perf_counter()
+        try:
+            archive = zipfile.ZipFile(source)
+            manifest = json.loads(archive.read("manifest.json"))
+        except (zipfile.BadZipFile, KeyError, ValueError) as e:
+            raise SnapshotError(f"Not a project snapshot: {str(e)}")
+        if manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise SnapshotError(
+                f"Unsupported snapshot format version: {manifest.get('format_version')}"
+            )
+
+        try:
+            loaded = {}
+            with archive:
+                for name, (table, _condition) in SNAPSHOT_TABLES.items():
+                    with archive.open(f"{name}.parquet") as parquet_file:
+                        loaded[name] = self._stage_table(table, parquet_file)
+            project_id = self._merge_staged()
+            self.db.commit()
+        except (KeyError, pa.ArrowException) as e:
+            self.db.rollback()
+            raise SnapshotError(f"Invalid project snapshot: {str(e)}")
+        except Exception:
+            self.db.rollback()
+            raise
+
+        logger.info(
+            f"Imported snapshot into project {project_id} "
+            f"({sum(loaded.values())} rows) in {time.perf_counter() - started:.2f}s"
+        )
+        return {"project_id": project_id, "rows": loaded}
+
+    def _stage_table(self, table: Table, source: IO[bytes]) -> int:
+        """COPY a table's Parquet rows into its temporary staging table."""
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
+
+        staging = f"snapshot_{table.name}"
+        create_staging_table(self.db, table.name, staging)
+        parquet = pq.ParquetFile(source)
+        # Columns the snapshot has, in case a newer schema added some
+        available = parquet.schema_arrow
+        columns = [name for name in arrow_schema(table).names if name in available.names]
+        schema = pa.schema([available.field(name) for name in columns])
+
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as spool:
+            with pa_csv.CSVWriter(spool, schema) as writer:
+                for batch in parquet.iter_batches(columns=columns):
+                    writer.write_batch(batch)
+            spool.seek(0)
+            return copy_csv_into(self.db, staging, columns, spool)
+
+    def _merge_staged(self) -> int:
+        """Merge the staging tables into the real tables, returning the project ID."""
+        project_id = self.db.execute(
+            text(
+                """
+                INSERT INTO projects (gitlab_id, name, url, last_synced_at)
+                SELECT gitlab_id, name, url, last_synced_at FROM snapshot_projects
+                ON CONFLICT (gitlab_id) DO UPDATE SET
+                    name = excluded.name,
+                    url = excluded.url,
+                    last_synced_at = greatest(projects.last_synced_at, excluded.last_synced_at)
+                RETURNING id
+                """
+            )
+        ).scalar_one()
+        params = {"project_id": project_id}
+
+        self.db.execute(
+            text(
+                """
+                INSERT INTO team_members (
+                    project_id, gitlab_user_id, username, name, email, avatar_url
+                )
+                SELECT :project_id, gitlab_user_id, username, name, email, avatar_url
+                FROM snapshot_team_members
+                ON CONFLICT (project_id, gitlab_user_id) DO UPDATE SET
+                    username = excluded.username,
+                    name = excluded.name,
+                    email = excluded.email,
+                    avatar_url = excluded.avatar_url
+                """
+            ),
+            params,
+        )
+        # Snapshot member IDs mapped to this database's IDs
+        self.db.execute(
+            text(
+                """
+                CREATE TEMPORARY TABLE snapshot_member_ids ON COMMIT DROP AS
+                SELECT s.id AS snapshot_id, tm.id
+                FROM snapshot_team_members s
+                JOIN team_members tm
+                  ON tm.project_id = :project_id AND tm.gitlab_user_id = s.gitlab_user_id
+                """
+            ),
+            params,
+        )
+
+        self.db.execute(
+            text(
+                """
+                INSERT INTO merge_requests (
+                    project_id, author_id, gitlab_mr_id, gitlab_mr_iid, title, state,
+                    created_at_gitlab, merged_at, closed_at, source_branch, target_branch,
+                    additions, deletions
+                )
+                SELECT
+                    :project_id, m.id, s.gitlab_mr_id, s.gitlab_mr_iid, s.title, s.state,
+                    s.created_at_gitlab, s.merged_at, s.closed_at, s.source_branch,
+                    s.target_branch, s.additions, s.deletions
+                FROM snapshot_merge_requests s
+                JOIN snapshot_member_ids m ON m.snapshot_id = s.author_id
+                ON CONFLICT (project_id, gitlab_mr_id, created_at_gitlab) DO UPDATE SET
+                    author_id = excluded.author_id,
+                    title = excluded.title,
+                    state = excluded.state,
+                    merged_at = excluded.merged_at,
+                    closed_at = excluded.closed_at,
+                    additions = excluded.additions,
+                    deletions = excluded.deletions
+                """
+            ),
+            params,
+        )
+
+        # Reviews have no GitLab key; one is identified by its merge request,
+        # reviewer and time
+        self.db.execute(
+            text(
+                """
+                INSERT INTO reviews (
+                    merge_request_id, reviewer_id, reviewed_at, comment_count, approval_status
+                )
+                SELECT mr.id, m.id, s.reviewed_at, s.comment_count, s.approval_status
+                FROM snapshot_reviews s
+                JOIN snapshot_merge_requests smr ON smr.id = s.merge_request_id
+                JOIN merge_requests mr
+                  ON mr.project_id = :project_id
+                 AND mr.gitlab_mr_id = smr.gitlab_mr_id
+                 AND mr.created_at_gitlab = smr.created_at_gitlab
+                JOIN snapshot_member_ids m ON m.snapshot_id = s.reviewer_id
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM reviews r
+                    WHERE r.merge_request_id = mr.id
+                      AND r.reviewer_id = m.id
+                      AND r.reviewed_at = s.reviewed_at
+                )
+                """
+            ),
+            params,
+        )
+
+        # Deployments have no unique constraint to upsert on: update the ones
+        # that exist, then insert the rest
+        self.db.execute(
+            text(
+                """
+                UPDATE deployments d SET
+                    status = s.status,
+                    finished_at = s.finished_at,
+                    merge_request_iid = s.merge_request_iid,
+                    is_failure = s.is_failure,
+                    lead_time_hours = s.lead_time_hours,
+                    time_to_restore_hours = s.time_to_restore_hours
+                FROM snapshot_deployments s
+                WHERE d.project_id = :project_id
+                  AND d.gitlab_deployment_id = s.gitlab_deployment_id
+                """
+            ),
+            params,
+        )
+        self.db.execute(
+            text(
+                """
+                INSERT INTO deployments (
+                    project_id, gitlab_deployment_id, environment, status, deployed_at,
+                    finished_at, commit_sha, merge_request_iid, is_failure, lead_time_hours,
+                    time_to_restore_hours
+                )
+                SELECT
+                    :project_id, s.gitlab_deployment_id, s.environment, s.status, s.deployed_at,
+                    s.finished_at, s.commit_sha, s.merge_request_iid, s.is_failure,
+                    s.lead_time_hours, s.time_to_restore_hours
+                FROM snapshot_deployments s
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM deployments d
+                    WHERE d.project_id = :project_id
+                      AND d.gitlab_deployment_id = s.gitlab_deployment_id
+                )
+                """
+            ),
+            params,
+        )
+        # See IncrementalMetricsService.mark_dirty; days are UTC calendar days
+        self.db.execute(
+            text(
+                """
+                INSERT INTO metrics_dirty_buckets (project_id, environment, day)
+                SELECT DISTINCT :project_id, environment, (deployed_at AT TIME ZONE 'UTC')::date
+                FROM snapshot_deployments
+                ON CONFLICT DO NOTHING
+                """
+            ),
+            params,
+        )
+        return project_id
+
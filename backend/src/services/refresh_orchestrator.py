@@ -0,0 +1,244 @@
+import asyncio
+import logging
+from typing import Any
+
+import httpx
+
+from src.config.settings import settings
+from src.database.session import SessionLocal
+from src.models.project import Project
+from src.observability.metrics import REFRESH_DURATION
+from src.services.data_refresh import DataRefreshService
+from src.services.gitlab_client import (
+    GitLabClient,
+    RateLimiter,
+    create_gitlab_client,
+    get_rate_limiter,
+)
+from src.services.project_leases import ProjectLeases
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshOrchestrator:
+    """
+    Refresh many projects concurrently on a single event loop.
+
+    All projects share one GitLab rate budget and one HTTP connection pool, so a
+    single worker can keep the GitLab allowance busy while individual requests
+    wait on network latency. Blocking database work is offloaded to worker
+    threads, with one session per project.
+
+    Each project's GitLab fetch runs under its ``refresh`` lease (see
+    ProjectLeases); a project already being refreshed elsewhere with at least
+    the same history is not fetched again, only its metrics are recomputed.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        project_timeout: float | None = None,
+        rate_limiter: RateLimiter | None = None,
+        http_client: httpx.AsyncClient | None = None,
+    ):
+        """
+        Initialize the orchestrator.
+
+        Args:
+            max_concurrency: Maximum number of projects refreshed at once
+            project_timeout: Seconds after which a single project's refresh is cancelled
+            rate_limiter: Shared GitLab rate limiter (defaults to the process's
+                limiter on the batch budget)
+            http_client: Shared HTTP client (a pooled client limited to
+                settings.gitlab_http_max_connections is opened per refresh
+                when omitted)
+        """
+        self.max_concurrency = max_concurrency or settings.refresh_max_concurrency
+        self.project_timeout = project_timeout or settings.refresh_project_timeout_seconds
+        self.rate_limiter = rate_limiter or get_rate_limiter("batch")
+        self.http_client = http_client
+        self._tasks: dict[int, asyncio.Task] = {}
+
+    async def refresh_projects(
+        self,
+        project_ids: list[int],
+        days_back: int = 90,
+        metrics_days: int | None = 30,
+        initial_days_back: int | None = None,
+    ) -> dict[str, Any]:
+        """
+        Refresh a set of projects concurrently.
+
+        Args:
+            project_ids: IDs of the projects to refresh
+            days_back: Number of days of GitLab history to fetch per project
+            metrics_days: Number of whole days (ending yesterday) of the rolling
+                Four Keys snapshot kept current after each refresh, or None to
+                only rebuild the metric buckets changed by the refresh
+            initial_days_back: Number of days fetched instead for projects that
+                were never synced (defaults to days_back)
+
+        Returns:
+            Summary with per-project results and aggregate counts
+        """
+        logger.info(
+            f"Refreshing {len(project_ids)} projects "
+            f"(concurrency={self.max_concurrency}, timeout={self.project_timeout}s)"
+        )
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        http_client = self.http_client
+        if http_client is None:
+            limits = httpx.Limits(
+                max_connections=settings.gitlab_http_max_connections,
+                max_keepalive_connections=settings.gitlab_http_max_connections,
+            )
+            http_client = httpx.AsyncClient(limits=limits)
+
+        leases = ProjectLeases()
+        try:
+            gitlab_client = create_gitlab_client(
+                rate_limiter=self.rate_limiter, http_client=http_client
+            )
+            for project_id in project_ids:
+                self._tasks[project_id] = asyncio.create_task(
+                    self._run_project(
+                        project_id,
+                        gitlab_client,
+                        leases,
+                        semaphore,
+                        days_back,
+                        metrics_days,
+                        initial_days_back,
+                    ),
+                    name=f"refresh-project-{project_id}",
+                )
+            try:
+                outcomes = await asyncio.gather(*self._tasks.values())
+            finally:
+                for task in self._tasks.values():
+                    task.cancel()
+                self._tasks.clear()
+                await leases.close()
+        finally:
+            if self.http_client is None:
+                await http_client.aclose()
+
+        results = dict(zip(project_ids, outcomes, strict=True))
+        succeeded = [r for r in results.values() if r["status"] == "success"]
+
+        summary = {
+            "projects_processed": len(succeeded),
+            "projects_failed": len(results) - len(succeeded),
+            "total_deployments": sum(r["deployments"] for r in succeeded),
+            "total_dirty_buckets": sum(r["dirty_buckets"] for r in succeeded),
+            "total_clean_buckets": sum(r["clean_buckets"] for r in succeeded),
+            "results": results,
+        }
+        logger.info(
+            f"Multi-project refresh completed: {summary['projects_processed']} succeeded, "
+            f"{summary['projects_failed']} failed, "
+            f"{summary['total_dirty_buckets']} dirty / "
+            f"{summary['total_clean_buckets']} clean metric buckets"
+        )
+        return summary
+
+    def cancel(self, project_id: int) -> bool:
+        """
+        Cancel an in-flight project refresh.
+
+        Returns:
+            True if a running refresh was found and cancelled
+        """
+        task = self._tasks.get(project_id)
+        if task is None or task.done():
+            return False
+        return task.cancel()
+
+    async def _run_project(
+        self,
+        project_id: int,
+        gitlab_client: GitLabClient,
+        leases: ProjectLeases,
+        semaphore: asyncio.Semaphore,
+        days_back: int,
+        metrics_days: int | None,
+        initial_days_back: int | None = None,
+    ) -> dict[str, Any]:
+        """Refresh one project under the concurrency limit and timeout."""
+        loop = asyncio.get_running_loop()
+        started: float | None = None
+        counters = {
+            "deployments": 0,
+            "dirty_buckets": 0,
+            "clean_buckets": 0,
+            "snapshots_recomputed": 0,
+        }
+        error: str | None = None
+        try:
+            async with semaphore:
+                started = loop.time()
+                counters = await asyncio.wait_for(
+                    self._refresh_project(
+                        project_id,
+                        gitlab_client,
+                        leases,
+                        days_back,
+                        metrics_days,
+                        initial_days_back,
+                    ),
+                    timeout=self.project_timeout,
+                )
+            status = "success"
+        except TimeoutError:
+            logger.error(f"Refresh of project {project_id} timed out after {self.project_timeout}s")
+            status, error = "timeout", "timed out"
+        except asyncio.CancelledError:
+            logger.warning(f"Refresh of project {project_id} was cancelled")
+            status, error = "cancelled", "cancelled"
+        except Exception as e:
+            logger.error(f"Error refreshing project {project_id}: {str(e)}", exc_info=True)
+            status, error = "error", str(e)
+
+        duration = loop.time() - started if started is not None else 0.0
+        if started is not None:
+            REFRESH_DURATION.labels(status=status).observe(duration)
+
+        return {
+            "status": status,
+            **counters,
+            "duration_seconds": duration,
+            "error": error,
+        }
+
+    async def _refresh_project(
+        self,
+        project_id: int,
+        gitlab_client: GitLabClient,
+        leases: ProjectLeases,
+        days_back: int,
+        metrics_days: int | None,
+        initial_days_back: int | None = None,
+    ) -> dict[str, Any]:
+        """Fetch and persist a single project's data using its own session."""
+        db = SessionLocal()
+        try:
+            project = await asyncio.to_thread(db.get, Project, project_id)
+            if not project:
+                raise ValueError(f"Project {project_id} not found")
+            if project.last_synced_at is None and initial_days_back:
+                days_back = max(days_back, initial_days_back)
+
+            refresh_service = DataRefreshService(db, gitlab_client, offload_db=True)
+            result = await leases.run(
+                "refresh",
+                project_id,
+                lambda: refresh_service.refresh_project_data(project, days_back=days_back),
+                scope=days_back,
+            )
+
+            counters = await refresh_service.recompute_metrics(project, metrics_days)
+
+            return {"deployments": result["deployments"], **counters}
+        finally:
+            await asyncio.to_thread(db.close)
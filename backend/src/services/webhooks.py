@@ -0,0 +1,78 @@
+import hmac
+import logging
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# X-Gitlab-Event values handled by parse_gitlab_event
+DEPLOYMENT_HOOK = "Deployment Hook"
+MERGE_REQUEST_HOOK = "Merge Request Hook"
+NOTE_HOOK = "Note Hook"
+PIPELINE_HOOK = "Pipeline Hook"
+SUPPORTED_EVENTS = (DEPLOYMENT_HOOK, MERGE_REQUEST_HOOK, NOTE_HOOK, PIPELINE_HOOK)
+
+
+@dataclass
+class WebhookChange:
+    """The rows of a GitLab project affected by a webhook event."""
+
+    gitlab_project_id: int
+    deployment_ids: list[int] = field(default_factory=list)
+    merge_request_iids: list[int] = field(default_factory=list)
+
+    def is_empty(self) -> bool:
+        """Whether the event affects no stored rows."""
+        return not self.deployment_ids and not self.merge_request_iids
+
+
+def is_webhook_authorized(token: str | None) -> bool:
+    """Whether token matches the configured webhook secret (never, when none is set)."""
+    if not settings.gitlab_webhook_secret or not token:
+        return False
+    return hmac.compare_digest(token.encode(), settings.gitlab_webhook_secret.encode())
+
+
+def parse_gitlab_event(event: str, payload: dict[str, Any]) -> WebhookChange | None:
+    """
+    Find the rows affected by a GitLab webhook event.
+
+    Deployment events affect their deployment; merge request events, and
+    notes and pipelines attached to a merge request, affect that merge
+    request. The event payloads are not stored as they are: they lack fields
+    of the REST API (a deployment's creation time, a merge request's
+    author), so the affected rows are fetched again from GitLab.
+
+    Args:
+        event: Value of the X-Gitlab-Event header
+        payload: Event body
+
+    Returns:
+        The affected rows, or None for events of other kinds
+
+    Raises:
+        ValueError: If the payload lacks the fields of its event kind
+    """
+    try:
+        gitlab_project_id = int(payload["project"]["id"])
+        change = WebhookChange(gitlab_project_id)
+
+        if event == DEPLOYMENT_HOOK:
+            change.deployment_ids.append(int(payload["deployment_id"]))
+        elif event == MERGE_REQUEST_HOOK:
+            change.merge_request_iids.append(int(payload["object_attributes"]["iid"]))
+        elif event == NOTE_HOOK:
+            if payload["object_attributes"].get("noteable_type") == "MergeRequest":
+                change.merge_request_iids.append(int(payload["merge_request"]["iid"]))
+        elif event == PIPELINE_HOOK:
+            # Deployments of a pipeline send their own deployment events
+            if payload.get("merge_request"):
+                change.merge_request_iids.append(int(payload["merge_request"]["iid"]))
+        else:
+            return None
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid {event} payload: {str(e)}")
+
+    return change
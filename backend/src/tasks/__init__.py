@@ -1,5 +1,6 @@
 from celery import Celery
 from celery.schedules import crontab
+from kombu import Exchange, Queue
 
 from src.config.settings import settings
 
@@ -8,9 +9,54 @@ celery_app = Celery(
     "workmetrics",
     broker=settings.celery_broker_url,
     backend=settings.celery_result_backend,
-    include=["src.tasks.daily_refresh"],
+    include=[
+        "src.tasks.daily_refresh",
+        "src.tasks.partition_maintenance",
+        "src.tasks.backfill",
+        "src.tasks.webhooks",
+    ],
 )
 
+# Queues, so that a user-triggered task never waits behind the daily batch.
+# Run a worker for the interactive queue on its own (-Q interactive) and one
+# for the others (-Q interactive,batch,backfill); a worker consuming several
+# queues takes from them in this order.
+INTERACTIVE_QUEUE = "interactive"  # on-demand refreshes and webhook changes
+BATCH_QUEUE = "batch"  # the daily refresh and maintenance
+BACKFILL_QUEUE = "backfill"  # historical backfills
+
+# Priorities within a queue; with the Redis broker, 0 is taken first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+
+TASK_ROUTES = {
+    "src.tasks.daily_refresh.refresh_single_project": {
+        "queue": INTERACTIVE_QUEUE,
+        "priority": PRIORITY_HIGH,
+    },
+    "src.tasks.webhooks.apply_webhook_change": {
+        "queue": INTERACTIVE_QUEUE,
+        "priority": PRIORITY_NORMAL,
+    },
+    "src.tasks.daily_refresh.refresh_all_projects": {
+        "queue": BATCH_QUEUE,
+        "priority": PRIORITY_NORMAL,
+    },
+    "src.tasks.partition_maintenance.maintain_partitions": {
+        "queue": BATCH_QUEUE,
+        "priority": PRIORITY_NORMAL,
+    },
+    "src.tasks.daily_refresh.collapse_metric_snapshots": {
+        "queue": BATCH_QUEUE,
+        "priority": PRIORITY_LOW,
+    },
+    "src.tasks.backfill.backfill_project": {
+        "queue": BACKFILL_QUEUE,
+        "priority": PRIORITY_NORMAL,
+    },
+}
+
 # Configure Celery
 celery_app.conf.update(
     task_serializer="json",
@@ -23,6 +69,18 @@ celery_app.conf.update(
     task_soft_time_limit=3000,  # 50 minutes
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
+    task_queues=tuple(
+        Queue(name, Exchange(name), routing_key=name)
+        for name in (INTERACTIVE_QUEUE, BATCH_QUEUE, BACKFILL_QUEUE)
+    ),
+    task_default_queue=BATCH_QUEUE,
+    task_default_priority=PRIORITY_NORMAL,
+    task_routes=TASK_ROUTES,
+    broker_transport_options={
+        "priority_steps": list(range(PRIORITY_LOW + 1)),
+        "sep": ":",
+        "queue_order_strategy": "priority",
+    },
 )
 
 # Configure periodic tasks
@@ -33,6 +91,13 @@ celery_app.conf.beat_schedule = {
             hour=settings.daily_batch_hour, minute=settings.daily_batch_minute
         ),
     },
+    "partition-maintenance": {
+        "task": "src.tasks.partition_maintenance.maintain_partitions",
+        "schedule": crontab(hour=settings.partition_maintenance_hour, minute=0),
+    },
 }
 
+# Worker instrumentation (connects Celery signal handlers)
+from src.tasks import instrumentation as _instrumentation  # noqa: E402,F401
+
 __all__ = ["celery_app"]
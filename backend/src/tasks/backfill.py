@@ -0,0 +1,88 @@
+import asyncio
+import logging
+
+import httpx
+
+from src.config.settings import settings
+from src.database.session import SessionLocal
+from src.models.backfill import BACKFILL_COMPLETED
+from src.services.backfill import BackfillService
+from src.services.gitlab_client import create_gitlab_client, get_rate_limiter
+from src.services.project_leases import ProjectLeases
+from src.tasks import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+async def _run_backfill(project_id: int) -> dict:
+    """
+    Helper to run a backfill with one pooled HTTP client under its backfill lease.
+
+    A task started while another one is processing the project's backfill
+    returns at once without a status, so it does not continue the backfill
+    a second time.
+    """
+    db = SessionLocal()
+    leases = ProjectLeases()
+    # Gives up on a backfill in flight after a single check instead of waiting
+    backfill_leases = ProjectLeases(leases.redis, wait_seconds=settings.refresh_lock_poll_seconds)
+    try:
+        async with httpx.AsyncClient() as http_client:
+            gitlab_client = create_gitlab_client(
+                rate_limiter=get_rate_limiter("backfill"),
+                http_client=http_client,
+            )
+            service = BackfillService(db, gitlab_client=gitlab_client, leases=leases)
+            run = service.get_run(project_id)
+            if run is None:
+                logger.error(f"No backfill started for project {project_id}")
+                return {"error": "No backfill started"}
+
+            async def continue_backfill() -> dict:
+                done = await service.run(
+                    run, time_budget_seconds=settings.backfill_task_budget_seconds
+                )
+                return {
+                    "status": done.status,
+                    "chunks_done": done.chunks_done,
+                    "chunks_total": done.chunks_total,
+                    "rows_written": done.rows_written,
+                }
+
+            try:
+                return await backfill_leases.run(
+                    "backfill", project_id, continue_backfill, attach=False
+                )
+            except TimeoutError:
+                logger.info(f"Backfill of project {project_id} is already being processed")
+                return {"skipped": "Backfill already in progress"}
+    finally:
+        await leases.close()
+        db.close()
+
+
+@celery_app.task(name="src.tasks.backfill.backfill_project")
+def backfill_project(project_id: int) -> dict:
+    """
+    Continue a project's backfill for up to settings.backfill_task_budget_seconds.
+
+    A backfill that is not finished when the budget runs out is continued by a
+    new task, so that a long backfill never hits the task time limit and other
+    tasks get worker time in between.
+
+    Args:
+        project_id: Project whose backfill (see BackfillService.start) to continue
+
+    Returns:
+        Status and progress of the backfill
+    """
+    try:
+        result = asyncio.run(_run_backfill(project_id))
+    except Exception as e:
+        logger.error(f"Error backfilling project {project_id}: {str(e)}", exc_info=True)
+        raise
+
+    if result.get("status") not in (None, BACKFILL_COMPLETED):
+        logger.info(f"Backfill of project {project_id} continues in a new task")
+        backfill_project.delay(project_id)
+    return result
@@ -1,12 +1,13 @@
 import asyncio
 import logging
-from datetime import datetime, timedelta
-
-from sqlalchemy.orm import Session
 
+from src.config.settings import settings
 from src.database.session import SessionLocal
 from src.models.project import Project
 from src.services.data_refresh import DataRefreshService
+from src.services.metrics_calculator import MetricsCalculator
+from src.services.project_leases import ProjectLeases
+from src.services.refresh_orchestrator import RefreshOrchestrator
 from src.tasks import celery_app
 
 logger = logging.getLogger(__name__)
@@ -17,6 +18,14 @@ def refresh_all_projects() -> dict[str, int]:
     """
     Daily task to refresh data for all projects and calculate metrics.
     
+    All projects are refreshed concurrently on a single event loop, sharing one
+    GitLab rate budget and HTTP connection pool. Metrics are recomputed only
+    for the (environment, day) buckets whose deployments changed.
+    
+    While GitLab webhooks are enabled, changes arrive as they happen and the
+    refresh only reconciles the last settings.webhook_reconcile_days days,
+    to catch events that were missed; projects never synced still get 90 days.
+    
     Returns:
         Summary of refresh operations
     """
@@ -24,65 +33,54 @@ def refresh_all_projects() -> dict[str, int]:
     
     db = SessionLocal()
     try:
-        # Get all projects
-        projects = db.query(Project).all()
-        
-        if not projects:
-            logger.info("No projects to refresh")
-            return {"projects_processed": 0, "total_deployments": 0}
-        
-        total_deployments = 0
-        projects_processed = 0
-        
-        for project in projects:
-            try:
-                # Run async refresh
-                result = asyncio.run(_refresh_project_async(project))
-                total_deployments += result["deployments"]
-                projects_processed += 1
-                
-                logger.info(
-                    f"Refreshed project {project.id} ({project.name}): "
-                    f"{result['deployments']} deployments"
-                )
-                
-                # Calculate metrics for last 30 days
-                end_date = datetime.utcnow()
-                start_date = end_date - timedelta(days=30)
-                
-                refresh_service = DataRefreshService(db)
-                asyncio.run(
-                    refresh_service.calculate_and_save_metrics(project, start_date, end_date)
-                )
-                
-            except Exception as e:
-                logger.error(f"Error refreshing project {project.id}: {str(e)}", exc_info=True)
-                continue
-        
-        logger.info(
-            f"Daily refresh completed: {projects_processed} projects, "
-            f"{total_deployments} total deployments"
+        project_ids = [row.id for row in db.query(Project.id).order_by(Project.id).all()]
+    finally:
+        db.close()
+
+    if not project_ids:
+        logger.info("No projects to refresh")
+        return {"projects_processed": 0, "total_deployments": 0}
+
+    try:
+        days_back = settings.webhook_reconcile_days if settings.gitlab_webhook_secret else 90
+        summary = asyncio.run(
+            RefreshOrchestrator().refresh_projects(
+                project_ids, days_back=days_back, metrics_days=30, initial_days_back=90
+            )
         )
-        
-        return {
-            "projects_processed": projects_processed,
-            "total_deployments": total_deployments,
-        }
-        
     except Exception as e:
         logger.error(f"Error in daily refresh task: {str(e)}", exc_info=True)
         raise
-    finally:
-        db.close()
+
+    logger.info(
+        f"Daily refresh completed: {summary['projects_processed']} projects, "
+        f"{summary['total_deployments']} total deployments"
+    )
+
+    return {
+        "projects_processed": summary["projects_processed"],
+        "projects_failed": summary["projects_failed"],
+        "total_deployments": summary["total_deployments"],
+        "dirty_buckets": summary["total_dirty_buckets"],
+        "clean_buckets": summary["total_clean_buckets"],
+    }
 
 
 async def _refresh_project_async(project: Project) -> dict[str, int]:
-    """Helper to run async refresh for a project."""
+    """Helper to run async refresh and metric recomputation under the refresh lease."""
     db = SessionLocal()
+    leases = ProjectLeases()
     try:
         refresh_service = DataRefreshService(db)
-        return await refresh_service.refresh_project_data(project, days_back=90)
+
+        async def refresh_and_recompute() -> dict[str, int]:
+            result = await refresh_service.refresh_project_data(project, days_back=90)
+            counters = await refresh_service.recompute_metrics(project, metrics_days=30)
+            return {**result, **counters}
+
+        return await leases.run("refresh", project.id, refresh_and_recompute, scope=90)
     finally:
+        await leases.close()
         db.close()
 
 
@@ -90,6 +88,10 @@ async def _refresh_project_async(project: Project) -> dict[str, int]:
 def refresh_single_project(project_id: int) -> dict[str, int]:
     """
     Refresh data for a single project (can be called manually or scheduled).
+
+    Metrics of the buckets the refresh changed are recomputed right after it.
+    While the project is being refreshed elsewhere, the task waits for that
+    refresh and returns its result (see ProjectLeases).
     
     Args:
         project_id: Project ID to refresh
@@ -121,3 +123,36 @@ def refresh_single_project(project_id: int) -> dict[str, int]:
         raise
     finally:
         db.close()
+
+
+@celery_app.task(name="src.tasks.daily_refresh.collapse_metric_snapshots")
+def collapse_metric_snapshots() -> dict[str, int]:
+    """
+    One-off task to collapse duplicate Four Keys snapshots left by older releases.
+    
+    Projects are processed one at a time to keep each delete short. Running it
+    before migration 005 shortens the migration, which collapses any remaining
+    duplicates before adding the unique constraint.
+    
+    Returns:
+        Number of projects processed and snapshot rows deleted
+    """
+    logger.info("Collapsing duplicate Four Keys snapshots")
+
+    db = SessionLocal()
+    try:
+        project_ids = [row.id for row in db.query(Project.id).order_by(Project.id).all()]
+        calculator = MetricsCalculator(db)
+        deleted = sum(
+            calculator.collapse_duplicate_snapshots(project_id) for project_id in project_ids
+        )
+
+        logger.info(f"Collapsed {deleted} duplicate snapshots across {len(project_ids)} projects")
+        return {"projects_processed": len(project_ids), "snapshots_deleted": deleted}
+
+    except Exception as e:
+        logger.error(f"Error collapsing Four Keys snapshots: {str(e)}", exc_info=True)
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,212 @@
+"""
+Instrumentation of Celery workers.
+
+Replaces Celery's logging setup with the queued log pipeline (see
+src.observability.logging), records task durations in Prometheus (see
+src.observability.metrics), attributes each task's database queries to it
+(see src.observability.queries), logging the totals and any repeated statements
+when the task finishes, and runs each task in a tracing span that continues
+the trace of whoever enqueued it (see src.observability.tracing). Pool
+processes are warmed up before they take tasks, and the worker signals
+readiness once its pool runs (see src.observability.readiness).
+
+Tasks enqueued with the ``workmetrics_profile`` header, e.g.
+``refresh_project.apply_async(args, headers={"workmetrics_profile": True})``,
+are run under cProfile (see src.observability.profiling); the artifact ID
+is logged when the task finishes.
+"""
+import logging
+import os
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass
+from typing import Any
+
+from celery.signals import (
+    before_task_publish,
+    setup_logging,
+    task_postrun,
+    task_prerun,
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_ready,
+    worker_shutdown,
+)
+from opentelemetry import context, trace
+from opentelemetry.trace import Span, SpanKind, Status, StatusCode
+from prometheus_client import multiprocess
+
+from src.config.settings import settings
+from src.observability.logging import configure_logging, shutdown_logging
+from src.observability.metrics import CELERY_TASK_DURATION, start_metrics_server
+from src.observability.profiling import ProfileSession, end_session, save_session, start_session
+from src.observability.queries import (
+    QuerySource,
+    current_query_source,
+    report_repeated_statements,
+    reset_query_source,
+    set_query_source,
+)
+from src.observability.readiness import remove_ready_file, warm_up, write_ready_file
+from src.observability.tracing import (
+    configure_tracing,
+    extract_context,
+    inject_context,
+    shutdown_tracing,
+    tracer,
+)
+
+logger = logging.getLogger(__name__)
+
+# Message header that asks for a task to be profiled
+PROFILE_HEADER = "workmetrics_profile"
+
+
+@dataclass
+class _TaskRun:
+    """Instrumentation state of a running task."""
+
+    started_at: float
+    query_source: QuerySource
+    query_token: Any
+    span: Span
+    context_token: Any
+    profile: ProfileSession | None = None
+    profile_token: Any = None
+    profile_stack: ExitStack | None = None
+
+
+# Running tasks by task ID
+_running: dict[str, _TaskRun] = {}
+
+
+@setup_logging.connect
+def configure_worker_logging(**kwargs: Any) -> None:
+    """Use the queued log pipeline instead of Celery's handlers."""
+    configure_logging("workmetrics-worker")
+
+
+@worker_process_init.connect
+def start_worker_process(**kwargs: Any) -> None:
+    """Start a log listener thread in a forked pool process and prime its database pool."""
+    configure_logging("workmetrics-worker")
+    try:
+        warm_up()
+    except Exception as e:
+        logger.warning(f"Worker process warm-up failed: {str(e)}")
+
+
+@worker_ready.connect
+def report_worker_ready(**kwargs: Any) -> None:
+    """Signal readiness once the worker consumes tasks and the database can be reached."""
+    write_ready_file()
+
+
+@worker_init.connect
+def start_worker_instrumentation(**kwargs: Any) -> None:
+    """Serve worker metrics over HTTP and install the tracer, from the worker's main process."""
+    if settings.metrics_enabled and settings.celery_metrics_port:
+        start_metrics_server(settings.celery_metrics_port)
+        logger.info(f"Serving worker metrics on port {settings.celery_metrics_port}")
+    # The span processor restarts its export thread in forked pool processes
+    configure_tracing("workmetrics-worker")
+    # Imports only: pool processes inherit the modules, but open their own connections
+    warm_up(connect=False)
+
+
+@worker_process_shutdown.connect
+def stop_worker_process_instrumentation(pid: int | None = None, **kwargs: Any) -> None:
+    """Flush spans and logs and drop the live gauges of a pool process that exits."""
+    shutdown_tracing()
+    shutdown_logging()
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+@worker_shutdown.connect
+def stop_worker_instrumentation(**kwargs: Any) -> None:
+    """Withdraw readiness and flush the spans and logs of the worker's main process."""
+    remove_ready_file()
+    shutdown_tracing()
+    shutdown_logging()
+
+
+@before_task_publish.connect
+def propagate_trace_context(headers: dict[str, Any] | None = None, **kwargs: Any) -> None:
+    """Carry the current trace context to the task in its message headers."""
+    if headers is not None:
+        inject_context(headers)
+
+
+@task_prerun.connect
+def start_task_instrumentation(task_id: str, task: Any, **kwargs: Any) -> None:
+    """Start the task's span and timer and attribute its database queries to it."""
+    span = tracer.start_span(
+        task.name,
+        context=extract_context(vars(task.request)),
+        kind=SpanKind.CONSUMER,
+        attributes={"celery.task_name": task.name, "celery.task_id": task_id},
+    )
+    context_token = context.attach(trace.set_span_in_context(span))
+    query_token = set_query_source(task.name)
+    run = _TaskRun(
+        started_at=time.perf_counter(),
+        query_source=current_query_source(),
+        query_token=query_token,
+        span=span,
+        context_token=context_token,
+    )
+    if vars(task.request).get(PROFILE_HEADER):
+        run.profile, run.profile_token = start_session("task", task.name)
+        run.profile_stack = ExitStack()
+        run.profile_stack.enter_context(run.profile.profile_thread())
+    _running[task_id] = run
+
+
+@task_postrun.connect
+def finish_task_instrumentation(
+    task_id: str, task: Any, state: str | None = None, **kwargs: Any
+) -> None:
+    """Record the task's run time, end its span and report its database queries."""
+    run = _running.pop(task_id, None)
+    if run is None:
+        return
+    if run.profile is not None:
+        _save_task_profile(task, task_id, run)
+    state = state or "UNKNOWN"
+    CELERY_TASK_DURATION.labels(task=task.name, state=state).observe(
+        time.perf_counter() - run.started_at
+    )
+
+    source = run.query_source
+    run.span.set_attribute("celery.state", state)
+    run.span.set_attribute("db.query_count", source.queries)
+    if state == "FAILURE":
+        run.span.set_status(Status(StatusCode.ERROR))
+    run.span.end()
+    try:
+        reset_query_source(run.query_token)
+        context.detach(run.context_token)
+    except ValueError:
+        # postrun ran in a different context from prerun
+        pass
+
+    logger.info(
+        f"Task {task.name} ran {source.queries} queries in {source.seconds:.3f}s of database time"
+    )
+    report_repeated_statements(source)
+
+
+def _save_task_profile(task: Any, task_id: str, run: _TaskRun) -> None:
+    """Stop profiling the task and store the profile."""
+    run.profile_stack.close()
+    try:
+        end_session(run.profile_token)
+    except ValueError:
+        # postrun ran in a different context from prerun
+        pass
+    artifact_id = save_session(run.profile)
+    if artifact_id is not None:
+        run.span.set_attribute("workmetrics.profile_id", artifact_id)
+        logger.info(f"Task {task.name} ({task_id}) profiled as {artifact_id}")
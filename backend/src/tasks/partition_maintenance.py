@@ -0,0 +1,45 @@
+import logging
+from typing import Any
+
+from src.config.settings import settings
+from src.database.partitioning import PartitionManager
+from src.database.session import SessionLocal
+from src.tasks import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="src.tasks.partition_maintenance.maintain_partitions")
+def maintain_partitions() -> dict[str, Any]:
+    """
+    Daily task to maintain monthly partitions of deployments and merge_requests.
+    
+    Moves rows out of the DEFAULT partitions into monthly partitions, creates
+    partitions for upcoming months, and applies the retention policy.
+    
+    Returns:
+        Summary of partitions created and removed
+    """
+    logger.info("Starting partition maintenance")
+
+    db = SessionLocal()
+    try:
+        summary = PartitionManager(db).run_maintenance(
+            premake_months=settings.partition_premake_months,
+            retention_months=settings.partition_retention_months,
+            retention_action=settings.partition_retention_action,
+        )
+        db.commit()
+
+        logger.info(
+            f"Partition maintenance completed: {summary['partitions_created']} created, "
+            f"{len(summary['partitions_removed'])} removed"
+        )
+        return summary
+
+    except Exception as e:
+        logger.error(f"Error in partition maintenance task: {str(e)}", exc_info=True)
+        db.rollback()
+        raise
+    finally:
+        db.close()
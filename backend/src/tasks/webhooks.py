@@ -0,0 +1,79 @@
+import asyncio
+import logging
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from src.database.session import SessionLocal
+from src.models.project import Project
+from src.services.data_refresh import DataRefreshService
+from src.services.project_leases import ProjectLeases
+from src.tasks import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+async def _apply_change_async(
+    project: Project, deployment_ids: list[int], merge_request_iids: list[int], db: Session
+) -> dict[str, Any]:
+    """Helper to run the async item refresh and metric recomputation under the refresh lease."""
+    refresh_service = DataRefreshService(db)
+
+    async def apply_change() -> dict[str, Any]:
+        result = await refresh_service.refresh_items(project, deployment_ids, merge_request_iids)
+        counters = await refresh_service.recompute_metrics(project, metrics_days=30)
+        return {**result, **counters}
+
+    leases = ProjectLeases()
+    try:
+        # A refresh in flight may have fetched the items before the event
+        return await leases.run("refresh", project.id, apply_change, attach=False)
+    finally:
+        await leases.close()
+
+
+@celery_app.task(name="src.tasks.webhooks.apply_webhook_change")
+def apply_webhook_change(
+    project_id: int, deployment_ids: list[int], merge_request_iids: list[int]
+) -> dict[str, Any]:
+    """
+    Upsert the rows affected by a GitLab webhook event and refresh their metrics.
+
+    Only the named deployments and merge requests are fetched from GitLab,
+    under the project's ``refresh`` lease so they are never written
+    concurrently with a refresh (see ProjectLeases).
+    Metric buckets they changed are marked dirty and recomputed, along with
+    the rolling Four Keys snapshot, so dashboards reflect the event without
+    waiting for the daily refresh.
+
+    Args:
+        project_id: Project ID
+        deployment_ids: GitLab deployment IDs
+        merge_request_iids: GitLab merge request IIDs
+
+    Returns:
+        Counts of refreshed rows and recomputed buckets
+    """
+    db = SessionLocal()
+    try:
+        project = db.query(Project).filter(Project.id == project_id).first()
+        if not project:
+            logger.error(f"Project {project_id} not found")
+            return {"error": "Project not found"}
+
+        result = asyncio.run(
+            _apply_change_async(project, deployment_ids, merge_request_iids, db)
+        )
+        logger.info(
+            f"Applied webhook change to project {project_id}: "
+            f"{result['deployments']} deployments, {result['merge_requests']} merge requests"
+        )
+        return result
+
+    except Exception as e:
+        logger.error(
+            f"Error applying webhook change to project {project_id}: {str(e)}", exc_info=True
+        )
+        raise
+    finally:
+        db.close()
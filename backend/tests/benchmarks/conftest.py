@@ -0,0 +1,73 @@
+from collections.abc import Generator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.config.settings import settings
+from tests.benchmarks.harness import BenchmarkRecorder, load_baseline
+from tests.benchmarks.synthetic_data import SyntheticDataConfig, generate_synthetic_data
+from tests.database import isolated_schema_engine
+
+# Benchmarks run in their own schema so they never touch real data
+BENCHMARK_SCHEMA = "workmetrics_benchmark"
+
+DATASET = SyntheticDataConfig()
+
+
+@pytest.fixture(autouse=True)
+def production_serialization(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Benchmark the production response path, without the test-only validation."""
+    monkeypatch.setattr(settings, "validate_trusted_responses", False)
+
+
+@pytest.fixture(scope="session")
+def benchmark_engine() -> Generator[Engine, None, None]:
+    """Engine on a schema seeded with the spec-scale synthetic dataset."""
+    with isolated_schema_engine(BENCHMARK_SCHEMA, history_days=DATASET.days) as engine:
+        with engine.begin() as conn:
+            generate_synthetic_data(conn, DATASET)
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("ANALYZE"))
+        yield engine
+
+
+@pytest.fixture
+def benchmark_db(benchmark_engine: Engine) -> Generator[Session, None, None]:
+    """Session on the benchmark schema; changes are rolled back after each test."""
+    session = sessionmaker(bind=benchmark_engine, autoflush=False)()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def benchmark_project_id(benchmark_engine: Engine) -> int:
+    """The project with the most merge requests (the heaviest realistic query)."""
+    with benchmark_engine.connect() as conn:
+        return conn.execute(
+            text(
+                "SELECT project_id FROM merge_requests "
+                "GROUP BY project_id ORDER BY count(*) DESC LIMIT 1"
+            )
+        ).scalar_one()
+
+
+@pytest.fixture(scope="session")
+def benchmark_baseline(pytestconfig: pytest.Config) -> dict[str, Any]:
+    """Stored results to compare against (empty when no baseline is given)."""
+    path = pytestconfig.getoption("--benchmark-baseline")
+    return load_baseline(Path(path) if path else None)
+
+
+@pytest.fixture(scope="session")
+def benchmark_recorder(pytestconfig: pytest.Config) -> Generator[BenchmarkRecorder, None, None]:
+    """Collects results and writes them to --benchmark-output at the end of the run."""
+    recorder = BenchmarkRecorder(dataset=DATASET.to_dict())
+    yield recorder
+    if recorder.benchmarks:
+        recorder.write(Path(pytestconfig.getoption("--benchmark-output")))
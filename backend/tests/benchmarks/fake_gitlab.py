@@ -0,0 +1,549 @@
+"""
+Local stand-in for the GitLab REST API.
+
+Serves seeded synthetic data for the endpoints GitLabClient talks to
+(deployments, merge requests, MR commits, notes and approvals, issues) with
+GitLab's pagination headers, RateLimit-* headers and 429 responses, ETags
+with 304 Not Modified, and configurable latency and jitter. Every request is
+counted so benchmarks can report API calls and pages per project.
+
+The GraphQL endpoint answers the merge request query of GitLabGraphQLClient
+from the same data. It does not parse queries: it reads the query variables
+and enforces a complexity limit estimated from the page size.
+
+Use it in-process through ``httpx.ASGITransport(app=create_fake_gitlab_app(...))``
+or run it as a server::
+
+    python -m tests.benchmarks.fake_gitlab --port 8081 --projects 5
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from urllib.parse import urlencode
+
+from fastapi import FastAPI, HTTPException, Request, Response
+
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+
+
+@dataclass(frozen=True)
+class FakeGitLabConfig:
+    """Behaviour of the fake server."""
+
+    # Latency added to every response: latency_ms +/- jitter_ms (uniform)
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+
+    # Requests allowed per token and window before answering 429
+    rate_limit: int = 2_000
+    rate_limit_window_seconds: float = 60.0
+
+    # GraphQL queries above this complexity are rejected, as by GitLab
+    graphql_max_complexity: int = 250
+
+    seed: int = 7
+
+
+@dataclass(frozen=True)
+class FakeGitLabDataset:
+    """Shape of the synthetic data served per project."""
+
+    projects: int = 5
+    first_project_id: int = 1_000
+    users_per_project: int = 40
+    deployments_per_project: int = 500
+    merge_requests_per_project: int = 300
+    commits_per_merge_request: int = 3
+    notes_per_merge_request: int = 4
+    issues_per_project: int = 100
+    days: int = 90
+    seed: int = 11
+
+    @property
+    def project_ids(self) -> list[int]:
+        """GitLab ids of the generated projects."""
+        return list(range(self.first_project_id, self.first_project_id + self.projects))
+
+
+@dataclass
+class FakeGitLabStats:
+    """Request counters collected by the fake server."""
+
+    requests: int = 0
+    pages: int = 0
+    rate_limited: int = 0
+    not_modified: int = 0
+    rows: int = 0
+    requests_per_project: Counter = field(default_factory=Counter)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the counters as a JSON-serializable dictionary."""
+        return {
+            "requests": self.requests,
+            "pages": self.pages,
+            "rate_limited": self.rate_limited,
+            "not_modified": self.not_modified,
+            "rows": self.rows,
+            "requests_per_project": dict(self.requests_per_project),
+        }
+
+
+def _iso(value: datetime | None) -> str | None:
+    return value.isoformat().replace("+00:00", "Z") if value else None
+
+
+def generate_gitlab_data(
+    dataset: FakeGitLabDataset, now: datetime | None = None
+) -> dict[int, dict[str, Any]]:
+    """
+    Build the API payloads served for each project.
+
+    Returns:
+        Mapping of GitLab project id to its deployments, merge requests,
+        issues, and per-MR commits, notes and approvals
+    """
+    rng = random.Random(dataset.seed)
+    now = now or datetime.now(timezone.utc)
+    history_seconds = dataset.days * 86_400
+    projects: dict[int, dict[str, Any]] = {}
+    next_id = 1
+
+    for project_id in dataset.project_ids:
+        users = [
+            {
+                "id": project_id * 10_000 + index,
+                "username": f"user{project_id}-{index}",
+                "name": f"User {project_id}-{index}",
+                "avatar_url": None,
+            }
+            for index in range(dataset.users_per_project)
+        ]
+
+        deployments = []
+        for index in range(dataset.deployments_per_project):
+            created = now - timedelta(seconds=rng.uniform(60, history_seconds))
+            status = "failed" if rng.random() < 0.15 else "success"
+            deployments.append(
+                {
+                    "id": next_id,
+                    "iid": index + 1,
+                    "ref": "main",
+                    "sha": hashlib.sha1(f"{project_id}-{index}".encode()).hexdigest(),
+                    "status": status,
+                    "environment": {"id": 1, "name": "production"},
+                    "created_at": _iso(created),
+                    "updated_at": _iso(
+                        min(created + timedelta(minutes=rng.uniform(2, 30)), now)
+                    ),
+                }
+            )
+            next_id += 1
+
+        merge_requests, commits, notes, approvals = [], {}, {}, {}
+        for index in range(dataset.merge_requests_per_project):
+            iid = index + 1
+            created = now - timedelta(seconds=rng.uniform(3_600, history_seconds))
+            finished = min(created + timedelta(hours=rng.lognormvariate(3.0, 1.0)), now)
+            state = rng.choices(["merged", "closed", "opened"], weights=[7, 1, 2])[0]
+            author = rng.choice(users)
+            merge_requests.append(
+                {
+                    "id": next_id,
+                    "iid": iid,
+                    "title": f"Change {iid}",
+                    "state": state,
+                    "author": author,
+                    "created_at": _iso(created),
+                    "updated_at": _iso(finished if state != "opened" else created),
+                    "merged_at": _iso(finished) if state == "merged" else None,
+                    "closed_at": _iso(finished) if state == "closed" else None,
+                    "source_branch": f"feature/{iid}",
+                    "target_branch": "main",
+                }
+            )
+            next_id += 1
+            commits[iid] = [
+                {
+                    "id": hashlib.sha1(f"{project_id}-{iid}-{n}".encode()).hexdigest(),
+                    "title": f"Commit {n} of change {iid}",
+                    "author_name": author["name"],
+                    "created_at": _iso(created - timedelta(hours=rng.uniform(1, 48))),
+                }
+                for n in range(dataset.commits_per_merge_request)
+            ]
+            notes[iid] = [
+                {
+                    "id": project_id * 1_000_000 + iid * 100 + n,
+                    "body": f"Review comment {n}",
+                    "author": rng.choice(users),
+                    "created_at": _iso(created + timedelta(hours=rng.uniform(0.5, 24))),
+                    "system": False,
+                }
+                for n in range(dataset.notes_per_merge_request)
+            ]
+            approvals[iid] = {
+                "approved": state == "merged",
+                "approved_by": [{"user": rng.choice(users)}] if state == "merged" else [],
+            }
+
+        issues = []
+        for index in range(dataset.issues_per_project):
+            created = now - timedelta(seconds=rng.uniform(60, history_seconds))
+            issues.append(
+                {
+                    "id": next_id,
+                    "iid": index + 1,
+                    "title": f"Issue {index + 1}",
+                    "state": rng.choice(["opened", "closed"]),
+                    "created_at": _iso(created),
+                    "updated_at": _iso(min(created + timedelta(hours=rng.uniform(1, 72)), now)),
+                }
+            )
+            next_id += 1
+
+        projects[project_id] = {
+            "deployments": deployments,
+            "merge_requests": merge_requests,
+            "issues": issues,
+            "commits": commits,
+            "notes": notes,
+            "approvals": approvals,
+        }
+
+    return projects
+
+
+def create_fake_gitlab_app(
+    dataset: FakeGitLabDataset | None = None,
+    config: FakeGitLabConfig | None = None,
+    now: datetime | None = None,
+) -> FastAPI:
+    """
+    Create the fake GitLab ASGI app.
+
+    The app's ``state.stats`` holds the FakeGitLabStats of every request
+    served, and ``state.data`` the generated payloads.
+    """
+    dataset = dataset or FakeGitLabDataset()
+    config = config or FakeGitLabConfig()
+    data = generate_gitlab_data(dataset, now)
+    stats = FakeGitLabStats()
+    rng = random.Random(config.seed)
+    windows: dict[str, tuple[float, int]] = {}
+
+    app = FastAPI(title="Fake GitLab API")
+    app.state.data = data
+    app.state.stats = stats
+
+    def project_data(project_id: int) -> dict[str, Any]:
+        if project_id not in data:
+            raise HTTPException(status_code=404, detail="404 Project Not Found")
+        return data[project_id]
+
+    def rate_limit_headers(token: str) -> tuple[dict[str, str], bool]:
+        """Count a request against token's window; return headers and whether it is allowed."""
+        now_ts = time.time()
+        started, used = windows.get(token, (now_ts, 0))
+        if now_ts - started >= config.rate_limit_window_seconds:
+            started, used = now_ts, 0
+        used += 1
+        windows[token] = (started, used)
+
+        reset = started + config.rate_limit_window_seconds
+        headers = {
+            "RateLimit-Limit": str(config.rate_limit),
+            "RateLimit-Observed": str(used),
+            "RateLimit-Remaining": str(max(config.rate_limit - used, 0)),
+            "RateLimit-Reset": str(int(reset)),
+            "RateLimit-ResetTime": datetime.fromtimestamp(reset, timezone.utc).strftime(
+                "%a, %d %b %Y %H:%M:%S GMT"
+            ),
+        }
+        return headers, used <= config.rate_limit
+
+    @app.middleware("http")
+    async def gitlab_behaviour(request: Request, call_next: Any) -> Response:
+        if config.latency_ms or config.jitter_ms:
+            delay = config.latency_ms + rng.uniform(-config.jitter_ms, config.jitter_ms)
+            await asyncio.sleep(max(delay, 0.0) / 1000)
+
+        stats.requests += 1
+        parts = request.url.path.split("/")
+        if len(parts) > 4 and parts[3] == "projects" and parts[4].isdigit():
+            stats.requests_per_project[int(parts[4])] += 1
+
+        token = request.headers.get("PRIVATE-TOKEN", "anonymous")
+        headers, allowed = rate_limit_headers(token)
+        if not allowed:
+            stats.rate_limited += 1
+            retry_after = max(int(headers["RateLimit-Reset"]) - int(time.time()), 1)
+            return Response(
+                content=json.dumps({"message": "429 Too Many Requests"}),
+                status_code=429,
+                media_type="application/json",
+                headers={**headers, "Retry-After": str(retry_after)},
+            )
+
+        response = await call_next(request)
+        response.headers.update(headers)
+        return response
+
+    def paginated(request: Request, items: list[dict[str, Any]]) -> Response:
+        """Serve one page of items with GitLab's pagination headers and an ETag."""
+        params = request.query_params
+        per_page = min(max(int(params.get("per_page", DEFAULT_PER_PAGE)), 1), MAX_PER_PAGE)
+        page = max(int(params.get("page", 1)), 1)
+        total_pages = max((len(items) + per_page - 1) // per_page, 1)
+        page_items = items[(page - 1) * per_page : page * per_page]
+
+        body = json.dumps(page_items, separators=(",", ":"))
+        etag = f'W/"{hashlib.md5(body.encode()).hexdigest()}"'
+        headers = {
+            "ETag": etag,
+            "X-Page": str(page),
+            "X-Per-Page": str(per_page),
+            "X-Total": str(len(items)),
+            "X-Total-Pages": str(total_pages),
+            "X-Next-Page": str(page + 1) if page < total_pages else "",
+            "X-Prev-Page": str(page - 1) if page > 1 else "",
+        }
+        links = []
+        base = str(request.url.remove_query_params("page"))
+        separator = "&" if "?" in base else "?"
+        for rel, target in (
+            ("prev", page - 1 if page > 1 else None),
+            ("next", page + 1 if page < total_pages else None),
+            ("first", 1),
+            ("last", total_pages),
+        ):
+            if target:
+                links.append(f'<{base}{separator}{urlencode({"page": target})}>; rel="{rel}"')
+        headers["Link"] = ", ".join(links)
+
+        stats.pages += 1
+        if request.headers.get("If-None-Match") == etag:
+            stats.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        stats.rows += len(page_items)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def filter_updated(
+        items: list[dict[str, Any]], after: str | None, before: str | None
+    ) -> list[dict[str, Any]]:
+        """Keep items updated between after and before (ISO 8601, either optional)."""
+        if after:
+            after_dt = datetime.fromisoformat(after.replace("Z", "+00:00"))
+            after_dt = after_dt if after_dt.tzinfo else after_dt.replace(tzinfo=timezone.utc)
+            items = [
+                item
+                for item in items
+                if datetime.fromisoformat(item["updated_at"].replace("Z", "+00:00")) >= after_dt
+            ]
+        if before:
+            before_dt = datetime.fromisoformat(before.replace("Z", "+00:00"))
+            before_dt = before_dt if before_dt.tzinfo else before_dt.replace(tzinfo=timezone.utc)
+            items = [
+                item
+                for item in items
+                if datetime.fromisoformat(item["updated_at"].replace("Z", "+00:00")) <= before_dt
+            ]
+        return items
+
+    def updated_between(request: Request, items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Apply GitLab's updated_after / updated_before filters."""
+        return filter_updated(
+            items,
+            request.query_params.get("updated_after"),
+            request.query_params.get("updated_before"),
+        )
+
+    @app.get("/api/v4/projects/{project_id}")
+    def get_project(project_id: int) -> dict[str, Any]:
+        project_data(project_id)
+        return {
+            "id": project_id,
+            "name": f"fake-{project_id}",
+            "web_url": f"https://gitlab.example.com/fake/{project_id}",
+        }
+
+    @app.get("/api/v4/projects/{project_id}/deployments")
+    def list_deployments(project_id: int, request: Request) -> Response:
+        items = updated_between(request, project_data(project_id)["deployments"])
+        return paginated(request, items)
+
+    @app.get("/api/v4/projects/{project_id}/merge_requests")
+    def list_merge_requests(project_id: int, request: Request) -> Response:
+        items = updated_between(request, project_data(project_id)["merge_requests"])
+        if request.query_params.get("sort", "desc") == "desc":
+            items = sorted(items, key=lambda item: item["updated_at"], reverse=True)
+        return paginated(request, items)
+
+    def find(items: list[dict[str, Any]], key: str, value: int) -> dict[str, Any]:
+        for item in items:
+            if item[key] == value:
+                return item
+        raise HTTPException(status_code=404, detail="404 Not found")
+
+    @app.get("/api/v4/projects/{project_id}/deployments/{deployment_id}")
+    def get_deployment(project_id: int, deployment_id: int) -> dict[str, Any]:
+        return find(project_data(project_id)["deployments"], "id", deployment_id)
+
+    @app.get("/api/v4/projects/{project_id}/merge_requests/{iid}")
+    def get_merge_request(project_id: int, iid: int) -> dict[str, Any]:
+        return find(project_data(project_id)["merge_requests"], "iid", iid)
+
+    def graphql_user(user: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "id": f"gid://gitlab/User/{user['id']}",
+            "username": user["username"],
+            "name": user["name"],
+            "avatarUrl": user["avatar_url"],
+            "publicEmail": None,
+        }
+
+    def graphql_merge_request(project: dict[str, Any], mr: dict[str, Any]) -> dict[str, Any]:
+        iid = mr["iid"]
+        commits = project["commits"].get(iid, [])
+        return {
+            "id": f"gid://gitlab/MergeRequest/{mr['id']}",
+            "iid": str(iid),
+            "title": mr["title"],
+            "state": mr["state"],
+            "createdAt": mr["created_at"],
+            "updatedAt": mr["updated_at"],
+            "mergedAt": mr["merged_at"],
+            "closedAt": mr["closed_at"],
+            "sourceBranch": mr["source_branch"],
+            "targetBranch": mr["target_branch"],
+            "author": graphql_user(mr["author"]),
+            "diffStatsSummary": {"additions": iid * 37 % 500, "deletions": iid * 11 % 200},
+            "userNotesCount": len(project["notes"].get(iid, [])),
+            "commitCount": len(commits),
+            "approvedBy": {
+                "nodes": [
+                    graphql_user(approval["user"])
+                    for approval in project["approvals"][iid]["approved_by"]
+                ]
+            },
+            "commits": {
+                "nodes": [{"authoredDate": min(c["created_at"] for c in commits)}]
+                if commits
+                else []
+            },
+        }
+
+    @app.post("/api/graphql")
+    async def graphql(request: Request) -> dict[str, Any]:
+        variables = (await request.json()).get("variables", {})
+        first = int(variables.get("first", 100))
+        # Each node costs its fields plus a share of its approvers connection
+        complexity = 5 + first * (2 + int(variables.get("approvers", 100)) // 10)
+        if complexity > config.graphql_max_complexity:
+            return {
+                "errors": [
+                    {
+                        "message": f"Query has complexity of {complexity}, which exceeds max "
+                        f"complexity of {config.graphql_max_complexity}"
+                    }
+                ]
+            }
+
+        project_ids = [int(gid.rsplit("/", 1)[-1]) for gid in variables.get("ids") or []]
+        nodes = []
+        for project_id in project_ids:
+            if project_id not in data:
+                continue
+            project = data[project_id]
+            items = filter_updated(
+                project["merge_requests"],
+                variables.get("updatedAfter"),
+                variables.get("updatedBefore"),
+            )
+            items = sorted(items, key=lambda item: item["updated_at"], reverse=True)
+            offset = int(variables.get("after") or 0)
+            page_items = items[offset : offset + first]
+            stats.pages += 1
+            stats.rows += len(page_items)
+            nodes.append(
+                {
+                    "mergeRequests": {
+                        "pageInfo": {
+                            "hasNextPage": offset + first < len(items),
+                            "endCursor": str(offset + first),
+                        },
+                        "nodes": [graphql_merge_request(project, mr) for mr in page_items],
+                    }
+                }
+            )
+        return {
+            "data": {
+                "queryComplexity": {
+                    "score": complexity,
+                    "limit": config.graphql_max_complexity,
+                },
+                "projects": {"nodes": nodes},
+            }
+        }
+
+    @app.get("/api/v4/projects/{project_id}/merge_requests/{iid}/commits")
+    def list_commits(project_id: int, iid: int, request: Request) -> Response:
+        return paginated(request, project_data(project_id)["commits"].get(iid, []))
+
+    @app.get("/api/v4/projects/{project_id}/merge_requests/{iid}/notes")
+    def list_notes(project_id: int, iid: int, request: Request) -> Response:
+        return paginated(request, project_data(project_id)["notes"].get(iid, []))
+
+    @app.get("/api/v4/projects/{project_id}/merge_requests/{iid}/approvals")
+    def get_approvals(project_id: int, iid: int) -> dict[str, Any]:
+        approvals = project_data(project_id)["approvals"]
+        if iid not in approvals:
+            raise HTTPException(status_code=404, detail="404 Not found")
+        return approvals[iid]
+
+    @app.get("/api/v4/projects/{project_id}/issues")
+    def list_issues(project_id: int, request: Request) -> Response:
+        items = updated_between(request, project_data(project_id)["issues"])
+        return paginated(request, items)
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the fake GitLab API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--projects", type=int, default=FakeGitLabDataset.projects)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=FakeGitLabConfig.rate_limit)
+    parser.add_argument(
+        "--rate-limit-window", type=float, default=FakeGitLabConfig.rate_limit_window_seconds
+    )
+    args = parser.parse_args()
+
+    app = create_fake_gitlab_app(
+        FakeGitLabDataset(projects=args.projects),
+        FakeGitLabConfig(
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            rate_limit=args.rate_limit,
+            rate_limit_window_seconds=args.rate_limit_window,
+        ),
+    )
+    print(f"Fake GitLab API at http://{args.host}:{args.port}/api/v4")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Timing and baseline comparison for the benchmark suite.
+
+Results are plain JSON so a run can be stored as the baseline for later
+runs: ``pytest --run-benchmarks --benchmark-output=baseline.json`` records
+one, and ``--benchmark-baseline=baseline.json`` compares against it.
+"""
+import json
+import platform
+import statistics
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+RESULTS_FORMAT_VERSION = 1
+
+
+def measure(func: Callable[[], Any], iterations: int, warmup: int = 2) -> dict[str, Any]:
+    """
+    Time repeated calls of func.
+
+    Args:
+        func: Zero-argument callable to time
+        iterations: Number of timed calls
+        warmup: Number of untimed calls made first (to fill caches and pools)
+
+    Returns:
+        Timing statistics in milliseconds (wall clock, plus the mean CPU
+        time of the process)
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    cpu_samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+        cpu_samples.append((time.process_time() - cpu_started) * 1000)
+
+    samples.sort()
+    return {
+        "iterations": iterations,
+        "mean_ms": statistics.fmean(samples),
+        "cpu_mean_ms": statistics.fmean(cpu_samples),
+        "p50_ms": _percentile(samples, 50),
+        "p95_ms": _percentile(samples, 95),
+        "max_ms": samples[-1],
+    }
+
+
+def _percentile(sorted_samples: list[float], percent: float) -> float:
+    """Linearly interpolated percentile of already sorted samples."""
+    if len(sorted_samples) == 1:
+        return sorted_samples[0]
+    position = (len(sorted_samples) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_samples) - 1)
+    return sorted_samples[lower] + (sorted_samples[upper] - sorted_samples[lower]) * (
+        position - lower
+    )
+
+
+def find_regression(
+    name: str, result: dict[str, Any], baseline: dict[str, Any], tolerance: float
+) -> str | None:
+    """
+    Compare one benchmark result with its baseline entry.
+
+    Returns:
+        A description of the regression, or None when p95 is within
+        tolerance of the baseline (or the benchmark has no baseline)
+    """
+    previous = baseline.get("benchmarks", {}).get(name)
+    if previous is None:
+        return None
+
+    limit = previous["p95_ms"] * (1 + tolerance)
+    if result["p95_ms"] > limit:
+        return (
+            f"{name}: p95 {result['p95_ms']:.1f}ms exceeds baseline "
+            f"{previous['p95_ms']:.1f}ms by more than {tolerance:.0%}"
+        )
+    return None
+
+
+class BenchmarkRecorder:
+    """Collect benchmark results for one run and write them as JSON."""
+
+    def __init__(self, dataset: dict[str, Any]):
+        self.dataset = dataset
+        self.benchmarks: dict[str, dict[str, Any]] = {}
+
+    def record(self, name: str, result: dict[str, Any]) -> None:
+        """Store the result of one benchmark."""
+        self.benchmarks[name] = result
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the run as a JSON-serializable dictionary."""
+        return {
+            "format_version": RESULTS_FORMAT_VERSION,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "dataset": self.dataset,
+            "benchmarks": dict(sorted(self.benchmarks.items())),
+        }
+
+    def write(self, path: Path) -> None:
+        """Write the run to path."""
+        path.write_text(json.dumps(self.to_dict(), indent=2) + "\n")
+
+
+def load_baseline(path: Path | None) -> dict[str, Any]:
+    """Load a stored results file, or return an empty baseline when path is None."""
+    if path is None:
+        return {}
+    return json.loads(path.read_text())
@@ -0,0 +1,257 @@
+"""
+Seeded synthetic dataset generator.
+
+Produces projects, team members, merge requests, reviews and deployments
+with realistic shapes: activity is skewed towards a few busy projects and
+people (Zipf-like weights), durations are log-normal, and every random draw
+comes from one seeded generator so a configuration always yields the same
+data.
+"""
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import numpy as np
+from sqlalchemy import Connection, insert, text
+
+from src.models.metrics import Deployment
+from src.models.project import Project
+from src.models.team_member import MergeRequest, Review, TeamMember
+
+# Rows per INSERT batch
+BATCH_SIZE = 5_000
+
+
+@dataclass(frozen=True)
+class SyntheticDataConfig:
+    """Shape of a synthetic dataset. The defaults match the spec scale (SC-004)."""
+
+    seed: int = 20_240_601
+    projects: int = 10
+    members: int = 1_000
+    merge_requests: int = 10_000
+    reviews_per_merge_request: float = 2.0
+    deployments: int = 5_000
+    days: int = 180
+
+    # Zipf exponent for how unevenly activity is spread over projects and
+    # members (0 is uniform, larger values concentrate it)
+    skew: float = 1.1
+
+    # Merge request outcomes; the remainder stays opened
+    merged_ratio: float = 0.7
+    closed_ratio: float = 0.1
+
+    # Log-normal parameters (of the underlying normal, in log-hours)
+    merge_hours_mu: float = 3.0
+    merge_hours_sigma: float = 1.0
+    review_hours_mu: float = 1.5
+    review_hours_sigma: float = 1.0
+    lead_time_hours_mu: float = 3.5
+    lead_time_hours_sigma: float = 0.8
+    restore_hours_mu: float = 1.0
+    restore_hours_sigma: float = 0.9
+
+    change_failure_ratio: float = 0.15
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the configuration as a JSON-serializable dictionary."""
+        return asdict(self)
+
+
+def _zipf_weights(count: int, skew: float, rng: np.random.Generator) -> np.ndarray:
+    """Return shuffled probabilities proportional to 1 / rank ** skew."""
+    weights = 1.0 / np.arange(1, count + 1) ** skew
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+def _insert(conn: Connection, model: Any, rows: list[dict[str, Any]]) -> None:
+    """Insert rows in batches."""
+    for offset in range(0, len(rows), BATCH_SIZE):
+        conn.execute(insert(model), rows[offset : offset + BATCH_SIZE])
+
+
+def generate_synthetic_data(
+    conn: Connection, config: SyntheticDataConfig, now: datetime | None = None
+) -> dict[str, int]:
+    """
+    Insert a synthetic dataset and return the number of rows per table.
+
+    Rows get explicit ids starting at 1, so the target schema must be empty;
+    id sequences are advanced past the generated rows afterwards.
+
+    Args:
+        conn: Connection to the (empty) target schema
+        config: Dataset shape
+        now: End of the generated history (defaults to the current time)
+
+    Returns:
+        Row counts per table
+    """
+    rng = np.random.default_rng(config.seed)
+    now = now or datetime.now(timezone.utc)
+    history_hours = config.days * 24
+
+    project_ids = np.arange(1, config.projects + 1)
+    project_weights = _zipf_weights(config.projects, config.skew, rng)
+    _insert(
+        conn,
+        Project,
+        [
+            {
+                "id": int(project_id),
+                "gitlab_id": 100_000 + int(project_id),
+                "name": f"synthetic-{project_id}",
+                "url": f"https://gitlab.example.com/synthetic/{project_id}",
+            }
+            for project_id in project_ids
+        ],
+    )
+
+    # Members are spread over projects round-robin; each project's members get
+    # their own skewed activity weights
+    member_projects = project_ids[np.arange(config.members) % config.projects]
+    _insert(
+        conn,
+        TeamMember,
+        [
+            {
+                "id": member_id,
+                "project_id": int(member_projects[member_id - 1]),
+                "gitlab_user_id": member_id,
+                "username": f"user{member_id}",
+                "name": f"User {member_id}",
+            }
+            for member_id in range(1, config.members + 1)
+        ],
+    )
+    members_by_project = {
+        int(project_id): np.flatnonzero(member_projects == project_id) + 1
+        for project_id in project_ids
+    }
+    member_weights = {
+        project_id: _zipf_weights(len(members), config.skew, rng)
+        for project_id, members in members_by_project.items()
+    }
+
+    # Merge requests
+    mr_projects = rng.choice(project_ids, size=config.merge_requests, p=project_weights)
+    mr_ages = rng.uniform(1, history_hours, config.merge_requests)
+    mr_states = rng.choice(
+        ["merged", "closed", "opened"],
+        size=config.merge_requests,
+        p=[
+            config.merged_ratio,
+            config.closed_ratio,
+            1 - config.merged_ratio - config.closed_ratio,
+        ],
+    )
+    mr_durations = rng.lognormal(
+        config.merge_hours_mu, config.merge_hours_sigma, config.merge_requests
+    )
+    mr_additions = rng.lognormal(4.0, 1.2, config.merge_requests).astype(int)
+    mr_deletions = rng.lognormal(3.0, 1.2, config.merge_requests).astype(int)
+
+    merge_requests = []
+    mr_authors = []
+    for index in range(config.merge_requests):
+        project_id = int(mr_projects[index])
+        author_id = int(
+            rng.choice(members_by_project[project_id], p=member_weights[project_id])
+        )
+        created = now - timedelta(hours=float(mr_ages[index]))
+        finished = min(created + timedelta(hours=float(mr_durations[index])), now)
+        state = str(mr_states[index])
+        mr_authors.append(author_id)
+        merge_requests.append(
+            {
+                "id": index + 1,
+                "project_id": project_id,
+                "author_id": author_id,
+                "gitlab_mr_id": index + 1,
+                "gitlab_mr_iid": index + 1,
+                "title": f"Synthetic change {index + 1}",
+                "state": state,
+                "created_at_gitlab": created,
+                "merged_at": finished if state == "merged" else None,
+                "closed_at": finished if state == "closed" else None,
+                "source_branch": f"feature/{index + 1}",
+                "target_branch": "main",
+                "additions": int(mr_additions[index]),
+                "deletions": int(mr_deletions[index]),
+            }
+        )
+    _insert(conn, MergeRequest, merge_requests)
+
+    # Reviews: a Poisson number per merge request, by project members other
+    # than the author where the project has any
+    review_counts = rng.poisson(config.reviews_per_merge_request, config.merge_requests)
+    reviews = []
+    for index, review_count in enumerate(review_counts):
+        mr = merge_requests[index]
+        candidates = members_by_project[mr["project_id"]]
+        weights = member_weights[mr["project_id"]]
+        if len(candidates) > 1:
+            keep = candidates != mr_authors[index]
+            candidates, weights = candidates[keep], weights[keep] / weights[keep].sum()
+        delays = rng.lognormal(config.review_hours_mu, config.review_hours_sigma, review_count)
+        for delay in delays:
+            reviewed_at = mr["created_at_gitlab"] + timedelta(hours=float(delay))
+            reviews.append(
+                {
+                    "merge_request_id": mr["id"],
+                    "reviewer_id": int(rng.choice(candidates, p=weights)),
+                    "reviewed_at": min(reviewed_at, now),
+                    "comment_count": int(rng.poisson(2)),
+                    "approval_status": "approved" if rng.random() < 0.6 else "commented",
+                }
+            )
+    _insert(conn, Review, reviews)
+
+    # Deployments
+    deploy_projects = rng.choice(project_ids, size=config.deployments, p=project_weights)
+    deploy_ages = rng.uniform(1, history_hours, config.deployments)
+    deploy_failures = rng.random(config.deployments) < config.change_failure_ratio
+    lead_times = rng.lognormal(
+        config.lead_time_hours_mu, config.lead_time_hours_sigma, config.deployments
+    )
+    restore_times = rng.lognormal(
+        config.restore_hours_mu, config.restore_hours_sigma, config.deployments
+    )
+    deployments = []
+    for index in range(config.deployments):
+        deployed_at = now - timedelta(hours=float(deploy_ages[index]))
+        failed = bool(deploy_failures[index])
+        deployments.append(
+            {
+                "id": index + 1,
+                "project_id": int(deploy_projects[index]),
+                "gitlab_deployment_id": index + 1,
+                "environment": "production",
+                "status": "failed" if failed else "success",
+                "deployed_at": deployed_at,
+                "finished_at": deployed_at + timedelta(minutes=10),
+                "commit_sha": f"{index + 1:040x}",
+                "is_failure": failed,
+                "lead_time_hours": float(lead_times[index]),
+                "time_to_restore_hours": float(restore_times[index]) if failed else None,
+            }
+        )
+    _insert(conn, Deployment, deployments)
+
+    for table in ("projects", "team_members", "merge_requests", "reviews", "deployments"):
+        conn.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"(SELECT coalesce(max(id), 0) + 1 FROM {table}), false)"
+            )
+        )
+
+    return {
+        "projects": config.projects,
+        "team_members": config.members,
+        "merge_requests": len(merge_requests),
+        "reviews": len(reviews),
+        "deployments": len(deployments),
+    }
@@ -0,0 +1,218 @@
+"""
+Ingestion throughput benchmark against the local GitLab stand-in.
+
+Runs the deployment and team activity refresh for several projects through
+the real GitLabClient and DataRefreshService, served by the fake GitLab app
+in-process (no network), once as an initial sync into an empty schema and
+once as a resync over the same data. The fake server enforces a small rate
+limit window so the client's 429 handling is part of the measurement.
+Reports pages/sec, rows/sec, API calls per project and end-to-end time.
+
+A second benchmark compares fetching merge requests with their approvals,
+notes, commits and diff stats through the REST API (a listing plus calls per
+merge request) and through one paged GraphQL query.
+"""
+import time
+from collections.abc import Generator
+from typing import Any
+
+import httpx
+import pytest
+from sqlalchemy import Engine, func, insert, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.models.metrics import Deployment
+from src.models.project import Project
+from src.models.team_member import MergeRequest
+from src.services.data_refresh import DataRefreshService
+from src.services.gitlab_client import GitLabClient, RateLimiter
+from src.services.gitlab_graphql import GitLabGraphQLClient
+from tests.benchmarks.fake_gitlab import (
+    FakeGitLabConfig,
+    FakeGitLabDataset,
+    create_fake_gitlab_app,
+)
+from tests.benchmarks.harness import BenchmarkRecorder, _percentile, find_regression
+from tests.database import isolated_schema_engine
+
+pytestmark = pytest.mark.benchmark
+
+INGESTION_SCHEMA = "workmetrics_ingestion"
+
+GITLAB_DATASET = FakeGitLabDataset()
+
+# Enough to serve most of a sync, but low enough that some requests are
+# answered with 429 and retried
+GITLAB_CONFIG = FakeGitLabConfig(
+    latency_ms=2.0, jitter_ms=1.0, rate_limit=5, rate_limit_window_seconds=1.0
+)
+
+# Latency without a rate limit, so the merge request benchmark measures calls
+MERGE_REQUEST_CONFIG = FakeGitLabConfig(latency_ms=2.0, jitter_ms=1.0, rate_limit=1_000_000)
+
+FAKE_API_URL = "http://fake-gitlab.test/api/v4"
+
+
+@pytest.fixture(scope="module")
+def ingestion_engine() -> Generator[Engine, None, None]:
+    """Engine on an empty schema with one project per fake GitLab project."""
+    with isolated_schema_engine(INGESTION_SCHEMA, history_days=GITLAB_DATASET.days) as engine:
+        with engine.begin() as conn:
+            conn.execute(
+                insert(Project),
+                [
+                    {
+                        "gitlab_id": gitlab_id,
+                        "name": f"fake-{gitlab_id}",
+                        "url": f"https://gitlab.example.com/fake/{gitlab_id}",
+                    }
+                    for gitlab_id in GITLAB_DATASET.project_ids
+                ],
+            )
+        yield engine
+
+
+@pytest.fixture(scope="module")
+def fake_gitlab() -> Any:
+    """The fake GitLab app, shared by the initial sync and the resync."""
+    return create_fake_gitlab_app(GITLAB_DATASET, GITLAB_CONFIG)
+
+
+async def _sync_all(engine: Engine, app: Any) -> dict[str, Any]:
+    """Refresh every project through the fake server and collect throughput figures."""
+    stats = app.state.stats
+    requests_before, pages_before, rows_before = stats.requests, stats.pages, stats.rows
+    rate_limited_before = stats.rate_limited
+
+    durations_ms = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app)) as http_client:
+        client = GitLabClient(
+            api_url=FAKE_API_URL,
+            access_token="benchmark-token",
+            rate_limiter=RateLimiter(1_000_000),
+            http_client=http_client,
+        )
+        started = time.perf_counter()
+        with sessionmaker(bind=engine, autoflush=False)() as db:
+            service = DataRefreshService(db, gitlab_client=client)
+            for project in db.execute(select(Project).order_by(Project.id)).scalars():
+                project_started = time.perf_counter()
+                await service.refresh_project_data(project, days_back=GITLAB_DATASET.days)
+                await service.refresh_team_activity_data(project, days_back=GITLAB_DATASET.days)
+                durations_ms.append((time.perf_counter() - project_started) * 1000)
+        elapsed = time.perf_counter() - started
+
+    durations_ms.sort()
+    pages = stats.pages - pages_before
+    rows = stats.rows - rows_before
+    api_calls = stats.requests - requests_before
+    return {
+        "projects": len(durations_ms),
+        "seconds": elapsed,
+        "api_calls": api_calls,
+        "api_calls_per_project": api_calls / len(durations_ms),
+        "rate_limited": stats.rate_limited - rate_limited_before,
+        "pages": pages,
+        "rows": rows,
+        "pages_per_second": pages / elapsed,
+        "rows_per_second": rows / elapsed,
+        "mean_ms": sum(durations_ms) / len(durations_ms),
+        "p50_ms": _percentile(durations_ms, 50),
+        "p95_ms": _percentile(durations_ms, 95),
+        "max_ms": durations_ms[-1],
+    }
+
+
+@pytest.mark.parametrize("phase", ["initial_sync", "resync"])
+async def test_ingestion_throughput(
+    phase: str,
+    ingestion_engine: Engine,
+    fake_gitlab: Any,
+    benchmark_recorder: BenchmarkRecorder,
+    benchmark_baseline: dict[str, Any],
+    pytestconfig: pytest.Config,
+) -> None:
+    result = await _sync_all(ingestion_engine, fake_gitlab)
+
+    # Every page of every list endpoint was read
+    expected_rows = GITLAB_DATASET.projects * (
+        GITLAB_DATASET.deployments_per_project + GITLAB_DATASET.merge_requests_per_project
+    )
+    assert result["rows"] == expected_rows
+
+    # A resync updates the rows of the initial sync instead of duplicating them
+    with Session(ingestion_engine) as db:
+        assert db.scalar(select(func.count()).select_from(Deployment)) == (
+            GITLAB_DATASET.projects * GITLAB_DATASET.deployments_per_project
+        )
+        assert db.scalar(select(func.count()).select_from(MergeRequest)) == (
+            GITLAB_DATASET.projects * GITLAB_DATASET.merge_requests_per_project
+        )
+
+    name = f"ingestion.{phase}"
+    benchmark_recorder.record(name, result)
+    regression = find_regression(
+        name, result, benchmark_baseline, pytestconfig.getoption("--benchmark-tolerance")
+    )
+    assert regression is None, regression
+
+
+async def _fetch_rest(client: GitLabClient, project_id: int) -> list[dict[str, Any]]:
+    """Merge requests from the REST listing, enriched with one call per detail."""
+    merge_requests = await client.get_project_merge_requests(project_id)
+    for mr in merge_requests:
+        endpoint = f"/projects/{project_id}/merge_requests/{mr['iid']}"
+        mr["commits"] = await client.get_merge_request_commits(project_id, mr["iid"])
+        mr["notes"] = await client.get_all(f"{endpoint}/notes")
+        mr["approvals"] = await client.get(f"{endpoint}/approvals")
+    return merge_requests
+
+
+@pytest.mark.parametrize("backend", ["rest", "graphql"])
+async def test_merge_request_fetch(
+    backend: str,
+    benchmark_recorder: BenchmarkRecorder,
+    benchmark_baseline: dict[str, Any],
+    pytestconfig: pytest.Config,
+) -> None:
+    app = create_fake_gitlab_app(GITLAB_DATASET, MERGE_REQUEST_CONFIG)
+    client_class = GitLabGraphQLClient if backend == "graphql" else GitLabClient
+
+    durations_ms = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app)) as http_client:
+        client = client_class(
+            api_url=FAKE_API_URL,
+            access_token="benchmark-token",
+            rate_limiter=RateLimiter(1_000_000),
+            http_client=http_client,
+        )
+        started = time.perf_counter()
+        for project_id in GITLAB_DATASET.project_ids:
+            project_started = time.perf_counter()
+            if backend == "graphql":
+                merge_requests = await client.get_project_merge_requests(project_id)
+            else:
+                merge_requests = await _fetch_rest(client, project_id)
+            durations_ms.append((time.perf_counter() - project_started) * 1000)
+            assert len(merge_requests) == GITLAB_DATASET.merge_requests_per_project
+        elapsed = time.perf_counter() - started
+
+    durations_ms.sort()
+    api_calls = app.state.stats.requests
+    result = {
+        "projects": len(durations_ms),
+        "seconds": elapsed,
+        "api_calls": api_calls,
+        "api_calls_per_project": api_calls / len(durations_ms),
+        "mean_ms": sum(durations_ms) / len(durations_ms),
+        "p50_ms": _percentile(durations_ms, 50),
+        "p95_ms": _percentile(durations_ms, 95),
+        "max_ms": durations_ms[-1],
+    }
+
+    name = f"ingestion.merge_requests_{backend}"
+    benchmark_recorder.record(name, result)
+    regression = find_regression(
+        name, result, benchmark_baseline, pytestconfig.getoption("--benchmark-tolerance")
+    )
+    assert regression is None, regression
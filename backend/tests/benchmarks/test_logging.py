@@ -0,0 +1,160 @@
+"""
+Per-request overhead of request logging.
+
+The middleware is called directly on the event loop, with a request built
+from an ASGI scope and a handler that returns at once, so the figures are
+the middleware's own cost. Variants: a pass-through middleware (baseline),
+the previous logging middleware (two INFO records per request, formatted
+and written synchronously on the event loop) and the current one through
+the queued pipeline, logging every request and sampling 10% of them. Logs
+go to a file. The overhead of each variant is its mean time per request
+minus that of the baseline. Run with ``pytest --run-benchmarks``.
+"""
+import asyncio
+import logging
+import time
+from collections.abc import Callable, Generator
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastapi import Request, Response
+
+from src.api.middleware.logging import logging_middleware
+from src.config.settings import settings
+from src.observability.logging import TEXT_FORMAT, configure_logging, shutdown_logging
+from tests.benchmarks.harness import BenchmarkRecorder, measure
+
+pytestmark = pytest.mark.benchmark
+
+# Requests per timed call
+BATCH = 1_000
+
+legacy_logger = logging.getLogger("src.api.middleware.logging.legacy")
+
+
+async def legacy_logging_middleware(request: Request, call_next: Callable) -> Response:
+    """The request logging middleware before the queued pipeline."""
+    start_time = time.time()
+    legacy_logger.info(
+        "Request started",
+        extra={
+            "method": request.method,
+            "url": str(request.url),
+            "client_host": request.client.host if request.client else None,
+            "user_agent": request.headers.get("user-agent"),
+        },
+    )
+    response = await call_next(request)
+    process_time = time.time() - start_time
+    legacy_logger.info(
+        "Request completed",
+        extra={
+            "method": request.method,
+            "url": str(request.url),
+            "status_code": response.status_code,
+            "process_time": f"{process_time:.3f}s",
+        },
+    )
+    response.headers["X-Process-Time"] = f"{process_time:.3f}"
+    return response
+
+
+async def passthrough_middleware(request: Request, call_next: Callable) -> Response:
+    """Baseline: the cost of an HTTP middleware without logging."""
+    return await call_next(request)
+
+
+SCOPE = {
+    "type": "http",
+    "method": "GET",
+    "scheme": "http",
+    "server": ("workmetrics.test", 80),
+    "client": ("127.0.0.1", 50_000),
+    "root_path": "",
+    "path": "/api/v1/projects/1/metrics/four-keys",
+    "raw_path": b"/api/v1/projects/1/metrics/four-keys",
+    "query_string": b"start_date=2024-01-01&end_date=2024-03-31",
+    "headers": [(b"host", b"workmetrics.test"), (b"user-agent", b"benchmark")],
+}
+
+
+async def handler(request: Request) -> Response:
+    return Response(b"{}", media_type="application/json")
+
+
+@pytest.fixture
+def log_file(tmp_path: Path) -> Generator[Path, None, None]:
+    """File the root logger writes to; the root logger is restored afterwards."""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield tmp_path / "requests.log"
+    shutdown_logging()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def configure_variant(variant: str, stream: Any, monkeypatch: pytest.MonkeyPatch) -> Callable:
+    """Set up logging as the variant does and return its middleware."""
+    shutdown_logging()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.setLevel(logging.INFO)
+
+    if variant == "none":
+        return passthrough_middleware
+    if variant == "legacy":
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        root.addHandler(handler)
+        return legacy_logging_middleware
+
+    monkeypatch.setattr(settings, "log_format", "json")
+    monkeypatch.setattr(settings, "log_level", "INFO")
+    monkeypatch.setattr(
+        settings, "request_log_sample_rate", 0.1 if variant == "queued_sampled" else 1.0
+    )
+    configure_logging("workmetrics-benchmark", stream=stream)
+    return logging_middleware
+
+
+def test_request_logging_overhead(
+    log_file: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    benchmark_recorder: BenchmarkRecorder,
+    pytestconfig: pytest.Config,
+) -> None:
+    loop = asyncio.new_event_loop()
+    results = {}
+    with log_file.open("w") as stream:
+        for variant in ("none", "legacy", "queued", "queued_sampled"):
+            middleware = configure_variant(variant, stream, monkeypatch)
+
+            async def requests(middleware: Callable = middleware) -> None:
+                for _ in range(BATCH):
+                    await middleware(Request(SCOPE), handler)
+
+            result = measure(
+                lambda requests=requests: loop.run_until_complete(requests()),
+                iterations=pytestconfig.getoption("--benchmark-iterations"),
+            )
+            shutdown_logging()
+            result["per_request_us"] = result["mean_ms"] * 1000 / BATCH
+            results[variant] = result
+    loop.close()
+
+    for variant, result in results.items():
+        result["overhead_us"] = result["per_request_us"] - results["none"]["per_request_us"]
+        benchmark_recorder.record(f"logging.request.{variant}", result)
+
+    assert log_file.stat().st_size > 0
+    assert results["queued"]["overhead_us"] < results["legacy"]["overhead_us"], (
+        "queued request logging is not cheaper than the previous middleware"
+    )
+    assert results["queued_sampled"]["overhead_us"] < results["queued"]["overhead_us"], (
+        "sampling does not reduce the request logging overhead"
+    )
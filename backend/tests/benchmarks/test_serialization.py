@@ -0,0 +1,175 @@
+"""
+Benchmarks for serializing large team-activity and cycle-time payloads.
+
+Each payload is encoded three ways: FastAPI's classic response_model path
+(validation, jsonable_encoder and the standard json module), its current
+path (validation, then Pydantic's JSON serializer) and trusted_response
+(orjson, no revalidation). Wall clock and CPU time are recorded per size.
+Run with ``pytest --run-benchmarks``.
+"""
+import json
+import random
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+import pytest
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from src.api.responses import trusted_response
+from src.api.routes.cycle_time import CycleTimeResponse
+from src.api.routes.team_activity import TeamActivityResponse
+from tests.benchmarks.harness import BenchmarkRecorder, measure
+
+pytestmark = pytest.mark.benchmark
+
+# Team members (team activity) or merge requests (cycle time) per payload
+PAYLOAD_SIZES = (100, 1_000, 10_000)
+
+
+def team_activity_payload(members: int, seed: int = 7) -> dict[str, Any]:
+    """A team-activity response body as the route builds it."""
+    rng = random.Random(seed)
+    team_members = [
+        {
+            "team_member_id": i,
+            "username": f"user-{i}",
+            "name": f"User {i}",
+            "commit_count": rng.randint(0, 500),
+            "lines_added": rng.randint(0, 50_000),
+            "lines_deleted": rng.randint(0, 20_000),
+            "mrs_created": rng.randint(0, 80),
+            "mrs_merged": rng.randint(0, 60),
+            "mrs_closed": rng.randint(0, 10),
+            "reviews_given": rng.randint(0, 120),
+            "review_comments": rng.randint(0, 400),
+            "avg_review_time_hours": rng.uniform(0, 72) if i % 4 else None,
+        }
+        for i in range(1, members + 1)
+    ]
+    review_load = [
+        {
+            "team_member_id": i,
+            "username": f"user-{i}",
+            "name": f"User {i}",
+            "review_count": rng.randint(1, 120),
+            "comment_count": rng.randint(0, 400),
+            "review_load_percentage": round(rng.uniform(0, 5), 2),
+        }
+        for i in range(1, members + 1)
+    ]
+    return {
+        "period_start": "2024-01-01T00:00:00",
+        "period_end": "2024-03-31T23:59:59",
+        "team_members": team_members,
+        "review_load": review_load,
+    }
+
+
+def cycle_time_payload(merge_requests: int, seed: int = 7) -> dict[str, Any]:
+    """A cycle-time response body with a distribution of merge_requests entries."""
+    rng = random.Random(seed)
+    distribution = []
+    for i in range(1, merge_requests + 1):
+        coding, review, deployment = (rng.uniform(0, 96) for _ in range(3))
+        distribution.append(
+            {
+                "mr_id": i,
+                "title": f"Merge request {i}",
+                "merged_at": f"2024-02-{1 + i % 28:02d}T12:00:00",
+                "coding_time": coding,
+                "review_time": review,
+                "deployment_time": deployment,
+                "total_time": coding + review + deployment,
+            }
+        )
+
+    def stats(name: str) -> dict[str, Any]:
+        return {
+            "name": name,
+            "mean": 30.0,
+            "median": 24.0,
+            "p75": 40.0,
+            "p90": 70.0,
+            "min": 0.5,
+            "max": 96.0,
+        }
+
+    return {
+        "period_start": "2024-01-01T00:00:00",
+        "period_end": "2024-03-31T23:59:59",
+        "metrics": {
+            "count": merge_requests,
+            "stages": {stage: stats(stage.title()) for stage in ("coding", "review", "deployment")},
+            "total": stats("Total"),
+            # The analyzer computes these with numpy
+            "stage_breakdown_avg": {
+                "coding_percentage": np.float64(35.0),
+                "review_percentage": np.float64(45.0),
+                "deployment_percentage": np.float64(20.0),
+            },
+        },
+        "distribution": distribution,
+    }
+
+
+PAYLOADS: dict[str, tuple[Callable[[int], dict[str, Any]], type[BaseModel]]] = {
+    "team_activity": (team_activity_payload, TeamActivityResponse),
+    "cycle_time": (cycle_time_payload, CycleTimeResponse),
+}
+
+
+def serialize_stdlib(payload: dict[str, Any], model: type[BaseModel]) -> bytes:
+    """Validate, then encode with jsonable_encoder and json (FastAPI's classic path)."""
+    validated = model.model_validate(payload)
+    return json.dumps(jsonable_encoder(validated), separators=(",", ":")).encode()
+
+
+def serialize_validated(payload: dict[str, Any], model: type[BaseModel]) -> bytes:
+    """Validate, then encode with Pydantic's serializer (FastAPI's response_model path)."""
+    return model.model_validate(payload).model_dump_json().encode()
+
+
+def serialize_trusted(payload: dict[str, Any], model: type[BaseModel]) -> bytes:
+    """Encode with trusted_response, as the team-activity and cycle-time routes do."""
+    return bytes(trusted_response(payload, model).body)
+
+
+SERIALIZERS = {
+    "stdlib": serialize_stdlib,
+    "validated": serialize_validated,
+    "trusted": serialize_trusted,
+}
+
+
+@pytest.mark.parametrize("size", PAYLOAD_SIZES)
+@pytest.mark.parametrize("name", sorted(PAYLOADS))
+def test_serialization_benchmark(
+    name: str,
+    size: int,
+    benchmark_recorder: BenchmarkRecorder,
+    pytestconfig: pytest.Config,
+) -> None:
+    build, model = PAYLOADS[name]
+    payload = build(size)
+
+    # Every path must produce the same document, and the trusted path the same bytes
+    # as the response_model path
+    documents = [json.loads(serialize(payload, model)) for serialize in SERIALIZERS.values()]
+    assert all(document == documents[0] for document in documents[1:])
+    assert serialize_trusted(payload, model) == serialize_validated(payload, model)
+
+    results = {}
+    for serializer_name, serialize in SERIALIZERS.items():
+        result = measure(
+            lambda serialize=serialize: serialize(payload, model),
+            iterations=pytestconfig.getoption("--benchmark-iterations"),
+        )
+        result["bytes"] = len(serialize(payload, model))
+        benchmark_recorder.record(f"serialization.{name}.{size}.{serializer_name}", result)
+        results[serializer_name] = result
+
+    assert results["trusted"]["p50_ms"] < results["validated"]["p50_ms"], (
+        f"trusted serialization of {name} at {size} entries is not faster than validation"
+    )
@@ -0,0 +1,56 @@
+from collections.abc import Generator
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import Engine, create_engine, text
+from sqlalchemy.exc import OperationalError
+
+import src.models.team_member  # noqa: F401  (register team activity tables)
+from src.config.settings import settings
+from src.database.partitioning import PartitionManager
+from src.models import Base
+
+
+@contextmanager
+def isolated_schema_engine(
+    schema: str, history_days: int = 365
+) -> Generator[Engine, None, None]:
+    """
+    Engine bound to a fresh schema in the configured PostgreSQL database.
+
+    The schema is created with all tables and monthly partitions covering
+    history_days of history, and dropped again on exit. Skips the calling
+    test when the database is not PostgreSQL or cannot be reached.
+    """
+    if not settings.database_url.startswith("postgresql"):
+        pytest.skip("Tests require PostgreSQL")
+
+    admin_engine = create_engine(settings.database_url)
+    try:
+        with admin_engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+            conn.execute(text(f"CREATE SCHEMA {schema}"))
+    except OperationalError as e:
+        admin_engine.dispose()
+        pytest.skip(f"PostgreSQL is not reachable: {e}")
+
+    engine = create_engine(
+        settings.database_url,
+        connect_args={"options": f"-csearch_path={schema}"},
+    )
+    try:
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            today = date.today()
+            PartitionManager(conn).ensure_partitions(
+                today - timedelta(days=history_days + 31), today + timedelta(days=31)
+            )
+
+        yield engine
+
+    finally:
+        engine.dispose()
+        with admin_engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        admin_engine.dispose()
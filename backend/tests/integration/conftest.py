@@ -0,0 +1,141 @@
+from collections.abc import Generator
+
+import pytest
+from sqlalchemy import Engine, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from tests.database import isolated_schema_engine
+
+# Integration tests run in their own schema so they never touch real data
+TEST_SCHEMA = "workmetrics_integration"
+
+# Seed volume for query-plan tests: large enough that the planner prefers an
+# index over a sequential scan when one exists
+SEED_PROJECTS = 100
+SEED_MEMBERS_PER_PROJECT = 30
+SEED_MERGE_REQUESTS = 100_000
+SEED_DEPLOYMENTS = 100_000
+SEED_DAYS = 365
+
+
+@pytest.fixture(scope="session")
+def pg_engine() -> Generator[Engine, None, None]:
+    """Engine bound to an isolated schema in the configured PostgreSQL database."""
+    with isolated_schema_engine(TEST_SCHEMA, history_days=SEED_DAYS) as engine:
+        yield engine
+
+
+@pytest.fixture(scope="session")
+def seeded_engine(pg_engine: Engine) -> Engine:
+    """Engine whose schema is seeded at scale with statistics up to date."""
+    params = {
+        "projects": SEED_PROJECTS,
+        "members": SEED_MEMBERS_PER_PROJECT,
+        "merge_requests": SEED_MERGE_REQUESTS,
+        "deployments": SEED_DEPLOYMENTS,
+        "days": SEED_DAYS,
+    }
+    with pg_engine.begin() as conn:
+        conn.execute(
+            text(
+                """
+                INSERT INTO projects (id, gitlab_id, name, url)
+                SELECT p, 1000 + p, 'project-' || p, 'https://gitlab.example.com/p/' || p
+                FROM generate_series(1, :projects) p
+                """
+            ),
+            params,
+        )
+        conn.execute(
+            text(
+                """
+                INSERT INTO team_members (project_id, gitlab_user_id, username, name)
+                SELECT p, m, 'user-' || p || '-' || m, 'User ' || p || '-' || m
+                FROM generate_series(1, :projects) p, generate_series(1, :members) m
+                ORDER BY p, m
+                """
+            ),
+            params,
+        )
+        conn.execute(
+            text(
+                """
+                INSERT INTO merge_requests (
+                    project_id, author_id, gitlab_mr_id, gitlab_mr_iid, title, state,
+                    created_at_gitlab, merged_at, closed_at, source_branch, target_branch,
+                    additions, deletions
+                )
+                SELECT
+                    project_id,
+                    (project_id - 1) * :members + 1 + (i / :projects) % :members,
+                    i, i, 'MR ' || i,
+                    CASE i % 5 WHEN 0 THEN 'opened' WHEN 1 THEN 'closed' ELSE 'merged' END,
+                    created,
+                    CASE WHEN i % 5 > 1 THEN created + (i % 72) * interval '1 hour' END,
+                    CASE WHEN i % 5 = 1 THEN created + (i % 48) * interval '1 hour' END,
+                    'feature-' || i, 'main', i % 400, i % 150
+                FROM (
+                    SELECT
+                        i,
+                        1 + i % :projects AS project_id,
+                        now() - (i % :days) * interval '1 day' - (i % 24) * interval '1 hour'
+                            AS created
+                    FROM generate_series(1, :merge_requests) i
+                ) mr
+                """
+            ),
+            params,
+        )
+        conn.execute(
+            text(
+                """
+                INSERT INTO reviews (merge_request_id, reviewer_id, reviewed_at, comment_count,
+                                     approval_status)
+                SELECT
+                    mr.id,
+                    (mr.project_id - 1) * :members + 1 + (mr.id + 7) % :members,
+                    mr.created_at_gitlab + (mr.id % 36) * interval '1 hour',
+                    mr.id % 6,
+                    CASE WHEN mr.id % 3 = 0 THEN 'approved' ELSE 'commented' END
+                FROM merge_requests mr
+                """
+            ),
+            params,
+        )
+        conn.execute(
+            text(
+                """
+                INSERT INTO deployments (
+                    project_id, gitlab_deployment_id, environment, status, deployed_at,
+                    finished_at, commit_sha, is_failure, lead_time_hours, time_to_restore_hours
+                )
+                SELECT
+                    1 + i % :projects, i, 'production',
+                    CASE WHEN i % 10 = 0 THEN 'failed' ELSE 'success' END,
+                    now() - (i % :days) * interval '1 day' - (i % 24) * interval '1 hour',
+                    now() - (i % :days) * interval '1 day',
+                    md5(i::text)::varchar(40),
+                    i % 10 = 0,
+                    (i % 96)::float,
+                    CASE WHEN i % 10 = 0 THEN (i % 12)::float END
+                FROM generate_series(1, :deployments) i
+                """
+            ),
+            params,
+        )
+
+    with pg_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
+
+    return pg_engine
+
+
+@pytest.fixture
+def seeded_db(seeded_engine: Engine) -> Generator[Session, None, None]:
+    """Session on the seeded schema; changes are rolled back after each test."""
+    session = sessionmaker(bind=seeded_engine, autoflush=False)()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
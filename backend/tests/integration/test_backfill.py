@@ -0,0 +1,211 @@
+"""
+Resumable historical backfill.
+
+A project's history is backfilled from the fake GitLab app in windows; the
+backfill is interrupted by a failing window and by its time budget, and
+resuming it must end with exactly the project's full history stored.
+"""
+import asyncio
+from collections.abc import AsyncGenerator, Generator
+from typing import Any
+
+import httpx
+import pytest
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.config.settings import settings
+from src.models.backfill import (
+    BACKFILL_COMPLETED,
+    BACKFILL_FAILED,
+    BACKFILL_PENDING,
+    BACKFILL_RUNNING,
+)
+from src.models.metrics import Deployment, DeploymentDailyRollup, MetricsDirtyBucket
+from src.models.project import Project
+from src.models.team_member import MergeRequest
+from src.services.backfill import BackfillService
+from src.services.data_refresh import DataRefreshService
+from src.services.gitlab_client import GitLabClient, RateLimiter
+from src.services.project_leases import ProjectLeases
+from src.tasks import backfill as backfill_tasks
+from tests.benchmarks.fake_gitlab import FakeGitLabDataset, create_fake_gitlab_app
+from tests.database import isolated_schema_engine
+
+BACKFILL_SCHEMA = "workmetrics_backfill"
+
+GITLAB_DATASET = FakeGitLabDataset(
+    projects=1,
+    users_per_project=10,
+    deployments_per_project=120,
+    merge_requests_per_project=60,
+    notes_per_merge_request=2,
+    issues_per_project=0,
+    days=120,
+)
+
+FAKE_API_URL = "http://fake-gitlab.test/api/v4"
+
+
+@pytest.fixture
+def backfill_db() -> Generator[Session, None, None]:
+    """Session on an empty schema with the fake GitLab project."""
+    with isolated_schema_engine(BACKFILL_SCHEMA, history_days=GITLAB_DATASET.days) as engine:
+        with engine.begin() as conn:
+            conn.execute(
+                insert(Project),
+                {
+                    "gitlab_id": GITLAB_DATASET.first_project_id,
+                    "name": "fake",
+                    "url": "https://gitlab.example.com/fake",
+                },
+            )
+        with sessionmaker(bind=engine, autoflush=False)() as db:
+            yield db
+
+
+@pytest.fixture
+async def gitlab_client() -> AsyncGenerator[GitLabClient, None]:
+    app = create_fake_gitlab_app(GITLAB_DATASET)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app)) as http_client:
+        yield GitLabClient(
+            api_url=FAKE_API_URL,
+            access_token="backfill-token",
+            rate_limiter=RateLimiter(1_000_000),
+            http_client=http_client,
+        )
+
+
+def _count(db: Session, model: Any) -> int:
+    return db.execute(select(func.count()).select_from(model)).scalar_one()
+
+
+async def test_backfill_resumes_to_full_history(
+    backfill_db: Session, gitlab_client: GitLabClient
+) -> None:
+    service = BackfillService(backfill_db, gitlab_client=gitlab_client)
+    project = backfill_db.execute(select(Project)).scalar_one()
+    run = service.start(project, days=GITLAB_DATASET.days + 1, chunk_days=30)
+    assert run.chunks_total == 5
+
+    # A window that fails leaves the run at its last checkpoint
+    failing_transport = httpx.MockTransport(lambda request: httpx.Response(500))
+    async with httpx.AsyncClient(transport=failing_transport) as failing_http_client:
+        failing = BackfillService(
+            backfill_db,
+            gitlab_client=GitLabClient(
+                api_url=FAKE_API_URL,
+                access_token="backfill-token",
+                rate_limiter=RateLimiter(1_000_000),
+                http_client=failing_http_client,
+            ),
+        )
+        with pytest.raises(httpx.HTTPError):
+            await failing.run(run)
+    assert run.status == BACKFILL_FAILED and run.last_error
+    assert run.chunks_done == 0 and run.cursor == run.newest
+
+    # Starting again resumes the failed run and completes it
+    run = await service.run(service.start(project, days=GITLAB_DATASET.days + 1))
+    assert run.status == BACKFILL_COMPLETED
+    assert run.chunks_done == run.chunks_total
+    assert run.last_error is None
+    assert run.eta_seconds == 0.0
+
+    assert _count(backfill_db, Deployment) == GITLAB_DATASET.deployments_per_project
+    assert _count(backfill_db, MergeRequest) == GITLAB_DATASET.merge_requests_per_project
+    assert project.last_synced_at is None
+    # Every window's metrics were recomputed as it was written
+    assert _count(backfill_db, MetricsDirtyBucket) == 0
+    assert backfill_db.execute(
+        select(func.sum(DeploymentDailyRollup.deployment_count))
+    ).scalar_one() == GITLAB_DATASET.deployments_per_project
+
+
+async def test_backfill_pauses_after_time_budget(
+    backfill_db: Session, gitlab_client: GitLabClient
+) -> None:
+    service = BackfillService(backfill_db, gitlab_client=gitlab_client)
+    project = backfill_db.execute(select(Project)).scalar_one()
+    run = service.start(project, days=GITLAB_DATASET.days + 1, chunk_days=30)
+
+    # A zero budget processes one window per run
+    run = await service.run(run, time_budget_seconds=0)
+    assert run.status == BACKFILL_RUNNING
+    assert run.chunks_done == 1
+    assert run.eta_seconds is not None
+
+    # Starting again resumes instead of starting over
+    assert service.start(project, days=GITLAB_DATASET.days + 1).chunks_done == 1
+    while run.status != BACKFILL_COMPLETED:
+        run = await service.run(run, time_budget_seconds=0)
+    assert run.chunks_done == run.chunks_total
+    assert _count(backfill_db, MergeRequest) == GITLAB_DATASET.merge_requests_per_project
+
+
+async def test_restart_during_a_window_keeps_the_restarted_run(
+    backfill_db: Session, gitlab_client: GitLabClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    service = BackfillService(backfill_db, gitlab_client=gitlab_client)
+    project = backfill_db.execute(select(Project)).scalar_one()
+    run = service.start(project, days=GITLAB_DATASET.days + 1, chunk_days=30)
+    refresh_team_activity_data = DataRefreshService.refresh_team_activity_data
+
+    async def restart_then_refresh(self: DataRefreshService, *args: Any, **kwargs: Any) -> Any:
+        # Another request restarts the run while this window is processed
+        with sessionmaker(bind=backfill_db.get_bind())() as db:
+            other = BackfillService(db, gitlab_client=gitlab_client)
+            other.start(db.get(Project, project.id), days=60, chunk_days=20, restart=True)
+        monkeypatch.setattr(
+            DataRefreshService, "refresh_team_activity_data", refresh_team_activity_data
+        )
+        return await refresh_team_activity_data(self, *args, **kwargs)
+
+    monkeypatch.setattr(DataRefreshService, "refresh_team_activity_data", restart_then_refresh)
+    run = await service.run(run)
+
+    # The stale window did not move the restarted run's checkpoint
+    assert run.status == BACKFILL_PENDING
+    assert run.chunks_total == 3 and run.chunks_done == 0
+    assert run.cursor == run.newest
+
+    run = await service.run(run)
+    assert run.status == BACKFILL_COMPLETED
+    assert run.chunks_done == 3
+
+
+async def test_backfill_task_skips_backfill_in_flight(
+    backfill_db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    redis = Redis.from_url(settings.redis_url, decode_responses=True)
+    try:
+        await redis.ping()
+    except RedisError as e:
+        await redis.aclose()
+        pytest.skip(f"Redis is not reachable: {e}")
+
+    project = backfill_db.execute(select(Project)).scalar_one()
+    BackfillService(backfill_db).start(project, days=GITLAB_DATASET.days + 1)
+    monkeypatch.setattr(
+        backfill_tasks, "SessionLocal", sessionmaker(bind=backfill_db.get_bind())
+    )
+
+    async def backfill_in_flight() -> dict:
+        await asyncio.sleep(2.0)
+        return {}
+
+    try:
+        in_flight = asyncio.create_task(
+            ProjectLeases(redis).run("backfill", project.id, backfill_in_flight)
+        )
+        await asyncio.sleep(0.1)
+
+        # The duplicate task neither fetches nor continues the backfill
+        assert await backfill_tasks._run_backfill(project.id) == {
+            "skipped": "Backfill already in progress"
+        }
+        await in_flight
+    finally:
+        await redis.aclose()
@@ -0,0 +1,139 @@
+"""
+COPY-based bulk loading of GitLab batches.
+
+The same GitLab payloads are saved for one project row by row and for another
+with the bulk loader; both must end up with the same rows, and reloading a
+changed batch must update rows in place and mark the changed buckets dirty.
+"""
+import copy
+from collections.abc import Generator
+from typing import Any
+
+import pytest
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.models.project import Project
+from src.services.bulk_loader import BulkLoader
+from src.services.data_refresh import DataRefreshService
+from src.services.incremental_metrics import deployment_day
+from tests.benchmarks.fake_gitlab import FakeGitLabDataset, generate_gitlab_data
+from tests.database import isolated_schema_engine
+
+BULK_SCHEMA = "workmetrics_bulk_loader"
+
+GITLAB_DATASET = FakeGitLabDataset(
+    projects=1,
+    users_per_project=15,
+    deployments_per_project=300,
+    merge_requests_per_project=150,
+    days=60,
+)
+
+HISTORY_QUERIES = {
+    "deployments": """
+        SELECT gitlab_deployment_id, environment, status, deployed_at, finished_at,
+               commit_sha, is_failure
+        FROM deployments WHERE project_id = :project_id ORDER BY 1
+    """,
+    "merge_requests": """
+        SELECT mr.gitlab_mr_id, mr.gitlab_mr_iid, tm.gitlab_user_id, mr.title, mr.state,
+               mr.created_at_gitlab, mr.merged_at, mr.closed_at, mr.source_branch,
+               mr.target_branch, mr.additions, mr.deletions
+        FROM merge_requests mr JOIN team_members tm ON tm.id = mr.author_id
+        WHERE mr.project_id = :project_id ORDER BY 1
+    """,
+    "team_members": """
+        SELECT gitlab_user_id, username, name, email, avatar_url
+        FROM team_members WHERE project_id = :project_id ORDER BY 1
+    """,
+    "dirty_buckets": """
+        SELECT environment, day FROM metrics_dirty_buckets
+        WHERE project_id = :project_id ORDER BY 1, 2
+    """,
+}
+
+
+@pytest.fixture(scope="module")
+def bulk_db() -> Generator[Session, None, None]:
+    """Session on an empty schema with one project per loading strategy."""
+    with isolated_schema_engine(BULK_SCHEMA, history_days=GITLAB_DATASET.days) as engine:
+        with engine.begin() as conn:
+            conn.execute(
+                insert(Project),
+                [
+                    {"gitlab_id": gitlab_id, "name": name, "url": f"https://example.com/{name}"}
+                    for gitlab_id, name in [(1, "row-by-row"), (2, "bulk")]
+                ],
+            )
+        with sessionmaker(bind=engine, autoflush=False)() as db:
+            yield db
+
+
+@pytest.fixture(scope="module")
+def gitlab_data() -> dict[str, Any]:
+    return generate_gitlab_data(GITLAB_DATASET)[GITLAB_DATASET.first_project_id]
+
+
+def _history(db: Session, project_id: int) -> dict[str, list[tuple]]:
+    return {
+        name: [tuple(row) for row in db.execute(text(query), {"project_id": project_id})]
+        for name, query in HISTORY_QUERIES.items()
+    }
+
+
+async def test_bulk_load_matches_row_by_row(bulk_db: Session, gitlab_data: dict) -> None:
+    row_project, bulk_project = bulk_db.execute(select(Project).order_by(Project.id)).scalars()
+    refresh_service = DataRefreshService(bulk_db)
+    loader = BulkLoader(bulk_db)
+
+    refresh_service._process_deployments(row_project, gitlab_data["deployments"])
+    await refresh_service._process_merge_requests(row_project, gitlab_data["merge_requests"])
+    bulk_db.commit()
+
+    # Pages can overlap, so a batch may repeat a row
+    assert loader.load_deployments(
+        bulk_project, gitlab_data["deployments"] + gitlab_data["deployments"][:5]
+    ) == len(gitlab_data["deployments"]) + 5
+    counts = loader.load_merge_requests(
+        bulk_project, gitlab_data["merge_requests"] + gitlab_data["merge_requests"][:5]
+    )
+    bulk_db.commit()
+    assert counts["team_members"] == len(
+        {mr["author"]["id"] for mr in gitlab_data["merge_requests"]}
+    )
+
+    expected = _history(bulk_db, row_project.id)
+    assert all(expected.values())
+    assert _history(bulk_db, bulk_project.id) == expected
+
+
+async def test_bulk_reload_updates_in_place(bulk_db: Session, gitlab_data: dict) -> None:
+    bulk_project = bulk_db.execute(select(Project).where(Project.gitlab_id == 2)).scalar_one()
+    loader = BulkLoader(bulk_db)
+    loader.load_deployments(bulk_project, gitlab_data["deployments"])
+    loader.load_merge_requests(bulk_project, gitlab_data["merge_requests"])
+    bulk_db.execute(text("DELETE FROM metrics_dirty_buckets"))
+    bulk_db.commit()
+    before = _history(bulk_db, bulk_project.id)
+
+    deployments = copy.deepcopy(gitlab_data["deployments"])
+    changed = next(d for d in deployments if d["status"] == "success")
+    changed["status"] = "failed"
+    merge_requests = copy.deepcopy(gitlab_data["merge_requests"])
+    merge_requests[0]["state"] = "closed"
+
+    loader.load_deployments(bulk_project, deployments)
+    loader.load_merge_requests(bulk_project, merge_requests)
+    bulk_db.commit()
+    after = _history(bulk_db, bulk_project.id)
+
+    assert len(after["deployments"]) == len(before["deployments"])
+    assert len(after["merge_requests"]) == len(before["merge_requests"])
+    assert after["team_members"] == before["team_members"]
+    row = next(r for r in after["deployments"] if r[0] == changed["id"])
+    assert row[2] == "failed" and row[6] is True
+    assert after["dirty_buckets"] == [(row[1], deployment_day(row[3]))]
+    assert next(r for r in after["merge_requests"] if r[0] == merge_requests[0]["id"])[4] == (
+        "closed"
+    )
@@ -0,0 +1,159 @@
+"""
+Multi-project Four Keys metrics from one grouped query.
+
+The batch endpoint is read from the seeded schema and checked against the
+per-project calculation, which loads the deployments themselves.
+"""
+from collections.abc import Generator
+from datetime import date, datetime, timedelta
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from src.api.main import app
+from src.database.session import get_read_db
+from src.models.metrics import Deployment
+from src.models.project import Project
+from src.services.metrics_calculator import MetricsCalculator
+
+END = date.today()
+START = END - timedelta(days=90)
+DATE_RANGE = {"start_date": START.isoformat(), "end_date": END.isoformat()}
+# As the route parses DATE_RANGE
+PERIOD = (
+    datetime.combine(START, datetime.min.time()),
+    datetime.combine(END, datetime.min.time()).replace(hour=23, minute=59, second=59),
+)
+
+# Includes projects 1 and 11, whose deployments have failures and restore times
+PROJECT_IDS = [1, 2, 11, 12, 40]
+
+
+@pytest.fixture
+def client(seeded_db: Session) -> Generator[TestClient, None, None]:
+    """Client whose requests read through seeded_db (rolled back after the test)."""
+
+    def override_get_read_db() -> Generator[Session, None, None]:
+        yield seeded_db
+
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(get_read_db, None)
+
+
+def get_batch(client: TestClient, project_ids: list[int], **params: Any) -> dict[str, Any]:
+    response = client.get(
+        "/api/v1/four-keys",
+        params={**DATE_RANGE, "project_ids": ",".join(map(str, project_ids)), **params},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def reference_metrics(db: Session, project_ids: list[int]) -> dict[str, Any]:
+    """Metrics over the deployments of project_ids, as calculate_four_keys computes them."""
+    calculator = MetricsCalculator(db)
+    deployments = (
+        db.execute(
+            select(Deployment)
+            .where(Deployment.project_id.in_(project_ids))
+            .where(Deployment.deployed_at >= PERIOD[0])
+            .where(Deployment.deployed_at <= PERIOD[1])
+        )
+        .scalars()
+        .all()
+    )
+    frequency = calculator._calculate_deployment_frequency(deployments, *PERIOD)
+    lead_time = calculator._calculate_lead_time(deployments)
+    failures = calculator._calculate_change_failure_rate(deployments)
+    restore = calculator._calculate_time_to_restore(deployments)
+    return {
+        "deployment_frequency": frequency["frequency"],
+        "deployment_count": frequency["count"],
+        "lead_time_hours": lead_time["mean"],
+        "lead_time_median_hours": lead_time["median"],
+        "change_failure_rate": failures["rate"],
+        "failed_deployment_count": failures["failed_count"],
+        "time_to_restore_hours": restore["mean"],
+        "time_to_restore_median_hours": restore["median"],
+    }
+
+
+def assert_same_metrics(actual: dict[str, Any], expected: dict[str, Any]) -> None:
+    for key, value in expected.items():
+        if key in ("period_start", "period_end"):
+            continue
+        if isinstance(value, float):
+            assert actual[key] == pytest.approx(value), key
+        else:
+            assert actual[key] == value, key
+
+
+def test_each_project_matches_its_own_calculation(
+    client: TestClient, seeded_db: Session
+) -> None:
+    body = get_batch(client, PROJECT_IDS)
+
+    assert [project["project_id"] for project in body["projects"]] == PROJECT_IDS
+    assert body["aggregate"] is None
+    calculator = MetricsCalculator(seeded_db)
+    for project in body["projects"]:
+        expected = calculator.calculate_four_keys(project["project_id"], *PERIOD)
+        assert expected["deployment_count"] > 0
+        assert_same_metrics(project, expected)
+    assert any(project["time_to_restore_hours"] is not None for project in body["projects"])
+
+
+def test_aggregate_covers_all_requested_projects(
+    client: TestClient, seeded_db: Session
+) -> None:
+    # The aggregate spans every requested project, not just the page
+    body = get_batch(client, PROJECT_IDS, include_aggregate=True, limit=2)
+
+    assert len(body["projects"]) == 2
+    assert_same_metrics(body["aggregate"], reference_metrics(seeded_db, PROJECT_IDS))
+    assert body["aggregate"]["deployment_count"] == sum(
+        MetricsCalculator(seeded_db).calculate_four_keys(pid, *PERIOD)["deployment_count"]
+        for pid in PROJECT_IDS
+    )
+
+
+def test_pages_follow_sorted_project_ids(client: TestClient) -> None:
+    project_ids = [40, 12, 2, 11, 1, 2]
+
+    pages = [
+        get_batch(client, project_ids, limit=2, offset=offset) for offset in (0, 2, 4, 6)
+    ]
+
+    assert [page["total"] for page in pages] == [5, 5, 5, 5]
+    assert [(page["limit"], page["offset"]) for page in pages] == [(2, 0), (2, 2), (2, 4), (2, 6)]
+    assert [[project["project_id"] for project in page["projects"]] for page in pages] == [
+        [1, 2],
+        [11, 12],
+        [40],
+        [],
+    ]
+
+
+def test_projects_without_deployments_get_empty_metrics(
+    client: TestClient, seeded_db: Session
+) -> None:
+    # The seeded projects take explicit IDs, so this one does too
+    idle_id = 10_000
+    seeded_db.execute(
+        insert(Project),
+        {"id": idle_id, "gitlab_id": idle_id, "name": "idle", "url": "https://example.com/idle"},
+    )
+
+    body = get_batch(client, [1, idle_id], include_aggregate=True)
+
+    idle = body["projects"][1]
+    assert idle["project_id"] == idle_id
+    assert_same_metrics(idle, MetricsCalculator(seeded_db)._empty_metrics(*PERIOD))
+    # The aggregate is that of the active project alone
+    assert_same_metrics(body["aggregate"], reference_metrics(seeded_db, [1]))
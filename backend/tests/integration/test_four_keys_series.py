@@ -0,0 +1,144 @@
+"""
+Four Keys series bucketed in the database by local calendar boundaries.
+
+Series in a timezone other than UTC are always calculated from the
+deployments, so these cover date_trunc bucketing rather than the rollups.
+"""
+from collections.abc import Generator
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from src.models.metrics import Deployment
+from src.models.project import Project
+from src.services.metrics_calculator import MetricsCalculator
+from tests.database import isolated_schema_engine
+
+SERIES_SCHEMA = "workmetrics_four_keys_series"
+
+# Clocks in Berlin go forward on Sunday 2026-03-29, so that day has 23 hours
+ZONE_NAME = "Europe/Berlin"
+ZONE = ZoneInfo(ZONE_NAME)
+
+
+def local(*args: int) -> datetime:
+    return datetime(*args, tzinfo=ZONE)
+
+
+# Local deployment times, with the lead time of each
+DEPLOYMENTS = [
+    (local(2026, 3, 28, 23, 30), 1.0),
+    (local(2026, 3, 29, 0, 30), 2.0),  # still the 28th in UTC
+    (local(2026, 3, 29, 23, 30), 4.0),
+    (local(2026, 3, 30, 12, 0), 8.0),  # Monday
+    (local(2026, 4, 5, 23, 59), 16.0),  # Sunday
+    (local(2026, 4, 6, 0, 0), 32.0),  # Monday midnight starts a new week
+]
+
+
+@pytest.fixture(scope="module")
+def series() -> Generator[tuple[MetricsCalculator, int], None, None]:
+    """Calculator on a schema with one project and DEPLOYMENTS, and the project ID."""
+    with isolated_schema_engine(SERIES_SCHEMA, history_days=0) as engine:
+        with engine.begin() as conn:
+            project_id = conn.execute(
+                insert(Project).returning(Project.id),
+                {"gitlab_id": 1, "name": "series", "url": "https://example.com/p"},
+            ).scalar_one()
+            conn.execute(
+                insert(Deployment),
+                [
+                    {
+                        "project_id": project_id,
+                        "gitlab_deployment_id": i,
+                        "environment": "production",
+                        "status": "success",
+                        "deployed_at": deployed_at,
+                        "commit_sha": f"{i:040x}",
+                        "is_failure": False,
+                        "lead_time_hours": lead_time,
+                    }
+                    for i, (deployed_at, lead_time) in enumerate(DEPLOYMENTS)
+                ],
+            )
+        with sessionmaker(bind=engine, autoflush=False)() as db:
+            yield MetricsCalculator(db), project_id
+
+
+def _hours(metrics: dict) -> float:
+    """Length of a bucket in hours (UTC arithmetic, so DST days are 23 or 25 hours)."""
+    start = metrics["period_start"].astimezone(timezone.utc)
+    end = metrics["period_end"].astimezone(timezone.utc)
+    return (end - start).total_seconds() / 3600
+
+
+def test_day_buckets_follow_local_days_across_dst(
+    series: tuple[MetricsCalculator, int],
+) -> None:
+    calculator, project_id = series
+    buckets = calculator.calculate_four_keys_series(
+        project_id, local(2026, 3, 28), local(2026, 3, 31), "day", ZONE_NAME
+    )
+
+    assert [bucket["period_start"] for bucket in buckets] == [
+        local(2026, 3, 28),
+        local(2026, 3, 29),
+        local(2026, 3, 30),
+    ]
+    assert [_hours(bucket) for bucket in buckets] == [24, 23, 24]
+    assert [bucket["deployment_count"] for bucket in buckets] == [1, 2, 1]
+    assert buckets[1]["lead_time_hours"] == pytest.approx(3.0)
+    # A short day is still one day
+    assert buckets[1]["deployment_frequency"] == 2
+
+
+def test_weeks_start_on_monday_and_are_clipped_to_the_period(
+    series: tuple[MetricsCalculator, int],
+) -> None:
+    calculator, project_id = series
+    # Wednesday to Wednesday
+    buckets = calculator.calculate_four_keys_series(
+        project_id, local(2026, 3, 25), local(2026, 4, 8), "week", ZONE_NAME
+    )
+
+    assert [(bucket["period_start"], bucket["period_end"]) for bucket in buckets] == [
+        (local(2026, 3, 25), local(2026, 3, 30)),
+        (local(2026, 3, 30), local(2026, 4, 6)),
+        (local(2026, 4, 6), local(2026, 4, 8)),
+    ]
+    assert [bucket["deployment_count"] for bucket in buckets] == [3, 2, 1]
+    # Frequencies are per day of the clipped buckets
+    assert [bucket["deployment_frequency"] for bucket in buckets] == pytest.approx(
+        [3 / 5, 2 / 7, 1 / 2]
+    )
+
+
+def test_empty_buckets_are_filled(series: tuple[MetricsCalculator, int]) -> None:
+    calculator, project_id = series
+    buckets = calculator.calculate_four_keys_series(
+        project_id, local(2026, 1, 1), local(2026, 6, 1), "month", ZONE_NAME
+    )
+
+    assert [bucket["period_start"].month for bucket in buckets] == [1, 2, 3, 4, 5]
+    assert [bucket["deployment_count"] for bucket in buckets] == [0, 0, 4, 2, 0]
+    for empty in (buckets[0], buckets[1], buckets[4]):
+        assert empty["deployment_frequency"] == 0.0
+        assert empty["lead_time_hours"] is None
+        assert empty["change_failure_rate"] is None
+
+
+def test_period_end_is_exclusive(series: tuple[MetricsCalculator, int]) -> None:
+    calculator, project_id = series
+    # Both bounds fall exactly on a deployment
+    start, end = local(2026, 3, 29, 0, 30), local(2026, 4, 6)
+    buckets = calculator.calculate_four_keys_series(project_id, start, end, "day", ZONE_NAME)
+
+    assert len(buckets) == 8
+    assert buckets[0]["period_start"] == start
+    assert buckets[-1]["period_start"] == local(2026, 4, 5)
+    assert buckets[-1]["period_end"] == end
+    assert sum(bucket["deployment_count"] for bucket in buckets) == 4
+    assert buckets[-1]["lead_time_hours"] == 16.0
@@ -0,0 +1,130 @@
+"""
+GraphQL merge request backend.
+
+Merge requests fetched through GitLabGraphQLClient from the fake GitLab app
+are ingested into the same rows as through the REST client, with diff stats
+the REST listing does not have, and pages that exceed the complexity limit
+are shrunk and retried.
+"""
+from collections.abc import Generator
+from datetime import datetime, timezone
+from typing import Any
+
+import httpx
+import pytest
+from sqlalchemy import Engine, delete, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from src.models.project import Project
+from src.models.team_member import MergeRequest
+from src.services.data_refresh import DataRefreshService
+from src.services.gitlab_client import GitLabClient, RateLimiter
+from src.services.gitlab_graphql import GitLabGraphQLClient
+from tests.benchmarks.fake_gitlab import (
+    FakeGitLabConfig,
+    FakeGitLabDataset,
+    create_fake_gitlab_app,
+)
+from tests.database import isolated_schema_engine
+
+GRAPHQL_SCHEMA = "workmetrics_graphql"
+
+GITLAB_DATASET = FakeGitLabDataset(
+    projects=1, deployments_per_project=5, merge_requests_per_project=40, days=30
+)
+
+FAKE_API_URL = "http://fake-gitlab.test/api/v4"
+
+# Both backends are served the same data
+NOW = datetime.now(timezone.utc)
+
+
+@pytest.fixture(scope="module")
+def graphql_engine() -> Generator[Engine, None, None]:
+    """Engine on an empty schema with the fake GitLab project."""
+    with isolated_schema_engine(GRAPHQL_SCHEMA, history_days=GITLAB_DATASET.days) as engine:
+        with engine.begin() as conn:
+            conn.execute(
+                insert(Project),
+                {
+                    "gitlab_id": GITLAB_DATASET.first_project_id,
+                    "name": "fake",
+                    "url": "https://gitlab.example.com/fake",
+                },
+            )
+        yield engine
+
+
+def _merge_request_rows(engine: Engine) -> dict[int, tuple]:
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(
+                MergeRequest.gitlab_mr_id,
+                MergeRequest.title,
+                MergeRequest.state,
+                MergeRequest.created_at_gitlab,
+                MergeRequest.merged_at,
+                MergeRequest.additions,
+            )
+        ).all()
+    return {row[0]: tuple(row[1:]) for row in rows}
+
+
+async def _ingest(engine: Engine, client_class: type[GitLabClient], **kwargs: Any) -> Any:
+    """Replace the project's merge requests with those fetched by client_class."""
+    app = create_fake_gitlab_app(GITLAB_DATASET, now=NOW)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app)) as http_client:
+        client = client_class(
+            api_url=FAKE_API_URL,
+            access_token="graphql-token",
+            rate_limiter=RateLimiter(1_000_000),
+            http_client=http_client,
+            **kwargs,
+        )
+        with sessionmaker(bind=engine, autoflush=False)() as db:
+            db.execute(delete(MergeRequest))
+            project = db.execute(select(Project)).scalar_one()
+            await DataRefreshService(db, gitlab_client=client).refresh_team_activity_data(
+                project, days_back=GITLAB_DATASET.days
+            )
+    return app.state.stats
+
+
+async def test_graphql_ingests_same_merge_requests_as_rest(graphql_engine: Engine) -> None:
+    await _ingest(graphql_engine, GitLabClient)
+    rest_rows = _merge_request_rows(graphql_engine)
+
+    stats = await _ingest(graphql_engine, GitLabGraphQLClient, page_size=6)
+    graphql_rows = _merge_request_rows(graphql_engine)
+
+    assert len(graphql_rows) == GITLAB_DATASET.merge_requests_per_project
+    assert graphql_rows.keys() == rest_rows.keys()
+    for mr_id, row in graphql_rows.items():
+        assert row[:-1] == rest_rows[mr_id][:-1]
+    # The REST listing has no diff stats
+    assert all(row[-1] == 0 for row in rest_rows.values())
+    assert any(row[-1] > 0 for row in graphql_rows.values())
+    # No per merge request calls, and the page grows to fit the complexity
+    # limit after the first one
+    assert stats.requests == 2
+
+
+async def test_graphql_shrinks_pages_that_exceed_complexity_limit() -> None:
+    app = create_fake_gitlab_app(GITLAB_DATASET, FakeGitLabConfig(graphql_max_complexity=250))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app)) as http_client:
+        client = GitLabGraphQLClient(
+            api_url=FAKE_API_URL,
+            access_token="graphql-token",
+            rate_limiter=RateLimiter(1_000_000),
+            http_client=http_client,
+            page_size=100,
+        )
+        merge_requests = await client.get_project_merge_requests(GITLAB_DATASET.first_project_id)
+
+    assert len(merge_requests) == GITLAB_DATASET.merge_requests_per_project
+    assert len({mr["iid"] for mr in merge_requests}) == len(merge_requests)
+    assert 1 <= client.page_size < 100
+    assert client.max_complexity == 250
+    merged = next(mr for mr in merge_requests if mr["state"] == "merged")
+    assert merged["approved_by"] and merged["commit_count"] == 3
+    assert merged["first_commit_at"] < merged["created_at"]
@@ -0,0 +1,208 @@
+"""
+Incremental Four Keys recomputation from dirty buckets.
+
+Deployments are saved for one project as a refresh would; rollups rebuilt
+from the dirty buckets must give the same metrics as calculating them from
+the deployments themselves.
+"""
+import copy
+from collections.abc import Generator
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any
+
+import pytest
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.models.metrics import DeploymentDailyRollup, FourKeysMetrics, MetricsDirtyBucket
+from src.models.project import Project
+from src.services.data_refresh import DataRefreshService
+from src.services.incremental_metrics import IncrementalMetricsService
+from src.services.metrics_calculator import MetricsCalculator
+from tests.benchmarks.fake_gitlab import FakeGitLabDataset, generate_gitlab_data
+from tests.database import isolated_schema_engine
+
+INCREMENTAL_SCHEMA = "workmetrics_incremental_metrics"
+
+GITLAB_DATASET = FakeGitLabDataset(
+    projects=1,
+    users_per_project=5,
+    deployments_per_project=400,
+    merge_requests_per_project=1,
+    days=45,
+)
+
+METRICS_DAYS = 30
+
+
+@pytest.fixture(scope="module")
+def metrics_db() -> Generator[Session, None, None]:
+    """Session on an empty schema with one project."""
+    with isolated_schema_engine(INCREMENTAL_SCHEMA, history_days=GITLAB_DATASET.days) as engine:
+        with engine.begin() as conn:
+            conn.execute(
+                insert(Project),
+                [{"gitlab_id": 1, "name": "incremental", "url": "https://example.com/p"}],
+            )
+        with sessionmaker(bind=engine, autoflush=False)() as db:
+            yield db
+
+
+@pytest.fixture(scope="module")
+def deployments() -> list[dict[str, Any]]:
+    return generate_gitlab_data(GITLAB_DATASET)[GITLAB_DATASET.first_project_id]["deployments"]
+
+
+@pytest.fixture(scope="module")
+def project(metrics_db: Session, deployments: list[dict[str, Any]]) -> Project:
+    """The project with its deployments saved and every bucket still dirty."""
+    project = metrics_db.execute(select(Project)).scalar_one()
+    DataRefreshService(metrics_db)._process_deployments(project, deployments)
+    # The fake payloads carry no lead or restore times
+    metrics_db.execute(
+        text(
+            """
+            UPDATE deployments
+            SET lead_time_hours = (gitlab_deployment_id % 97) * 0.5,
+                time_to_restore_hours = CASE WHEN is_failure
+                    THEN (gitlab_deployment_id % 13) + 0.25 END
+            """
+        )
+    )
+    metrics_db.commit()
+    return project
+
+
+def _days(today: date, days: int) -> tuple[datetime, datetime]:
+    """Whole UTC days ending yesterday, bounded as recompute bounds its snapshot."""
+    start = datetime.combine(today - timedelta(days=days), time.min, tzinfo=timezone.utc)
+    end = datetime.combine(today - timedelta(days=1), time(23, 59, 59), tzinfo=timezone.utc)
+    return start, end
+
+
+def _assert_same_metrics(actual: dict[str, Any], expected: dict[str, Any]) -> None:
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, float):
+            assert actual[key] == pytest.approx(value), key
+        else:
+            assert actual[key] == value, key
+
+
+def test_recompute_rebuilds_dirty_buckets(metrics_db: Session, project: Project) -> None:
+    today = datetime.now(timezone.utc).date()
+    dirty = metrics_db.execute(
+        select(func.count()).select_from(MetricsDirtyBucket)
+    ).scalar_one()
+    assert dirty > METRICS_DAYS
+
+    counters = IncrementalMetricsService(metrics_db).recompute(
+        project.id, metrics_days=METRICS_DAYS, today=today
+    )
+
+    assert counters == {"dirty_buckets": dirty, "clean_buckets": 0, "snapshots_recomputed": 1}
+    assert metrics_db.execute(select(MetricsDirtyBucket)).first() is None
+
+    calculator = MetricsCalculator(metrics_db)
+    for days in (1, 7, METRICS_DAYS):
+        start, end = _days(today, days)
+        _assert_same_metrics(
+            calculator.calculate_four_keys_from_rollups(project.id, start, end),
+            calculator.calculate_four_keys(project.id, start, end),
+        )
+
+    start, end = _days(today, METRICS_DAYS)
+    snapshot = calculator.get_snapshot(project.id, start, end)
+    assert snapshot is not None
+    _assert_same_metrics(snapshot, calculator.calculate_four_keys(project.id, start, end))
+
+
+def test_recompute_only_touches_changed_buckets(
+    metrics_db: Session, project: Project, deployments: list[dict[str, Any]]
+) -> None:
+    today = datetime.now(timezone.utc).date()
+    service = IncrementalMetricsService(metrics_db)
+    service.recompute(project.id, metrics_days=METRICS_DAYS, today=today)
+    window_buckets = metrics_db.execute(
+        select(func.count())
+        .select_from(DeploymentDailyRollup)
+        .where(DeploymentDailyRollup.day >= today - timedelta(days=METRICS_DAYS))
+        .where(DeploymentDailyRollup.day < today)
+    ).scalar_one()
+
+    # Nothing changed: nothing to rebuild, and the snapshot is left alone
+    assert service.recompute(project.id, metrics_days=METRICS_DAYS, today=today) == {
+        "dirty_buckets": 0,
+        "clean_buckets": window_buckets,
+        "snapshots_recomputed": 0,
+    }
+
+    start, end = _days(today, METRICS_DAYS)
+    changed = copy.deepcopy(
+        next(
+            d
+            for d in deployments
+            if d["status"] == "success"
+            and start + timedelta(days=1) < datetime.fromisoformat(d["created_at"]) < end
+        )
+    )
+    changed["status"] = "failed"
+    DataRefreshService(metrics_db)._process_deployments(project, [changed])
+
+    assert service.recompute(project.id, metrics_days=METRICS_DAYS, today=today) == {
+        "dirty_buckets": 1,
+        "clean_buckets": window_buckets - 1,
+        "snapshots_recomputed": 1,
+    }
+    calculator = MetricsCalculator(metrics_db)
+    stored = metrics_db.execute(select(FourKeysMetrics)).scalars().all()
+    assert len(stored) == 1
+    assert stored[0].failed_deployment_count == (
+        calculator.calculate_four_keys(project.id, start, end)["failed_deployment_count"]
+    )
+
+
+@pytest.mark.parametrize("bucket", ["day", "week", "month"])
+def test_utc_series_is_read_from_rollups(
+    metrics_db: Session, project: Project, bucket: str
+) -> None:
+    today = datetime.now(timezone.utc).date()
+    IncrementalMetricsService(metrics_db).recompute(project.id, metrics_days=None, today=today)
+    calculator = MetricsCalculator(metrics_db)
+    start = datetime.combine(today - timedelta(days=40), time.min, tzinfo=timezone.utc)
+    end = datetime.combine(today, time.min, tzinfo=timezone.utc)
+
+    from_rollups = calculator.calculate_four_keys_series(project.id, start, end, bucket)
+    # The same UTC buckets under another zone name are read from the deployments
+    from_deployments = calculator.calculate_four_keys_series(
+        project.id, start, end, bucket, "Etc/UTC"
+    )
+
+    assert len(from_rollups) == len(from_deployments)
+    assert sum(metrics["deployment_count"] for metrics in from_rollups) > 0
+    for actual, expected in zip(from_rollups, from_deployments, strict=True):
+        _assert_same_metrics(actual, expected)
+
+
+def test_snapshots_overlapping_dirty_days(metrics_db: Session, project: Project) -> None:
+    calculator = MetricsCalculator(metrics_db)
+    today = datetime.now(timezone.utc).date()
+    periods = [_days(today - timedelta(days=offset), 5) for offset in (0, 10, 20)]
+    for start, end in periods:
+        calculator.save_metrics(project.id, calculator.calculate_four_keys(project.id, start, end))
+    try:
+        # Any number of dirty days is passed as one array parameter
+        dirty_days = {today - timedelta(days=offset) for offset in (1, *range(25, 400))}
+        overlapping = IncrementalMetricsService(metrics_db)._snapshots_overlapping(
+            project.id, dirty_days
+        )
+
+        found = {(snapshot.period_start, snapshot.period_end) for snapshot in overlapping}
+        assert found & set(periods) == {periods[0], periods[2]}
+    finally:
+        metrics_db.execute(
+            delete(FourKeysMetrics).where(
+                FourKeysMetrics.period_start.in_([start for start, _end in periods])
+            )
+        )
+        metrics_db.commit()
@@ -0,0 +1,179 @@
+"""
+Stored Four Keys snapshots: one row per project and period, served when they
+cover the requested days.
+"""
+from collections.abc import Generator
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.api.main import app
+from src.database.session import get_read_db
+from src.models.metrics import FourKeysMetrics, MetricsDirtyBucket
+from src.models.project import Project
+from src.services.metrics_calculator import MetricsCalculator
+from tests.database import isolated_schema_engine
+
+SNAPSHOTS_SCHEMA = "workmetrics_metric_snapshots"
+
+# Whole days ending yesterday, as saved by the daily refresh
+LAST_DAY = date.today() - timedelta(days=1)
+FIRST_DAY = LAST_DAY - timedelta(days=29)
+PERIOD_START = datetime.combine(FIRST_DAY, time.min, tzinfo=timezone.utc)
+PERIOD_END = datetime.combine(LAST_DAY, time(23, 59, 59), tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def snapshot_db() -> Generator[Session, None, None]:
+    """Session on an empty schema with one project and no deployments."""
+    with isolated_schema_engine(SNAPSHOTS_SCHEMA, history_days=31) as engine:
+        with engine.begin() as conn:
+            conn.execute(
+                insert(Project),
+                {"gitlab_id": 1, "name": "snapshots", "url": "https://example.com/p"},
+            )
+        with sessionmaker(bind=engine, autoflush=False)() as db:
+            yield db
+
+
+def metrics(deployment_count: int, start: datetime = PERIOD_START, end: datetime = PERIOD_END):
+    """Snapshot values that cannot come from the (empty) deployments table."""
+    return {
+        "period_start": start,
+        "period_end": end,
+        "deployment_frequency": deployment_count / 30,
+        "deployment_count": deployment_count,
+        "lead_time_hours": 12.5,
+        "lead_time_median_hours": 10.0,
+        "change_failure_rate": 10.0,
+        "failed_deployment_count": deployment_count // 10,
+        "time_to_restore_hours": 2.0,
+        "time_to_restore_median_hours": 1.5,
+    }
+
+
+def _snapshot_count(db: Session) -> int:
+    return db.execute(select(func.count()).select_from(FourKeysMetrics)).scalar_one()
+
+
+def test_repeated_save_keeps_one_row_per_period(snapshot_db: Session) -> None:
+    project = snapshot_db.execute(select(Project)).scalar_one()
+    calculator = MetricsCalculator(snapshot_db)
+
+    first = calculator.save_metrics(project.id, metrics(30))
+    second = calculator.save_metrics(project.id, metrics(40))
+
+    assert second.id == first.id
+    assert _snapshot_count(snapshot_db) == 1
+    assert second.deployment_count == 40
+
+    # Another period is another row
+    calculator.save_metrics(project.id, metrics(5, end=PERIOD_END - timedelta(days=1)))
+    assert _snapshot_count(snapshot_db) == 2
+
+
+def test_uncommitted_save_is_left_to_the_caller(snapshot_db: Session) -> None:
+    project = snapshot_db.execute(select(Project)).scalar_one()
+    MetricsCalculator(snapshot_db).save_metrics(project.id, metrics(30), commit=False)
+    snapshot_db.rollback()
+
+    assert _snapshot_count(snapshot_db) == 0
+
+
+def test_snapshot_covering_requested_days_is_served(snapshot_db: Session) -> None:
+    project = snapshot_db.execute(select(Project)).scalar_one()
+    calculator = MetricsCalculator(snapshot_db)
+    calculator.save_metrics(project.id, metrics(30))
+
+    # Requested as the API does: naive dates, end at the last second of the day
+    snapshot = calculator.get_snapshot(
+        project.id,
+        datetime.combine(FIRST_DAY, time.min),
+        datetime.combine(LAST_DAY, time(23, 59, 59)),
+    )
+    assert snapshot is not None
+    assert snapshot["deployment_count"] == 30
+
+    # Other days are calculated live
+    assert calculator.get_snapshot(project.id, PERIOD_START, PERIOD_END - timedelta(days=1)) is None
+
+    def override_get_read_db() -> Generator[Session, None, None]:
+        yield snapshot_db
+
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    try:
+        response = TestClient(app).get(
+            f"/api/v1/projects/{project.id}/four-keys",
+            params={"start_date": FIRST_DAY.isoformat(), "end_date": LAST_DAY.isoformat()},
+        )
+    finally:
+        app.dependency_overrides.pop(get_read_db, None)
+    assert response.status_code == 200
+    assert response.json()["deployment_count"] == 30
+
+
+def test_snapshot_saved_before_its_period_ended_is_not_served(snapshot_db: Session) -> None:
+    project = snapshot_db.execute(select(Project)).scalar_one()
+    calculator = MetricsCalculator(snapshot_db)
+    today = datetime.combine(date.today(), time.min, tzinfo=timezone.utc)
+    tonight = today + timedelta(days=1, seconds=-1)
+    calculator.save_metrics(project.id, metrics(30, start=today, end=tonight))
+
+    assert calculator.get_snapshot(project.id, today, tonight) is None
+
+
+def test_snapshot_with_days_pending_recompute_is_not_served(snapshot_db: Session) -> None:
+    project = snapshot_db.execute(select(Project)).scalar_one()
+    calculator = MetricsCalculator(snapshot_db)
+    calculator.save_metrics(project.id, metrics(30))
+
+    # A refresh changed deployments of the last day; the snapshot is stale
+    snapshot_db.execute(
+        insert(MetricsDirtyBucket),
+        {"project_id": project.id, "environment": "production", "day": LAST_DAY},
+    )
+    assert calculator.get_snapshot(project.id, PERIOD_START, PERIOD_END) is None
+    # ... whichever form the end of the last day takes
+    next_midnight = PERIOD_END + timedelta(seconds=1)
+    assert calculator.get_snapshot(project.id, PERIOD_START, next_midnight) is None
+
+    # Days outside the period do not matter
+    snapshot_db.execute(
+        text("UPDATE metrics_dirty_buckets SET day = :day"), {"day": LAST_DAY + timedelta(days=1)}
+    )
+    assert calculator.get_snapshot(project.id, PERIOD_START, PERIOD_END) is not None
+
+
+def test_duplicate_snapshots_are_collapsed(snapshot_db: Session) -> None:
+    project = snapshot_db.execute(select(Project)).scalar_one()
+    # As left by older releases, before the unique constraint
+    snapshot_db.execute(
+        text(
+            "ALTER TABLE four_keys_metrics "
+            "DROP CONSTRAINT uq_four_keys_metrics_project_period"
+        )
+    )
+    rows: list[dict[str, Any]] = []
+    for age_days, deployment_count in [(3, 10), (1, 30), (2, 20)]:
+        rows.append(
+            {
+                **metrics(deployment_count),
+                "project_id": project.id,
+                "updated_at": datetime.now(timezone.utc) - timedelta(days=age_days),
+            }
+        )
+    rows.append({**metrics(5, end=PERIOD_END - timedelta(days=1)), "project_id": project.id})
+    snapshot_db.execute(insert(FourKeysMetrics), rows)
+    snapshot_db.commit()
+
+    assert MetricsCalculator(snapshot_db).collapse_duplicate_snapshots(project.id) == 2
+
+    kept = snapshot_db.execute(
+        select(FourKeysMetrics.deployment_count).order_by(FourKeysMetrics.deployment_count)
+    ).scalars().all()
+    # The most recently updated row of each period
+    assert kept == [5, 30]
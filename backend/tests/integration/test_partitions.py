@@ -0,0 +1,182 @@
+"""
+Monthly partition maintenance of deployments and merge_requests.
+
+The schema starts with partitions for the months around today only, so rows
+two years old land in the DEFAULT partitions.
+"""
+from collections.abc import Generator
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import Connection, Engine, func, insert, inspect, select, text
+
+from src.database.partitioning import (
+    PartitionManager,
+    add_months,
+    default_partition_name,
+    month_start,
+    partition_name,
+)
+from src.models.metrics import Deployment
+from src.models.project import Project
+from src.models.team_member import MergeRequest, Review, TeamMember
+from tests.database import isolated_schema_engine
+
+PARTITIONS_SCHEMA = "workmetrics_partitions"
+
+CURRENT_MONTH = month_start(datetime.now(timezone.utc))
+OLD_MONTH = add_months(CURRENT_MONTH, -24)
+
+
+@pytest.fixture
+def engine() -> Generator[Engine, None, None]:
+    """Engine on an empty schema with one project and one team member."""
+    with isolated_schema_engine(PARTITIONS_SCHEMA, history_days=0) as engine:
+        with engine.begin() as conn:
+            project_id = conn.execute(
+                insert(Project).returning(Project.id),
+                {"gitlab_id": 1, "name": "partitions", "url": "https://example.com/p"},
+            ).scalar_one()
+            conn.execute(
+                insert(TeamMember),
+                {"project_id": project_id, "gitlab_user_id": 1, "username": "dev", "name": "Dev"},
+            )
+        yield engine
+
+
+def _at(month: date, day: int = 1) -> datetime:
+    return datetime(month.year, month.month, day, 12, tzinfo=timezone.utc)
+
+
+def insert_deployments(conn: Connection, month: date, count: int) -> None:
+    project_id = conn.execute(select(Project.id)).scalar_one()
+    conn.execute(
+        insert(Deployment),
+        [
+            {
+                "project_id": project_id,
+                "gitlab_deployment_id": 1_000 * month.month + i,
+                "environment": "production",
+                "status": "success",
+                "deployed_at": _at(month, i % 28 + 1),
+                "commit_sha": f"{i:040x}",
+                "is_failure": False,
+            }
+            for i in range(count)
+        ],
+    )
+
+
+def insert_merge_request(conn: Connection, month: date) -> int:
+    """Insert a merge request created in month, with one review; returns its ID."""
+    project_id, author_id = conn.execute(select(TeamMember.project_id, TeamMember.id)).one()
+    merge_request_id = conn.execute(
+        insert(MergeRequest).returning(MergeRequest.id),
+        {
+            "project_id": project_id,
+            "author_id": author_id,
+            "gitlab_mr_id": month.month,
+            "gitlab_mr_iid": month.month,
+            "title": "Change",
+            "state": "merged",
+            "created_at_gitlab": _at(month),
+            "source_branch": "feature",
+            "target_branch": "main",
+        },
+    ).scalar_one()
+    conn.execute(
+        insert(Review),
+        {
+            "merge_request_id": merge_request_id,
+            "reviewer_id": author_id,
+            "reviewed_at": _at(month, 2),
+        },
+    )
+    return merge_request_id
+
+
+def _count(conn: Connection, table: str) -> int:
+    return conn.execute(text(f"SELECT count(*) FROM {table}")).scalar_one()
+
+
+def test_create_partition_moves_rows_out_of_default(engine: Engine) -> None:
+    with engine.begin() as conn:
+        insert_deployments(conn, OLD_MONTH, 5)
+        insert_deployments(conn, add_months(OLD_MONTH, 1), 3)
+        assert _count(conn, default_partition_name("deployments")) == 8
+
+        manager = PartitionManager(conn)
+        assert manager.create_partition("deployments", OLD_MONTH)
+        assert not manager.create_partition("deployments", OLD_MONTH)
+
+        assert OLD_MONTH in manager.list_partitions("deployments")
+        assert _count(conn, partition_name("deployments", OLD_MONTH)) == 5
+        # Only that month's rows moved
+        assert _count(conn, default_partition_name("deployments")) == 3
+        assert conn.execute(select(func.count()).select_from(Deployment)).scalar_one() == 8
+
+
+def test_ensure_partitions_covers_every_month_of_every_table(engine: Engine) -> None:
+    with engine.begin() as conn:
+        manager = PartitionManager(conn)
+        end = add_months(OLD_MONTH, 2) + timedelta(days=10)
+
+        assert manager.ensure_partitions(OLD_MONTH + timedelta(days=14), end) == 6
+        assert manager.ensure_partitions(OLD_MONTH, end) == 0
+        for table in ("deployments", "merge_requests"):
+            months = manager.list_partitions(table)
+            assert [OLD_MONTH, add_months(OLD_MONTH, 1), add_months(OLD_MONTH, 2)] == (
+                months[:3]
+            )
+
+
+def test_split_default_partitions(engine: Engine) -> None:
+    with engine.begin() as conn:
+        insert_deployments(conn, OLD_MONTH, 4)
+        insert_deployments(conn, add_months(OLD_MONTH, 3), 2)
+        insert_merge_request(conn, add_months(OLD_MONTH, 1))
+
+        manager = PartitionManager(conn)
+        assert manager.split_default_partitions() == 3
+        assert manager.split_default_partitions() == 0
+
+        for table in ("deployments", "merge_requests"):
+            assert _count(conn, default_partition_name(table)) == 0
+        assert _count(conn, partition_name("deployments", add_months(OLD_MONTH, 3))) == 2
+        assert _count(conn, partition_name("merge_requests", add_months(OLD_MONTH, 1))) == 1
+
+
+def test_retention_detaches_old_partitions(engine: Engine) -> None:
+    with engine.begin() as conn:
+        insert_deployments(conn, OLD_MONTH, 4)
+        manager = PartitionManager(conn)
+        manager.split_default_partitions()
+        kept = manager.list_partitions("deployments")[1:]
+
+        name = partition_name("deployments", OLD_MONTH)
+        assert manager.apply_retention(retention_months=12) == [name]
+
+        assert manager.list_partitions("deployments") == kept
+        assert conn.execute(select(func.count()).select_from(Deployment)).scalar_one() == 0
+        # Kept as a standalone table for archival
+        assert _count(conn, name) == 4
+
+
+def test_retention_drops_old_partitions_and_their_reviews(engine: Engine) -> None:
+    with engine.begin() as conn:
+        insert_merge_request(conn, OLD_MONTH)
+        recent = insert_merge_request(conn, CURRENT_MONTH)
+        manager = PartitionManager(conn)
+        manager.split_default_partitions()
+
+        name = partition_name("merge_requests", OLD_MONTH)
+        assert manager.apply_retention(retention_months=12, action="drop") == [name]
+
+        assert name not in inspect(conn).get_table_names()
+        assert conn.execute(select(Review.merge_request_id)).scalars().all() == [recent]
+
+
+def test_unknown_retention_action_is_rejected(engine: Engine) -> None:
+    with engine.begin() as conn:
+        with pytest.raises(ValueError):
+            PartitionManager(conn).apply_retention(retention_months=12, action="truncate")
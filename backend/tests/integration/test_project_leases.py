@@ -0,0 +1,177 @@
+"""
+Per-project leases against the Redis at settings.redis_url.
+
+Each test uses its own resource name, so tests never share a lease.
+"""
+import asyncio
+import uuid
+from collections.abc import AsyncGenerator
+
+import pytest
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.config.settings import settings
+from src.services.project_leases import (
+    KEY_PREFIX,
+    LeaseLostError,
+    ProjectLeases,
+)
+
+PROJECT_ID = 1
+
+
+@pytest.fixture
+async def redis() -> AsyncGenerator[Redis, None]:
+    client = Redis.from_url(settings.redis_url, decode_responses=True)
+    try:
+        await client.ping()
+    except RedisError as e:
+        await client.aclose()
+        pytest.skip(f"Redis is not reachable: {e}")
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+def resource() -> str:
+    return f"test-{uuid.uuid4().hex}"
+
+
+def leases_on(redis: Redis, lease_seconds: float = 5.0) -> ProjectLeases:
+    return ProjectLeases(redis, lease_seconds=lease_seconds, wait_seconds=10, poll_seconds=0.05)
+
+
+class Job:
+    """A refresh stand-in that records its runs and how many overlapped."""
+
+    def __init__(self, seconds: float = 0.3, error: str | None = None):
+        self.seconds = seconds
+        self.error = error
+        self.runs = 0
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self) -> dict[str, int]:
+        self.runs += 1
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.seconds)
+            if self.error:
+                raise RuntimeError(self.error)
+            return {"deployments": 5}
+        finally:
+            self.running -= 1
+
+
+async def test_duplicate_requests_attach_to_job_in_flight(redis: Redis, resource: str) -> None:
+    job = Job()
+    results = await asyncio.gather(
+        *(leases_on(redis).run(resource, PROJECT_ID, job, scope=90) for _ in range(3))
+    )
+
+    assert job.runs == 1
+    assert results == [{"deployments": 5}] * 3
+    assert await redis.get(f"{KEY_PREFIX}:{resource}:{PROJECT_ID}") is None
+
+
+async def test_wider_request_waits_for_narrower_job(redis: Redis, resource: str) -> None:
+    narrow, wide = Job(), Job()
+    leases = leases_on(redis)
+    narrow_run = asyncio.create_task(leases.run(resource, PROJECT_ID, narrow, scope=3))
+    await asyncio.sleep(0.05)
+    wide_run = asyncio.create_task(leases.run(resource, PROJECT_ID, wide, scope=90))
+    await asyncio.sleep(0.1)
+    assert wide.runs == 0
+
+    await asyncio.gather(narrow_run, wide_run)
+    assert narrow.runs == wide.runs == 1
+
+
+async def test_non_attaching_request_runs_after_job_in_flight(
+    redis: Redis, resource: str
+) -> None:
+    job = Job()
+    results = await asyncio.gather(
+        leases_on(redis).run(resource, PROJECT_ID, job, scope=90),
+        leases_on(redis).run(resource, PROJECT_ID, job, attach=False),
+    )
+
+    assert results == [{"deployments": 5}] * 2
+    assert job.runs == 2
+    assert job.max_running == 1
+
+
+async def test_attached_requests_see_job_failure(redis: Redis, resource: str) -> None:
+    job = Job(error="GitLab unavailable")
+    results = await asyncio.gather(
+        *(leases_on(redis).run(resource, PROJECT_ID, job) for _ in range(2)),
+        return_exceptions=True,
+    )
+
+    assert job.runs == 1
+    assert sorted(type(result).__name__ for result in results) == [
+        "JobFailedError",
+        "RuntimeError",
+    ]
+    assert all("GitLab unavailable" in str(result) for result in results)
+
+
+async def test_abandoned_lease_is_recovered(redis: Redis, resource: str) -> None:
+    # Left by a holder that died: no job state and no renewals
+    await redis.set(f"{KEY_PREFIX}:{resource}:{PROJECT_ID}", "dead-job", px=300)
+    job = Job(seconds=0.0)
+
+    assert await leases_on(redis).run(resource, PROJECT_ID, job) == {"deployments": 5}
+    assert job.runs == 1
+
+
+async def test_lease_is_renewed_while_job_runs(redis: Redis, resource: str) -> None:
+    job = Job(seconds=1.5)
+    leases = leases_on(redis, lease_seconds=0.6)
+    run = asyncio.create_task(leases.run(resource, PROJECT_ID, job))
+    await asyncio.sleep(1.0)
+
+    assert await redis.pttl(f"{KEY_PREFIX}:{resource}:{PROJECT_ID}") > 0
+    assert await leases_on(redis).run(resource, PROJECT_ID, Job(seconds=0.0)) == {
+        "deployments": 5
+    }
+    await run
+    assert job.runs == 1
+
+
+async def test_job_is_cancelled_when_lease_is_lost(redis: Redis, resource: str) -> None:
+    job = Job(seconds=5.0)
+    leases = leases_on(redis, lease_seconds=0.6)
+    run = asyncio.create_task(leases.run(resource, PROJECT_ID, job))
+    await asyncio.sleep(0.1)
+    await redis.delete(f"{KEY_PREFIX}:{resource}:{PROJECT_ID}")
+
+    with pytest.raises(LeaseLostError):
+        await asyncio.wait_for(run, timeout=2.0)
+    assert job.running == 0
+
+
+async def test_disabled_leases_run_every_request(
+    redis: Redis, resource: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "refresh_lock_enabled", False)
+    job = Job()
+    await asyncio.gather(*(leases_on(redis).run(resource, PROJECT_ID, job) for _ in range(2)))
+
+    assert job.runs == 2
+    assert job.max_running == 2
+
+
+async def test_jobs_run_without_lease_when_redis_is_unreachable() -> None:
+    unreachable = Redis.from_url("redis://127.0.0.1:1/0", decode_responses=True)
+    job = Job(seconds=0.0)
+    try:
+        assert await ProjectLeases(unreachable).run("refresh", PROJECT_ID, job) == {
+            "deployments": 5
+        }
+    finally:
+        await unreachable.aclose()
+    assert job.runs == 1
+
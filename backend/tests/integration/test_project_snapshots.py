@@ -0,0 +1,159 @@
+"""
+Columnar project snapshots.
+
+A seeded project is exported to a snapshot and imported into a separate,
+empty schema; the imported history must match the source row for row,
+with IDs of the target database, and importing it again must change
+nothing.
+"""
+import io
+import zipfile
+from collections.abc import Generator
+
+import pyarrow.parquet as pq
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.api.main import app
+from src.database.session import get_db, get_read_db
+from src.services.project_snapshot import ProjectSnapshotService, SnapshotError
+from tests.database import isolated_schema_engine
+
+PROJECT_ID = 42
+
+IMPORT_SCHEMA = "workmetrics_snapshot_import"
+
+# One row per merge request, review and deployment of a project, keyed by
+# GitLab identifiers rather than database IDs
+HISTORY_QUERIES = {
+    "merge_requests": """
+        SELECT mr.gitlab_mr_id, tm.gitlab_user_id, mr.title, mr.state, mr.created_at_gitlab,
+               mr.merged_at, mr.additions
+        FROM merge_requests mr
+        JOIN projects p ON p.id = mr.project_id
+        JOIN team_members tm ON tm.id = mr.author_id
+        WHERE p.gitlab_id = :gitlab_id
+        ORDER BY 1
+    """,
+    "reviews": """
+        SELECT mr.gitlab_mr_id, tm.gitlab_user_id, r.reviewed_at, r.comment_count,
+               r.approval_status
+        FROM reviews r
+        JOIN merge_requests mr ON mr.id = r.merge_request_id
+        JOIN projects p ON p.id = mr.project_id
+        JOIN team_members tm ON tm.id = r.reviewer_id
+        WHERE p.gitlab_id = :gitlab_id
+        ORDER BY 1, 2, 3
+    """,
+    "deployments": """
+        SELECT d.gitlab_deployment_id, d.environment, d.status, d.deployed_at, d.is_failure,
+               d.lead_time_hours, d.time_to_restore_hours
+        FROM deployments d
+        JOIN projects p ON p.id = d.project_id
+        WHERE p.gitlab_id = :gitlab_id
+        ORDER BY 1
+    """,
+}
+
+
+@pytest.fixture(scope="module")
+def import_engine() -> Generator[Engine, None, None]:
+    """Engine on an empty schema that snapshots are imported into."""
+    with isolated_schema_engine(IMPORT_SCHEMA) as engine:
+        yield engine
+
+
+def _history(engine: Engine, gitlab_id: int) -> dict[str, list[tuple]]:
+    with engine.connect() as conn:
+        return {
+            name: [tuple(row) for row in conn.execute(text(query), {"gitlab_id": gitlab_id})]
+            for name, query in HISTORY_QUERIES.items()
+        }
+
+
+def test_snapshot_round_trip(
+    seeded_db: Session, seeded_engine: Engine, import_engine: Engine
+) -> None:
+    snapshot = io.BytesIO()
+    manifest = ProjectSnapshotService(seeded_db).export_project(PROJECT_ID, snapshot)
+    gitlab_id = manifest["project_gitlab_id"]
+    assert manifest["rows"]["merge_requests"] > 0
+
+    import_session = sessionmaker(bind=import_engine)()
+    try:
+        # Shift IDs in the target so that reusing source IDs would show up
+        import_session.execute(
+            text("SELECT setval(pg_get_serial_sequence('team_members', 'id'), 5000)")
+        )
+        snapshot.seek(0)
+        result = ProjectSnapshotService(import_session).import_snapshot(snapshot)
+        assert result["rows"] == manifest["rows"]
+
+        expected = _history(seeded_engine, gitlab_id)
+        assert _history(import_engine, gitlab_id) == expected
+        assert all(expected.values())
+
+        # Importing again updates rows in place
+        snapshot.seek(0)
+        ProjectSnapshotService(import_session).import_snapshot(snapshot)
+        assert _history(import_engine, gitlab_id) == expected
+
+        dirty = import_session.execute(
+            text("SELECT count(*) FROM metrics_dirty_buckets WHERE project_id = :id"),
+            {"id": result["project_id"]},
+        ).scalar_one()
+        assert dirty > 0
+    finally:
+        import_session.close()
+
+
+def test_snapshot_files_are_parquet(seeded_db: Session) -> None:
+    snapshot = io.BytesIO()
+    manifest = ProjectSnapshotService(seeded_db).export_project(PROJECT_ID, snapshot)
+
+    with zipfile.ZipFile(snapshot) as archive:
+        table = pq.read_table(io.BytesIO(archive.read("deployments.parquet")))
+    assert table.num_rows == manifest["rows"]["deployments"]
+    assert str(table.schema.field("deployed_at").type) == "timestamp[us, tz=UTC]"
+
+
+def test_import_rejects_other_files(seeded_db: Session) -> None:
+    with pytest.raises(SnapshotError):
+        ProjectSnapshotService(seeded_db).import_snapshot(io.BytesIO(b"not a zip archive"))
+
+
+def test_snapshot_api_round_trip(seeded_engine: Engine, import_engine: Engine) -> None:
+    engines = {"export": seeded_engine, "import": import_engine}
+    target = {"engine": "export"}
+
+    def override_get_db() -> Generator[Session, None, None]:
+        db = sessionmaker(bind=engines[target["engine"]], autoflush=False)()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    try:
+        with TestClient(app) as client:
+            response = client.get(f"/api/v1/projects/{PROJECT_ID}/snapshot")
+            assert response.status_code == 200
+            assert response.headers["content-type"] == "application/zip"
+
+            target["engine"] = "import"
+            imported = client.post(
+                "/api/v1/projects/snapshots",
+                content=response.content,
+                headers={"Content-Type": "application/zip"},
+            )
+            assert imported.status_code == 201, imported.text
+            assert imported.json()["rows"]["deployments"] > 0
+
+            rejected = client.post("/api/v1/projects/snapshots", content=b"not a zip archive")
+            assert rejected.status_code == 400
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_read_db, None)
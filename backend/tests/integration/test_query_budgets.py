@@ -0,0 +1,95 @@
+"""
+Query budgets for the API endpoints.
+
+Each endpoint is called against the seeded schema and must not run more SQL
+statements than its budget. Budgets are fixed numbers rather than a
+function of the data, so an N+1 loop (one query per member, merge request
+or project) fails the test as soon as it is introduced.
+"""
+from collections.abc import Callable, Generator
+from contextlib import AbstractContextManager
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.api.main import app
+from src.database.session import get_db, get_read_db
+from src.observability.queries import instrument_engine
+
+PROJECT_ID = 42
+END = date.today()
+START = END - timedelta(days=30)
+DATE_RANGE = {"start_date": START.isoformat(), "end_date": END.isoformat()}
+
+# (path, query parameters, maximum statements)
+ENDPOINT_BUDGETS = {
+    "four_keys": (f"/api/v1/projects/{PROJECT_ID}/four-keys", DATE_RANGE, 3),
+    "four_keys_series": (
+        f"/api/v1/projects/{PROJECT_ID}/four-keys/series",
+        {**DATE_RANGE, "bucket": "week"},
+        # Project, days waiting to be recomputed, and the series itself
+        3,
+    ),
+    "four_keys_batch": (
+        "/api/v1/four-keys",
+        {**DATE_RANGE, "project_ids": "1,2,3,4,5", "include_aggregate": "true"},
+        2,
+    ),
+    "team_activity": (f"/api/v1/projects/{PROJECT_ID}/team-activity", DATE_RANGE, 5),
+    "cycle_time": (f"/api/v1/projects/{PROJECT_ID}/cycle-time", DATE_RANGE, 3),
+}
+
+# Endpoints with a known N+1 pattern; ActivityAnalyzer queries merge requests
+# and reviews once per team member (about 150 statements for 30 members)
+KNOWN_N_PLUS_ONE = {"team_activity"}
+
+
+@pytest.fixture(scope="module")
+def client(seeded_engine: Engine) -> Generator[TestClient, None, None]:
+    """ASGI test client whose requests use the seeded schema."""
+    instrument_engine(seeded_engine)
+    session_factory = sessionmaker(bind=seeded_engine, autoflush=False)
+
+    def override_get_db() -> Generator[Session, None, None]:
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    try:
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        app.dependency_overrides.pop(get_read_db, None)
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        pytest.param(name, marks=pytest.mark.xfail(reason="known N+1 queries", strict=True))
+        if name in KNOWN_N_PLUS_ONE
+        else name
+        for name in sorted(ENDPOINT_BUDGETS)
+    ],
+)
+def test_endpoint_query_budget(
+    name: str,
+    client: TestClient,
+    query_budget: Callable[[int], AbstractContextManager[list[str]]],
+) -> None:
+    path, params, max_queries = ENDPOINT_BUDGETS[name]
+
+    with query_budget(max_queries) as statements:
+        response = client.get(path, params=params)
+
+    assert response.status_code == 200, response.text
+    # The counts reported outside production match what reached the database
+    assert int(response.headers["X-DB-Query-Count"]) == len(statements)
+    assert float(response.headers["X-DB-Query-Time"]) >= 0
@@ -0,0 +1,117 @@
+"""
+Query-plan regression tests.
+
+Each analyzer entry point is run against a database seeded at scale while its
+SELECT statements are captured. Every captured statement is then EXPLAINed
+with the same parameters, and the test fails if the plan falls back to a
+sequential scan on one of the large tables.
+"""
+import json
+from collections.abc import Callable, Generator
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+from sqlalchemy import Engine, event, text
+from sqlalchemy.orm import Session
+
+from src.services.activity_analyzer import ActivityAnalyzer
+from src.services.cycle_time_analyzer import CycleTimeAnalyzer
+from src.services.metrics_calculator import MetricsCalculator
+
+# Tables that grow with history and must always be reached through an index
+LARGE_TABLES = {"deployments", "merge_requests", "reviews", "team_members"}
+
+# Sequential scans of partitions smaller than this are legitimate planner choices
+MIN_SCANNED_ROWS = 1000
+
+PROJECT_ID = 42
+END = datetime.now(timezone.utc)
+START = END - timedelta(days=30)
+
+ANALYZER_CALLS: dict[str, Callable[[Session], Any]] = {
+    "four_keys": lambda db: MetricsCalculator(db).calculate_four_keys(PROJECT_ID, START, END),
+    "four_keys_batch": lambda db: MetricsCalculator(db).calculate_four_keys_batch(
+        [PROJECT_ID, PROJECT_ID + 1, PROJECT_ID + 2], START, END, include_aggregate=True
+    ),
+    "four_keys_series": lambda db: MetricsCalculator(db).calculate_four_keys_series(
+        PROJECT_ID, START, END, "week"
+    ),
+    "activity_metrics": lambda db: ActivityAnalyzer(db).calculate_activity_metrics(
+        PROJECT_ID, START, END
+    ),
+    "review_load": lambda db: ActivityAnalyzer(db).get_review_load_distribution(
+        PROJECT_ID, START, END
+    ),
+    "cycle_time_metrics": lambda db: CycleTimeAnalyzer(db).calculate_cycle_time_metrics(
+        PROJECT_ID, START, END
+    ),
+    "cycle_time_distribution": lambda db: CycleTimeAnalyzer(db).get_cycle_time_distribution(
+        PROJECT_ID, START, END
+    ),
+}
+
+
+@pytest.fixture
+def captured_selects(seeded_engine: Engine) -> Generator[dict[str, Any], None, None]:
+    """Record each distinct SELECT statement (with its first parameters) sent to the database."""
+    statements: dict[str, Any] = {}
+
+    def capture(conn, cursor, statement, parameters, context, executemany):  # type: ignore[no-untyped-def]
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.setdefault(statement, parameters)
+
+    event.listen(seeded_engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(seeded_engine, "before_cursor_execute", capture)
+
+
+def _is_large_table(relation: str) -> bool:
+    """Whether relation is a large table or one of its monthly partitions."""
+    return any(
+        relation == table or (relation.startswith(f"{table}_p") and relation[-3] == "_")
+        for table in LARGE_TABLES
+    )
+
+
+def _sequential_scans(plan: dict[str, Any]) -> list[str]:
+    """Return the large tables (or partitions) read by a sequential scan in a plan tree."""
+    scans = []
+    if plan.get("Node Type") == "Seq Scan" and _is_large_table(plan.get("Relation Name", "")):
+        scans.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        scans.extend(_sequential_scans(child))
+    return scans
+
+
+@pytest.mark.parametrize("name", sorted(ANALYZER_CALLS))
+def test_analyzer_queries_use_indexes(
+    name: str, seeded_db: Session, captured_selects: dict[str, Any]
+) -> None:
+    ANALYZER_CALLS[name](seeded_db)
+    assert captured_selects, f"{name} issued no SELECT statements"
+
+    connection = seeded_db.connection()
+    failures = []
+    for statement, parameters in list(captured_selects.items()):
+        result = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        scans = [
+            relation
+            for relation in _sequential_scans(plan[0]["Plan"])
+            if connection.execute(
+                text("SELECT reltuples FROM pg_class WHERE oid = to_regclass(:relation)"),
+                {"relation": relation},
+            ).scalar()
+            >= MIN_SCANNED_ROWS
+        ]
+        if scans:
+            failures.append(f"Seq Scan on {', '.join(scans)}:\n{statement}")
+
+    assert not failures, f"{name} has sequential scans on large tables:\n\n" + "\n\n".join(
+        failures
+    )
@@ -0,0 +1,103 @@
+"""
+Shared GitLab rate budget against the Redis at settings.redis_url.
+
+Each test uses its own bucket keys, so tests never share a budget.
+"""
+import asyncio
+import time
+import uuid
+from collections.abc import AsyncGenerator
+
+import pytest
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.config.settings import settings
+from src.services.gitlab_client import BudgetRateLimiter
+
+
+@pytest.fixture
+async def redis() -> AsyncGenerator[Redis, None]:
+    client = Redis.from_url(settings.redis_url)
+    try:
+        await client.ping()
+    except RedisError as e:
+        await client.aclose()
+        pytest.skip(f"Redis is not reachable: {e}")
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+def budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    """120 calls per minute (2 per second), 20 of them reserved for interactive calls."""
+    monkeypatch.setattr(settings, "gitlab_api_rate_limit_per_minute", 120)
+    monkeypatch.setattr(settings, "gitlab_interactive_rate_reserve_per_minute", 20)
+    monkeypatch.setattr(settings, "backfill_rate_limit_per_minute", 6)
+
+
+def limiters(redis: Redis, *budgets: str) -> list[BudgetRateLimiter]:
+    key_prefix = f"test-budget:{uuid.uuid4().hex}"
+    return [BudgetRateLimiter(budget, redis=redis, key_prefix=key_prefix) for budget in budgets]
+
+
+async def calls_within(limiter: BudgetRateLimiter, seconds: float) -> int:
+    """Acquire repeatedly for a while; return how many calls got through."""
+    calls = 0
+
+    async def keep_calling() -> None:
+        nonlocal calls
+        while True:
+            await limiter.acquire()
+            calls += 1
+
+    try:
+        await asyncio.wait_for(keep_calling(), timeout=seconds)
+    except TimeoutError:
+        pass
+    return calls
+
+
+async def test_interactive_calls_get_through_while_batch_saturates(
+    redis: Redis, budget: None
+) -> None:
+    batch, interactive = limiters(redis, "batch", "interactive")
+    saturating = asyncio.create_task(calls_within(batch, 2.0))
+    await asyncio.sleep(0.5)
+
+    # The batch has taken everything but the reserve and is now waiting for tokens
+    started = time.perf_counter()
+    for _ in range(15):
+        await interactive.acquire()
+    assert time.perf_counter() - started < 0.5
+
+    batch_calls = await saturating
+    # The burst (120 - 20) plus at most 2 per second of refill
+    assert 100 <= batch_calls <= 105
+
+
+async def test_interactive_calls_may_use_whole_budget(redis: Redis, budget: None) -> None:
+    (interactive,) = limiters(redis, "interactive")
+
+    assert await calls_within(interactive, 0.5) >= 120
+
+
+async def test_backfills_are_capped_by_their_share(redis: Redis, budget: None) -> None:
+    backfill, batch = limiters(redis, "backfill", "batch")
+
+    assert await calls_within(backfill, 0.5) == 6
+    # The backfill's calls count against the shared budget too
+    # ... plus at most 2 per second of refill
+    assert 120 - 20 - 6 <= await calls_within(batch, 0.5) <= 120 - 20 - 6 + 2
+
+
+async def test_budget_is_limited_per_process_without_redis(
+    budget: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    unreachable = Redis.from_url("redis://127.0.0.1:1/0")
+    (interactive,) = [BudgetRateLimiter("interactive", redis=unreachable)]
+    try:
+        # The static interactive share: the reserve
+        assert await calls_within(interactive, 0.5) == 20
+    finally:
+        await unreachable.aclose()
@@ -0,0 +1,98 @@
+"""
+Read-replica routing.
+
+The configured PostgreSQL database stands in for the replica: it is not in
+recovery, so its measured lag is zero. Lag above the threshold and an
+unreachable replica are simulated on the guard.
+"""
+from collections.abc import Generator
+
+import pytest
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from src.config.settings import settings
+from src.database import session as db_session
+from src.database.session import ReplicaLagGuard, _create_engine, get_read_db
+
+
+@pytest.fixture
+def replica_engine() -> Generator[Engine, None, None]:
+    """Engine on the configured database with the replica's pool settings."""
+    if not settings.database_url.startswith("postgresql"):
+        pytest.skip("Tests require PostgreSQL")
+    engine = _create_engine(
+        settings.database_url,
+        pool_size=2,
+        max_overflow=0,
+        pool_recycle=60,
+        statement_timeout_ms=1500,
+    )
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except OperationalError as e:
+        pytest.skip(f"PostgreSQL is not reachable: {e}")
+    yield engine
+    engine.dispose()
+
+
+def test_replica_engine_uses_role_settings(replica_engine: Engine) -> None:
+    assert replica_engine.pool.size() == 2
+    with replica_engine.connect() as conn:
+        assert conn.execute(text("SHOW statement_timeout")).scalar_one() == "1500ms"
+
+
+def test_lag_guard_measures_and_caches_lag(
+    replica_engine: Engine, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    guard = ReplicaLagGuard(replica_engine, max_lag_seconds=30, check_interval_seconds=60)
+    assert guard.is_usable()
+    assert guard.lag_seconds == 0
+
+    # The measurement is reused until the check interval has passed
+    monkeypatch.setattr(guard, "measure_lag", lambda: 120.0)
+    assert guard.is_usable()
+
+    guard.check_interval_seconds = 0
+    assert not guard.is_usable()
+    assert guard.lag_seconds == 120.0
+
+    def unreachable() -> float:
+        raise OperationalError("SELECT", {}, Exception("connection refused"))
+
+    monkeypatch.setattr(guard, "measure_lag", unreachable)
+    assert not guard.is_usable()
+    assert guard.lag_seconds is None
+
+
+def test_read_sessions_fall_back_to_primary_when_replica_lags(
+    replica_engine: Engine, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    guard = ReplicaLagGuard(replica_engine, max_lag_seconds=30, check_interval_seconds=0)
+    monkeypatch.setattr(db_session, "get_replica_guard", lambda: guard)
+    monkeypatch.setattr(
+        db_session, "ReplicaSessionLocal", sessionmaker(bind=replica_engine, autoflush=False)
+    )
+
+    def read_session_engine() -> Engine:
+        sessions = get_read_db()
+        db = next(sessions)
+        try:
+            return db.get_bind()
+        finally:
+            sessions.close()
+
+    assert read_session_engine() is replica_engine
+
+    monkeypatch.setattr(guard, "measure_lag", lambda: 120.0)
+    assert read_session_engine() is db_session.get_engine()
+
+
+def test_read_sessions_use_primary_without_replica(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(db_session, "get_replica_guard", lambda: None)
+
+    sessions = get_read_db()
+    assert next(sessions).get_bind() is db_session.get_engine()
+    sessions.close()
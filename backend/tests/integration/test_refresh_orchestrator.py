@@ -0,0 +1,211 @@
+"""
+Concurrent multi-project refresh against the fake GitLab app.
+
+Projects are refreshed in-process through the real GitLabClient and
+DataRefreshService; each test uses its own fake GitLab app.
+"""
+import asyncio
+from collections.abc import AsyncGenerator, Generator
+from typing import Any
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from src.config.settings import settings
+from src.models.metrics import Deployment
+from src.models.project import Project
+from src.services import refresh_orchestrator
+from src.services.gitlab_client import RateLimiter
+from src.services.refresh_orchestrator import RefreshOrchestrator
+from tests.benchmarks.fake_gitlab import (
+    FakeGitLabConfig,
+    FakeGitLabDataset,
+    create_fake_gitlab_app,
+)
+from tests.database import isolated_schema_engine
+
+ORCHESTRATOR_SCHEMA = "workmetrics_refresh_orchestrator"
+
+GITLAB_DATASET = FakeGitLabDataset(
+    projects=4,
+    users_per_project=5,
+    deployments_per_project=40,
+    merge_requests_per_project=1,
+    issues_per_project=0,
+    days=30,
+)
+
+FAKE_API_URL = "http://fake-gitlab.test/api/v4"
+
+
+class CountingRateLimiter(RateLimiter):
+    """Rate limiter that counts the calls it let through."""
+
+    def __init__(self) -> None:
+        super().__init__(1_000_000)
+        self.acquired = 0
+
+    async def acquire(self) -> None:
+        await super().acquire()
+        self.acquired += 1
+
+
+class TrackingOrchestrator(RefreshOrchestrator):
+    """Orchestrator that records how many project refreshes overlapped."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.running = 0
+        self.max_running = 0
+        self.started = asyncio.Event()
+
+    async def _refresh_project(self, *args: Any, **kwargs: Any) -> dict[str, Any]:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        self.started.set()
+        try:
+            return await super()._refresh_project(*args, **kwargs)
+        finally:
+            self.running -= 1
+
+
+@pytest.fixture
+def project_ids(monkeypatch: pytest.MonkeyPatch) -> Generator[list[int], None, None]:
+    """IDs of one project per fake GitLab project, refreshed in an isolated schema."""
+    with isolated_schema_engine(ORCHESTRATOR_SCHEMA, history_days=GITLAB_DATASET.days) as engine:
+        with engine.begin() as conn:
+            ids = conn.execute(
+                insert(Project).returning(Project.id),
+                [
+                    {
+                        "gitlab_id": gitlab_id,
+                        "name": f"fake-{gitlab_id}",
+                        "url": f"https://gitlab.example.com/fake/{gitlab_id}",
+                    }
+                    for gitlab_id in GITLAB_DATASET.project_ids
+                ],
+            ).scalars().all()
+        monkeypatch.setattr(
+            refresh_orchestrator, "SessionLocal", sessionmaker(bind=engine, autoflush=False)
+        )
+        monkeypatch.setattr(settings, "gitlab_api_url", FAKE_API_URL)
+        monkeypatch.setattr(settings, "gitlab_access_token", "orchestrator-token")
+        monkeypatch.setattr(settings, "gitlab_merge_request_backend", "rest")
+        yield sorted(ids)
+
+
+def fake_gitlab(latency_ms: float = 0.0) -> FastAPI:
+    return create_fake_gitlab_app(
+        GITLAB_DATASET, FakeGitLabConfig(latency_ms=latency_ms, rate_limit=1_000_000)
+    )
+
+
+@pytest.fixture
+async def http_client() -> AsyncGenerator[tuple[httpx.AsyncClient, list[str]], None]:
+    """Client on a fake GitLab app with some latency, and the URLs it requested."""
+    requested: list[str] = []
+
+    async def record(request: httpx.Request) -> None:
+        requested.append(str(request.url))
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=fake_gitlab(latency_ms=50)),
+        event_hooks={"request": [record]},
+    ) as client:
+        yield client, requested
+
+
+async def test_projects_share_rate_limiter_and_http_client(
+    project_ids: list[int], http_client: tuple[httpx.AsyncClient, list[str]]
+) -> None:
+    client, requested = http_client
+    limiter = CountingRateLimiter()
+    orchestrator = RefreshOrchestrator(
+        max_concurrency=4, project_timeout=30, rate_limiter=limiter, http_client=client
+    )
+
+    summary = await orchestrator.refresh_projects(project_ids, days_back=GITLAB_DATASET.days)
+
+    assert summary["projects_processed"] == len(project_ids)
+    assert summary["total_deployments"] == (
+        GITLAB_DATASET.deployments_per_project * GITLAB_DATASET.projects
+    )
+    # Every GitLab call of every project went through the one limiter and client
+    assert limiter.acquired == len(requested) >= len(project_ids)
+    assert {url.split("/projects/")[1].split("/")[0] for url in requested} == {
+        str(gitlab_id) for gitlab_id in GITLAB_DATASET.project_ids
+    }
+    # The shared client is left open for its owner
+    assert not client.is_closed
+
+    db = refresh_orchestrator.SessionLocal()
+    try:
+        assert db.execute(select(func.count()).select_from(Deployment)).scalar_one() == (
+            summary["total_deployments"]
+        )
+    finally:
+        db.close()
+
+
+async def test_concurrency_is_limited(
+    project_ids: list[int], http_client: tuple[httpx.AsyncClient, list[str]]
+) -> None:
+    client, _requested = http_client
+    orchestrator = TrackingOrchestrator(
+        max_concurrency=2,
+        project_timeout=30,
+        rate_limiter=RateLimiter(1_000_000),
+        http_client=client,
+    )
+
+    summary = await orchestrator.refresh_projects(project_ids, days_back=GITLAB_DATASET.days)
+
+    assert summary["projects_processed"] == len(project_ids)
+    assert orchestrator.max_running == 2
+
+
+async def test_slow_project_times_out(project_ids: list[int]) -> None:
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=fake_gitlab(latency_ms=2_000))
+    ) as client:
+        orchestrator = RefreshOrchestrator(
+            max_concurrency=4,
+            project_timeout=0.3,
+            rate_limiter=RateLimiter(1_000_000),
+            http_client=client,
+        )
+        summary = await orchestrator.refresh_projects(project_ids[:2])
+
+    assert summary["projects_failed"] == 2
+    for result in summary["results"].values():
+        assert result["status"] == "timeout"
+        assert result["error"] == "timed out"
+        assert 0.3 <= result["duration_seconds"] < 2.0
+
+
+async def test_cancelled_project_does_not_stop_the_others(
+    project_ids: list[int], http_client: tuple[httpx.AsyncClient, list[str]]
+) -> None:
+    client, _requested = http_client
+    orchestrator = TrackingOrchestrator(
+        max_concurrency=1,
+        project_timeout=30,
+        rate_limiter=RateLimiter(1_000_000),
+        http_client=client,
+    )
+    cancelled, *others = project_ids
+
+    refresh = asyncio.create_task(
+        orchestrator.refresh_projects(project_ids, days_back=GITLAB_DATASET.days)
+    )
+    await asyncio.wait_for(orchestrator.started.wait(), timeout=5)
+    assert orchestrator.cancel(cancelled)
+    assert not orchestrator.cancel(10_000)
+    summary = await refresh
+
+    assert summary["results"][cancelled]["status"] == "cancelled"
+    assert all(summary["results"][project_id]["status"] == "success" for project_id in others)
+    assert summary["projects_processed"] == len(others)
@@ -0,0 +1,178 @@
+"""
+GitLab webhook receiver.
+
+Events are checked against the webhook secret and turned into a queued
+update of the affected rows; the update fetches just those rows from the
+fake GitLab app and marks their metric buckets dirty.
+"""
+from collections.abc import AsyncGenerator, Generator
+from typing import Any
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, func, insert, select, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.api.main import app
+from src.config.settings import settings
+from src.database.session import get_db
+from src.models.metrics import Deployment
+from src.models.project import Project
+from src.models.team_member import MergeRequest
+from src.services.data_refresh import DataRefreshService
+from src.services.gitlab_client import GitLabClient, RateLimiter
+from src.tasks.webhooks import apply_webhook_change
+from tests.benchmarks.fake_gitlab import FakeGitLabDataset, create_fake_gitlab_app
+from tests.database import isolated_schema_engine
+
+WEBHOOK_SCHEMA = "workmetrics_webhooks"
+
+WEBHOOK_SECRET = "webhook-secret"
+
+GITLAB_DATASET = FakeGitLabDataset(
+    projects=1, deployments_per_project=20, merge_requests_per_project=10, days=30
+)
+
+FAKE_API_URL = "http://fake-gitlab.test/api/v4"
+
+
+@pytest.fixture(scope="module")
+def webhook_engine() -> Generator[Engine, None, None]:
+    """Engine on an empty schema with the fake GitLab project."""
+    with isolated_schema_engine(WEBHOOK_SCHEMA, history_days=GITLAB_DATASET.days) as engine:
+        with engine.begin() as conn:
+            conn.execute(
+                insert(Project),
+                {
+                    "gitlab_id": GITLAB_DATASET.first_project_id,
+                    "name": "fake",
+                    "url": "https://gitlab.example.com/fake",
+                },
+            )
+        yield engine
+
+
+@pytest.fixture
+def client(
+    webhook_engine: Engine, monkeypatch: pytest.MonkeyPatch
+) -> Generator[tuple[TestClient, list[tuple]], None, None]:
+    """API client whose queued webhook changes are recorded instead of sent to Celery."""
+    queued: list[tuple] = []
+    monkeypatch.setattr(settings, "gitlab_webhook_secret", WEBHOOK_SECRET)
+    monkeypatch.setattr(apply_webhook_change, "delay", lambda *args: queued.append(args))
+
+    def override_get_db() -> Generator[Session, None, None]:
+        db = sessionmaker(bind=webhook_engine, autoflush=False)()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        with TestClient(app) as test_client:
+            yield test_client, queued
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+
+def _post_event(
+    client: TestClient, event: str, payload: Any, token: str = WEBHOOK_SECRET
+) -> httpx.Response:
+    return client.post(
+        "/api/v1/webhooks/gitlab",
+        json=payload,
+        headers={"X-Gitlab-Event": event, "X-Gitlab-Token": token},
+    )
+
+
+def test_webhook_requires_secret(client: tuple[TestClient, list[tuple]]) -> None:
+    test_client, queued = client
+    payload = {"project": {"id": GITLAB_DATASET.first_project_id}, "deployment_id": 1}
+
+    assert _post_event(test_client, "Deployment Hook", payload, token="wrong").status_code == 401
+    assert not queued
+
+
+def test_webhook_queues_affected_rows(
+    client: tuple[TestClient, list[tuple]], webhook_engine: Engine
+) -> None:
+    test_client, queued = client
+    project = {"id": GITLAB_DATASET.first_project_id}
+    with webhook_engine.connect() as conn:
+        project_id = conn.execute(select(Project.id)).scalar_one()
+
+    events = [
+        ("Deployment Hook", {"project": project, "deployment_id": 7}),
+        ("Merge Request Hook", {"project": project, "object_attributes": {"iid": 3}}),
+        (
+            "Note Hook",
+            {
+                "project": project,
+                "object_attributes": {"noteable_type": "MergeRequest"},
+                "merge_request": {"iid": 4},
+            },
+        ),
+        ("Pipeline Hook", {"project": project, "merge_request": {"iid": 5}}),
+    ]
+    for event, payload in events:
+        response = _post_event(test_client, event, payload)
+        assert response.status_code == 202, response.text
+        assert response.json() == {"status": "queued", "project_id": project_id}
+    assert queued == [
+        (project_id, [7], []),
+        (project_id, [], [3]),
+        (project_id, [], [4]),
+        (project_id, [], [5]),
+    ]
+
+
+def test_webhook_ignores_other_events(client: tuple[TestClient, list[tuple]]) -> None:
+    test_client, queued = client
+
+    ignored = [
+        ("Push Hook", {"project": {"id": GITLAB_DATASET.first_project_id}}),
+        ("Deployment Hook", {"project": {"id": 999_999}, "deployment_id": 1}),
+        ("Pipeline Hook", {"project": {"id": GITLAB_DATASET.first_project_id}}),
+    ]
+    for event, payload in ignored:
+        response = _post_event(test_client, event, payload)
+        assert response.status_code == 202
+        assert response.json()["status"] == "ignored"
+    assert not queued
+
+    assert _post_event(test_client, "Deployment Hook", {"project": {}}).status_code == 400
+
+
+@pytest.fixture
+async def gitlab_client() -> AsyncGenerator[GitLabClient, None]:
+    fake_gitlab = create_fake_gitlab_app(GITLAB_DATASET)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=fake_gitlab)) as http_client:
+        yield GitLabClient(
+            api_url=FAKE_API_URL,
+            access_token="webhook-token",
+            rate_limiter=RateLimiter(1_000_000),
+            http_client=http_client,
+        )
+
+
+async def test_refresh_items_upserts_only_affected_rows(
+    webhook_engine: Engine, gitlab_client: GitLabClient
+) -> None:
+    with sessionmaker(bind=webhook_engine, autoflush=False)() as db:
+        project = db.execute(select(Project)).scalar_one()
+        deployments = (await gitlab_client.get_project_deployments(project.gitlab_id))[:2]
+
+        result = await DataRefreshService(db, gitlab_client=gitlab_client).refresh_items(
+            project,
+            deployment_ids=[d["id"] for d in deployments] + [999_999],
+            merge_request_iids=[1],
+        )
+
+        assert result["deployments"] == 2 and result["merge_requests"] == 1
+        assert db.execute(select(func.count()).select_from(Deployment)).scalar_one() == 2
+        assert db.execute(select(func.count()).select_from(MergeRequest)).scalar_one() == 1
+        dirty = db.execute(text("SELECT count(*) FROM metrics_dirty_buckets")).scalar_one()
+        assert dirty >= 1
+        assert project.last_synced_at is None
@@ -0,0 +1,91 @@
+"""
+Queued log pipeline and request log sampling.
+"""
+import io
+import json
+import logging
+from collections.abc import Generator
+
+import pytest
+
+from src.api.middleware.logging import should_log_request
+from src.config.settings import settings
+from src.observability.logging import configure_logging, shutdown_logging
+
+
+@pytest.fixture
+def root_logger() -> Generator[logging.Logger, None, None]:
+    """The root logger, with its handlers and level restored afterwards."""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield root
+    shutdown_logging()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_json_records_are_written_by_the_listener(
+    root_logger: logging.Logger, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "log_format", "json")
+    monkeypatch.setattr(settings, "log_level", "INFO")
+    stream = io.StringIO()
+    configure_logging("workmetrics-test", stream=stream)
+
+    logger = logging.getLogger("workmetrics.test")
+    logger.debug("Created deployment %s", 1)
+    logger.info("Request %s", "done", extra={"status_code": 200, "path": "/api/v1/health"})
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        logger.exception("Refresh failed")
+    shutdown_logging()
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert len(records) == 2
+    assert records[0]["message"] == "Request done"
+    assert records[0]["service"] == "workmetrics-test"
+    assert records[0]["status_code"] == 200 and records[0]["path"] == "/api/v1/health"
+    assert records[1]["level"] == "ERROR"
+    assert "RuntimeError: boom" in records[1]["exception"]
+
+
+def test_arguments_are_rendered_when_logged(
+    root_logger: logging.Logger, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "log_format", "text")
+    monkeypatch.setattr(settings, "log_level", "INFO")
+    stream = io.StringIO()
+    configure_logging(stream=stream)
+
+    project_ids = [1, 2]
+    logging.getLogger("workmetrics.test").info("Refreshing projects %s", project_ids)
+    # Changed before the listener may have written the record
+    project_ids.append(3)
+    shutdown_logging()
+
+    assert stream.getvalue().rstrip().endswith("Refreshing projects [1, 2]")
+
+
+def test_unknown_log_format_is_rejected(
+    root_logger: logging.Logger, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "log_format", "xml")
+    with pytest.raises(ValueError):
+        configure_logging()
+
+
+def test_successful_requests_are_sampled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "request_log_sample_rate", 0.0)
+    monkeypatch.setattr(settings, "request_log_slow_ms", 1000)
+
+    assert not should_log_request(200, 0.010)
+    assert should_log_request(404, 0.010)
+    assert should_log_request(500, 0.010)
+    assert should_log_request(200, 1.5)
+
+    monkeypatch.setattr(settings, "request_log_sample_rate", 1.0)
+    assert should_log_request(200, 0.010)
@@ -0,0 +1,58 @@
+"""
+Prometheus metric labels and the /metrics endpoint.
+"""
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from src.api.main import app
+from src.observability.metrics import gitlab_endpoint_label, record_cache_lookup
+
+
+@pytest.mark.parametrize(
+    ("endpoint", "label"),
+    [
+        ("projects/42/deployments", "/projects/:id/deployments"),
+        ("/projects/42/merge_requests/7/notes", "/projects/:id/merge_requests/:id/notes"),
+        ("projects/42", "/projects/:id"),
+        ("projects/group%2Fproject/deployments", "/projects/group%2Fproject/deployments"),
+        ("projects/42/repository/commits/4f2a91", "/projects/:id/repository/commits/4f2a91"),
+    ],
+)
+def test_gitlab_endpoint_labels_collapse_ids(endpoint: str, label: str) -> None:
+    assert gitlab_endpoint_label(endpoint) == label
+
+
+def test_many_projects_share_one_endpoint_label() -> None:
+    labels = {gitlab_endpoint_label(f"projects/{i}/deployments") for i in range(1_000)}
+    assert labels == {"/projects/:id/deployments"}
+
+
+def _requests(route: str, status: str) -> float:
+    return REGISTRY.get_sample_value(
+        "workmetrics_http_request_duration_seconds_count",
+        {"method": "GET", "route": route, "status": status},
+    ) or 0.0
+
+
+def test_metrics_endpoint_exposes_route_templates() -> None:
+    client = TestClient(app)
+    before = _requests("/", "200"), _requests("unmatched", "404")
+
+    client.get("/")
+    for i in range(3):
+        client.get(f"/no-such-page/{i}")
+    record_cache_lookup("unit_test_cache", hit=True)
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (_requests("/", "200"), _requests("unmatched", "404")) == (
+        before[0] + 1,
+        before[1] + 3,
+    )
+    body = response.text
+    assert "# TYPE workmetrics_http_request_duration_seconds histogram" in body
+    assert 'workmetrics_cache_requests_total{cache="unit_test_cache",result="hit"} 1.0' in body
+    # Raw paths never become labels
+    assert "/no-such-page" not in body
@@ -0,0 +1,140 @@
+"""
+On-demand request profiling and profile retrieval.
+"""
+import asyncio
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+
+from src.api.middleware.profiling import ProfiledRoute, profiling_middleware
+from src.api.routes.profiles import router as profiles_router
+from src.config.settings import settings
+
+TOKEN = "profiling-test-token"
+
+router = APIRouter(route_class=ProfiledRoute)
+slow_request_started = asyncio.Event()
+slow_request_release = asyncio.Event()
+
+
+@router.get("/work")
+def work() -> dict[str, int]:
+    return {"total": sum(range(10_000))}
+
+
+@router.get("/slow")
+async def slow() -> dict[str, bool]:
+    slow_request_started.set()
+    await slow_request_release.wait()
+    return {"done": True}
+
+
+app = FastAPI()
+app.include_router(router, prefix="/api/v1")
+app.include_router(profiles_router, prefix="/api/v1")
+app.middleware("http")(profiling_middleware)
+
+
+@pytest.fixture
+def profiling(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Profiling enabled with TOKEN, storing profiles under a temporary directory."""
+    monkeypatch.setattr(settings, "profiling_token", TOKEN)
+    monkeypatch.setattr(settings, "profiling_dir", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+async def client() -> AsyncGenerator[httpx.AsyncClient, None]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def test_profiled_request_returns_artifact(
+    profiling: Path, client: httpx.AsyncClient
+) -> None:
+    response = await client.get("/api/v1/work", headers={"X-Profile-Token": TOKEN})
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+
+    headers = {"X-Profile-Token": TOKEN}
+    metadata = (await client.get(f"/api/v1/profiles/{profile_id}", headers=headers)).json()
+    assert metadata["kind"] == "request"
+    assert metadata["name"] == "GET /api/v1/work"
+    assert metadata["total_calls"] > 0
+
+    pstats = await client.get(f"/api/v1/profiles/{profile_id}/pstats", headers=headers)
+    assert pstats.status_code == 200
+    assert pstats.content == (profiling / f"{profile_id}.pstats").read_bytes()
+
+    collapsed = await client.get(f"/api/v1/profiles/{profile_id}/collapsed", headers=headers)
+    # The sync endpoint ran under its own profiler in the threadpool
+    assert "work (test_profiling.py" in collapsed.text
+
+
+async def test_profile_opt_in_by_query_parameter(
+    profiling: Path, client: httpx.AsyncClient
+) -> None:
+    response = await client.get("/api/v1/work", params={"profile": TOKEN})
+
+    assert response.status_code == 200
+    assert (profiling / f"{response.headers['X-Profile-Id']}.json").exists()
+
+
+@pytest.mark.parametrize("token", [None, "wrong-token"])
+async def test_requests_without_token_pass_through(
+    profiling: Path, client: httpx.AsyncClient, token: str | None
+) -> None:
+    headers = {"X-Profile-Token": token} if token else {}
+    response = await client.get("/api/v1/work", headers=headers)
+
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    assert list(profiling.iterdir()) == []
+
+
+async def test_profiling_is_off_without_configured_token(
+    tmp_path: Path, client: httpx.AsyncClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "profiling_dir", str(tmp_path))
+    response = await client.get("/api/v1/work", headers={"X-Profile-Token": TOKEN})
+
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    profile = await client.get(
+        f"/api/v1/profiles/{'0' * 32}", headers={"X-Profile-Token": TOKEN}
+    )
+    assert profile.status_code == 403
+
+
+async def test_unknown_profile_is_not_found(profiling: Path, client: httpx.AsyncClient) -> None:
+    headers = {"X-Profile-Token": TOKEN}
+    for profile_id in ("0" * 32, "not-a-profile-id"):
+        response = await client.get(f"/api/v1/profiles/{profile_id}", headers=headers)
+        assert response.status_code == 404
+
+
+async def test_one_profiled_request_at_a_time(
+    profiling: Path, client: httpx.AsyncClient
+) -> None:
+    slow_request_started.clear()
+    slow_request_release.clear()
+    headers = {"X-Profile-Token": TOKEN}
+    first = asyncio.create_task(client.get("/api/v1/slow", headers=headers))
+    await asyncio.wait_for(slow_request_started.wait(), timeout=5)
+
+    # The event loop is already being profiled
+    conflict = await client.get("/api/v1/work", headers=headers)
+    assert conflict.status_code == 409
+    # Requests that do not ask for a profile are unaffected
+    assert (await client.get("/api/v1/work")).status_code == 200
+
+    slow_request_release.set()
+    response = await first
+    assert response.status_code == 200
+    assert "X-Profile-Id" in response.headers
+    # ... and profiling is available again once it finished
+    assert "X-Profile-Id" in (await client.get("/api/v1/work", headers=headers)).headers
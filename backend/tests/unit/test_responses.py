@@ -0,0 +1,56 @@
+"""
+Trusted (unvalidated) JSON responses and their drift check.
+"""
+from typing import Any
+
+import orjson
+import pytest
+
+from src.api.responses import trusted_response
+from src.api.routes.team_activity import TeamActivityResponse
+from src.config.settings import settings
+
+REVIEW_LOAD = {
+    "team_member_id": 1,
+    "username": "dev",
+    "name": "Dev",
+    "review_count": 4,
+    "comment_count": 9,
+    "review_load_percentage": 100.0,
+}
+
+
+def payload(**review_load: Any) -> dict[str, Any]:
+    return {
+        "period_start": "2024-01-01T00:00:00",
+        "period_end": "2024-01-31T23:59:59",
+        "team_members": [],
+        "review_load": [{**REVIEW_LOAD, **review_load}],
+    }
+
+
+def test_matching_payload_is_sent_as_is(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "validate_trusted_responses", True)
+    response = trusted_response(payload(), TeamActivityResponse)
+
+    assert response.body == orjson.dumps(payload())
+    assert response.body == TeamActivityResponse.model_validate(payload()).model_dump_json().encode()
+
+
+@pytest.mark.parametrize(
+    "drift",
+    [
+        {"review_load_percentage": 100},  # int where the schema has a float
+        {"email": "dev@example.com"},  # key the schema does not document
+    ],
+)
+def test_drift_from_response_model_is_rejected(
+    drift: dict[str, Any], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "validate_trusted_responses", True)
+    with pytest.raises(ValueError):
+        trusted_response(payload(**drift), TeamActivityResponse)
+
+    # Unchecked in production
+    monkeypatch.setattr(settings, "validate_trusted_responses", False)
+    assert trusted_response(payload(**drift), TeamActivityResponse).status_code == 200
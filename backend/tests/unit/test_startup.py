@@ -0,0 +1,145 @@
+"""
+Startup import budget and readiness.
+
+Each import is measured in a fresh interpreter with ``python -X importtime``;
+the last line of its report is the cumulative time of the top-level module.
+The budgets leave headroom over the measured times (about 0.9s for the API,
+0.7s for the tasks); a module that pulls a heavy dependency back into
+startup shows up both in the budget and in the list of modules loaded.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from src.config.settings import settings
+from src.observability import readiness
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# Cumulative import time budgets, in seconds
+IMPORT_BUDGETS = {"src.api.main": 1.5, "src.tasks": 1.2}
+
+# Modules startup must not import; they are loaded on first use or by warm-up
+LAZY_MODULES = {
+    "src.api.main": ("numpy", "pyarrow", "celery"),
+    "src.tasks": ("numpy", "pyarrow"),
+}
+
+PROBE = """
+import json, sys
+import {module}
+from src.database.session import get_engine
+print(json.dumps({{"modules": sorted(sys.modules), "engines": get_engine.cache_info().currsize}}))
+"""
+
+
+def import_in_subprocess(module: str) -> tuple[float, dict]:
+    """Import a module in a fresh interpreter; return its import time (s) and probe output."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(module=module)],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "PYTHONPATH": str(BACKEND_DIR)},
+        capture_output=True,
+        text=True,
+        timeout=60,
+        check=True,
+    )
+    # "import time: self [us] | cumulative | imported package"
+    timings = [line for line in result.stderr.splitlines() if line.startswith("import time:")]
+    top_level = [line for line in timings if line.split("|")[2].strip() == module]
+    cumulative_us = int(top_level[-1].split("|")[1])
+    return cumulative_us / 1_000_000, json.loads(result.stdout.splitlines()[-1])
+
+
+@pytest.mark.parametrize("module", sorted(IMPORT_BUDGETS))
+def test_startup_import_budget(module: str) -> None:
+    seconds, probe = import_in_subprocess(module)
+
+    assert seconds < IMPORT_BUDGETS[module], (
+        f"importing {module} took {seconds:.2f}s (budget {IMPORT_BUDGETS[module]}s)"
+    )
+    loaded = set(probe["modules"])
+    assert not [name for name in LAZY_MODULES[module] if name in loaded]
+    # No engine (and no connection) until the first session or warm-up
+    assert probe["engines"] == 0
+
+
+@pytest.fixture
+def not_ready() -> Generator[None, None, None]:
+    """A process that has not warmed up yet; readiness is restored afterwards."""
+    if not settings.database_url.startswith("postgresql"):
+        pytest.skip("Tests require PostgreSQL")
+    try:
+        with readiness.get_engine().connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except OperationalError as e:
+        pytest.skip(f"PostgreSQL is not reachable: {e}")
+    was_ready = readiness.is_ready()
+    readiness._ready.clear()
+    yield
+    if was_ready:
+        readiness._ready.set()
+    else:
+        readiness._ready.clear()
+
+
+def test_readiness_follows_warm_up(not_ready: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    from src.api.main import app
+
+    def unreachable(engine: object, connections: int) -> int:
+        raise OperationalError("SELECT 1", {}, Exception("connection refused"))
+
+    # Without the lifespan (no context manager) warm-up only runs from /ready
+    client = TestClient(app)
+    monkeypatch.setattr(readiness, "prime_pool", unreachable)
+    response = client.get("/api/v1/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "not ready"
+    assert not readiness.is_ready()
+
+    monkeypatch.undo()
+    response = client.get("/api/v1/ready")
+    assert response.status_code == 200
+    assert readiness.is_ready()
+
+
+def test_prime_pool_opens_pooled_connections(not_ready: None) -> None:
+    engine = readiness.get_engine()
+    opened = readiness.prime_pool(engine, 2)
+
+    assert opened == min(2, engine.pool.size())
+    assert engine.pool.checkedin() >= opened
+
+
+def test_ready_file_waits_for_database(
+    not_ready: None, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    ready_file = tmp_path / "ready"
+    monkeypatch.setattr(settings, "worker_ready_file", str(ready_file))
+    database_url = settings.database_url
+    monkeypatch.setattr(
+        settings, "database_url", "postgresql+psycopg2://workmetrics@127.0.0.1:1/workmetrics"
+    )
+    try:
+        readiness.write_ready_file(retry_seconds=0.1)
+        assert not ready_file.exists()
+
+        # Written by the background retry once the database is reachable
+        monkeypatch.setattr(settings, "database_url", database_url)
+        for _ in range(50):
+            if ready_file.exists():
+                break
+            time.sleep(0.1)
+        assert ready_file.exists()
+    finally:
+        readiness.remove_ready_file()
+    assert not ready_file.exists()
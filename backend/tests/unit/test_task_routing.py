@@ -0,0 +1,69 @@
+"""
+Celery queue routing and the split of the GitLab rate budget.
+"""
+import importlib
+
+import pytest
+
+from src.config.settings import settings
+from src.services.gitlab_client import RATE_BUDGETS, rate_limit_per_minute
+from src.tasks import (
+    BACKFILL_QUEUE,
+    BATCH_QUEUE,
+    INTERACTIVE_QUEUE,
+    TASK_ROUTES,
+    celery_app,
+)
+
+
+@pytest.fixture(scope="module")
+def task_names() -> list[str]:
+    for module in celery_app.conf.include:
+        importlib.import_module(module)
+    return sorted(name for name in celery_app.tasks if name.startswith("src.tasks."))
+
+
+def route(task_name: str) -> dict:
+    return celery_app.amqp.router.route({}, task_name)
+
+
+def test_every_task_has_a_route(task_names: list[str]) -> None:
+    assert task_names
+    assert set(task_names) == set(TASK_ROUTES)
+
+
+def test_tasks_are_routed_by_who_waits_for_them() -> None:
+    single = route("src.tasks.daily_refresh.refresh_single_project")
+    webhook = route("src.tasks.webhooks.apply_webhook_change")
+    batch = route("src.tasks.daily_refresh.refresh_all_projects")
+    backfill = route("src.tasks.backfill.backfill_project")
+
+    assert single["queue"].name == webhook["queue"].name == INTERACTIVE_QUEUE
+    assert batch["queue"].name == BATCH_QUEUE
+    assert backfill["queue"].name == BACKFILL_QUEUE
+    # Each queue has its own routing key, so no message reaches another queue
+    assert len({r["queue"].routing_key for r in (single, batch, backfill)}) == 3
+    # Redis broker: lower is taken first
+    assert single["priority"] < webhook["priority"]
+
+
+def test_rate_budget_reserves_interactive_share(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "gitlab_api_rate_limit_per_minute", 100)
+    monkeypatch.setattr(settings, "gitlab_interactive_rate_reserve_per_minute", 15)
+    monkeypatch.setattr(settings, "backfill_rate_limit_per_minute", 20)
+
+    assert rate_limit_per_minute("interactive") == 15
+    assert rate_limit_per_minute("backfill") == 20
+    assert rate_limit_per_minute("batch") == 65
+    assert sum(rate_limit_per_minute(budget) for budget in RATE_BUDGETS) == 100
+
+    with pytest.raises(ValueError):
+        rate_limit_per_minute("nightly")
+
+
+def test_batch_budget_never_drops_to_zero(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "gitlab_api_rate_limit_per_minute", 20)
+    monkeypatch.setattr(settings, "gitlab_interactive_rate_reserve_per_minute", 10)
+    monkeypatch.setattr(settings, "backfill_rate_limit_per_minute", 20)
+
+    assert rate_limit_per_minute("batch") == 1
@@ -0,0 +1,96 @@
+"""
+Refresh stage spans and span exporter selection.
+"""
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import StatusCode
+
+from src.config.settings import settings
+from src.observability import tracing
+from src.observability.tracing import (
+    JsonFileSpanExporter,
+    _create_exporter,
+    configure_tracing,
+    traced_stage,
+)
+
+
+class Stages:
+    @traced_stage("refresh.fetch")
+    async def fetch(self, project: SimpleNamespace, fail: bool = False) -> str:
+        if fail:
+            raise RuntimeError("GitLab is down")
+        return f"fetched {project.id}"
+
+
+async def test_traced_stage_records_project_and_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(tracing, "tracer", provider.get_tracer("test"))
+
+    project = SimpleNamespace(id=42)
+    assert await Stages().fetch(project) == "fetched 42"
+    with pytest.raises(RuntimeError):
+        await Stages().fetch(project, fail=True)
+
+    ok, failed = exporter.get_finished_spans()
+    assert ok.name == failed.name == "refresh.fetch"
+    assert ok.attributes["workmetrics.project_id"] == 42
+    assert ok.status.status_code == StatusCode.UNSET
+    assert failed.status.status_code == StatusCode.ERROR
+    assert failed.events[0].attributes["exception.message"] == "GitLab is down"
+
+
+def test_exporters_are_chosen_by_name(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "tracing_json_path", str(tmp_path / "spans.jsonl"))
+
+    assert isinstance(_create_exporter("otlp"), OTLPSpanExporter)
+    json_exporter = _create_exporter("json")
+    assert isinstance(json_exporter, JsonFileSpanExporter)
+    assert json_exporter.path == str(tmp_path / "spans.jsonl")
+    with pytest.raises(ValueError):
+        _create_exporter("zipkin")
+
+
+def test_json_exporter_writes_one_span_per_line(tmp_path: Path) -> None:
+    path = tmp_path / "spans.jsonl"
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(JsonFileSpanExporter(str(path))))
+    tracer = provider.get_tracer("test")
+    with tracer.start_as_current_span("refresh"):
+        with tracer.start_as_current_span("refresh.upsert"):
+            pass
+
+    child, parent = (json.loads(line) for line in path.read_text().splitlines())
+    assert (child["name"], parent["name"]) == ("refresh.upsert", "refresh")
+    assert child["parent_id"] == parent["context"]["span_id"]
+
+
+def test_configure_tracing(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    installed: list[TracerProvider] = []
+    monkeypatch.setattr(tracing.trace, "set_tracer_provider", installed.append)
+    monkeypatch.setattr(tracing, "_provider", None)
+    monkeypatch.setattr(settings, "tracing_json_path", str(tmp_path / "spans.jsonl"))
+
+    monkeypatch.setattr(settings, "tracing_exporter", "none")
+    assert not configure_tracing("workmetrics-test")
+    monkeypatch.setattr(settings, "tracing_exporter", "zipkin")
+    with pytest.raises(ValueError):
+        configure_tracing("workmetrics-test")
+    assert installed == []
+
+    monkeypatch.setattr(settings, "tracing_exporter", "JSON")
+    assert configure_tracing("workmetrics-test")
+    # A second call keeps the installed provider
+    assert configure_tracing("workmetrics-test")
+    assert len(installed) == 1
+    assert installed[0].resource.attributes["service.name"] == "workmetrics-test"
+    installed[0].shutdown()
@@ -1,5 +1,10 @@
 import { apiClient } from './api';
-import { FourKeysMetrics, MetricsQueryParams } from '../types/metrics';
+import {
+  FourKeysBatchQueryParams,
+  FourKeysBatchResponse,
+  FourKeysMetrics,
+  MetricsQueryParams,
+} from '../types/metrics';
 
 export class FourKeysService {
   async getFourKeysMetrics(
@@ -11,6 +16,15 @@ export class FourKeysService {
       { params }
     );
   }
+
+  async getFourKeysMetricsBatch(
+    projectIds: number[],
+    params: FourKeysBatchQueryParams
+  ): Promise<FourKeysBatchResponse> {
+    return await apiClient.get<FourKeysBatchResponse>('/four-keys', {
+      params: { ...params, project_ids: projectIds.join(',') },
+    });
+  }
 }
 
 export const fourKeysService = new FourKeysService();
@@ -11,6 +11,26 @@ export interface FourKeysMetrics {
   time_to_restore_median_hours: number | null;
 }
 
+export interface ProjectFourKeysMetrics extends FourKeysMetrics {
+  project_id: number;
+}
+
+export interface FourKeysBatchResponse {
+  period_start: string;
+  period_end: string;
+  total: number;
+  limit: number;
+  offset: number;
+  projects: ProjectFourKeysMetrics[];
+  aggregate: FourKeysMetrics | null;
+}
+
+export interface FourKeysBatchQueryParams extends MetricsQueryParams {
+  include_aggregate?: boolean;
+  limit?: number;
+  offset?: number;
+}
+
 export interface MetricsQueryParams {
   start_date: string; // YYYY-MM-DD
   end_date: string; // YYYY-MM-DD